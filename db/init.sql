@@ -42,6 +42,8 @@ CREATE TABLE user_preferences (
     streak_notifications_enabled BOOLEAN DEFAULT TRUE,
     -- Timezone (from add_schedule_tables migration)
     timezone VARCHAR(50) DEFAULT 'UTC',
+    -- Bumped on any change that can alter a computed schedule (from migration 007)
+    schedule_version BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     -- Constraint: only one test level can be enabled at a time
@@ -56,13 +58,18 @@ CREATE TABLE user_preferences (
 CREATE TABLE audio (
     text_content TEXT NOT NULL,
     language VARCHAR(10) NOT NULL,
-    audio_data BYTEA NOT NULL,
+    audio_data BYTEA,                       -- NULL once moved to the media store (from migration 011)
     content_type VARCHAR(50) DEFAULT 'audio/mpeg',
     ai_verified BOOLEAN DEFAULT FALSE,
     ai_verification_comment TEXT,
     version INTEGER DEFAULT 1,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    PRIMARY KEY (text_content, language)
+    -- sha256 hex of language + newline + text, maintained by trigger (from migration 009)
+    content_hash CHAR(64),
+    -- sha256 of the blob in the media store (from migration 011)
+    storage_key CHAR(64),
+    PRIMARY KEY (text_content, language),
+    CONSTRAINT audio_blob_present CHECK (audio_data IS NOT NULL OR storage_key IS NOT NULL)
 );
 
 -- Language-Specific Definitions Table
@@ -90,6 +97,14 @@ CREATE TABLE saved_words (
     is_known BOOLEAN DEFAULT FALSE,  -- From migration 005
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     metadata JSONB DEFAULT '{}'::jsonb,
+    -- Latest review state, maintained by trigger on reviews (from migration 008)
+    last_reviewed_at TIMESTAMP,
+    next_review_date TIMESTAMP,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    correct_count INTEGER NOT NULL DEFAULT 0,
+    last_failure_at TIMESTAMP,
+    word_key VARCHAR(255) GENERATED ALWAYS AS (LOWER(word)) STORED,  -- From migration 015
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- From migration 016
     UNIQUE(user_id, word, learning_language, native_language)
 );
 
@@ -178,10 +193,13 @@ CREATE TABLE illustrations (
     word VARCHAR(255) NOT NULL,
     language VARCHAR(10) NOT NULL,
     scene_description TEXT NOT NULL,
-    image_data BYTEA NOT NULL,
+    image_data BYTEA,                       -- NULL once moved to the media store (from migration 011)
     content_type VARCHAR(50) DEFAULT 'image/png',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    PRIMARY KEY (word, language)
+    -- sha256 of the blob in the media store (from migration 011)
+    storage_key CHAR(64),
+    PRIMARY KEY (word, language),
+    CONSTRAINT illustrations_blob_present CHECK (image_data IS NOT NULL OR storage_key IS NOT NULL)
 );
 
 -- User Feedback Table
@@ -208,6 +226,7 @@ CREATE TABLE test_vocabularies (
     is_ielts_intermediate BOOLEAN DEFAULT FALSE,
     is_ielts_advanced BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    word_key VARCHAR(100) GENERATED ALWAYS AS (LOWER(word)) STORED,  -- From migration 015
     PRIMARY KEY (word, language)
 );
 
@@ -283,6 +302,7 @@ CREATE INDEX idx_definitions_unverified ON definitions(ai_verified) WHERE ai_ver
 -- Saved words indexes
 CREATE INDEX idx_saved_words_user_id ON saved_words(user_id);
 CREATE INDEX idx_saved_words_is_known ON saved_words(user_id, is_known);
+CREATE INDEX idx_saved_words_user_next_review ON saved_words(user_id, next_review_date);
 
 -- Reviews indexes
 CREATE INDEX idx_reviews_user_id ON reviews(user_id);
@@ -341,3 +361,433 @@ CREATE INDEX idx_notification_logs_type ON notification_logs(notification_type);
 CREATE INDEX idx_api_usage_endpoint_timestamp ON api_usage_logs(endpoint, timestamp DESC);
 CREATE INDEX idx_api_usage_timestamp ON api_usage_logs(timestamp DESC);
 CREATE INDEX idx_api_usage_user_id ON api_usage_logs(user_id);
+
+-- ============================================================
+-- SCHEDULE SNAPSHOT VERSIONING (from migration 007)
+-- ============================================================
+
+-- Reviews and saved words: bump the owning user's version
+CREATE OR REPLACE FUNCTION bump_schedule_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE user_preferences SET schedule_version = schedule_version + 1
+        WHERE user_id = OLD.user_id;
+    ELSE
+        UPDATE user_preferences SET schedule_version = schedule_version + 1
+        WHERE user_id = NEW.user_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_reviews_schedule_version
+    AFTER INSERT OR DELETE ON reviews
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_schedule_version();
+
+CREATE TRIGGER trigger_saved_words_schedule_version
+    AFTER INSERT OR DELETE OR UPDATE OF word, is_known ON saved_words
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_schedule_version();
+
+-- Preferences: bump when test settings, target date or timezone change
+CREATE OR REPLACE FUNCTION bump_schedule_version_on_preferences()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (NEW.timezone, NEW.target_end_date,
+        NEW.toefl_enabled, NEW.ielts_enabled, NEW.tianz_enabled,
+        NEW.toefl_beginner_enabled, NEW.toefl_intermediate_enabled, NEW.toefl_advanced_enabled,
+        NEW.ielts_beginner_enabled, NEW.ielts_intermediate_enabled, NEW.ielts_advanced_enabled)
+       IS DISTINCT FROM
+       (OLD.timezone, OLD.target_end_date,
+        OLD.toefl_enabled, OLD.ielts_enabled, OLD.tianz_enabled,
+        OLD.toefl_beginner_enabled, OLD.toefl_intermediate_enabled, OLD.toefl_advanced_enabled,
+        OLD.ielts_beginner_enabled, OLD.ielts_intermediate_enabled, OLD.ielts_advanced_enabled)
+    THEN
+        NEW.schedule_version = OLD.schedule_version + 1;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_user_preferences_schedule_version
+    BEFORE UPDATE ON user_preferences
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_schedule_version_on_preferences();
+
+-- Optional shared snapshot store (SCHEDULE_SNAPSHOT_STORE=postgres):
+-- latest computed snapshot per user and kind, valid only for the stored version
+CREATE TABLE schedule_snapshots (
+    user_id UUID NOT NULL,
+    kind VARCHAR(50) NOT NULL,               -- 'schedule', 'test_progress'
+    params TEXT NOT NULL,                    -- e.g. test_type|target_end_date|local_date
+    schedule_version BIGINT NOT NULL,
+    payload JSONB NOT NULL,
+    computed_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (user_id, kind)
+);
+
+-- ============================================================
+-- SAVED WORD REVIEW STATE (from migration 008)
+-- ============================================================
+
+-- Recompute one word's state from its reviews (used for updates/deletes and the backfill)
+CREATE OR REPLACE FUNCTION refresh_saved_word_review_state(p_word_id INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE saved_words sw
+    SET last_reviewed_at = agg.last_reviewed_at,
+        next_review_date = agg.next_review_date,
+        review_count = agg.review_count,
+        correct_count = agg.correct_count,
+        last_failure_at = agg.last_failure_at
+    FROM (
+        SELECT
+            MAX(reviewed_at) AS last_reviewed_at,
+            (ARRAY_AGG(next_review_date ORDER BY reviewed_at DESC))[1] AS next_review_date,
+            COUNT(*) AS review_count,
+            COUNT(*) FILTER (WHERE response = TRUE) AS correct_count,
+            MAX(reviewed_at) FILTER (WHERE response = FALSE) AS last_failure_at
+        FROM reviews
+        WHERE word_id = p_word_id
+    ) agg
+    WHERE sw.id = p_word_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- New review: fold it into the state incrementally, in the inserting transaction.
+-- SET expressions all see the pre-update row, so next_review_date compares
+-- against the previous last_reviewed_at.
+CREATE OR REPLACE FUNCTION apply_review_to_saved_word()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE saved_words
+        SET review_count = review_count + 1,
+            correct_count = correct_count + CASE WHEN NEW.response THEN 1 ELSE 0 END,
+            last_failure_at = CASE WHEN NEW.response THEN last_failure_at
+                                   ELSE GREATEST(last_failure_at, NEW.reviewed_at) END,
+            next_review_date = CASE WHEN last_reviewed_at IS NULL OR NEW.reviewed_at >= last_reviewed_at
+                                    THEN NEW.next_review_date ELSE next_review_date END,
+            last_reviewed_at = GREATEST(last_reviewed_at, NEW.reviewed_at)
+        WHERE id = NEW.word_id;
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM refresh_saved_word_review_state(NEW.word_id);
+        IF OLD.word_id IS DISTINCT FROM NEW.word_id THEN
+            PERFORM refresh_saved_word_review_state(OLD.word_id);
+        END IF;
+    ELSE
+        PERFORM refresh_saved_word_review_state(OLD.word_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_reviews_saved_word_state
+    AFTER INSERT OR UPDATE OF word_id, response, reviewed_at, next_review_date OR DELETE ON reviews
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_review_to_saved_word();
+
+-- ============================================================
+-- CONTENT-ADDRESSED AUDIO (from migration 009)
+-- ============================================================
+
+-- Must match handlers.audio.audio_content_hash()
+CREATE OR REPLACE FUNCTION set_audio_content_hash()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.content_hash = encode(sha256(convert_to(NEW.language || E'\n' || NEW.text_content, 'UTF8')), 'hex');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_audio_content_hash
+    BEFORE INSERT OR UPDATE OF text_content, language ON audio
+    FOR EACH ROW
+    EXECUTE FUNCTION set_audio_content_hash();
+
+CREATE UNIQUE INDEX idx_audio_content_hash ON audio(content_hash);
+
+-- ============================================================
+-- AUDIO JOB QUEUE (from migration 012)
+-- ============================================================
+
+CREATE TABLE audio_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    text_content TEXT NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMP NOT NULL DEFAULT NOW(),   -- not claimable before this (retry backoff)
+    locked_by TEXT,
+    locked_at TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP,
+    CONSTRAINT audio_jobs_text_language_key UNIQUE (text_content, language),
+    CONSTRAINT audio_jobs_status_check CHECK (status IN ('queued', 'running', 'done', 'failed'))
+);
+
+CREATE INDEX idx_audio_jobs_claimable ON audio_jobs (run_after, id) WHERE status = 'queued';
+CREATE INDEX idx_audio_jobs_running ON audio_jobs (locked_at) WHERE status = 'running';
+
+-- ============================================================
+-- LEADERBOARD SCORES (from migration 013)
+-- ============================================================
+
+CREATE TABLE user_scores (
+    user_id UUID PRIMARY KEY REFERENCES user_preferences(user_id) ON DELETE CASCADE,
+    score BIGINT NOT NULL DEFAULT 0,              -- correct = 2 points, wrong = 1 point
+    total_reviews BIGINT NOT NULL DEFAULT 0,
+    correct_reviews BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_user_scores_score_rank ON user_scores (score DESC, total_reviews DESC, user_id);
+CREATE INDEX idx_user_scores_reviews_rank ON user_scores (total_reviews DESC, user_id);
+
+CREATE OR REPLACE FUNCTION add_review_to_user_score(p_user_id UUID, p_response BOOLEAN, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO user_scores (user_id, score, total_reviews, correct_reviews, updated_at)
+    SELECT p_user_id,
+           p_sign * CASE WHEN p_response THEN 2 ELSE 1 END,
+           p_sign,
+           p_sign * CASE WHEN p_response THEN 1 ELSE 0 END,
+           NOW()
+    WHERE EXISTS (SELECT 1 FROM user_preferences WHERE user_id = p_user_id)
+    ON CONFLICT (user_id) DO UPDATE
+    SET score = user_scores.score + EXCLUDED.score,
+        total_reviews = user_scores.total_reviews + EXCLUDED.total_reviews,
+        correct_reviews = user_scores.correct_reviews + EXCLUDED.correct_reviews,
+        updated_at = EXCLUDED.updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_review_to_user_score()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM add_review_to_user_score(OLD.user_id, OLD.response, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM add_review_to_user_score(NEW.user_id, NEW.response, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_reviews_user_score
+    AFTER INSERT OR UPDATE OF user_id, response OR DELETE ON reviews
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_review_to_user_score();
+
+CREATE OR REPLACE FUNCTION create_user_score()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO user_scores (user_id) VALUES (NEW.user_id) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_user_preferences_score
+    AFTER INSERT ON user_preferences
+    FOR EACH ROW
+    EXECUTE FUNCTION create_user_score();
+
+-- ============================================================
+-- TEST VOCABULARY PROGRESS COUNTERS (from migration 014)
+-- ============================================================
+
+CREATE TABLE user_test_progress (
+    user_id UUID NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    test_type VARCHAR(32) NOT NULL,             -- key of handlers.achievements.TEST_TYPES_MAPPING
+    saved_words INTEGER NOT NULL DEFAULT 0,     -- distinct word_key saved from this test
+    PRIMARY KEY (user_id, language, test_type)
+);
+
+-- Case-normalized word keys (from migration 015)
+CREATE INDEX idx_test_vocab_word_key ON test_vocabularies (word_key, language);
+CREATE INDEX idx_saved_words_user_word_key ON saved_words (user_id, word_key, learning_language);
+
+CREATE OR REPLACE FUNCTION test_vocabulary_types(tv test_vocabularies)
+RETURNS SETOF VARCHAR AS $$
+    SELECT t.test_type
+    FROM (VALUES
+        ('TOEFL_BEGINNER', tv.is_toefl_beginner),
+        ('TOEFL_INTERMEDIATE', tv.is_toefl_intermediate),
+        ('TOEFL_ADVANCED', tv.is_toefl_advanced),
+        ('IELTS_BEGINNER', tv.is_ielts_beginner),
+        ('IELTS_INTERMEDIATE', tv.is_ielts_intermediate),
+        ('IELTS_ADVANCED', tv.is_ielts_advanced),
+        ('TIANZ', tv.is_tianz)
+    ) AS t(test_type, member)
+    WHERE t.member = TRUE
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION add_word_to_test_progress(p_user_id UUID, p_word TEXT, p_language VARCHAR, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO user_test_progress (user_id, language, test_type, saved_words)
+    SELECT p_user_id, p_language, t.test_type, p_sign
+    FROM test_vocabularies tv
+    CROSS JOIN LATERAL test_vocabulary_types(tv) AS t(test_type)
+    WHERE tv.word_key = LOWER(p_word) AND tv.language = p_language
+    GROUP BY t.test_type
+    ON CONFLICT (user_id, language, test_type) DO UPDATE
+    SET saved_words = user_test_progress.saved_words + EXCLUDED.saved_words;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_saved_word_to_test_progress()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND NOT EXISTS (
+        SELECT 1 FROM saved_words
+        WHERE user_id = OLD.user_id AND learning_language = OLD.learning_language
+          AND word_key = OLD.word_key AND id <> OLD.id
+    ) THEN
+        PERFORM add_word_to_test_progress(OLD.user_id, OLD.word, OLD.learning_language, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NOT EXISTS (
+        SELECT 1 FROM saved_words
+        WHERE user_id = NEW.user_id AND learning_language = NEW.learning_language
+          AND word_key = NEW.word_key AND id <> NEW.id
+    ) THEN
+        PERFORM add_word_to_test_progress(NEW.user_id, NEW.word, NEW.learning_language, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_saved_words_test_progress
+    AFTER INSERT OR UPDATE OF user_id, word, learning_language OR DELETE ON saved_words
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_saved_word_to_test_progress();
+
+CREATE OR REPLACE FUNCTION rebuild_user_test_progress()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM user_test_progress;
+    INSERT INTO user_test_progress (user_id, language, test_type, saved_words)
+    SELECT sw.user_id, sw.learning_language, t.test_type, COUNT(DISTINCT sw.word_key)
+    FROM saved_words sw
+    JOIN test_vocabularies tv ON tv.word_key = sw.word_key AND tv.language = sw.learning_language
+    CROSS JOIN LATERAL test_vocabulary_types(tv) AS t(test_type)
+    GROUP BY sw.user_id, sw.learning_language, t.test_type;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================
+-- SAVED WORDS DELTA SYNC (from migration 016)
+-- ============================================================
+
+CREATE INDEX idx_saved_words_user_updated ON saved_words (user_id, updated_at);
+
+-- Any update (including review state written by the reviews trigger from
+-- migration 008) moves the row past clients' sync cursors
+CREATE OR REPLACE FUNCTION touch_saved_word()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_touch_saved_word
+    BEFORE UPDATE ON saved_words
+    FOR EACH ROW
+    EXECUTE FUNCTION touch_saved_word();
+
+-- Removed words, kept for 90 days (SAVED_WORDS_SYNC_RETENTION_DAYS in
+-- handlers/words.py); older cursors get a full list instead of a delta
+CREATE TABLE saved_word_deletions (
+    word_id INTEGER PRIMARY KEY,
+    user_id UUID NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_saved_word_deletions_user ON saved_word_deletions (user_id, deleted_at);
+
+-- Record the tombstone and prune the user's expired ones while we are there
+CREATE OR REPLACE FUNCTION record_saved_word_deletion()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM saved_word_deletions
+    WHERE user_id = OLD.user_id AND deleted_at < CURRENT_TIMESTAMP - INTERVAL '90 days';
+    INSERT INTO saved_word_deletions (word_id, user_id)
+    VALUES (OLD.id, OLD.user_id)
+    ON CONFLICT (word_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_record_saved_word_deletion
+    AFTER DELETE ON saved_words
+    FOR EACH ROW
+    EXECUTE FUNCTION record_saved_word_deletion();
+
+-- User-scoped review aggregates for the saved words list
+CREATE INDEX idx_reviews_user_reviewed_at ON reviews (user_id, reviewed_at);
+
+-- ============================================================
+-- LLM RESPONSE CACHE (from migration 017)
+-- ============================================================
+
+CREATE TABLE llm_response_cache (
+    cache_key CHAR(64) PRIMARY KEY,            -- sha256 of model, messages, response_format, temperature, token limit
+    model VARCHAR(100) NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_hit_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    hits INTEGER NOT NULL DEFAULT 0
+);
+
+-- Eviction walks entries from most to least recently used
+CREATE INDEX idx_llm_response_cache_last_hit ON llm_response_cache (last_hit_at);
+
+COMMENT ON TABLE llm_response_cache IS 'Cached LLM completions; expired and least recently used rows are pruned by utils/llm_cache.py';
+
+-- ============================================================
+-- LLM BATCH JOBS (from migration 018)
+-- ============================================================
+
+CREATE TABLE llm_batch_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,                 -- 'definition' or 'question'
+    backend VARCHAR(20) NOT NULL,              -- 'provider' or 'local' (LLM_BATCH_BACKEND)
+    model VARCHAR(100) NOT NULL,
+    batch_id VARCHAR(100) NOT NULL,            -- id returned by the backend
+    items JSONB NOT NULL,                      -- custom_id -> word, languages, question type
+    status VARCHAR(10) NOT NULL DEFAULT 'submitted',
+    applied_count INTEGER NOT NULL DEFAULT 0,
+    failed_count INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP,
+    CONSTRAINT llm_batch_jobs_status_check CHECK (status IN ('submitted', 'applied', 'failed'))
+);
+
+-- Pending batches are polled on every run
+CREATE INDEX idx_llm_batch_jobs_submitted
+ON llm_batch_jobs (id)
+WHERE status = 'submitted';
+
+COMMENT ON TABLE llm_batch_jobs IS 'Submitted LLM batches and the definitions/review_questions rows they fill; see services/batch_generation_service.py';
+
+-- ============================================================
+-- LLM BATCH ATTEMPTS (from migration 019)
+-- ============================================================
+
+CREATE TABLE llm_batch_attempts (
+    custom_id TEXT PRIMARY KEY,               -- definition:<lang>:<lang>:<word> or question:...
+    attempts INTEGER NOT NULL DEFAULT 0,      -- finished batches that returned no usable result
+    last_error TEXT,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE llm_batch_attempts IS 'Failed LLM batch attempts per request; rows are removed once the request succeeds';
@@ -0,0 +1,77 @@
+-- Migration: Add schedule snapshot versioning
+-- Purpose: Let computed study schedules be cached per user and invalidated
+--          whenever anything they are derived from changes
+-- Created: 2026-10-16
+
+-- Per-user counter bumped by every change that can alter a computed schedule.
+-- Cached schedules are keyed by it, so a bump invalidates them in every process.
+ALTER TABLE user_preferences
+ADD COLUMN IF NOT EXISTS schedule_version BIGINT NOT NULL DEFAULT 0;
+
+-- Reviews and saved words: bump the owning user's version
+CREATE OR REPLACE FUNCTION bump_schedule_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE user_preferences SET schedule_version = schedule_version + 1
+        WHERE user_id = OLD.user_id;
+    ELSE
+        UPDATE user_preferences SET schedule_version = schedule_version + 1
+        WHERE user_id = NEW.user_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_reviews_schedule_version ON reviews;
+CREATE TRIGGER trigger_reviews_schedule_version
+    AFTER INSERT OR DELETE ON reviews
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_schedule_version();
+
+DROP TRIGGER IF EXISTS trigger_saved_words_schedule_version ON saved_words;
+CREATE TRIGGER trigger_saved_words_schedule_version
+    AFTER INSERT OR DELETE OR UPDATE OF word, is_known ON saved_words
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_schedule_version();
+
+-- Preferences: bump when test settings, target date or timezone change
+CREATE OR REPLACE FUNCTION bump_schedule_version_on_preferences()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (NEW.timezone, NEW.target_end_date,
+        NEW.toefl_enabled, NEW.ielts_enabled, NEW.tianz_enabled,
+        NEW.toefl_beginner_enabled, NEW.toefl_intermediate_enabled, NEW.toefl_advanced_enabled,
+        NEW.ielts_beginner_enabled, NEW.ielts_intermediate_enabled, NEW.ielts_advanced_enabled)
+       IS DISTINCT FROM
+       (OLD.timezone, OLD.target_end_date,
+        OLD.toefl_enabled, OLD.ielts_enabled, OLD.tianz_enabled,
+        OLD.toefl_beginner_enabled, OLD.toefl_intermediate_enabled, OLD.toefl_advanced_enabled,
+        OLD.ielts_beginner_enabled, OLD.ielts_intermediate_enabled, OLD.ielts_advanced_enabled)
+    THEN
+        NEW.schedule_version = OLD.schedule_version + 1;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_user_preferences_schedule_version ON user_preferences;
+CREATE TRIGGER trigger_user_preferences_schedule_version
+    BEFORE UPDATE ON user_preferences
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_schedule_version_on_preferences();
+
+-- Optional shared snapshot store (SCHEDULE_SNAPSHOT_STORE=postgres):
+-- latest computed snapshot per user and kind, valid only for the stored version
+CREATE TABLE IF NOT EXISTS schedule_snapshots (
+    user_id UUID NOT NULL,
+    kind VARCHAR(50) NOT NULL,               -- 'schedule', 'test_progress'
+    params TEXT NOT NULL,                    -- e.g. test_type|target_end_date|local_date
+    schedule_version BIGINT NOT NULL,
+    payload JSONB NOT NULL,
+    computed_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (user_id, kind)
+);
+
+COMMENT ON COLUMN user_preferences.schedule_version IS 'Bumped by triggers whenever reviews, saved words or schedule-relevant preferences change';
+COMMENT ON TABLE schedule_snapshots IS 'Cross-process cache of computed schedules, keyed by user and schedule_version';
@@ -0,0 +1,98 @@
+-- Migration: Denormalize per-word review state onto saved_words
+-- Purpose: Replace "latest review per word" ROW_NUMBER() scans over the whole
+--          reviews table with indexed reads of saved_words
+-- Created: 2026-10-16
+
+ALTER TABLE saved_words
+ADD COLUMN IF NOT EXISTS last_reviewed_at TIMESTAMP,
+ADD COLUMN IF NOT EXISTS next_review_date TIMESTAMP,
+ADD COLUMN IF NOT EXISTS review_count INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS correct_count INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS last_failure_at TIMESTAMP;
+
+-- Recompute one word's state from its reviews (used for updates/deletes and the backfill)
+CREATE OR REPLACE FUNCTION refresh_saved_word_review_state(p_word_id INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE saved_words sw
+    SET last_reviewed_at = agg.last_reviewed_at,
+        next_review_date = agg.next_review_date,
+        review_count = agg.review_count,
+        correct_count = agg.correct_count,
+        last_failure_at = agg.last_failure_at
+    FROM (
+        SELECT
+            MAX(reviewed_at) AS last_reviewed_at,
+            (ARRAY_AGG(next_review_date ORDER BY reviewed_at DESC))[1] AS next_review_date,
+            COUNT(*) AS review_count,
+            COUNT(*) FILTER (WHERE response = TRUE) AS correct_count,
+            MAX(reviewed_at) FILTER (WHERE response = FALSE) AS last_failure_at
+        FROM reviews
+        WHERE word_id = p_word_id
+    ) agg
+    WHERE sw.id = p_word_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- New review: fold it into the state incrementally, in the inserting transaction.
+-- SET expressions all see the pre-update row, so next_review_date compares
+-- against the previous last_reviewed_at.
+CREATE OR REPLACE FUNCTION apply_review_to_saved_word()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE saved_words
+        SET review_count = review_count + 1,
+            correct_count = correct_count + CASE WHEN NEW.response THEN 1 ELSE 0 END,
+            last_failure_at = CASE WHEN NEW.response THEN last_failure_at
+                                   ELSE GREATEST(last_failure_at, NEW.reviewed_at) END,
+            next_review_date = CASE WHEN last_reviewed_at IS NULL OR NEW.reviewed_at >= last_reviewed_at
+                                    THEN NEW.next_review_date ELSE next_review_date END,
+            last_reviewed_at = GREATEST(last_reviewed_at, NEW.reviewed_at)
+        WHERE id = NEW.word_id;
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM refresh_saved_word_review_state(NEW.word_id);
+        IF OLD.word_id IS DISTINCT FROM NEW.word_id THEN
+            PERFORM refresh_saved_word_review_state(OLD.word_id);
+        END IF;
+    ELSE
+        PERFORM refresh_saved_word_review_state(OLD.word_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_reviews_saved_word_state ON reviews;
+CREATE TRIGGER trigger_reviews_saved_word_state
+    AFTER INSERT OR UPDATE OF word_id, response, reviewed_at, next_review_date OR DELETE ON reviews
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_review_to_saved_word();
+
+-- One-shot backfill of existing reviews
+UPDATE saved_words sw
+SET last_reviewed_at = agg.last_reviewed_at,
+    next_review_date = agg.next_review_date,
+    review_count = agg.review_count,
+    correct_count = agg.correct_count,
+    last_failure_at = agg.last_failure_at
+FROM (
+    SELECT
+        word_id,
+        MAX(reviewed_at) AS last_reviewed_at,
+        (ARRAY_AGG(next_review_date ORDER BY reviewed_at DESC))[1] AS next_review_date,
+        COUNT(*) AS review_count,
+        COUNT(*) FILTER (WHERE response = TRUE) AS correct_count,
+        MAX(reviewed_at) FILTER (WHERE response = FALSE) AS last_failure_at
+    FROM reviews
+    GROUP BY word_id
+) agg
+WHERE sw.id = agg.word_id;
+
+-- Due checks become a range scan per user
+CREATE INDEX IF NOT EXISTS idx_saved_words_user_next_review ON saved_words(user_id, next_review_date);
+
+COMMENT ON COLUMN saved_words.last_reviewed_at IS 'reviewed_at of the latest review (maintained by trigger)';
+COMMENT ON COLUMN saved_words.next_review_date IS 'next_review_date of the latest review (maintained by trigger)';
+COMMENT ON COLUMN saved_words.review_count IS 'Number of reviews (maintained by trigger)';
+COMMENT ON COLUMN saved_words.correct_count IS 'Number of correct reviews (maintained by trigger)';
+COMMENT ON COLUMN saved_words.last_failure_at IS 'reviewed_at of the latest incorrect review (maintained by trigger)';
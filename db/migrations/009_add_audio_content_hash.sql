@@ -0,0 +1,32 @@
+-- Migration: Content-addressed audio
+-- Purpose: Serve audio by a stable hash of (language, text) so responses can
+--          reference cacheable URLs instead of inlining base64
+-- Created: 2026-10-16
+
+-- sha256 hex of language || '\n' || text_content (UTF-8); must match
+-- handlers.audio.audio_content_hash()
+ALTER TABLE audio
+ADD COLUMN IF NOT EXISTS content_hash CHAR(64);
+
+CREATE OR REPLACE FUNCTION set_audio_content_hash()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.content_hash = encode(sha256(convert_to(NEW.language || E'\n' || NEW.text_content, 'UTF8')), 'hex');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_audio_content_hash ON audio;
+CREATE TRIGGER trigger_audio_content_hash
+    BEFORE INSERT OR UPDATE OF text_content, language ON audio
+    FOR EACH ROW
+    EXECUTE FUNCTION set_audio_content_hash();
+
+-- Backfill existing rows
+UPDATE audio
+SET content_hash = encode(sha256(convert_to(language || E'\n' || text_content, 'UTF8')), 'hex')
+WHERE content_hash IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_audio_content_hash ON audio(content_hash);
+
+COMMENT ON COLUMN audio.content_hash IS 'sha256 hex of language + newline + text_content, addressed by /v3/audio-content/<hash> (maintained by trigger)';
@@ -0,0 +1,12 @@
+-- Migration: Store video bytes uncompressed out of line
+-- Purpose: Let /v3/videos/<id> read byte ranges with substring() without
+--          decompressing the whole video for every slice
+-- Created: 2026-10-16
+
+-- MP4/WebM are already compressed, so TOAST compression only costs CPU.
+-- With EXTERNAL storage substring() fetches just the TOAST chunks it needs.
+ALTER TABLE videos ALTER COLUMN video_data SET STORAGE EXTERNAL;
+
+-- SET STORAGE only affects new values; rewrite existing rows so they are
+-- stored the same way (the concatenation forces a new TOAST value)
+UPDATE videos SET video_data = video_data || ''::bytea;
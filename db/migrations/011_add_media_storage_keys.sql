@@ -0,0 +1,29 @@
+-- Migration: Media store references
+-- Purpose: Let video, audio and illustration blobs move out of BYTEA columns
+--          into the content-addressed media store (utils/media_store.py)
+-- Created: 2026-10-16
+
+-- storage_key is the sha256 hex of the blob in the media store. During cutover
+-- both columns are set; once a row is verified in the store its BYTEA column
+-- may be cleared (scripts/migrate_media_to_store.py --purge).
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS storage_key CHAR(64);
+ALTER TABLE videos ALTER COLUMN video_data DROP NOT NULL;
+ALTER TABLE videos DROP CONSTRAINT IF EXISTS videos_blob_present;
+ALTER TABLE videos ADD CONSTRAINT videos_blob_present
+    CHECK (video_data IS NOT NULL OR storage_key IS NOT NULL);
+
+ALTER TABLE audio ADD COLUMN IF NOT EXISTS storage_key CHAR(64);
+ALTER TABLE audio ALTER COLUMN audio_data DROP NOT NULL;
+ALTER TABLE audio DROP CONSTRAINT IF EXISTS audio_blob_present;
+ALTER TABLE audio ADD CONSTRAINT audio_blob_present
+    CHECK (audio_data IS NOT NULL OR storage_key IS NOT NULL);
+
+ALTER TABLE illustrations ADD COLUMN IF NOT EXISTS storage_key CHAR(64);
+ALTER TABLE illustrations ALTER COLUMN image_data DROP NOT NULL;
+ALTER TABLE illustrations DROP CONSTRAINT IF EXISTS illustrations_blob_present;
+ALTER TABLE illustrations ADD CONSTRAINT illustrations_blob_present
+    CHECK (image_data IS NOT NULL OR storage_key IS NOT NULL);
+
+COMMENT ON COLUMN videos.storage_key IS 'sha256 of video_data in the media store (NULL while only in the database)';
+COMMENT ON COLUMN audio.storage_key IS 'sha256 of audio_data in the media store (NULL while only in the database)';
+COMMENT ON COLUMN illustrations.storage_key IS 'sha256 of image_data in the media store (NULL while only in the database)';
@@ -0,0 +1,35 @@
+-- Migration: Durable TTS job queue
+-- Purpose: Replace the per-process in-memory audio queue with a table that
+--          survives restarts and is consumed by any number of workers using
+--          SELECT ... FOR UPDATE SKIP LOCKED
+-- Created: 2026-10-16
+
+CREATE TABLE IF NOT EXISTS audio_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    text_content TEXT NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMP NOT NULL DEFAULT NOW(),   -- not claimable before this (retry backoff)
+    locked_by TEXT,
+    locked_at TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP,
+    CONSTRAINT audio_jobs_text_language_key UNIQUE (text_content, language),
+    CONSTRAINT audio_jobs_status_check CHECK (status IN ('queued', 'running', 'done', 'failed'))
+);
+
+-- Claim order for workers; only pending rows are indexed
+CREATE INDEX IF NOT EXISTS idx_audio_jobs_claimable
+ON audio_jobs (run_after, id)
+WHERE status = 'queued';
+
+-- Finding jobs whose worker died mid-run
+CREATE INDEX IF NOT EXISTS idx_audio_jobs_running
+ON audio_jobs (locked_at)
+WHERE status = 'running';
+
+COMMENT ON TABLE audio_jobs IS 'TTS generation queue, deduplicated on (text_content, language); see services/audio_job_service.py';
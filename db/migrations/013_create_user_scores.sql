@@ -0,0 +1,91 @@
+-- Migration: Materialized leaderboard scores
+-- Purpose: Keep each user's score (correct = 2 points, wrong = 1 point) and
+--          review count in user_scores, updated by trigger on every review,
+--          so leaderboards read a ranked index instead of aggregating reviews
+-- Created: 2026-10-16
+
+CREATE TABLE IF NOT EXISTS user_scores (
+    user_id UUID PRIMARY KEY REFERENCES user_preferences(user_id) ON DELETE CASCADE,
+    score BIGINT NOT NULL DEFAULT 0,
+    total_reviews BIGINT NOT NULL DEFAULT 0,
+    correct_reviews BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Leaderboard orderings; rank lookups count the entries ahead of a user
+CREATE INDEX IF NOT EXISTS idx_user_scores_score_rank
+ON user_scores (score DESC, total_reviews DESC, user_id);
+
+CREATE INDEX IF NOT EXISTS idx_user_scores_reviews_rank
+ON user_scores (total_reviews DESC, user_id);
+
+-- Apply one review's contribution (sign = 1 to add, -1 to remove)
+CREATE OR REPLACE FUNCTION add_review_to_user_score(p_user_id UUID, p_response BOOLEAN, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO user_scores (user_id, score, total_reviews, correct_reviews, updated_at)
+    SELECT p_user_id,
+           p_sign * CASE WHEN p_response THEN 2 ELSE 1 END,
+           p_sign,
+           p_sign * CASE WHEN p_response THEN 1 ELSE 0 END,
+           NOW()
+    -- Reviews are not tied to user_preferences; skip users without a profile
+    WHERE EXISTS (SELECT 1 FROM user_preferences WHERE user_id = p_user_id)
+    ON CONFLICT (user_id) DO UPDATE
+    SET score = user_scores.score + EXCLUDED.score,
+        total_reviews = user_scores.total_reviews + EXCLUDED.total_reviews,
+        correct_reviews = user_scores.correct_reviews + EXCLUDED.correct_reviews,
+        updated_at = EXCLUDED.updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_review_to_user_score()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM add_review_to_user_score(OLD.user_id, OLD.response, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM add_review_to_user_score(NEW.user_id, NEW.response, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_reviews_user_score ON reviews;
+CREATE TRIGGER trigger_reviews_user_score
+    AFTER INSERT OR UPDATE OF user_id, response OR DELETE ON reviews
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_review_to_user_score();
+
+-- Every user is ranked, starting from zero
+CREATE OR REPLACE FUNCTION create_user_score()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO user_scores (user_id) VALUES (NEW.user_id) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_user_preferences_score ON user_preferences;
+CREATE TRIGGER trigger_user_preferences_score
+    AFTER INSERT ON user_preferences
+    FOR EACH ROW
+    EXECUTE FUNCTION create_user_score();
+
+-- Backfill
+INSERT INTO user_scores (user_id, score, total_reviews, correct_reviews)
+SELECT up.user_id,
+       COALESCE(SUM(CASE WHEN r.response THEN 2 ELSE 1 END) FILTER (WHERE r.id IS NOT NULL), 0),
+       COUNT(r.id),
+       COUNT(r.id) FILTER (WHERE r.response)
+FROM user_preferences up
+LEFT JOIN reviews r ON r.user_id = up.user_id
+GROUP BY up.user_id
+ON CONFLICT (user_id) DO UPDATE
+SET score = EXCLUDED.score,
+    total_reviews = EXCLUDED.total_reviews,
+    correct_reviews = EXCLUDED.correct_reviews,
+    updated_at = NOW();
+
+ANALYZE user_scores;
@@ -0,0 +1,94 @@
+-- Migration: Running per-user test vocabulary counters
+-- Purpose: Keep how many words of each test vocabulary a user has saved in
+--          user_test_progress, updated by trigger in the same transaction as
+--          the save, so badge and progress checks are single-row reads
+-- Created: 2026-10-16
+
+CREATE TABLE IF NOT EXISTS user_test_progress (
+    user_id UUID NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    test_type VARCHAR(32) NOT NULL,             -- key of handlers.achievements.TEST_TYPES_MAPPING
+    saved_words INTEGER NOT NULL DEFAULT 0,     -- distinct LOWER(word) saved from this test
+    PRIMARY KEY (user_id, language, test_type)
+);
+
+-- Case-insensitive membership lookups for the counters
+CREATE INDEX IF NOT EXISTS idx_test_vocab_lower_word
+ON test_vocabularies (LOWER(word), language);
+
+-- Test types a vocabulary row belongs to
+CREATE OR REPLACE FUNCTION test_vocabulary_types(tv test_vocabularies)
+RETURNS SETOF VARCHAR AS $$
+    SELECT t.test_type
+    FROM (VALUES
+        ('TOEFL_BEGINNER', tv.is_toefl_beginner),
+        ('TOEFL_INTERMEDIATE', tv.is_toefl_intermediate),
+        ('TOEFL_ADVANCED', tv.is_toefl_advanced),
+        ('IELTS_BEGINNER', tv.is_ielts_beginner),
+        ('IELTS_INTERMEDIATE', tv.is_ielts_intermediate),
+        ('IELTS_ADVANCED', tv.is_ielts_advanced),
+        ('TIANZ', tv.is_tianz)
+    ) AS t(test_type, member)
+    WHERE t.member = TRUE
+$$ LANGUAGE sql STABLE;
+
+-- Add (sign = 1) or remove (sign = -1) one saved word from a user's counters
+CREATE OR REPLACE FUNCTION add_word_to_test_progress(p_user_id UUID, p_word TEXT, p_language VARCHAR, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO user_test_progress (user_id, language, test_type, saved_words)
+    SELECT p_user_id, p_language, t.test_type, p_sign
+    FROM test_vocabularies tv
+    CROSS JOIN LATERAL test_vocabulary_types(tv) AS t(test_type)
+    WHERE LOWER(tv.word) = LOWER(p_word) AND tv.language = p_language
+    GROUP BY t.test_type
+    ON CONFLICT (user_id, language, test_type) DO UPDATE
+    SET saved_words = user_test_progress.saved_words + EXCLUDED.saved_words;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A word counts once per user and language, however many native languages it is saved with
+CREATE OR REPLACE FUNCTION apply_saved_word_to_test_progress()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND NOT EXISTS (
+        SELECT 1 FROM saved_words
+        WHERE user_id = OLD.user_id AND learning_language = OLD.learning_language
+          AND LOWER(word) = LOWER(OLD.word) AND id <> OLD.id
+    ) THEN
+        PERFORM add_word_to_test_progress(OLD.user_id, OLD.word, OLD.learning_language, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NOT EXISTS (
+        SELECT 1 FROM saved_words
+        WHERE user_id = NEW.user_id AND learning_language = NEW.learning_language
+          AND LOWER(word) = LOWER(NEW.word) AND id <> NEW.id
+    ) THEN
+        PERFORM add_word_to_test_progress(NEW.user_id, NEW.word, NEW.learning_language, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_saved_words_test_progress ON saved_words;
+CREATE TRIGGER trigger_saved_words_test_progress
+    AFTER INSERT OR UPDATE OF user_id, word, learning_language OR DELETE ON saved_words
+    FOR EACH ROW
+    EXECUTE FUNCTION apply_saved_word_to_test_progress();
+
+-- Recount every user from scratch; also run after importing or re-tagging test vocabularies
+CREATE OR REPLACE FUNCTION rebuild_user_test_progress()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM user_test_progress;
+    INSERT INTO user_test_progress (user_id, language, test_type, saved_words)
+    SELECT sw.user_id, sw.learning_language, t.test_type, COUNT(DISTINCT LOWER(sw.word))
+    FROM saved_words sw
+    JOIN test_vocabularies tv ON LOWER(tv.word) = LOWER(sw.word) AND tv.language = sw.learning_language
+    CROSS JOIN LATERAL test_vocabulary_types(tv) AS t(test_type)
+    GROUP BY sw.user_id, sw.learning_language, t.test_type;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_user_test_progress();
+
+ANALYZE user_test_progress;
@@ -0,0 +1,75 @@
+-- Migration: Case-normalized word keys
+-- Purpose: Give saved_words and test_vocabularies a stored LOWER(word) column
+--          with matching indexes, so case-insensitive joins between them (test
+--          progress, badges, "is saved" lookups) are index scans instead of
+--          LOWER() expressions evaluated over whole tables
+-- Created: 2026-10-16
+--
+-- Adding a stored generated column rewrites both tables once; run it in a
+-- maintenance window on large installs.
+
+ALTER TABLE test_vocabularies
+ADD COLUMN IF NOT EXISTS word_key VARCHAR(100) GENERATED ALWAYS AS (LOWER(word)) STORED;
+
+ALTER TABLE saved_words
+ADD COLUMN IF NOT EXISTS word_key VARCHAR(255) GENERATED ALWAYS AS (LOWER(word)) STORED;
+
+-- Membership lookups and joins from saved words
+CREATE INDEX IF NOT EXISTS idx_test_vocab_word_key ON test_vocabularies (word_key, language);
+DROP INDEX IF EXISTS idx_test_vocab_lower_word;  -- expression index from migration 014
+
+-- A user's saved copy of a word, in any or a given learning language
+CREATE INDEX IF NOT EXISTS idx_saved_words_user_word_key
+ON saved_words (user_id, word_key, learning_language);
+
+-- Counters from migration 014, now keyed on word_key
+CREATE OR REPLACE FUNCTION add_word_to_test_progress(p_user_id UUID, p_word TEXT, p_language VARCHAR, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO user_test_progress (user_id, language, test_type, saved_words)
+    SELECT p_user_id, p_language, t.test_type, p_sign
+    FROM test_vocabularies tv
+    CROSS JOIN LATERAL test_vocabulary_types(tv) AS t(test_type)
+    WHERE tv.word_key = LOWER(p_word) AND tv.language = p_language
+    GROUP BY t.test_type
+    ON CONFLICT (user_id, language, test_type) DO UPDATE
+    SET saved_words = user_test_progress.saved_words + EXCLUDED.saved_words;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_saved_word_to_test_progress()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND NOT EXISTS (
+        SELECT 1 FROM saved_words
+        WHERE user_id = OLD.user_id AND word_key = OLD.word_key
+          AND learning_language = OLD.learning_language AND id <> OLD.id
+    ) THEN
+        PERFORM add_word_to_test_progress(OLD.user_id, OLD.word, OLD.learning_language, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NOT EXISTS (
+        SELECT 1 FROM saved_words
+        WHERE user_id = NEW.user_id AND word_key = NEW.word_key
+          AND learning_language = NEW.learning_language AND id <> NEW.id
+    ) THEN
+        PERFORM add_word_to_test_progress(NEW.user_id, NEW.word, NEW.learning_language, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION rebuild_user_test_progress()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM user_test_progress;
+    INSERT INTO user_test_progress (user_id, language, test_type, saved_words)
+    SELECT sw.user_id, sw.learning_language, t.test_type, COUNT(DISTINCT sw.word_key)
+    FROM saved_words sw
+    JOIN test_vocabularies tv ON tv.word_key = sw.word_key AND tv.language = sw.learning_language
+    CROSS JOIN LATERAL test_vocabulary_types(tv) AS t(test_type)
+    GROUP BY sw.user_id, sw.learning_language, t.test_type;
+END;
+$$ LANGUAGE plpgsql;
+
+ANALYZE test_vocabularies;
+ANALYZE saved_words;
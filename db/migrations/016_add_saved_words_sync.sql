@@ -0,0 +1,60 @@
+-- Migration: Delta sync for saved words
+-- Purpose: Track when each saved word last changed and keep tombstones for
+--          removed words, so clients can fetch only what changed since their
+--          last sync instead of the whole list
+-- Created: 2026-10-16
+
+-- Existing rows all get the migration time, so clients without a cursor
+-- simply start with a full list
+ALTER TABLE saved_words
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_saved_words_user_updated ON saved_words (user_id, updated_at);
+
+-- Any update (including review state written by the reviews trigger from
+-- migration 008) moves the row past clients' sync cursors
+CREATE OR REPLACE FUNCTION touch_saved_word()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_touch_saved_word ON saved_words;
+CREATE TRIGGER trigger_touch_saved_word
+    BEFORE UPDATE ON saved_words
+    FOR EACH ROW
+    EXECUTE FUNCTION touch_saved_word();
+
+-- Removed words, kept for 90 days (SAVED_WORDS_SYNC_RETENTION_DAYS in
+-- handlers/words.py); older cursors get a full list instead of a delta
+CREATE TABLE IF NOT EXISTS saved_word_deletions (
+    word_id INTEGER PRIMARY KEY,
+    user_id UUID NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_saved_word_deletions_user ON saved_word_deletions (user_id, deleted_at);
+
+-- Record the tombstone and prune the user's expired ones while we are there
+CREATE OR REPLACE FUNCTION record_saved_word_deletion()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM saved_word_deletions
+    WHERE user_id = OLD.user_id AND deleted_at < CURRENT_TIMESTAMP - INTERVAL '90 days';
+    INSERT INTO saved_word_deletions (word_id, user_id)
+    VALUES (OLD.id, OLD.user_id)
+    ON CONFLICT (word_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_record_saved_word_deletion ON saved_words;
+CREATE TRIGGER trigger_record_saved_word_deletion
+    AFTER DELETE ON saved_words
+    FOR EACH ROW
+    EXECUTE FUNCTION record_saved_word_deletion();
+
+-- User-scoped review aggregates for the saved words list
+CREATE INDEX IF NOT EXISTS idx_reviews_user_reviewed_at ON reviews (user_id, reviewed_at);
@@ -0,0 +1,18 @@
+-- Migration: LLM response cache
+-- Purpose: Persistent cache of LLM completions keyed by a hash of the request,
+--          used by utils/llm_cache.py when LLM_RESPONSE_CACHE=postgres
+-- Created: 2026-10-16
+
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key CHAR(64) PRIMARY KEY,            -- sha256 of model, messages, response_format, temperature, token limit
+    model VARCHAR(100) NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_hit_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    hits INTEGER NOT NULL DEFAULT 0
+);
+
+-- Eviction walks entries from most to least recently used
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_hit ON llm_response_cache (last_hit_at);
+
+COMMENT ON TABLE llm_response_cache IS 'Cached LLM completions; expired and least recently used rows are pruned by utils/llm_cache.py';
@@ -0,0 +1,28 @@
+-- Migration: LLM batch generation jobs
+-- Purpose: Checkpoint for bulk definition/question generation through the
+--          provider batch API (services/batch_generation_service.py); a rerun
+--          polls the submitted batches instead of sending their requests again
+-- Created: 2026-10-16
+
+CREATE TABLE IF NOT EXISTS llm_batch_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,                 -- 'definition' or 'question'
+    backend VARCHAR(20) NOT NULL,              -- 'provider' or 'local' (LLM_BATCH_BACKEND)
+    model VARCHAR(100) NOT NULL,
+    batch_id VARCHAR(100) NOT NULL,            -- id returned by the backend
+    items JSONB NOT NULL,                      -- custom_id -> word, languages, question type
+    status VARCHAR(10) NOT NULL DEFAULT 'submitted',
+    applied_count INTEGER NOT NULL DEFAULT 0,
+    failed_count INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP,
+    CONSTRAINT llm_batch_jobs_status_check CHECK (status IN ('submitted', 'applied', 'failed'))
+);
+
+-- Pending batches are polled on every run
+CREATE INDEX IF NOT EXISTS idx_llm_batch_jobs_submitted
+ON llm_batch_jobs (id)
+WHERE status = 'submitted';
+
+COMMENT ON TABLE llm_batch_jobs IS 'Submitted LLM batches and the definitions/review_questions rows they fill; see services/batch_generation_service.py';
@@ -0,0 +1,14 @@
+-- Migration: LLM batch attempt counts
+-- Purpose: Count failed batch attempts per request (custom_id) so backfills
+--          stop resubmitting requests that keep failing after
+--          LLM_BATCH_MAX_ATTEMPTS (services/batch_generation_service.py)
+-- Created: 2026-10-16
+
+CREATE TABLE IF NOT EXISTS llm_batch_attempts (
+    custom_id TEXT PRIMARY KEY,               -- definition:<lang>:<lang>:<word> or question:...
+    attempts INTEGER NOT NULL DEFAULT 0,      -- finished batches that returned no usable result
+    last_error TEXT,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE llm_batch_attempts IS 'Failed LLM batch attempts per request; rows are removed once the request succeeds';
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark review-history loading for schedule calculation
+
+Compares the per-word loader (one get_word_review_history() call, and one
+pooled connection checkout, per saved word) with the bulk loader used by
+fetch_schedule_data() / initiate_schedule(), reporting database round trips
+and wall-clock latency for each.
+
+By default it runs against an in-memory stand-in that charges a fixed
+round-trip time per query, so it needs no database:
+
+    python scripts/benchmark_schedule_fetch.py --words 3000 --reviews 6 --rtt-ms 0.5
+
+Pass --user-id to measure a real user's data instead (uses DATABASE_URL):
+
+    python scripts/benchmark_schedule_fetch.py --user-id <uuid>
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import services.schedule_service as schedule_service
+
+
+class SimulatedDatabase:
+    """Answers the two review-history queries from memory, sleeping rtt per query."""
+
+    def __init__(self, words: int, reviews_per_word: int, rtt: float):
+        self.rtt = rtt
+        rng = random.Random(42)
+        start = datetime(2025, 1, 1)
+        self.reviews = {}
+        for word_id in range(1, words + 1):
+            day = start
+            history = []
+            for _ in range(rng.randint(0, reviews_per_word * 2)):
+                day += timedelta(days=rng.randint(1, 10), hours=rng.randint(0, 23))
+                history.append({'reviewed_at': day, 'response': rng.random() < 0.8})
+            self.reviews[word_id] = history
+
+    def connect(self):
+        return _SimulatedConnection(self)
+
+
+class _SimulatedConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return _SimulatedCursor(self.db)
+
+    def close(self):
+        pass
+
+
+class _SimulatedCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def execute(self, query, params=None):
+        time.sleep(self.db.rtt)
+        if 'ANY(' in query:
+            self.rows = [
+                {'word_id': word_id, **review}
+                for word_id in sorted(params[0])
+                for review in self.db.reviews.get(word_id, [])
+            ]
+        else:
+            self.rows = list(self.db.reviews.get(params[0], []))
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class QueryCounter:
+    """Wraps a connection factory and counts checkouts and executed queries."""
+
+    def __init__(self, connect):
+        self._connect = connect
+        self.connections = 0
+        self.queries = 0
+
+    def __call__(self):
+        self.connections += 1
+        conn = self._connect()
+        counter = self
+
+        class CountingConnection:
+            def cursor(self):
+                cur = conn.cursor()
+
+                class CountingCursor:
+                    def execute(self, *args, **kwargs):
+                        counter.queries += 1
+                        return cur.execute(*args, **kwargs)
+
+                    def __getattr__(self, name):
+                        return getattr(cur, name)
+
+                return CountingCursor()
+
+            def __getattr__(self, name):
+                return getattr(conn, name)
+
+        return CountingConnection()
+
+
+def load_per_word(saved_words_map):
+    return {
+        word: {
+            'id': info['id'],
+            'created_at': info['created_at'],
+            'reviews': schedule_service.get_word_review_history(info['id']),
+            'is_known': info['is_known']
+        }
+        for word, info in saved_words_map.items()
+    }
+
+
+def load_bulk(saved_words_map):
+    return schedule_service.build_saved_words_with_reviews(saved_words_map)
+
+
+def measure(label, loader, saved_words_map, connect, repeat):
+    best = None
+    for _ in range(repeat):
+        counter = QueryCounter(connect)
+        with patch.object(schedule_service, 'get_db_connection', counter):
+            start = time.perf_counter()
+            result = loader(saved_words_map)
+            elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, counter.queries, counter.connections, result)
+    elapsed, queries, connections, result = best
+    print(f"{label:<10} {queries:>8} {connections:>12} {elapsed * 1000:>12.1f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=3000, help='Simulated saved words (default: 3000)')
+    parser.add_argument('--reviews', type=int, default=6, help='Average reviews per simulated word (default: 6)')
+    parser.add_argument('--rtt-ms', type=float, default=0.5, help='Simulated round trip per query in ms (default: 0.5)')
+    parser.add_argument('--user-id', help='Benchmark this user against DATABASE_URL instead of simulating')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per loader; the fastest is reported (default: 3)')
+    args = parser.parse_args()
+
+    if args.user_id:
+        from utils.database import get_db_connection
+        connect = get_db_connection
+        saved_words_map = schedule_service.get_user_saved_words(args.user_id)
+        source = f"user {args.user_id}"
+    else:
+        db = SimulatedDatabase(args.words, args.reviews, args.rtt_ms / 1000)
+        connect = db.connect
+        created_at = datetime(2025, 1, 1)
+        saved_words_map = {
+            f"word{word_id}": {'id': word_id, 'created_at': created_at, 'is_known': False}
+            for word_id in db.reviews
+        }
+        source = f"simulated, rtt={args.rtt_ms}ms"
+
+    print(f"Loading review history for {len(saved_words_map)} saved words ({source})")
+    print(f"{'loader':<10} {'queries':>8} {'connections':>12} {'latency_ms':>12}")
+    per_word = measure('per-word', load_per_word, saved_words_map, connect, args.repeat)
+    bulk = measure('bulk', load_bulk, saved_words_map, connect, args.repeat)
+
+    if per_word != bulk:
+        print("❌ Loaders returned different review histories")
+        sys.exit(1)
+    print("✅ Both loaders returned identical review histories")
+
+
+if __name__ == '__main__':
+    main()
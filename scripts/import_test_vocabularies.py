@@ -188,6 +188,10 @@ def import_test_vocabularies(conn):
                 is_ielts_advanced = EXCLUDED.is_ielts_advanced
         """, data, page_size=100)
 
+        # Per-user test progress counters depend on vocabulary membership (migration 014)
+        print("Rebuilding user test progress counters...")
+        cur.execute("SELECT rebuild_user_test_progress()")
+
         conn.commit()
 
         # Get statistics with cumulative counts
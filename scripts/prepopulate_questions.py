@@ -20,6 +20,9 @@ Usage:
 
     # Production
     python3 prepopulate_questions.py --source tianz_test --backend-url https://kwafy.com
+
+    # Backfill through the LLM batch API (resumable; re-run to pick up where it stopped)
+    python3 prepopulate_questions.py --source toefl --batch
 """
 
 import argparse
@@ -164,6 +167,71 @@ def prepopulate_questions(
         sys.exit(1)
 
 
+def prepopulate_questions_batch(
+    backend_url: str,
+    source: str,
+    learning_lang: str = 'en',
+    native_lang: str = 'zh',
+    max_words: Optional[int] = None,
+    poll_interval: float = 60
+):
+    """
+    Backfill definitions and questions through the LLM batch API.
+
+    Repeatedly calls the smart batch endpoint in batch mode: each call applies
+    finished batches and submits new ones. Progress is checkpointed server-side
+    (llm_batch_jobs), so the script can be stopped and re-run at any time.
+    """
+    endpoint = f"{backend_url}/v3/admin/questions/smart-batch-generate"
+    payload = {
+        'source': source,
+        'num_words': max_words or 5000,
+        'learning_language': learning_lang,
+        'native_language': native_lang,
+        'mode': 'batch'
+    }
+
+    print("=" * 80)
+    print("📦 BATCH BACKFILL OF DEFINITIONS AND QUESTIONS")
+    print("=" * 80)
+    print(f"Backend URL: {backend_url}")
+    print(f"Source: {source} ({learning_lang} → {native_lang})")
+    print(f"Poll Interval: {poll_interval}s")
+    print("=" * 80)
+
+    step = 0
+    while True:
+        step += 1
+        try:
+            response = requests.post(endpoint, json=payload, timeout=600)
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            # e.g. 409 when the server's LLM_BATCH_BACKEND is local
+            print(f"\n❌ Error calling API: {e}: {response.text}")
+            sys.exit(1)
+        except requests.exceptions.RequestException as e:
+            print(f"\n❌ Error calling API: {e}")
+            sys.exit(1)
+
+        result = response.json()
+        stats = result.get('statistics', {})
+        print(f"[step {step}] applied {stats.get('definitions_applied', 0)} definitions / "
+              f"{stats.get('questions_applied', 0)} questions, failed {stats.get('failed', 0)}, "
+              f"submitted {stats.get('submitted', 0)}, in flight {stats.get('in_flight', 0)}, "
+              f"{result.get('next_incomplete_count', 0)} words incomplete "
+              f"({result.get('progress_percentage', 0)}%)")
+
+        if result.get('next_incomplete_count', 0) == 0:
+            print("\n✨ Done! All words are complete.")
+            return
+        idle = not (stats.get('submitted') or stats.get('in_flight') or stats.get('pending_batches')
+                    or stats.get('definitions_applied') or stats.get('questions_applied'))
+        if idle:
+            print("\n⚠️  Nothing left to submit for the remaining words (requests that failed LLM_BATCH_MAX_ATTEMPTS times are in llm_batch_attempts).")
+            return
+        time.sleep(poll_interval)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Pre-populate review questions to eliminate LLM delays',
@@ -238,12 +306,38 @@ Examples:
         help='Re-generate even if questions already exist (slower)'
     )
 
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Generate through the LLM batch API (cheaper, results within hours; requires --source)'
+    )
+
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=60,
+        help='Seconds between batch progress checks with --batch (default: 60)'
+    )
+
     args = parser.parse_args()
 
     # Validate that either source or words is provided
     if not args.source and not args.words:
         parser.error("Either --source or --words must be provided")
 
+    if args.batch:
+        if not args.source:
+            parser.error("--batch requires --source")
+        prepopulate_questions_batch(
+            backend_url=args.backend_url.rstrip('/'),
+            source=args.source,
+            learning_lang=args.learning_language,
+            native_lang=args.native_language,
+            max_words=args.max_words,
+            poll_interval=args.poll_interval
+        )
+        return
+
     # Parse words if provided
     words_list = None
     if args.words:
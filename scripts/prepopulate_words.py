@@ -7,6 +7,10 @@ and then triggers lookups for those words to store them in the database.
 
 Usage:
     python prepopulate_words.py --domain=localhost:5000 --words=10 --learning_language=en --native_language=zh
+
+    # Define the new words through the LLM batch API, writing straight to the
+    # database (needs DATABASE_URL; an interrupted run resumes its batches)
+    python prepopulate_words.py --words=2000 --learning_language=en --native_language=zh --batch
 """
 
 import argparse
@@ -185,6 +189,16 @@ def populate_word(domain: str, word: str, learning_lang: str, native_lang: str,
     return False
 
 
+def populate_words_batch(words: List[str], learning_lang: str, native_lang: str, poll_interval: float) -> dict:
+    """Generate definitions for words through the LLM batch API and wait for them to be stored"""
+    sys.path.insert(0, str(project_root / 'src'))
+    from services.batch_generation_service import run_batch_generation
+
+    items = [{'word': w, 'learning_language': learning_lang, 'native_language': native_lang, 'question_types': []}
+             for w in words]
+    return run_batch_generation(items, wait=True, poll_interval=poll_interval)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Prepopulate words in Dogetionary database')
     parser.add_argument('--domain', default='https://dogetionary.webhop.net/api',
@@ -195,6 +209,10 @@ def main():
                         help='Learning language code (e.g., en, de, zh)')
     parser.add_argument('--native_language', required=True,
                         help='Native language code (e.g., zh, en)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Define the words through the LLM batch API instead of one lookup per word')
+    parser.add_argument('--poll_interval', type=float, default=60,
+                        help='Seconds between batch progress checks with --batch (default: 60)')
 
     args = parser.parse_args()
 
@@ -225,6 +243,15 @@ def main():
         print("\n⚠️  No new words to populate. Exiting.")
         sys.exit(0)
 
+    if args.batch:
+        print(f"\n📦 Submitting {len(new_words)} new words to the LLM batch API...")
+        stats = populate_words_batch(new_words, args.learning_language, args.native_language, args.poll_interval)
+        print(f"\n📊 Summary:")
+        print(f"  ✅ Successfully added: {stats['definitions_applied']}/{len(new_words)}")
+        print(f"  ❌ Failed: {stats['failed']}")
+        print("\n✨ Done!")
+        return
+
     # Step 3: Populate each word
     print(f"\n📝 Populating {len(new_words)} new words...")
     print("-" * 60)
@@ -4,7 +4,9 @@ Dogetionary API - Main Application Entry Point
 This is the consolidated Flask application that serves all API endpoints.
 All routes are registered through blueprints for better organization.
 
-Entry point for production deployment via Docker.
+Production deployments serve the app through gunicorn (wsgi.py +
+gunicorn.conf.py); running this module directly starts the Flask
+development server.
 """
 
 from flask import Flask
@@ -229,27 +231,33 @@ def register_legacy_routes(app):
     app.logger.info("✅ Legacy routes registered")
 
 
-def start_background_workers():
+def start_process_workers():
     """
-    Start all background worker threads for async processing.
+    Start worker threads that must run inside every serving process.
 
     Workers:
-    - Audio generation worker: Processes TTS audio generation queue
-    - Daily test words worker: Schedules daily TOEFL/IELTS vocabulary
+    - Audio generation workers: AUDIO_JOB_WORKERS threads consuming the durable
+      TTS job queue (more can run standalone via `python -m workers.audio_worker`)
     """
-    logging.info("Starting background workers...")
+    from workers.audio_worker import start_audio_workers
+    audio_workers = start_audio_workers()
+    logging.info(f"✅ {len(audio_workers)} audio generation workers started (pid={os.getpid()})")
 
-    # Audio generation worker
-    from handlers.words import audio_generation_worker
-    audio_worker = threading.Thread(
-        target=audio_generation_worker,
-        daemon=True,
-        name="AudioWorker"
-    )
-    audio_worker.start()
-    logging.info("✅ Audio generation worker started")
 
-    # Daily test vocabulary scheduler
+def start_scheduled_workers():
+    """
+    Start worker threads that must run exactly once per deployment.
+
+    Under gunicorn these live in a dedicated process (see worker.py) so that
+    scaling web workers does not multiply the scheduled jobs.
+
+    Workers:
+    - Daily test words worker: Schedules daily TOEFL/IELTS vocabulary
+    - Question pool worker: Periodically pre-generates questions for active users
+
+    Returns:
+        list: The started threads
+    """
     from workers.test_vocabulary_worker import daily_test_words_worker
     test_words_worker = threading.Thread(
         target=daily_test_words_worker,
@@ -259,6 +267,28 @@ def start_background_workers():
     test_words_worker.start()
     logging.info("✅ Test vocabulary scheduler started")
 
+    from workers.question_pool_worker import question_pool_worker
+    pool_worker = threading.Thread(
+        target=question_pool_worker,
+        daemon=True,
+        name="QuestionPoolWorker"
+    )
+    pool_worker.start()
+    logging.info("✅ Question pool scheduler started")
+    return [test_words_worker, pool_worker]
+
+
+def start_background_workers():
+    """
+    Start all background worker threads for async processing.
+
+    Used by the single-process development server. Production (gunicorn)
+    starts process workers from the post_fork hook and scheduled workers in
+    a dedicated process; see gunicorn.conf.py.
+    """
+    logging.info("Starting background workers...")
+    start_process_workers()
+    start_scheduled_workers()
     logging.info("✅ All background workers started successfully")
 
 
@@ -267,23 +297,28 @@ def start_background_workers():
 # =================================================================
 
 if __name__ == '__main__':
+    # Development server only - production runs `gunicorn -c gunicorn.conf.py wsgi:app`
+    debug = os.environ.get('FLASK_DEBUG', '1') == '1'
+
     # Create application
     app = create_app()
 
-    # Start background workers
-    start_background_workers()
+    # The reloader runs this module twice; only start workers in the child
+    # process that actually serves requests
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_workers()
 
     # Get port from environment or default to 5000
     port = int(os.environ.get('PORT', 5000))
 
     app.logger.info("=" * 60)
     app.logger.info(f"Starting Dogetionary API on port {port}")
-    app.logger.info("Environment: Development" if app.debug else "Environment: Production")
+    app.logger.info("Environment: Development server")
     app.logger.info("=" * 60)
 
     # Start Flask development server
     app.run(
         host='0.0.0.0',
         port=port,
-        debug=True  # Set to False in production via environment variable
+        debug=debug
     )
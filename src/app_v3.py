@@ -11,6 +11,7 @@ from handlers.admin import test_review_intervals, fix_next_review_dates, privacy
 from handlers.usage_dashboard import get_usage_dashboard
 from handlers.analytics import track_user_action
 from handlers.pronunciation import practice_pronunciation, submit_pronunciation_review
+from handlers.audio import get_audio_content, get_audio_jobs_status
 from handlers.words import get_saved_words, get_word_definition_v4, get_word_details, get_audio, get_illustration, toggle_exclude_from_practice, is_word_saved
 from handlers.videos import get_video
 from handlers.admin_videos import batch_upload_videos
@@ -53,6 +54,8 @@ v3_api.route('/words/<int:word_id>/forgetting-curve', methods=['GET'])(get_forge
 
 # Media and Assets (V3 - merged illustration functionality)
 v3_api.route('/audio/<path:text>/<language>')(get_audio)
+v3_api.route('/audio-content/<content_hash>', methods=['GET'])(get_audio_content)  # Content-addressed raw audio
+v3_api.route('/audio-jobs', methods=['GET'])(get_audio_jobs_status)  # TTS generation status
 v3_api.route('/illustration', methods=['GET', 'POST'])(get_illustration)  # Merged cache-first logic
 v3_api.route('/videos/<int:video_id>', methods=['GET'])(get_video)  # Video binary data for practice mode
 
@@ -176,8 +179,8 @@ def manual_daily_job():
     """Manual trigger for daily test vocabulary job"""
     try:
         logging.info("Manual trigger of daily test vocabulary job")
-        add_daily_test_words_for_all_users()
-        return jsonify({"success": True, "message": "Daily job completed successfully"}), 200
+        stats = add_daily_test_words_for_all_users()
+        return jsonify({"success": True, "message": "Daily job completed successfully", "stats": stats}), 200
     except Exception as e:
         logging.error(f"Manual daily job failed: {e}")
         return jsonify({"error": "Failed to run daily job"}), 500
@@ -0,0 +1,112 @@
+"""
+Gunicorn configuration for the Dogetionary API.
+
+Worker model: WEB_CONCURRENCY processes x GUNICORN_THREADS threads (gthread).
+All settings are read from environment variables:
+
+- PORT: Listen port (default: 5000)
+- WEB_CONCURRENCY: Worker processes (default: one per CPU core)
+- GUNICORN_THREADS: Threads per worker process (default: 4)
+- GUNICORN_TIMEOUT: Seconds a silent worker is allowed before being killed (default: 120)
+- GUNICORN_GRACEFUL_TIMEOUT: Seconds in-flight requests get on restart/shutdown (default: 30)
+- GUNICORN_KEEPALIVE: Seconds to hold idle keep-alive connections from nginx (default: 75)
+- GUNICORN_MAX_REQUESTS: Recycle a worker after this many requests, 0 = never (default: 2000)
+- GUNICORN_MAX_REQUESTS_JITTER: Random spread so workers do not recycle together (default: 200)
+- GUNICORN_PRELOAD: "1" to import the app once in the master before forking (default: 1)
+- RUN_SCHEDULED_WORKERS: "0" when scheduled jobs run in a separate container (default: 1)
+- PROMETHEUS_MULTIPROC_DIR: Where worker processes write metric samples, cleared at
+  startup (default: /tmp/prometheus-multiproc)
+
+Graceful restart: `kill -HUP <master pid>` replaces workers one generation at
+a time, letting in-flight requests finish within GUNICORN_GRACEFUL_TIMEOUT.
+"""
+
+import glob
+import multiprocessing
+import os
+import subprocess
+import sys
+
+# Must be set before prometheus_client is first imported (the app is loaded
+# after this file); the scheduled worker process inherits it as well
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus-multiproc')
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+# Longer than nginx's upstream keepalive_timeout so gunicorn never closes first
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '75'))
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+accesslog = None  # Requests are already logged by middleware.logging
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+RUN_SCHEDULED_WORKERS = os.environ.get('RUN_SCHEDULED_WORKERS', '1') == '1'
+
+
+def on_starting(server):
+    """Drop metric files left by a previous run of the server."""
+    for path in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+        os.remove(path)
+
+
+def when_ready(server):
+    """Launch the dedicated scheduled-worker process once per master."""
+    if not RUN_SCHEDULED_WORKERS:
+        server.log.info("RUN_SCHEDULED_WORKERS=0, not starting scheduled workers")
+        return
+    # Kept on the arbiter: this module is re-executed on every HUP reload
+    server.scheduled_worker_process = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'worker.py')]
+    )
+    server.log.info(f"Scheduled worker process started (pid={server.scheduled_worker_process.pid})")
+
+
+def post_fork(server, worker):
+    """Give each web worker its own DB pool and in-process workers."""
+    from utils.db_pool import close_pool
+    from app import start_process_workers
+
+    # Drop any pool inherited from a preloaded master without touching its sockets
+    close_pool()
+    start_process_workers()
+
+
+def worker_exit(server, worker):
+    """Flush buffered usage logs, then close this worker's pooled connections."""
+    from middleware.api_usage_tracker import usage_log_writer
+    from utils.db_pool import close_pool
+    usage_log_writer.shutdown()
+    close_pool()
+
+
+def child_exit(server, worker):
+    """Stop reporting live gauges of a worker that has gone."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    """Stop the scheduled-worker process along with the master."""
+    process = getattr(server, 'scheduled_worker_process', None)
+    if process and process.poll() is None:
+        server.log.info("Stopping scheduled worker process")
+        process.terminate()
+        try:
+            process.wait(timeout=graceful_timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    if process:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(process.pid)
@@ -4,6 +4,10 @@ Achievements Handler
 This module provides functions to:
 - Calculate achievement progress based on score (from reviews)
 - Score formula: failed review = 1 point, success review = 2 points
+
+Scores and per-test saved-word counts are running counters (user_scores and
+user_test_progress) kept current by triggers in the review/save transaction,
+so these checks are single-row reads.
 - Return unlocked achievements and next milestone
 """
 
@@ -16,10 +20,14 @@ import logging
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.database import db_fetch_one
+from utils.database import db_fetch_one, db_fetch_all
+from utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+TEST_VOCAB_TOTALS_TTL = float(os.getenv('TEST_VOCAB_TOTALS_TTL', '3600'))
+_test_totals_cache = TTLCache(max_size=32, ttl=TEST_VOCAB_TOTALS_TTL)
+
 # Achievement milestones with metadata (score-based, 10x original word thresholds)
 ACHIEVEMENTS = [
     # Entry Level
@@ -106,7 +114,7 @@ TEST_TYPES_MAPPING = {
 
 def calculate_user_score(user_id: str) -> int:
     """
-    Calculate total score from reviews.
+    Total score, read from the running counter in user_scores.
 
     Score formula:
     - Correct review = 2 points
@@ -118,6 +126,13 @@ def calculate_user_score(user_id: str) -> int:
     Returns:
         Total score as integer (0 if no reviews)
     """
+    result = db_fetch_one("""
+        SELECT score FROM user_scores WHERE user_id = %s
+    """, (user_id,))
+    if result:
+        return result['score']
+
+    # Reviews by a user without preferences are not counted in user_scores
     result = db_fetch_one("""
         SELECT COALESCE(SUM(CASE WHEN response THEN 2 ELSE 1 END), 0) as score
         FROM reviews
@@ -127,6 +142,50 @@ def calculate_user_score(user_id: str) -> int:
     return result['score'] if result else 0
 
 
+def get_test_vocabulary_totals(language: str = 'en') -> dict:
+    """
+    Number of words in each test vocabulary for a language, e.g.
+    {'TOEFL_BEGINNER': 796, ...}. Cached: vocabularies only change on import.
+    """
+    totals = _test_totals_cache.get(language)
+    if totals is not None:
+        return totals
+
+    counts = ",\n               ".join(
+        f"COUNT(*) FILTER (WHERE {metadata['vocab_column']} = TRUE) AS {test_name.lower()}"
+        for test_name, metadata in TEST_TYPES_MAPPING.items()
+    )
+    row = db_fetch_one(f"""
+        SELECT {counts}
+        FROM test_vocabularies
+        WHERE language = %s
+    """, (language,)) or {}
+    totals = {test_name: row.get(test_name.lower(), 0) or 0 for test_name in TEST_TYPES_MAPPING}
+    _test_totals_cache.set(language, totals)
+    return totals
+
+
+def get_test_vocabulary_progress(user_id: str, language: str = 'en') -> dict:
+    """
+    Saved and total words for every test vocabulary, from the user_test_progress
+    counters maintained on each save.
+
+    Returns:
+        {'TOEFL_BEGINNER': {'saved_words': 750, 'total_words': 796}, ...}
+    """
+    rows = db_fetch_all("""
+        SELECT test_type, saved_words
+        FROM user_test_progress
+        WHERE user_id = %s AND language = %s
+    """, (user_id, language))
+    saved = {row['test_type']: row['saved_words'] for row in rows}
+    totals = get_test_vocabulary_totals(language)
+    return {
+        test_name: {"saved_words": saved.get(test_name, 0), "total_words": totals[test_name]}
+        for test_name in TEST_TYPES_MAPPING
+    }
+
+
 def count_test_vocabulary_progress(user_id: str, vocab_column: str, language: str = 'en') -> dict:
     """
     Count total and saved words for a specific test vocabulary.
@@ -141,28 +200,17 @@ def count_test_vocabulary_progress(user_id: str, vocab_column: str, language: st
         - saved_words: Number of words user has saved from this test
         - total_words: Total number of words in this test vocabulary
     """
-    # Count total words in test vocabulary
-    total_words_result = db_fetch_one(f"""
-        SELECT COUNT(*) as total
-        FROM test_vocabularies
-        WHERE {vocab_column} = TRUE AND language = %s
-    """, (language,))
-    total_words = total_words_result['total'] if total_words_result else 0
-
-    # Count saved words (completed by user)
-    saved_words_result = db_fetch_one(f"""
-        SELECT COUNT(DISTINCT sw.word) as saved
-        FROM saved_words sw
-        INNER JOIN test_vocabularies tv ON
-            LOWER(sw.word) = LOWER(tv.word) AND
-            sw.learning_language = tv.language
-        WHERE sw.user_id = %s AND tv.{vocab_column} = TRUE
-    """, (user_id,))
-    saved_words = saved_words_result['saved'] if saved_words_result else 0
+    test_name = next(name for name, metadata in TEST_TYPES_MAPPING.items()
+                     if metadata['vocab_column'] == vocab_column)
+    row = db_fetch_one("""
+        SELECT saved_words
+        FROM user_test_progress
+        WHERE user_id = %s AND language = %s AND test_type = %s
+    """, (user_id, language, test_name))
 
     return {
-        "saved_words": saved_words,
-        "total_words": total_words
+        "saved_words": row['saved_words'] if row else 0,
+        "total_words": get_test_vocabulary_totals(language)[test_name]
     }
 
 
@@ -246,6 +294,9 @@ def check_test_completion_badges(
     2. The current word being reviewed is part of that test
     3. The test is enabled (if enabled_tests_only=True)
 
+    Reads the current word's test memberships, then (only if it belongs to a
+    candidate test) the user's running counters; no saved_words scans.
+
     Args:
         user_id: User UUID string
         current_word: The word that was just reviewed
@@ -256,45 +307,34 @@ def check_test_completion_badges(
         List of completion badge dictionaries:
         [{"badge_id": "TIANZ", "title": "Tianz Master", "description": "TIANZ vocabulary completed!"}]
     """
-    completion_badges = []
+    flags = ", ".join(f"BOOL_OR({metadata['vocab_column']}) AS {test_name.lower()}"
+                      for test_name, metadata in TEST_TYPES_MAPPING.items())
+    membership = db_fetch_one(f"""
+        SELECT {flags}
+        FROM test_vocabularies
+        WHERE word_key = LOWER(%s) AND language = %s
+    """, (current_word, learning_language)) or {}
+    candidates = [test_name for test_name in TEST_TYPES_MAPPING if membership.get(test_name.lower())]
 
-    # Get user's test preferences if needed
-    enabled_tests = {}
-    if enabled_tests_only:
+    if candidates and enabled_tests_only:
         enabled_tests = get_user_test_preferences(user_id)
+        candidates = [test_name for test_name in candidates if enabled_tests.get(test_name, False)]
+    if not candidates:
+        return []
 
-    # Check each test type
-    for test_name, metadata in TEST_TYPES_MAPPING.items():
-        # Skip if checking enabled tests only and this test is not enabled
-        if enabled_tests_only and not enabled_tests.get(test_name, False):
-            continue
-
-        vocab_column = metadata['vocab_column']
-
-        # Get progress for this test
-        progress = count_test_vocabulary_progress(user_id, vocab_column, learning_language)
-
+    progress = get_test_vocabulary_progress(user_id, learning_language)
+    completion_badges = []
+    for test_name in candidates:
+        counts = progress[test_name]
         # Check if test is completed (saved == total)
-        if progress['total_words'] > 0 and progress['saved_words'] == progress['total_words']:
-            # Check if current word is part of this test vocabulary
-            is_test_word_result = db_fetch_one(f"""
-                SELECT COUNT(*) as is_test_word
-                FROM test_vocabularies
-                WHERE LOWER(word) = LOWER(%s)
-                  AND language = %s
-                  AND {vocab_column} = TRUE
-            """, (current_word, learning_language))
-
-            is_test_word = (is_test_word_result['is_test_word'] > 0) if is_test_word_result else False
-
-            # If this review was for a test word, award the completion badge
-            if is_test_word:
-                completion_badges.append({
-                    "badge_id": test_name,
-                    "title": metadata['title'],
-                    "description": metadata['description']
-                })
-                logger.info(f"User {user_id} completed {test_name} test vocabulary!")
+        if counts['total_words'] > 0 and counts['saved_words'] >= counts['total_words']:
+            metadata = TEST_TYPES_MAPPING[test_name]
+            completion_badges.append({
+                "badge_id": test_name,
+                "title": metadata['title'],
+                "description": metadata['description']
+            })
+            logger.info(f"User {user_id} completed {test_name} test vocabulary!")
 
     return completion_badges
 
@@ -401,13 +441,10 @@ def get_test_vocabulary_awards():
         except ValueError:
             return jsonify({"error": "Invalid user_id format. Must be a valid UUID"}), 400
 
-        # Use utility functions to get progress for all test types
+        # One read of the running counters covers every test type
         result = {}
 
-        for test_name, metadata in TEST_TYPES_MAPPING.items():
-            vocab_column = metadata['vocab_column']
-            progress = count_test_vocabulary_progress(user_id, vocab_column, language='en')
-
+        for test_name, progress in get_test_vocabulary_progress(user_id, language='en').items():
             result[test_name] = {
                 "saved_test_words": progress['saved_words'],
                 "total_test_words": progress['total_words']
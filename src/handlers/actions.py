@@ -26,6 +26,7 @@ from config.config import *
 from utils.database import validate_language, get_db_connection, db_insert_returning, db_cursor, db_fetch_one, db_fetch_all, db_execute
 from services.user_service import get_user_preferences
 from services.spaced_repetition_service import get_next_review_date_new
+from services.schedule_service import invalidate_user_snapshots
 from handlers.achievements import (
     calculate_user_score,
     get_newly_earned_score_badges,
@@ -76,7 +77,8 @@ def save_word():
             DO UPDATE SET metadata = EXCLUDED.metadata
             RETURNING id, created_at
         """, (user_id, word, learning_lang, native_lang, json.dumps(metadata)))
-        
+        invalidate_user_snapshots(user_id)
+
         return jsonify({
             "success": True,
             "message": f"Word '{word}' saved successfully",
@@ -141,6 +143,7 @@ def delete_saved_word():
             deleted = cur.fetchone()
 
         if deleted:
+            invalidate_user_snapshots(user_id)
             return jsonify({
                 "success": True,
                 "message": f"Word '{deleted['word']}' removed from saved words",
@@ -194,6 +197,7 @@ def delete_saved_word_v2():
             deleted = cur.fetchone()
 
         if deleted:
+            invalidate_user_snapshots(user_id)
             return jsonify({
                 "success": True,
                 "message": f"Word '{deleted['word']}' removed from saved words",
@@ -224,32 +228,22 @@ def get_next_review_word():
                 sw.native_language,
                 sw.metadata,
                 sw.created_at,
-                COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') as next_review_date,
-                COALESCE(latest_review.review_count, 0) as review_count,
-                latest_review.last_reviewed_at,
+                COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') as next_review_date,
+                sw.review_count,
+                sw.last_reviewed_at,
                 CASE
-                    WHEN latest_review.last_reviewed_at IS NOT NULL AND latest_review.next_review_date IS NOT NULL
-                    THEN EXTRACT(epoch FROM (latest_review.next_review_date - latest_review.last_reviewed_at)) / 86400
-                    WHEN latest_review.next_review_date IS NOT NULL
-                    THEN EXTRACT(epoch FROM (latest_review.next_review_date - sw.created_at)) / 86400
+                    WHEN sw.last_reviewed_at IS NOT NULL AND sw.next_review_date IS NOT NULL
+                    THEN EXTRACT(epoch FROM (sw.next_review_date - sw.last_reviewed_at)) / 86400
+                    WHEN sw.next_review_date IS NOT NULL
+                    THEN EXTRACT(epoch FROM (sw.next_review_date - sw.created_at)) / 86400
                     ELSE 1
                 END as interval_days
             FROM saved_words sw
-            LEFT JOIN (
-                SELECT
-                    word_id,
-                    next_review_date,
-                    reviewed_at as last_reviewed_at,
-                    COUNT(*) as review_count,
-                    ROW_NUMBER() OVER (PARTITION BY word_id ORDER BY reviewed_at DESC) as rn
-                FROM reviews
-                GROUP BY word_id, next_review_date, reviewed_at
-            ) latest_review ON sw.id = latest_review.word_id AND latest_review.rn = 1
             WHERE sw.user_id = %s
             -- Exclude words reviewed in the past 24 hours
-            AND (latest_review.last_reviewed_at IS NULL OR latest_review.last_reviewed_at <= NOW() - INTERVAL '24 hours')
-            -- AND COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW()
-            ORDER BY COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') ASC
+            AND (sw.last_reviewed_at IS NULL OR sw.last_reviewed_at <= NOW() - INTERVAL '24 hours')
+            -- AND COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW()
+            ORDER BY COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') ASC
             LIMIT 1
         """, (user_id,))
         
@@ -303,9 +297,6 @@ def submit_review():
         # Record the current review time
         current_review_time = datetime.now()
 
-        # Get old score BEFORE inserting review (for badge calculation)
-        old_score = calculate_user_score(user_id)
-
         # Use a single connection for the entire transaction
         conn = get_db_connection()
         cur = conn.cursor()
@@ -360,6 +351,10 @@ def submit_review():
                 VALUES (%s, %s, %s, %s, %s)
             """, (user_id, word_id, response_bool, current_review_time, next_review_date))
 
+            # The reviews trigger already added this review to the running score
+            cur.execute("SELECT score FROM user_scores WHERE user_id = %s", (user_id,))
+            score_row = cur.fetchone()
+
             conn.commit()
         except Exception as e:
             conn.rollback()
@@ -368,8 +363,11 @@ def submit_review():
             cur.close()
             conn.close()
 
-        # Calculate new score AFTER inserting review
-        new_score = old_score + (2 if response_bool else 1)
+        invalidate_user_snapshots(user_id)
+
+        # Score badges compare the counter before and after this review
+        new_score = score_row['score'] if score_row else calculate_user_score(user_id)
+        old_score = new_score - (2 if response_bool else 1)
 
         # Check if user earned new badges using utility functions
         new_badges = []
@@ -402,17 +400,10 @@ def submit_review():
                 SELECT
                     COUNT(*) as total_count,
                     COUNT(CASE
-                        WHEN COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW()
+                        WHEN COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW()
                         THEN 1
                     END) as due_count
                 FROM saved_words sw
-                LEFT JOIN (
-                    SELECT
-                        word_id,
-                        next_review_date,
-                        ROW_NUMBER() OVER (PARTITION BY word_id ORDER BY reviewed_at DESC) as rn
-                    FROM reviews
-                ) latest_review ON sw.id = latest_review.word_id AND latest_review.rn = 1
                 WHERE sw.user_id = %s
             """, (user_id,))
 
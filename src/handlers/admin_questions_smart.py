@@ -12,6 +12,8 @@ from typing import Dict, List, Optional, Tuple
 from utils.database import db_fetch_all, db_fetch_one
 from services.question_generation_service import get_or_generate_question, QUESTION_TYPE_WEIGHTS
 from services.definition_service import generate_definition_with_llm
+from services.batch_generation_service import run_batch_generation
+from utils.llm_batch import get_batch_backend
 
 logger = logging.getLogger(__name__)
 
@@ -32,9 +34,18 @@ def smart_batch_generate_questions():
         "num_words": 10,                  // number of incomplete words to process
         "learning_language": "en",        // required
         "native_language": "zh",          // required
-        "strategy": "missing_any"         // optional: "missing_any", "missing_definition", "missing_questions"
+        "strategy": "missing_any",        // optional: "missing_any", "missing_definition", "missing_questions"
+        "mode": "sync"                    // optional: "sync" or "batch"
     }
 
+    With "mode": "batch" the selected words are handed to the batch generation
+    service (services/batch_generation_service.py) instead: the call applies
+    batches that have finished, submits batches for what is still missing and
+    returns 202 with the batch statistics (409 when LLM_BATCH_BACKEND is
+    local). Call it again to make progress;
+    definitions come first and a word's questions are submitted once its
+    definition has been stored.
+
     Returns:
     {
         "statistics": {
@@ -71,6 +82,17 @@ def smart_batch_generate_questions():
 
         # Optional fields
         strategy = data.get('strategy', 'missing_any')
+        mode = data.get('mode', 'sync')
+
+        if mode not in ('sync', 'batch'):
+            return jsonify({"error": "Invalid mode. Must be one of: sync, batch"}), 400
+
+        # The local backend runs every completion of a batch inside the polling call
+        if mode == 'batch' and get_batch_backend().name == 'local':
+            return jsonify({
+                "error": "Batch mode needs LLM_BATCH_BACKEND=provider; local batches run outside the web "
+                         "process (scripts/prepopulate_words.py --batch)"
+            }), 409
 
         # Validate strategy
         valid_strategies = ['missing_any', 'missing_definition', 'missing_questions', 'missing_video_questions']
@@ -109,6 +131,10 @@ def smart_batch_generate_questions():
                 "total_words": total_words
             }), 200
 
+        if mode == 'batch':
+            return smart_batch_submit(incomplete_words, source, num_words, learning_lang, native_lang,
+                                      strategy, start_time)
+
         # Statistics
         stats = {
             'words_requested': num_words,
@@ -238,6 +264,43 @@ def smart_batch_generate_questions():
         return jsonify({"error": str(e)}), 500
 
 
+def smart_batch_submit(incomplete_words: List[Dict], source: str, num_words: int, learning_lang: str,
+                       native_lang: str, strategy: str, start_time: float):
+    """Batch mode of smart_batch_generate_questions: one step of the batch backfill."""
+    items = [{
+        'word': word_info['word'],
+        'learning_language': learning_lang,
+        'native_language': native_lang,
+        'question_types': determine_question_types(
+            word=word_info['word'],
+            learning_lang=learning_lang,
+            native_lang=native_lang,
+            has_video=word_info['has_video']
+        ),
+    } for word_info in incomplete_words]
+
+    stats = run_batch_generation(items, poll_local=False)
+    stats['words_requested'] = num_words
+    stats['words_selected'] = len(items)
+
+    next_incomplete = count_incomplete_words(source, learning_lang, native_lang, strategy)
+    total_words = get_total_words_count(source, learning_lang)
+    progress = ((total_words - next_incomplete) / total_words * 100) if total_words > 0 else 0
+    stats['duration_seconds'] = round(time.time() - start_time, 2)
+
+    logger.info(f"Smart batch (batch mode): {stats['submitted']} requests submitted, "
+                f"{stats['in_flight']} in flight, {stats['pending_batches']} batches pending")
+
+    return jsonify({
+        "message": "Batch generation step complete",
+        "mode": "batch",
+        "statistics": stats,
+        "next_incomplete_count": next_incomplete,
+        "progress_percentage": round(progress, 2),
+        "total_words": total_words
+    }), 202
+
+
 def find_incomplete_words(
     source: str,
     num_words: int,
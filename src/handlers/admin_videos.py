@@ -8,6 +8,7 @@ import logging
 import base64
 from flask import request, jsonify
 from utils.database import db_fetch_one, db_execute, get_db_connection
+from utils.media_store import save_blob
 import psycopg2.extras
 
 logger = logging.getLogger(__name__)
@@ -155,13 +156,16 @@ def _upload_single_video(cursor, video_data: dict, source_id: str = None) -> dic
         status = "existed"
         logger.info(f"Video already exists: {name}.{format_type} (id={video_id})")
     else:
+        # Blob goes to the media store when one is configured
+        storage_key, db_video_bytes = save_blob(video_bytes, f"video/{format_type}")
+
         # Insert video with audio transcript support
         cursor.execute("""
-            INSERT INTO videos (name, format, video_data, size_bytes, transcript, audio_transcript,
+            INSERT INTO videos (name, format, video_data, storage_key, size_bytes, transcript, audio_transcript,
                                audio_transcript_verified, whisper_metadata, metadata, source_id)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING id
-        """, (name, format_type, video_bytes, size_bytes or len(video_bytes), transcript, audio_transcript,
+        """, (name, format_type, db_video_bytes, storage_key, size_bytes or len(video_bytes), transcript, audio_transcript,
               audio_transcript_verified, psycopg2.extras.Json(whisper_metadata) if whisper_metadata else None,
               psycopg2.extras.Json(metadata), source_id))
 
@@ -0,0 +1,205 @@
+"""
+Audio Handler - Serve content-addressed TTS audio
+
+Audio is addressed by a hash of (language, text), so its URL never changes
+meaning and can be cached forever by browsers and the CDN. Word and review
+responses inline base64 audio by default, which the shipped iOS client
+requires; clients that can fetch URLs pass inline_audio=false to get
+/v3/audio-content/<hash> URLs instead (AUDIO_INLINE_BASE64=false flips the
+default once all clients do).
+
+Audio bytes live in audio.audio_data or, once moved, in the media store
+(utils.media_store) referenced by audio.storage_key.
+"""
+
+import io
+import os
+import hashlib
+import logging
+from flask import request, has_request_context, send_file, jsonify, Response
+from utils.database import db_fetch_one
+from utils.media_store import get_media_store, load_blob, send_stored_media
+from services.audio_job_service import get_audio_job_statuses
+
+logger = logging.getLogger(__name__)
+
+AUDIO_INLINE_BASE64 = os.getenv('AUDIO_INLINE_BASE64', 'true').lower() == 'true'
+
+AUDIO_CACHE_MAX_AGE = 31536000  # 1 year; content-addressed audio is immutable
+
+AUDIO_STATUS_MAX_TEXTS = 100
+
+# Select list for readers of audio bytes: the BYTEA column is only transferred
+# for rows that have not been moved to the media store
+AUDIO_BLOB_COLUMNS = "storage_key, CASE WHEN storage_key IS NULL THEN audio_data END AS audio_data"
+
+
+def audio_content_hash(text: str, language: str) -> str:
+    """sha256 hex of language + newline + text; must match the audio.content_hash trigger."""
+    return hashlib.sha256(f"{language}\n{text}".encode('utf-8')).hexdigest()
+
+
+def audio_content_url(text: str, language: str) -> str:
+    """
+    Root-relative URL of the audio for text+language, under the prefix the
+    request came in on (X-Forwarded-Prefix from the proxy, e.g. /api).
+    """
+    prefix = ''
+    if has_request_context():
+        prefix = (request.headers.get('X-Forwarded-Prefix') or request.script_root).rstrip('/')
+    return f"{prefix}/v3/audio-content/{audio_content_hash(text, language)}"
+
+
+def load_audio_bytes(text: str, language: str, storage_key, audio_data) -> bytes:
+    """
+    Bytes for an audio row selected with AUDIO_BLOB_COLUMNS: from the media
+    store when moved there, else the column (re-read if it was not selected).
+    """
+    def from_db():
+        if audio_data is not None:
+            return audio_data
+        row = db_fetch_one("""
+            SELECT audio_data FROM audio WHERE text_content = %s AND language = %s
+        """, (text, language))
+        return row['audio_data'] if row else None
+
+    return load_blob(storage_key, from_db)
+
+
+def wants_inline_audio() -> bool:
+    """Whether to inline base64 audio for the current request (inline_audio=true/false, else AUDIO_INLINE_BASE64)."""
+    value = request.args.get('inline_audio')
+    if value is None:
+        return AUDIO_INLINE_BASE64
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def _set_cache_headers(response: Response) -> Response:
+    response.headers['Cache-Control'] = f'public, max-age={AUDIO_CACHE_MAX_AGE}, immutable'
+    response.headers['CDN-Cache-Control'] = f'public, max-age={AUDIO_CACHE_MAX_AGE}, immutable'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+def get_audio_content(content_hash: str):
+    """
+    Serve raw audio bytes by content hash.
+
+    Supports If-None-Match (304, answered without touching the database) and
+    Range requests (206) for seeking.
+
+    Example:
+        GET /v3/audio-content/3f0a...e1
+
+        Response:
+            Content-Type: audio/mpeg
+            Cache-Control: public, max-age=31536000, immutable
+            ETag: "3f0a...e1"
+            <binary audio data>
+    """
+    try:
+        content_hash = content_hash.lower()
+        if len(content_hash) != 64 or any(c not in '0123456789abcdef' for c in content_hash):
+            return jsonify({"error": "Invalid audio hash"}), 404
+
+        # The hash is the ETag, so a matching validator needs no lookup
+        if content_hash in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(content_hash)
+            return _set_cache_headers(response)
+
+        audio = db_fetch_one(f"""
+            SELECT text_content, language, content_type, {AUDIO_BLOB_COLUMNS}
+            FROM audio
+            WHERE content_hash = %s
+        """, (content_hash,))
+
+        if not audio:
+            logger.warning(f"Audio not found: hash={content_hash}")
+            return jsonify({"error": "Audio not found"}), 404
+
+        mimetype = audio['content_type'] or 'audio/mpeg'
+        store = get_media_store()
+        if audio['storage_key'] and store is not None and store.exists(audio['storage_key']):
+            response = send_stored_media(store, audio['storage_key'], mimetype, content_hash, {})
+            return _set_cache_headers(response)
+
+        audio_data = load_audio_bytes(audio['text_content'], audio['language'], None, audio['audio_data'])
+        if audio_data is None:
+            logger.error(f"Audio {content_hash} is only in the media store, which is unavailable")
+            return jsonify({"error": "Audio not available"}), 503
+
+        response = send_file(
+            io.BytesIO(audio_data),
+            mimetype=mimetype,
+            etag=content_hash,
+            conditional=True,
+            max_age=AUDIO_CACHE_MAX_AGE
+        )
+        return _set_cache_headers(response)
+
+    except Exception as e:
+        logger.error(f"Error serving audio {content_hash}: {e}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+def get_audio_jobs_status():
+    """
+    Generation status of audio for one or more texts, read from the durable
+    job queue.
+
+    Query params:
+        language: Language code (required)
+        text: Text to check; repeat for several (required, max 100)
+
+    Example:
+        GET /v3/audio-jobs?language=en&text=hello&text=Hello%20there!
+
+        Response:
+        {
+            "language": "en",
+            "status": "queued",
+            "jobs": [
+                {"text": "hello", "status": "complete", "attempts": 1, "last_error": null,
+                 "next_attempt_at": null, "audio_url": "/v3/audio-content/3f0a...e1"},
+                {"text": "Hello there!", "status": "queued", "attempts": 1, "last_error": "timeout",
+                 "next_attempt_at": "2026-10-16T12:00:05", "audio_url": null}
+            ]
+        }
+
+    status is complete once every text has audio; failed means some job ran
+    out of retries; missing means some text was never queued.
+    """
+    try:
+        language = request.args.get('language')
+        texts = list(dict.fromkeys(request.args.getlist('text')))
+        if not language or not texts:
+            return jsonify({"error": "language and text parameters are required"}), 400
+        if len(texts) > AUDIO_STATUS_MAX_TEXTS:
+            return jsonify({"error": f"At most {AUDIO_STATUS_MAX_TEXTS} texts per request"}), 400
+
+        statuses = get_audio_job_statuses(texts, language)
+        jobs = []
+        for text in texts:
+            job = statuses.get(text, {'status': 'missing', 'attempts': 0, 'last_error': None, 'next_attempt_at': None})
+            jobs.append({
+                "text": text,
+                **job,
+                "audio_url": audio_content_url(text, language) if job['status'] == 'complete' else None,
+            })
+
+        states = {job['status'] for job in jobs}
+        if states == {'complete'}:
+            overall = 'complete'
+        elif states & {'queued', 'running'}:
+            overall = 'queued'
+        elif 'failed' in states:
+            overall = 'failed'
+        else:
+            overall = 'missing'
+
+        return jsonify({"language": language, "status": overall, "jobs": jobs})
+
+    except Exception as e:
+        logger.error(f"Error getting audio job status: {e}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
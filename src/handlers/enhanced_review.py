@@ -13,10 +13,29 @@ from utils.database import db_fetch_one, get_db_connection
 from services.question_generation_service import get_or_generate_question
 from services.user_service import get_user_preferences
 from services.schedule_service import get_user_timezone, get_today_in_timezone
+from handlers.audio import AUDIO_BLOB_COLUMNS, audio_content_url, load_audio_bytes, wants_inline_audio
 
 logger = logging.getLogger(__name__)
 
 
+def get_or_generate_audio_url(text: str, language: str) -> str:
+    """
+    Make sure audio exists for text and return its content-addressed URL.
+
+    Returns:
+        Audio URL (see audio_content_url), or "" if generation failed
+    """
+    try:
+        from services.question_pool_service import ensure_audio
+
+        ensure_audio(text, language)
+        return audio_content_url(text, language)
+
+    except Exception as e:
+        logger.error(f"Error getting/generating audio: {e}", exc_info=True)
+        return ""
+
+
 def get_or_generate_audio_base64(text: str, language: str) -> str:
     """
     Get or generate audio for text and return as base64 encoded data URI.
@@ -35,8 +54,8 @@ def get_or_generate_audio_base64(text: str, language: str) -> str:
         cur = conn.cursor()
 
         # Try to get existing audio from cache
-        cur.execute("""
-            SELECT audio_data
+        cur.execute(f"""
+            SELECT {AUDIO_BLOB_COLUMNS}
             FROM audio
             WHERE text_content = %s AND language = %s
         """, (text, language))
@@ -47,7 +66,8 @@ def get_or_generate_audio_base64(text: str, language: str) -> str:
             # Found cached audio
             cur.close()
             conn.close()
-            audio_base64 = base64.b64encode(result['audio_data']).decode('utf-8')
+            audio_data = load_audio_bytes(text, language, result['storage_key'], result['audio_data'])
+            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
             logger.info(f"Retrieved cached audio for text: '{text[:50]}...'")
             return f"data:audio/mpeg;base64,{audio_base64}"
 
@@ -185,22 +205,14 @@ def get_next_review_enhanced():
                         sw.word,
                         sw.learning_language,
                         sw.native_language,
-                        COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') as next_review_date
+                        COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') as next_review_date
                     FROM saved_words sw
-                    LEFT JOIN (
-                        SELECT
-                            word_id,
-                            next_review_date,
-                            reviewed_at as last_reviewed_at,
-                            ROW_NUMBER() OVER (PARTITION BY word_id ORDER BY reviewed_at DESC) as rn
-                        FROM reviews
-                    ) latest_review ON sw.id = latest_review.word_id AND latest_review.rn = 1
                     WHERE sw.user_id = %s
                     -- Exclude words reviewed in the past 24 hours
-                    AND (latest_review.last_reviewed_at IS NULL OR latest_review.last_reviewed_at <= NOW() - INTERVAL '24 hours')
+                    AND (sw.last_reviewed_at IS NULL OR sw.last_reviewed_at <= NOW() - INTERVAL '24 hours')
                     -- ONLY include words that are actually DUE (overdue or due now)
-                    AND COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW()
-                    ORDER BY COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') ASC
+                    AND COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW()
+                    ORDER BY COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') ASC
                     LIMIT 1
                 """, (user_id,))
 
@@ -257,7 +269,10 @@ def get_next_review_enhanced():
 
             # For pronounce_sentence questions, generate audio for the sentence
             if question.get('question_type') == 'pronounce_sentence' and question.get('sentence'):
-                audio_url = get_or_generate_audio_base64(question['sentence'], learning_lang)
+                if wants_inline_audio():
+                    audio_url = get_or_generate_audio_base64(question['sentence'], learning_lang)
+                else:
+                    audio_url = get_or_generate_audio_url(question['sentence'], learning_lang)
                 question['audio_url'] = audio_url
                 # Add evaluation threshold if not already present
                 if 'evaluation_threshold' not in question:
@@ -79,16 +79,10 @@ def get_practice_status():
             non_test_due_row = db_fetch_all("""
                 SELECT sw.word
                 FROM saved_words sw
-                INNER JOIN (
-                    SELECT
-                        word_id,
-                        next_review_date,
-                        ROW_NUMBER() OVER (PARTITION BY word_id ORDER BY reviewed_at DESC) as rn
-                    FROM reviews
-                ) latest_review ON sw.id = latest_review.word_id AND latest_review.rn = 1
                 WHERE sw.user_id = %s
                   AND (sw.is_known IS NULL OR sw.is_known = FALSE)
-                  AND COALESCE(latest_review.next_review_date, (NOW() AT TIME ZONE %s)::date) <= (NOW() AT TIME ZONE %s)::date
+                  AND sw.last_reviewed_at IS NOT NULL
+                  AND COALESCE(sw.next_review_date, (NOW() AT TIME ZONE %s)::date) <= (NOW() AT TIME ZONE %s)::date
             """, (user_id, user_tz, user_tz))
 
             if non_test_due_row:
@@ -100,7 +94,7 @@ def get_practice_status():
                 SELECT
                     toefl_beginner_enabled, toefl_intermediate_enabled, toefl_advanced_enabled,
                     ielts_beginner_enabled, ielts_intermediate_enabled, ielts_advanced_enabled,
-                    tianz_enabled, target_end_date
+                    tianz_enabled, target_end_date, schedule_version
                 FROM user_preferences
                 WHERE user_id = %s
             """, (user_id,))
@@ -114,21 +108,11 @@ def get_practice_status():
 
                 # If user has test prep enabled, calculate schedule on-the-fly
                 if test_type and target_end_date and target_end_date > today:
-                    from services.schedule_service import fetch_schedule_data, calc_schedule, get_schedule
-
-                    # Fetch all data needed for calculation
-                    schedule_data = fetch_schedule_data(user_id, test_type, user_tz, today)
-
-                    # Calculate the full schedule
-                    schedule_result = calc_schedule(
-                        today=today,
-                        target_end_date=target_end_date,
-                        all_test_words=schedule_data['all_test_words'],
-                        saved_words_with_reviews=schedule_data['saved_words_with_reviews'],
-                        words_saved_today=schedule_data['words_saved_today'],
-                        words_reviewed_today=schedule_data['words_reviewed_today'],
-                        get_schedule_fn=get_schedule,
-                        all_saved_words=schedule_data['all_saved_words']
+                    from services.schedule_service import get_schedule_snapshot
+
+                    # Calculate the full schedule (memoized until the user's data changes)
+                    schedule_result = get_schedule_snapshot(
+                        user_id, test_type, target_end_date, user_tz, today, prefs['schedule_version']
                     )
 
                     # Extract today's entry from calculated schedule
@@ -152,18 +136,10 @@ def get_practice_status():
         not_due_yet_row = db_fetch_one("""
             SELECT COUNT(*) as cnt
             FROM saved_words sw
-            INNER JOIN (
-                SELECT
-                    word_id,
-                    next_review_date,
-                    reviewed_at as last_reviewed_at,
-                    ROW_NUMBER() OVER (PARTITION BY word_id ORDER BY reviewed_at DESC) as rn
-                FROM reviews
-            ) latest_review ON sw.id = latest_review.word_id AND latest_review.rn = 1
             WHERE sw.user_id = %s
               AND (sw.is_known IS NULL OR sw.is_known = FALSE)
-              AND latest_review.last_reviewed_at <= NOW() - INTERVAL '24 hours'
-              AND COALESCE(latest_review.next_review_date, (NOW() AT TIME ZONE %s)::date + INTERVAL '1 day') > (NOW() AT TIME ZONE %s)::date
+              AND sw.last_reviewed_at <= NOW() - INTERVAL '24 hours'
+              AND COALESCE(sw.next_review_date, (NOW() AT TIME ZONE %s)::date + INTERVAL '1 day') > (NOW() AT TIME ZONE %s)::date
         """, (user_id, user_tz, user_tz))
         not_due_yet_count = not_due_yet_row['cnt'] if not_due_yet_row else 0
 
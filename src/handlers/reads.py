@@ -17,12 +17,15 @@ import base64
 import logging
 import sys
 import os
+import numpy as np
 
 # Add parent directory to Python path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.database import validate_language, get_db_connection
-from services.spaced_repetition_service import get_next_review_date_new, calculate_retention, get_decay_rate
+from services.spaced_repetition_service import (
+    get_next_review_date_new, calculate_retention, calculate_retention_batch, get_decay_rate
+)
 
 from config.config import *
 
@@ -56,17 +59,10 @@ def get_due_words_count(user_id, conn=None):
             SELECT 
                 COUNT(*) as total_count,
                 COUNT(CASE 
-                    WHEN COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW() 
+                    WHEN COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW() 
                     THEN 1 
                 END) as due_count
             FROM saved_words sw
-            LEFT JOIN (
-                SELECT 
-                    word_id,
-                    next_review_date,
-                    ROW_NUMBER() OVER (PARTITION BY word_id ORDER BY reviewed_at DESC) as rn
-                FROM reviews
-            ) latest_review ON sw.id = latest_review.word_id AND latest_review.rn = 1
             WHERE sw.user_id = %s
             -- Exclude known words from due counts
             AND (sw.is_known IS NULL OR sw.is_known = FALSE)
@@ -199,9 +195,7 @@ def get_forgetting_curve(word_id):
             # For words with no reviews, show until next review or 30 days
             end_date = next_review_date if next_review_date else (created_at + timedelta(days=30))
         
-        # Generate curve points (one per day) - use datetime throughout
-        curve_points = []
-        
+        # Generate curve points (one per day)
         # Ensure we have datetime objects
         current_datetime = created_at
         end_datetime = end_date
@@ -225,26 +219,29 @@ def get_forgetting_curve(word_id):
             if hasattr(last_review_date, 'date'):
                 last_review_date = last_review_date.date()
         
-        # Generate points for each day
-        while current_datetime <= end_datetime:
-            # Use end of day for retention calculation (to include same-day reviews)
-            end_of_day = datetime.combine(current_datetime.date(), datetime.max.time())
-            retention = calculate_retention(review_history, end_of_day, created_at)
-            
-            # Determine if this point is part of the solid line (historical) or dotted line (projection)
-            is_projection = False
-            if last_review_date and current_datetime.date() > last_review_date:
-                is_projection = True
-            
-            curve_points.append({
-                "date": current_datetime.strftime('%Y-%m-%d'),  # Display as date string
+        # One point per day; a datetime64[D] range means end of day for retention
+        # (to include same-day reviews)
+        curve_days = np.arange(
+            np.datetime64(current_datetime.date(), 'D'),
+            np.datetime64(end_datetime.date(), 'D') + 1
+        )
+        retentions = calculate_retention_batch(review_history, curve_days, created_at).tolist()
+
+        # Points after the last review are projections (dotted line in the UI)
+        if last_review_date:
+            is_projection = (curve_days > np.datetime64(last_review_date, 'D')).tolist()
+        else:
+            is_projection = [False] * len(curve_days)
+
+        curve_points = [
+            {
+                "date": day,  # Display as date string
                 "retention": retention * 100,  # Convert to percentage
-                "is_projection": is_projection  # Flag for UI to render as dotted line
-            })
-            
-            # Move to next day (start of day)
-            current_datetime = datetime.combine((current_datetime + timedelta(days=1)).date(), datetime.min.time())
-        
+                "is_projection": projection  # Flag for UI to render as dotted line
+            }
+            for day, retention, projection in zip(curve_days.astype(str).tolist(), retentions, is_projection)
+        ]
+
         # Prepare all markers including creation and next review
         all_markers = []
         
@@ -354,98 +351,62 @@ def get_word_details(word_id):
         return jsonify({"error": f"Failed to get word details: {str(e)}"}), 500
 
 
-def get_leaderboard():
-    """Get leaderboard with all users ranked by total review count"""
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Get all users with their review counts, name, and motto
-        cur.execute("""
-            SELECT 
-                up.user_id,
-                COALESCE(up.user_name, 'Anonymous') as user_name,
-                COALESCE(up.user_motto, '') as user_motto,
-                COALESCE(COUNT(r.id), 0) as total_reviews
-            FROM user_preferences up
-            LEFT JOIN saved_words sw ON up.user_id = sw.user_id
-            LEFT JOIN reviews r ON sw.id = r.word_id
-            GROUP BY up.user_id, up.user_name, up.user_motto
-            ORDER BY total_reviews DESC, up.user_name ASC
-        """)
-        
-        leaderboard = []
-        rank = 1
-        for row in cur.fetchall():
-            leaderboard.append({
-                "rank": rank,
-                "user_id": row['user_id'],
-                "user_name": row['user_name'],
-                "user_motto": row['user_motto'], 
-                "total_reviews": row['total_reviews']
-            })
-            rank += 1
-        
-        cur.close()
-        conn.close()
-        
-        return jsonify({
-            "leaderboard": leaderboard,
-            "total_users": len(leaderboard)
-        })
-        
-    except Exception as e:
-        logger.error(f"Error getting leaderboard: {str(e)}")
-        return jsonify({"error": f"Failed to get leaderboard: {str(e)}"}), 500
+def _leaderboard_response(ordering: str, error_label: str):
+    """
+    Shared body of the leaderboard endpoints.
 
+    Query params:
+        offset: First rank to return, 0-based (default: 0)
+        limit: Entries to return (default and max: LEADERBOARD_TOP_K, at least 100)
+        user_id: Also return this user's own rank as my_rank
+    """
+    from services.leaderboard_service import (
+        get_leaderboard_page, get_user_rank, LEADERBOARD_TOP_K, LEADERBOARD_MAX_PAGE_SIZE
+    )
 
-def get_leaderboard_v2():
-    """Get leaderboard with all users ranked by score (correct=2pts, wrong=1pt)"""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
+        try:
+            offset = max(int(request.args.get('offset', 0)), 0)
+            limit = int(request.args.get('limit', LEADERBOARD_TOP_K))
+        except ValueError:
+            return jsonify({"error": "offset and limit must be integers"}), 400
+        limit = min(max(limit, 1), max(LEADERBOARD_TOP_K, LEADERBOARD_MAX_PAGE_SIZE))
 
-        # Get all users with their scores, name, and motto
-        # Score = 2 points for correct answers, 1 point for wrong answers
-        cur.execute("""
-            SELECT
-                up.user_id,
-                COALESCE(up.user_name, 'Anonymous') as user_name,
-                COALESCE(up.user_motto, '') as user_motto,
-                COALESCE(SUM(CASE WHEN r.response THEN 2 ELSE 1 END), 0) as score,
-                COALESCE(COUNT(r.id), 0) as total_reviews
-            FROM user_preferences up
-            LEFT JOIN reviews r ON up.user_id = r.user_id
-            GROUP BY up.user_id, up.user_name, up.user_motto
-            ORDER BY score DESC, total_reviews DESC, up.user_name ASC
-        """)
-
-        leaderboard = []
-        rank = 1
-        for row in cur.fetchall():
-            leaderboard.append({
-                "rank": rank,
-                "user_id": row['user_id'],
-                "user_name": row['user_name'],
-                "user_motto": row['user_motto'],
-                "score": row['score'],
-                "total_reviews": row['total_reviews']
-            })
-            rank += 1
+        user_id = request.args.get('user_id')
+        if user_id:
+            try:
+                uuid.UUID(user_id)
+            except ValueError:
+                return jsonify({"error": "Invalid user_id format. Must be a valid UUID"}), 400
+
+        page = get_leaderboard_page(ordering, offset, limit)
+        response = {
+            "leaderboard": page['entries'],
+            "total_users": page['total_users'],
+            "offset": offset,
+            "limit": limit
+        }
 
-        cur.close()
-        conn.close()
+        if user_id:
+            response["my_rank"] = get_user_rank(user_id, ordering)
 
-        return jsonify({
-            "leaderboard": leaderboard,
-            "total_users": len(leaderboard)
-        })
+        return jsonify(response)
 
     except Exception as e:
-        logger.error(f"Error getting leaderboard v2: {str(e)}")
+        logger.error(f"Error getting {error_label}: {str(e)}")
         return jsonify({"error": f"Failed to get leaderboard: {str(e)}"}), 500
 
 
+def get_leaderboard():
+    """Get leaderboard with users ranked by total review count (reads materialized user_scores)"""
+    return _leaderboard_response('reviews', 'leaderboard')
+
+
+def get_leaderboard_v2():
+    """Get leaderboard with users ranked by score (correct=2pts, wrong=1pt) from materialized user_scores"""
+    return _leaderboard_response('score', 'leaderboard v2')
+
+
 def get_review_progress_stats():
     """Get review progress statistics for ReviewGoalAchievedView"""
     try:
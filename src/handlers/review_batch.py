@@ -3,73 +3,48 @@ Batch Review Handler
 
 Provides endpoint for fetching multiple review questions at once for performance.
 This allows iOS to maintain a local queue and provide instant question transitions.
+
+Questions are read from the pool that services.question_pool_service fills
+ahead of time; each request also queues a look-ahead for the user's next batch.
+Definitions, cached questions, video availability and audio for the whole
+batch are prefetched in one query each, and only the misses are generated,
+concurrently on a bounded executor (REVIEW_BATCH_GENERATION_WORKERS).
+Sentence audio is returned as a content-addressed URL (see handlers.audio)
+unless the client asks for inline base64.
 """
 
 from flask import jsonify, request
+import os
+import copy
 import logging
 import json
 import base64
-from typing import Dict, Any, Optional, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Set, Tuple
 from utils.database import db_fetch_one, db_fetch_all, get_db_connection
-from services.question_generation_service import get_or_generate_question
+from services.question_generation_service import (
+    choose_question_type,
+    generate_question_with_llm,
+    cache_question,
+    shuffle_question_options,
+)
+from services.question_pool_service import select_pooled_question, ensure_audio, question_pool, PRIORITY_INTERACTIVE
+from handlers.audio import AUDIO_BLOB_COLUMNS, audio_content_url, load_audio_bytes, wants_inline_audio
 from services.user_service import get_user_preferences
 from services.schedule_service import get_user_timezone, get_today_in_timezone
 
 logger = logging.getLogger(__name__)
 
+# Max concurrent generations (definitions, questions, audio) for batch misses, per process
+REVIEW_BATCH_GENERATION_WORKERS = int(os.getenv('REVIEW_BATCH_GENERATION_WORKERS', '4'))
 
-def get_or_generate_audio_base64(text: str, language: str) -> str:
-    """
-    Get or generate audio for text and return as base64 encoded data URI.
-
-    Args:
-        text: The text to generate audio for
-        language: Language code (e.g., 'en', 'zh')
-
-    Returns:
-        Base64 encoded audio data URI (data:audio/mpeg;base64,...)
-    """
-    try:
-        from handlers.words import generate_audio_for_text, store_audio
-
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        # Try to get existing audio from cache
-        cur.execute("""
-            SELECT audio_data
-            FROM audio
-            WHERE text_content = %s AND language = %s
-        """, (text, language))
-
-        result = cur.fetchone()
+_generation_executor = None
+_generation_executor_pid = None
+_generation_executor_lock = threading.Lock()
 
-        if result:
-            # Found cached audio
-            cur.close()
-            conn.close()
-            audio_base64 = base64.b64encode(result['audio_data']).decode('utf-8')
-            logger.info(f"Retrieved cached audio for text: '{text[:50]}...'")
-            return f"data:audio/mpeg;base64,{audio_base64}"
-
-        # Audio doesn't exist, generate it
-        cur.close()
-        conn.close()
-
-        logger.info(f"Generating audio for text: '{text[:50]}...' in {language}")
-        audio_data = generate_audio_for_text(text)
-
-        # Store in database for future use
-        store_audio(text, language, audio_data)
-
-        # Return as base64 data URI
-        audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-        return f"data:audio/mpeg;base64,{audio_base64}"
-
-    except Exception as e:
-        logger.error(f"Error getting/generating audio: {e}", exc_info=True)
-        # Return empty string on error
-        return ""
+# (word, learning_language, native_language)
+WordKey = Tuple[str, str, str]
 
 
 def fetch_and_cache_definition(word: str, learning_lang: str, native_lang: str) -> Optional[Dict]:
@@ -97,6 +72,156 @@ def fetch_and_cache_definition(word: str, learning_lang: str, native_lang: str)
         return None
 
 
+def get_generation_executor() -> ThreadPoolExecutor:
+    """
+    Bounded executor shared by all batch requests in this process for
+    generating definitions, questions and audio the prefetch could not serve.
+    """
+    global _generation_executor, _generation_executor_pid
+    # Threads do not survive fork(), so a forked worker builds its own executor
+    if _generation_executor is None or _generation_executor_pid != os.getpid():
+        with _generation_executor_lock:
+            if _generation_executor is None or _generation_executor_pid != os.getpid():
+                _generation_executor = ThreadPoolExecutor(
+                    max_workers=REVIEW_BATCH_GENERATION_WORKERS,
+                    thread_name_prefix="ReviewBatchGen"
+                )
+                _generation_executor_pid = os.getpid()
+    return _generation_executor
+
+
+def prefetch_definitions(cur, keys: List[WordKey]) -> Dict[WordKey, Dict]:
+    """Cached definitions for (word, learning_language, native_language) keys, in one query."""
+    if not keys:
+        return {}
+    cur.execute("""
+        SELECT word, learning_language, native_language, definition_data
+        FROM definitions
+        WHERE (word, learning_language, native_language) IN %s
+    """, (tuple(set(keys)),))
+    return {
+        (row['word'], row['learning_language'], row['native_language']): row['definition_data']
+        for row in cur.fetchall()
+    }
+
+
+def prefetch_cached_questions(cur, keys: List[WordKey]) -> Dict[WordKey, Dict[str, Dict]]:
+    """Cached review questions per key (question_type -> question_data), in one query."""
+    if not keys:
+        return {}
+    cur.execute("""
+        SELECT word, learning_language, native_language, question_type, question_data
+        FROM review_questions
+        WHERE (word, learning_language, native_language) IN %s
+    """, (tuple(set(keys)),))
+    cached = {}
+    for row in cur.fetchall():
+        key = (row['word'], row['learning_language'], row['native_language'])
+        cached.setdefault(key, {})[row['question_type']] = row['question_data']
+    return cached
+
+
+def prefetch_video_words(cur, keys: List[WordKey]) -> Set[Tuple[str, str]]:
+    """
+    (lowercased word, learning_language) pairs with a usable video, in one query.
+    Mirrors check_word_has_videos(): only videos under 5MB count.
+    """
+    if not keys:
+        return set()
+    cur.execute("""
+        SELECT DISTINCT LOWER(wtv.word) AS word, wtv.learning_language
+        FROM word_to_video wtv
+        JOIN videos v ON v.id = wtv.video_id
+        WHERE LOWER(wtv.word) = ANY(%s)
+          AND wtv.learning_language = ANY(%s)
+          AND v.size_bytes <= 5242880
+    """, (list({key[0].lower() for key in keys}), list({key[1] for key in keys})))
+    return {(row['word'], row['learning_language']) for row in cur.fetchall()}
+
+
+def prefetch_audio_keys(cur, audio_keys: Set[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """The (text, language) pairs that already have stored audio, in one query."""
+    if not audio_keys:
+        return set()
+    cur.execute("""
+        SELECT text_content, language
+        FROM audio
+        WHERE (text_content, language) IN %s
+    """, (tuple(audio_keys),))
+    return {(row['text_content'], row['language']) for row in cur.fetchall()}
+
+
+def prefetch_audio_data_uris(cur, audio_keys: Set[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+    """Stored audio as base64 data URIs for (text, language) pairs, in one query."""
+    if not audio_keys:
+        return {}
+    cur.execute(f"""
+        SELECT text_content, language, {AUDIO_BLOB_COLUMNS}
+        FROM audio
+        WHERE (text_content, language) IN %s
+    """, (tuple(audio_keys),))
+    data_uris = {}
+    for row in cur.fetchall():
+        audio_data = load_audio_bytes(row['text_content'], row['language'], row['storage_key'], row['audio_data'])
+        data_uris[(row['text_content'], row['language'])] = \
+            f"data:audio/mpeg;base64,{base64.b64encode(audio_data).decode('utf-8')}"
+    return data_uris
+
+
+def definition_examples(definition_data: Dict) -> List[str]:
+    """Example sentences of a definition, in the order collect_audio_references() walks them."""
+    return [
+        example
+        for def_group in definition_data.get('definitions', [])
+        for example in def_group.get('examples', [])
+    ]
+
+
+def build_audio_references(word: str, definition_data: Dict, learning_lang: str,
+                           available_audio: Set[Tuple[str, str]]) -> Dict:
+    """Same shape as collect_audio_references() plus word_audio, from prefetched audio keys."""
+    audio_refs = {"example_audio": {}, "word_audio": None}
+    for example in definition_examples(definition_data):
+        if (example, learning_lang) in available_audio:
+            audio_refs["example_audio"][example] = True
+    if (word, learning_lang) in available_audio:
+        audio_refs["word_audio"] = True
+    return audio_refs
+
+
+def generate_batch_miss(
+    word: str,
+    learning_lang: str,
+    native_lang: str,
+    definition_data: Optional[Dict],
+    question: Optional[Dict],
+    has_videos: bool
+) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """
+    Fill in whatever the prefetch could not serve for one word (runs on the
+    generation executor). A generated question is cached, and the word is
+    queued on the question pool so its remaining types get generated too.
+
+    Returns:
+        (definition_data, question); definition_data is None if it could not be fetched
+    """
+    if definition_data is None:
+        logger.info(f"Word '{word}' has no definition, fetching...")
+        definition_data = fetch_and_cache_definition(word, learning_lang, native_lang)
+        if definition_data is None:
+            return None, None
+
+    if question is None:
+        question_type = choose_question_type(has_videos)
+        generated = generate_question_with_llm(word, definition_data, learning_lang, native_lang, question_type)
+        # Cache before shuffling, so the cache has a consistent order
+        cache_question(word, learning_lang, native_lang, question_type, generated)
+        question = shuffle_question_options(copy.deepcopy(generated))
+        question_pool.submit_word(word, learning_lang, native_lang, PRIORITY_INTERACTIVE)
+
+    return definition_data, question
+
+
 def get_review_words_batch():
     """
     Get multiple review words with enhanced questions in a single request.
@@ -167,7 +292,7 @@ def get_review_words_batch():
                     SELECT
                         toefl_beginner_enabled, toefl_intermediate_enabled, toefl_advanced_enabled,
                         ielts_beginner_enabled, ielts_intermediate_enabled, ielts_advanced_enabled,
-                        tianz_enabled, target_end_date
+                        tianz_enabled, target_end_date, schedule_version
                     FROM user_preferences
                     WHERE user_id = %s
                 """, (user_id,))
@@ -180,21 +305,11 @@ def get_review_words_batch():
 
                     # If user has test prep enabled, calculate schedule
                     if test_type and target_end_date and target_end_date > today:
-                        from services.schedule_service import fetch_schedule_data, calc_schedule, get_schedule
-
-                        # Fetch all data needed for calculation
-                        schedule_data = fetch_schedule_data(user_id, test_type, user_tz, today)
-
-                        # Calculate the full schedule
-                        schedule_result = calc_schedule(
-                            today=today,
-                            target_end_date=target_end_date,
-                            all_test_words=schedule_data['all_test_words'],
-                            saved_words_with_reviews=schedule_data['saved_words_with_reviews'],
-                            words_saved_today=schedule_data['words_saved_today'],
-                            words_reviewed_today=schedule_data['words_reviewed_today'],
-                            get_schedule_fn=get_schedule,
-                            all_saved_words=schedule_data['all_saved_words']
+                        from services.schedule_service import get_schedule_snapshot
+
+                        # Calculate the full schedule (memoized until the user's data changes)
+                        schedule_result = get_schedule_snapshot(
+                            user_id, test_type, target_end_date, user_tz, today, prefs['schedule_version']
                         )
 
                         # Extract today's entry from calculated schedule
@@ -238,16 +353,9 @@ def get_review_words_batch():
                 available = sorted(available, key=lambda w: w.lower())
 
                 for word in available[:count - len(words_fetched)]:
-                    # Get saved_word_id from saved_words (should exist for practice words)
-                    cur.execute("""
-                        SELECT id FROM saved_words
-                        WHERE user_id = %s AND word = %s AND learning_language = %s AND native_language = %s
-                    """, (user_id, word, learning_lang, native_lang))
-                    word_info = cur.fetchone()
-
-                    # saved_word_id may be null if word was somehow not saved yet
+                    # saved_word_id is filled in below for all practice words at once
                     test_practice_list.append({
-                        'saved_word_id': word_info['id'] if word_info else None,
+                        'saved_word_id': None,
                         'word': word,
                         'learning_language': learning_lang,
                         'native_language': native_lang,
@@ -267,16 +375,9 @@ def get_review_words_batch():
                 available = sorted(available, key=lambda w: w.lower())
 
                 for word in available[:count - len(words_fetched)]:
-                    # Get saved_word_id from saved_words (should exist for practice words)
-                    cur.execute("""
-                        SELECT id FROM saved_words
-                        WHERE user_id = %s AND word = %s AND learning_language = %s AND native_language = %s
-                    """, (user_id, word, learning_lang, native_lang))
-                    word_info = cur.fetchone()
-
-                    # saved_word_id may be null if word was somehow not saved yet
+                    # saved_word_id is filled in below for all practice words at once
                     non_test_practice_list.append({
-                        'saved_word_id': word_info['id'] if word_info else None,
+                        'saved_word_id': None,
                         'word': word,
                         'learning_language': learning_lang,
                         'native_language': native_lang,
@@ -304,18 +405,10 @@ def get_review_words_batch():
                         sw.learning_language,
                         sw.native_language
                     FROM saved_words sw
-                    INNER JOIN (
-                        SELECT
-                            word_id,
-                            next_review_date,
-                            reviewed_at as last_reviewed_at,
-                            ROW_NUMBER() OVER (PARTITION BY word_id ORDER BY reviewed_at DESC) as rn
-                        FROM reviews
-                    ) latest_review ON sw.id = latest_review.word_id AND latest_review.rn = 1
                     WHERE sw.user_id = %s
                       AND (sw.is_known IS NULL OR sw.is_known = FALSE)
-                      AND latest_review.last_reviewed_at <= NOW() - INTERVAL '24 hours'
-                      AND COALESCE(latest_review.next_review_date, (NOW() AT TIME ZONE %s)::date + INTERVAL '1 day') > (NOW() AT TIME ZONE %s)::date
+                      AND sw.last_reviewed_at <= NOW() - INTERVAL '24 hours'
+                      AND COALESCE(sw.next_review_date, (NOW() AT TIME ZONE %s)::date + INTERVAL '1 day') > (NOW() AT TIME ZONE %s)::date
                       {exclude_clause}
                     ORDER BY sw.word ASC
                     LIMIT %s
@@ -339,6 +432,18 @@ def get_review_words_batch():
             # ============================================================
             all_word_rows = new_words_list + test_practice_list + non_test_practice_list + not_due_yet_list
 
+            # Get saved_word_ids for practice words (should exist; may be null if
+            # a word was somehow not saved yet)
+            practice_rows = test_practice_list + non_test_practice_list
+            if practice_rows:
+                cur.execute("""
+                    SELECT word, id FROM saved_words
+                    WHERE user_id = %s AND word = ANY(%s) AND learning_language = %s AND native_language = %s
+                """, (user_id, [r['word'] for r in practice_rows], learning_lang, native_lang))
+                practice_word_ids = {r['word']: r['id'] for r in cur.fetchall()}
+                for practice_row in practice_rows:
+                    practice_row['saved_word_id'] = practice_word_ids.get(practice_row['word'])
+
             # Calculate total available
             total_available = len(all_word_rows)  # Start with words we're returning
 
@@ -366,79 +471,105 @@ def get_review_words_batch():
             cur.execute(f"""
                 SELECT COUNT(*) as cnt
                 FROM saved_words sw
-                INNER JOIN (
-                    SELECT
-                        word_id,
-                        next_review_date,
-                        reviewed_at as last_reviewed_at,
-                        ROW_NUMBER() OVER (PARTITION BY word_id ORDER BY reviewed_at DESC) as rn
-                    FROM reviews
-                ) latest_review ON sw.id = latest_review.word_id AND latest_review.rn = 1
                 WHERE sw.user_id = %s
                   AND (sw.is_known IS NULL OR sw.is_known = FALSE)
-                  AND latest_review.last_reviewed_at <= NOW() - INTERVAL '24 hours'
-                  AND COALESCE(latest_review.next_review_date, (NOW() AT TIME ZONE %s)::date + INTERVAL '1 day') > (NOW() AT TIME ZONE %s)::date
+                  AND sw.last_reviewed_at <= NOW() - INTERVAL '24 hours'
+                  AND COALESCE(sw.next_review_date, (NOW() AT TIME ZONE %s)::date + INTERVAL '1 day') > (NOW() AT TIME ZONE %s)::date
                   {exclude_clause}
             """, (user_id, user_tz, user_tz, *exclude_params))
             not_due_yet_remaining = cur.fetchone()
             if not_due_yet_remaining:
                 total_available += not_due_yet_remaining['cnt']
 
-            # Generate questions for each word with position
+            # Prefetch everything the batch needs in a few set-based queries,
+            # then generate only the misses, concurrently
+            keys = [
+                (row['word'], row.get('learning_language', learning_lang), row.get('native_language', native_lang))
+                for row in all_word_rows
+            ]
+            definitions = prefetch_definitions(cur, keys)
+            cached_questions = prefetch_cached_questions(cur, keys)
+            video_words = prefetch_video_words(cur, keys)
+
+            assembled = {}
+            misses = {}
+            executor = get_generation_executor()
+            for position, key in enumerate(keys):
+                word, word_learning_lang, word_native_lang = key
+                has_videos = (word.lower(), word_learning_lang) in video_words
+                definition_data = definitions.get(key)
+                question = select_pooled_question(cached_questions.get(key, {}), has_videos)
+                if definition_data is None or question is None:
+                    misses[position] = executor.submit(
+                        generate_batch_miss, word, word_learning_lang, word_native_lang,
+                        definition_data, question, has_videos
+                    )
+                else:
+                    assembled[position] = (definition_data, question)
+
+            for position, future in misses.items():
+                try:
+                    definition_data, question = future.result()
+                except Exception as e:
+                    logger.error(f"Error generating review content for '{keys[position][0]}': {e}", exc_info=True)
+                    continue
+                if definition_data is None:
+                    logger.warning(f"Could not fetch definition for '{keys[position][0]}', skipping")
+                    continue  # Skip words without definitions
+                assembled[position] = (definition_data, question)
+
+            # Audio: existence for words and examples, data for pronounce_sentence sentences
+            audio_keys = set()
+            sentence_keys = set()
+            for position, (definition_data, question) in assembled.items():
+                word, word_learning_lang, _ = keys[position]
+                audio_keys.add((word, word_learning_lang))
+                audio_keys.update((example, word_learning_lang) for example in definition_examples(definition_data))
+                if question.get('question_type') == 'pronounce_sentence' and question.get('sentence'):
+                    sentence_keys.add((question['sentence'], word_learning_lang))
+            available_audio = prefetch_audio_keys(cur, audio_keys | sentence_keys)
+            audio_misses = {
+                key: executor.submit(ensure_audio, *key)
+                for key in sentence_keys - available_audio
+            }
+            for key, future in audio_misses.items():
+                try:
+                    future.result()
+                    available_audio.add(key)
+                except Exception as e:
+                    logger.error(f"Error generating audio for '{key[0][:50]}': {e}", exc_info=True)
+
+            # Sentence audio is referenced by URL unless the client opted into inline base64
+            inline_audio = wants_inline_audio()
+            sentence_audio = {}
+            if inline_audio:
+                sentence_audio = prefetch_audio_data_uris(cur, sentence_keys & available_audio)
+
             questions = []
             for position, row in enumerate(all_word_rows):
-                word = row['word']
+                if position not in assembled:
+                    continue
+                word, word_learning_lang, word_native_lang = keys[position]
                 saved_word_id = row['saved_word_id']  # May be None for new words
-                word_learning_lang = row.get('learning_language', learning_lang)
-                word_native_lang = row.get('native_language', native_lang)
                 source_type = row.get('source_type', 'unknown')
+                definition_data, question = assembled[position]
 
-                # Fetch definition
-                cur.execute("""
-                    SELECT definition_data
-                    FROM definitions
-                    WHERE word = %s
-                      AND learning_language = %s
-                      AND native_language = %s
-                """, (word, word_learning_lang, word_native_lang))
-
-                definition_result = cur.fetchone()
-                definition_data = definition_result['definition_data'] if definition_result else None
-
-                # Fetch definition if missing
-                question_type = None
-                if definition_data is None:
-                    logger.info(f"Word '{word}' has no definition, fetching...")
-                    definition_data = fetch_and_cache_definition(word, word_learning_lang, word_native_lang)
-
-                    if definition_data is None:
-                        logger.warning(f"Could not fetch definition for '{word}', skipping")
-                        continue  # Skip words without definitions
-
-                # Generate question
-                question = get_or_generate_question(
-                    word=word,
-                    definition=definition_data,
-                    learning_lang=word_learning_lang,
-                    native_lang=word_native_lang,
-                    question_type=question_type
-                )
-
-                # For pronounce_sentence questions, generate audio for the sentence
+                # For pronounce_sentence questions, attach audio for the sentence
                 if question.get('question_type') == 'pronounce_sentence' and question.get('sentence'):
-                    audio_url = get_or_generate_audio_base64(question['sentence'], word_learning_lang)
-                    question['audio_url'] = audio_url
+                    sentence_key = (question['sentence'], word_learning_lang)
+                    if inline_audio:
+                        question['audio_url'] = sentence_audio.get(sentence_key, "")
+                    elif sentence_key in available_audio:
+                        question['audio_url'] = audio_content_url(*sentence_key)
+                    else:
+                        question['audio_url'] = ""
                     # Add evaluation threshold if not already present
                     if 'evaluation_threshold' not in question:
                         question['evaluation_threshold'] = 0.7
 
                 # Return definition in same format as search API
                 # This ensures DefinitionCard receives identical data in both search and practice modes
-                from handlers.words import collect_audio_references, audio_exists
-
-                audio_refs = collect_audio_references(definition_data, word_learning_lang)
-                if audio_exists(word, word_learning_lang):
-                    audio_refs["word_audio"] = True
+                audio_refs = build_audio_references(word, definition_data, word_learning_lang, available_audio)
 
                 # Extract validation data (should always be present in v4 definitions)
                 valid_word_score = definition_data.get('valid_word_score', 1.0)
@@ -464,6 +595,9 @@ def get_review_words_batch():
                     }
                 })
 
+            # Warm the pool for the user's next batch
+            question_pool.submit_user(user_id, PRIORITY_INTERACTIVE)
+
             return jsonify({
                 "questions": questions,
                 "total_available": total_available,
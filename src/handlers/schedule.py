@@ -18,7 +18,7 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.schedule_service import initiate_schedule, refresh_schedule, get_user_timezone, get_today_in_timezone, get_words_reviewed_on_date
+from services.schedule_service import initiate_schedule, refresh_schedule, get_user_timezone, get_today_in_timezone, get_words_reviewed_on_date, get_user_snapshot, invalidate_user_snapshots
 from utils.database import get_db_connection
 from services.spaced_repetition_service import get_next_review_date_new
 from handlers.test_vocabulary import TEST_TYPE_MAPPING
@@ -113,7 +113,7 @@ def get_today_schedule():
                     toefl_enabled, ielts_enabled, tianz_enabled,
                     toefl_beginner_enabled, toefl_intermediate_enabled, toefl_advanced_enabled,
                     ielts_beginner_enabled, ielts_intermediate_enabled, ielts_advanced_enabled,
-                    user_name, target_end_date
+                    user_name, target_end_date, schedule_version
                 FROM user_preferences
                 WHERE user_id = %s
             """, (user_id,))
@@ -169,21 +169,11 @@ def get_today_schedule():
                 }), 200
 
             # Calculate schedule on-the-fly
-            from services.schedule_service import fetch_schedule_data, calc_schedule, get_schedule
-
-            # Fetch all data needed for calculation
-            schedule_data = fetch_schedule_data(user_id, test_type, user_tz, today)
-
-            # Calculate the full schedule
-            schedule_result = calc_schedule(
-                today=today,
-                target_end_date=target_end_date,
-                all_test_words=schedule_data['all_test_words'],
-                saved_words_with_reviews=schedule_data['saved_words_with_reviews'],
-                words_saved_today=schedule_data['words_saved_today'],
-                words_reviewed_today=schedule_data['words_reviewed_today'],
-                get_schedule_fn=get_schedule,
-                all_saved_words=schedule_data['all_saved_words']
+            from services.schedule_service import get_schedule_snapshot
+
+            # Calculate the full schedule (memoized until the user's data changes)
+            schedule_result = get_schedule_snapshot(
+                user_id, test_type, target_end_date, user_tz, today, prefs['schedule_version']
             )
 
             # Extract today's entry from calculated schedule
@@ -409,7 +399,7 @@ def get_schedule_range():
                     toefl_enabled, ielts_enabled, tianz_enabled,
                     toefl_beginner_enabled, toefl_intermediate_enabled, toefl_advanced_enabled,
                     ielts_beginner_enabled, ielts_intermediate_enabled, ielts_advanced_enabled,
-                    user_name, target_end_date
+                    user_name, target_end_date, schedule_version
                 FROM user_preferences
                 WHERE user_id = %s
             """, (user_id,))
@@ -456,21 +446,11 @@ def get_schedule_range():
                 }), 200
 
             # Calculate schedule on-the-fly
-            from services.schedule_service import fetch_schedule_data, calc_schedule, get_schedule
-
-            # Fetch all data needed for calculation
-            schedule_data = fetch_schedule_data(user_id, test_type, user_tz, today)
-
-            # Calculate the full schedule
-            schedule_result = calc_schedule(
-                today=today,
-                target_end_date=target_end_date,
-                all_test_words=schedule_data['all_test_words'],
-                saved_words_with_reviews=schedule_data['saved_words_with_reviews'],
-                words_saved_today=schedule_data['words_saved_today'],
-                words_reviewed_today=schedule_data['words_reviewed_today'],
-                get_schedule_fn=get_schedule,
-                all_saved_words=schedule_data['all_saved_words']
+            from services.schedule_service import get_schedule_snapshot
+
+            # Calculate the full schedule (memoized until the user's data changes)
+            schedule_result = get_schedule_snapshot(
+                user_id, test_type, target_end_date, user_tz, today, prefs['schedule_version']
             )
 
             # Get words reviewed today (for marking completed on today's entry)
@@ -629,6 +609,7 @@ def update_timezone():
                 return jsonify({"error": "User not found"}), 404
 
             conn.commit()
+            invalidate_user_snapshots(user_id)
 
             return jsonify({
                 "success": True,
@@ -752,22 +733,14 @@ def get_next_review_word_with_scheduled_new_words():
                     sw.word,
                     sw.learning_language,
                     sw.native_language,
-                    COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') as next_review_date
+                    COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') as next_review_date
                 FROM saved_words sw
-                LEFT JOIN (
-                    SELECT
-                        word_id,
-                        next_review_date,
-                        reviewed_at as last_reviewed_at,
-                        ROW_NUMBER() OVER (PARTITION BY word_id ORDER BY reviewed_at DESC) as rn
-                    FROM reviews
-                ) latest_review ON sw.id = latest_review.word_id AND latest_review.rn = 1
                 WHERE sw.user_id = %s
                 -- Exclude words reviewed in the past 24 hours
-                AND (latest_review.last_reviewed_at IS NULL OR latest_review.last_reviewed_at <= NOW() - INTERVAL '24 hours')
+                AND (sw.last_reviewed_at IS NULL OR sw.last_reviewed_at <= NOW() - INTERVAL '24 hours')
                 -- ONLY include words that are actually DUE (overdue or due now)
-                AND COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW()
-                ORDER BY COALESCE(latest_review.next_review_date, sw.created_at + INTERVAL '1 day') ASC
+                AND COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') <= NOW()
+                ORDER BY COALESCE(sw.next_review_date, sw.created_at + INTERVAL '1 day') ASC
                 LIMIT 1
             """, (user_id,))
 
@@ -832,7 +805,7 @@ def get_test_progress(): # chen vetted
                 SELECT
                     toefl_beginner_enabled, toefl_intermediate_enabled, toefl_advanced_enabled,
                     ielts_beginner_enabled, ielts_intermediate_enabled, ielts_advanced_enabled,
-                    tianz_enabled
+                    tianz_enabled, schedule_version
                 FROM user_preferences
                 WHERE user_id = %s
             """, (user_id,))
@@ -888,27 +861,37 @@ def get_test_progress(): # chen vetted
                     "streak_days": 0
                 }), 200
 
-            # Get total words in enabled test level using the specific vocab column
-            cur.execute(f"""
-                SELECT COUNT(DISTINCT word) as total
-                FROM test_vocabularies
-                WHERE {vocab_column} = TRUE
-            """)
-
-            total_result = cur.fetchone()
-            total_words = total_result['total'] if total_result else 0
-
-            # Get count of saved words that are in the enabled test level
-            cur.execute(f"""
-                SELECT COUNT(DISTINCT sw.word) as saved
-                FROM saved_words sw
-                INNER JOIN test_vocabularies tv ON sw.word = tv.word AND sw.learning_language = tv.language
-                WHERE sw.user_id = %s
-                    AND tv.{vocab_column} = TRUE
-            """, (user_id,))
+            def count_progress():
+                # Get total words in enabled test level using the specific vocab column
+                cur.execute(f"""
+                    SELECT COUNT(DISTINCT word) as total
+                    FROM test_vocabularies
+                    WHERE {vocab_column} = TRUE
+                """)
+
+                total_result = cur.fetchone()
+
+                # Get count of saved words that are in the enabled test level
+                cur.execute(f"""
+                    SELECT COUNT(DISTINCT sw.word_key) as saved
+                    FROM saved_words sw
+                    INNER JOIN test_vocabularies tv ON sw.word_key = tv.word_key AND sw.learning_language = tv.language
+                    WHERE sw.user_id = %s
+                        AND tv.{vocab_column} = TRUE
+                """, (user_id,))
+
+                saved_result = cur.fetchone()
+                return {
+                    'total_words': total_result['total'] if total_result else 0,
+                    'saved_words': saved_result['saved'] if saved_result else 0
+                }
 
-            saved_result = cur.fetchone()
-            saved_words = saved_result['saved'] if saved_result else 0
+            # Counts only change with saved words or test settings (memoized until then)
+            counts = get_user_snapshot(
+                user_id, prefs['schedule_version'], 'test_progress', (vocab_column,), count_progress
+            )
+            total_words = counts['total_words']
+            saved_words = counts['saved_words']
 
             # Calculate progress
             progress = saved_words / total_words if total_words > 0 else 0.0
@@ -13,6 +13,7 @@ from typing import Dict, Any, Optional
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.database import get_db_connection, db_cursor, db_fetch_scalar
+from services.schedule_service import invalidate_user_snapshots
 
 logger = logging.getLogger(__name__)
 
@@ -146,6 +147,7 @@ def update_test_settings():
                     cur.execute("DELETE FROM study_schedules WHERE user_id = %s", (user_id,))
 
                 conn.commit()
+                invalidate_user_snapshots(user_id)
 
                 # Return new format response
                 return get_test_settings_response(user_id, cur)
@@ -227,6 +229,7 @@ def handle_legacy_update(data, user_id, cur, conn):
     """
     cur.execute(query, params)
     conn.commit()
+    invalidate_user_snapshots(user_id)
 
     # Return legacy format response
     cur.execute("""
@@ -642,8 +645,8 @@ def manual_daily_job():
         from workers.test_vocabulary_worker import add_daily_test_words_for_all_users
 
         logger.info("Manual trigger of daily test vocabulary job")
-        add_daily_test_words_for_all_users()
-        return jsonify({"success": True, "message": "Daily job completed successfully"}), 200
+        stats = add_daily_test_words_for_all_users()
+        return jsonify({"success": True, "message": "Daily job completed successfully", "stats": stats}), 200
     except Exception as e:
         logger.error(f"Manual daily job failed: {e}")
         return jsonify({"error": "Failed to run daily job"}), 500
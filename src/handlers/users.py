@@ -26,6 +26,7 @@ from static.privacy import PRIVACY_POLICY
 from static.support import SUPPORT_HTML
 from utils.database import validate_language, get_db_connection
 from services.user_service import generate_user_profile
+from services.schedule_service import invalidate_user_snapshots
 from handlers.test_vocabulary import TEST_TYPE_MAPPING, ALL_TEST_ENABLE_COLUMNS
 
 # Get logger
@@ -244,6 +245,7 @@ def handle_user_preferences(user_id):
             cur.execute(query, insert_values)
             conn.commit()
             conn.close()
+            invalidate_user_snapshots(user_id)
 
             response_data = {
                 "user_id": user_id,
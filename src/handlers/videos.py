@@ -2,37 +2,106 @@
 Video Handler - Serve video files for practice mode
 
 Provides endpoint to fetch video binary data with CDN-friendly caching headers.
+
+Videos are streamed from Postgres in VIDEO_STREAM_CHUNK_SIZE slices read with
+substring(), so memory per request stays bounded regardless of clip size, and
+Range requests (AVPlayer seeking) only read the bytes they ask for. Videos
+moved to the media store (utils.media_store) are served from there instead.
 """
 
+import os
 import logging
-from flask import Response, jsonify
+from flask import Response, jsonify, request
 from utils.database import db_fetch_one
+from utils.media_store import get_media_store, ranged_response, send_stored_media
 
 logger = logging.getLogger(__name__)
 
+VIDEO_STREAM_CHUNK_SIZE = int(os.getenv('VIDEO_STREAM_CHUNK_SIZE', str(512 * 1024)))
+
+# Common video MIME types
+MIME_MAPPING = {
+    'mp4': 'video/mp4',
+    'mov': 'video/quicktime',
+    'webm': 'video/webm',
+    'avi': 'video/x-msvideo',
+    'mkv': 'video/x-matroska'
+}
+
+
+def _cache_headers(video_id: int) -> dict:
+    return {
+        # Browser caching: cache for 1 year (videos are immutable)
+        'Cache-Control': 'public, max-age=31536000, immutable',
+        # Cloudflare-specific: cache everything for 1 year
+        'CDN-Cache-Control': 'public, max-age=31536000, immutable',
+        # Alternative Cloudflare header (redundancy)
+        'Cloudflare-CDN-Cache-Control': 'public, max-age=31536000',
+        # ETag for cache validation
+        'ETag': f'"{video_id}"',
+        # Security headers
+        'X-Content-Type-Options': 'nosniff',
+        # Accept range requests for video seeking
+        'Accept-Ranges': 'bytes'
+    }
+
+
+def stream_video_bytes(video_id: int, start: int, stop: int, chunk_size: int = None):
+    """
+    Yield video_data[start:stop] in chunk_size slices (default
+    VIDEO_STREAM_CHUNK_SIZE), one substring() query per slice, so no more than
+    one chunk is held in memory at a time.
+    """
+    chunk_size = chunk_size or VIDEO_STREAM_CHUNK_SIZE
+    position = start
+    while position < stop:
+        length = min(chunk_size, stop - position)
+        # substring() is 1-based
+        row = db_fetch_one("""
+            SELECT substring(video_data FROM %s FOR %s) AS chunk
+            FROM videos
+            WHERE id = %s
+        """, (position + 1, length, video_id))
+        if not row or not row['chunk']:
+            logger.error(f"Video {video_id} ended early at byte {position} of {stop}")
+            return
+        chunk = bytes(row['chunk'])
+        yield chunk
+        position += len(chunk)
+
 
 def get_video(video_id: int):
     """
     Serve video binary data by ID.
 
+    Supports If-None-Match (304) and single byte-range requests (206/416).
+
     Args:
         video_id: The ID of the video to fetch
 
     Returns:
-        Response with video binary data and CDN-friendly cache headers
+        Streamed response with video binary data and CDN-friendly cache headers
 
     Example:
         GET /v3/videos/12
+        Range: bytes=0-1023
 
-        Response:
+        Response (206):
             Content-Type: video/mp4
+            Content-Range: bytes 0-1023/524288
             Cache-Control: public, max-age=31536000, immutable
             <binary video data>
     """
     try:
-        # Fetch video from database
+        headers = _cache_headers(video_id)
+
+        # Videos are immutable, so a matching validator needs no lookup
+        if request.if_none_match.contains(str(video_id)):
+            return Response(status=304, headers=headers)
+
+        # Fetch metadata only; octet_length() does not read the video itself
         video = db_fetch_one("""
-            SELECT video_data, format
+            SELECT format, storage_key, octet_length(video_data) AS length
             FROM videos
             WHERE id = %s
         """, (video_id,))
@@ -43,41 +112,25 @@ def get_video(video_id: int):
 
         # Determine MIME type based on format
         format_type = video['format'].lower()
-        mime_type = f"video/{format_type}"
-
-        # Common video MIME types
-        mime_mapping = {
-            'mp4': 'video/mp4',
-            'mov': 'video/quicktime',
-            'webm': 'video/webm',
-            'avi': 'video/x-msvideo',
-            'mkv': 'video/x-matroska'
-        }
-
-        mime_type = mime_mapping.get(format_type, f"video/{format_type}")
-
-        logger.info(f"Serving video: id={video_id}, format={format_type}, size={len(video['video_data'])} bytes")
-
-        # Return binary data with Cloudflare-optimized cache headers
-        return Response(
-            video['video_data'],
-            mimetype=mime_type,
-            headers={
-                # Browser caching: cache for 1 year (videos are immutable)
-                'Cache-Control': 'public, max-age=31536000, immutable',
-                # Cloudflare-specific: cache everything for 1 year
-                'CDN-Cache-Control': 'public, max-age=31536000, immutable',
-                # Alternative Cloudflare header (redundancy)
-                'Cloudflare-CDN-Cache-Control': 'public, max-age=31536000',
-                # ETag for cache validation
-                'ETag': f'"{video_id}"',
-                # Security headers
-                'X-Content-Type-Options': 'nosniff',
-                # Content length for better caching
-                'Content-Length': str(len(video['video_data'])),
-                # Accept range requests for video seeking
-                'Accept-Ranges': 'bytes'
-            }
+        mime_type = MIME_MAPPING.get(format_type, f"video/{format_type}")
+
+        store = get_media_store()
+        if video['storage_key'] and store is not None and store.exists(video['storage_key']):
+            logger.info(f"Serving video from {store.name} store: id={video_id}, format={format_type}")
+            return send_stored_media(store, video['storage_key'], mime_type, str(video_id), headers)
+
+        if video['length'] is None:
+            logger.error(f"Video {video_id} is only in the media store, which is unavailable")
+            return jsonify({"error": "Video not available"}), 503
+
+        logger.info(f"Serving video: id={video_id}, format={format_type}, size={video['length']} bytes")
+
+        return ranged_response(
+            video['length'],
+            lambda start, stop: stream_video_bytes(video_id, start, stop),
+            mime_type,
+            headers,
+            str(video_id)
         )
 
     except Exception as e:
@@ -5,17 +5,30 @@ Tracks all API endpoint calls with timing information to help:
 - Identify which endpoints are still being used
 - Determine when old API versions can be deprecated
 - Monitor API performance
+
+Rows are buffered and written by one background thread in multi-row INSERTs.
 """
 
+import os
 import time
+import uuid
+import atexit
 import logging
 import re
+from collections import deque
+from datetime import datetime, timezone
 from flask import request, g
+from psycopg2.extras import execute_values
 from utils.database import get_db_connection
+from middleware.metrics import api_usage_log_rows_dropped_total, api_usage_log_queue_depth
 import threading
 
 logger = logging.getLogger(__name__)
 
+API_USAGE_LOG_QUEUE_SIZE = int(os.getenv('API_USAGE_LOG_QUEUE_SIZE', '10000'))  # Buffered rows; oldest dropped beyond this
+API_USAGE_LOG_BATCH_SIZE = int(os.getenv('API_USAGE_LOG_BATCH_SIZE', '500'))  # Flush once this many rows are buffered
+API_USAGE_LOG_FLUSH_INTERVAL = float(os.getenv('API_USAGE_LOG_FLUSH_INTERVAL', '2'))  # Max seconds a row waits
+
 def extract_user_id():
     """Extract user_id from request (query params or JSON body)"""
     try:
@@ -44,29 +57,137 @@ def extract_api_version(endpoint):
     # Unversioned endpoint
     return None
 
-def log_api_usage_async(endpoint, method, user_id, status_code, duration_ms, user_agent, api_version):
-    """Log API usage to database asynchronously (non-blocking)"""
-    def log_to_db():
+class ApiUsageLogWriter:
+    """
+    Single background writer for api_usage_logs rows.
+
+    enqueue() only appends to a bounded deque; when the deque is full the
+    oldest row is dropped (and counted) so request latency never depends on
+    the database. The writer thread flushes when batch_size rows are waiting
+    or flush_interval seconds have passed, and once more on shutdown.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = API_USAGE_LOG_QUEUE_SIZE,
+        batch_size: int = API_USAGE_LOG_BATCH_SIZE,
+        flush_interval: float = API_USAGE_LOG_FLUSH_INTERVAL
+    ):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+
+    def enqueue(self, row: tuple):
+        """Buffer one row; never blocks on I/O."""
+        with self._cond:
+            if len(self._queue) >= self.max_queue_size:
+                self._queue.popleft()
+                self.dropped += 1
+                api_usage_log_rows_dropped_total.labels(reason='queue_full').inc()
+            self._queue.append(row)
+            api_usage_log_queue_depth.set(len(self._queue))
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        self._ensure_started()
+
+    def flush(self) -> int:
+        """Write everything currently buffered; returns rows written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                    api_usage_log_queue_depth.set(len(self._queue))
+                if not batch:
+                    return written
+                try:
+                    self._write_rows(batch)
+                    written += len(batch)
+                except Exception as e:
+                    # Log error but don't crash the app
+                    self.dropped += len(batch)
+                    api_usage_log_rows_dropped_total.labels(reason='write_error').inc(len(batch))
+                    logger.error(f"Failed to log API usage ({len(batch)} rows): {str(e)}")
+                    return written
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop the writer thread and flush whatever is still buffered."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        thread = self._thread
+        if thread and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout)
+        self.flush()
+
+    def _ensure_started(self):
+        # Threads do not survive fork(), so a forked worker starts its own writer
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._cond:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, daemon=True, name="ApiUsageLogWriter")
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._stopping and len(self._queue) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def _write_rows(self, rows):
+        conn = get_db_connection()
         try:
-            conn = get_db_connection()
             cur = conn.cursor()
-
-            cur.execute("""
+            execute_values(cur, """
                 INSERT INTO api_usage_logs
                 (timestamp, endpoint, method, user_id, response_status, duration_ms, user_agent, api_version)
-                VALUES (NOW(), %s, %s, %s, %s, %s, %s, %s)
-            """, (endpoint, method, user_id, status_code, duration_ms, user_agent, api_version))
-
+                VALUES %s
+            """, rows, page_size=self.batch_size)
             conn.commit()
             cur.close()
+        finally:
             conn.close()
-        except Exception as e:
-            # Log error but don't crash the app
-            logger.error(f"Failed to log API usage: {str(e)}")
 
-    # Run in background thread to not block request
-    thread = threading.Thread(target=log_to_db, daemon=True)
-    thread.start()
+
+usage_log_writer = ApiUsageLogWriter()
+atexit.register(usage_log_writer.shutdown)
+
+
+def _valid_uuid(value):
+    """user_id column is UUID; a malformed id must not fail the whole batch"""
+    if not value:
+        return None
+    try:
+        return str(uuid.UUID(str(value)))
+    except (ValueError, AttributeError):
+        return None
+
+def log_api_usage_async(endpoint, method, user_id, status_code, duration_ms, user_agent, api_version):
+    """Queue an API usage row for the background batch writer (non-blocking)"""
+    usage_log_writer.enqueue((
+        datetime.now(timezone.utc), endpoint, method, _valid_uuid(user_id),
+        status_code, duration_ms, user_agent, api_version
+    ))
 
 def track_request_start():
     """Middleware to track request start time"""
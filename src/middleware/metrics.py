@@ -1,7 +1,14 @@
 """
 Prometheus metrics for monitoring API and LLM performance.
+
+Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set (gunicorn.conf.py) so every
+worker process writes its samples there and /metrics reports the merged
+values; each Gauge declares how per-process values combine.
 """
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+import os
+from prometheus_client import (
+    Counter, Histogram, Gauge, CollectorRegistry, multiprocess, generate_latest, CONTENT_TYPE_LATEST
+)
 from flask import Response
 import time
 import functools
@@ -29,7 +36,8 @@ http_request_duration_seconds = Histogram(
 http_requests_in_flight = Gauge(
     'http_requests_in_flight',
     'Number of HTTP requests currently being processed',
-    ['method', 'endpoint']
+    ['method', 'endpoint'],
+    multiprocess_mode='livesum'
 )
 
 # ============================================================================
@@ -39,7 +47,7 @@ http_requests_in_flight = Gauge(
 llm_calls_total = Counter(
     'llm_calls_total',
     'Total LLM API calls',
-    ['provider', 'model', 'status']  # status: success|error
+    ['provider', 'model', 'status']  # status: success|error|cached|rejected
 )
 
 llm_request_duration_seconds = Histogram(
@@ -67,6 +75,231 @@ llm_errors_total = Counter(
     ['provider', 'model', 'error_type']
 )
 
+llm_generation_duration_seconds = Histogram(
+    'llm_generation_duration_seconds',
+    'LLM request duration excluding connection setup',
+    ['provider', 'model'],
+    buckets=(0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+)
+
+llm_connect_duration_seconds = Histogram(
+    'llm_connect_duration_seconds',
+    'Time to open a provider connection (TCP + TLS)',
+    ['provider'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+llm_http_requests_total = Counter(
+    'llm_http_requests_total',
+    'Provider HTTP requests by connection used',
+    ['provider', 'connection']  # connection: new|reused
+)
+
+llm_breaker_state = Gauge(
+    'llm_breaker_state',
+    'Circuit breaker state per provider/model (0 closed, 1 half-open, 2 open)',
+    ['provider', 'model'],
+    multiprocess_mode='livemax'
+)
+
+llm_breaker_transitions_total = Counter(
+    'llm_breaker_transitions_total',
+    'Circuit breaker state changes',
+    ['provider', 'model', 'state']  # state: closed|half_open|open
+)
+
+llm_concurrency_limit = Gauge(
+    'llm_concurrency_limit',
+    'Current adaptive concurrency limit per provider/model',
+    ['provider', 'model'],
+    multiprocess_mode='livesum'
+)
+
+llm_in_flight = Gauge(
+    'llm_in_flight',
+    'LLM calls currently holding a concurrency slot',
+    ['provider', 'model'],
+    multiprocess_mode='livesum'
+)
+
+llm_queue_depth = Gauge(
+    'llm_queue_depth',
+    'LLM calls waiting for a concurrency slot',
+    ['provider', 'model'],
+    multiprocess_mode='livesum'
+)
+
+llm_hedge_total = Counter(
+    'llm_hedge_total',
+    'Hedged LLM calls by what the hedge did',
+    ['model', 'action']  # action: skipped (primary in time)|hedged|failover (primary failed early)
+)
+
+llm_hedge_wins_total = Counter(
+    'llm_hedge_wins_total',
+    'Source of the answer for hedged and failed-over LLM calls',
+    ['model', 'winner']  # winner: primary|fallback|none
+)
+
+llm_hedge_delay_seconds = Gauge(
+    'llm_hedge_delay_seconds',
+    'Current hedge delay (percentile of recent primary latencies)',
+    ['model'],
+    multiprocess_mode='livemax'
+)
+
+llm_batch_requests_total = Counter(
+    'llm_batch_requests_total',
+    'Batch generation requests by kind and result',
+    ['backend', 'kind', 'result']  # result: submitted, applied, failed
+)
+
+# ============================================================================
+# DATABASE METRICS
+# ============================================================================
+
+db_pool_connections_in_use = Gauge(
+    'db_pool_connections_in_use',
+    'Database connections currently checked out of the pool',
+    multiprocess_mode='livesum'
+)
+
+db_pool_connections_idle = Gauge(
+    'db_pool_connections_idle',
+    'Open database connections idle in the pool',
+    multiprocess_mode='livesum'
+)
+
+db_pool_wait_seconds = Histogram(
+    'db_pool_wait_seconds',
+    'Time spent waiting to check out a database connection',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+)
+
+db_pool_timeouts_total = Counter(
+    'db_pool_timeouts_total',
+    'Connection checkouts that gave up after the pool timeout'
+)
+
+api_usage_log_rows_dropped_total = Counter(
+    'api_usage_log_rows_dropped_total',
+    'API usage log rows discarded before reaching the database',
+    ['reason']  # reason: queue_full|write_error
+)
+
+api_usage_log_queue_depth = Gauge(
+    'api_usage_log_queue_depth',
+    'API usage log rows buffered in memory awaiting a batch write',
+    multiprocess_mode='livesum'
+)
+
+# ============================================================================
+# CACHE METRICS
+# ============================================================================
+
+cache_requests_total = Counter(
+    'cache_requests_total',
+    'In-process cache lookups',
+    ['cache', 'result']  # result: hit|miss|coalesced
+)
+
+# ============================================================================
+# QUESTION POOL METRICS
+# ============================================================================
+
+question_pool_lookups_total = Counter(
+    'question_pool_lookups_total',
+    'Review batch question lookups against the precomputed pool (coverage = hit / total)',
+    ['result']  # result: hit|miss
+)
+
+question_pool_tasks_total = Counter(
+    'question_pool_tasks_total',
+    'Question pool pre-generation tasks',
+    ['kind', 'result']  # kind: user|word, result: done|error|dropped
+)
+
+question_pool_queue_depth = Gauge(
+    'question_pool_queue_depth',
+    'Question pool tasks waiting for a worker',
+    multiprocess_mode='livesum'
+)
+
+question_pool_generated_total = Counter(
+    'question_pool_generated_total',
+    'Questions generated ahead of time by the question pool',
+    ['question_type']
+)
+
+# ============================================================================
+# MEDIA STORE METRICS
+# ============================================================================
+
+media_store_reads_total = Counter(
+    'media_store_reads_total',
+    'Blob reads through the media store',
+    ['backend', 'result']  # result: hit|fallback (read from the database column)
+)
+
+# ============================================================================
+# AUDIO JOB QUEUE METRICS
+# ============================================================================
+
+audio_jobs_enqueued_total = Counter(
+    'audio_jobs_enqueued_total',
+    'TTS jobs submitted to the durable queue',
+    ['result']  # result: new|duplicate
+)
+
+audio_jobs_processed_total = Counter(
+    'audio_jobs_processed_total',
+    'TTS jobs finished by a worker (throughput)',
+    ['result']  # result: done|skipped|retry|failed
+)
+
+audio_job_lag_seconds = Histogram(
+    'audio_job_lag_seconds',
+    'Time a TTS job waited between becoming runnable and being claimed',
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+)
+
+audio_job_duration_seconds = Histogram(
+    'audio_job_duration_seconds',
+    'Time spent generating and storing one TTS job',
+    buckets=(0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+)
+
+audio_job_queue_depth = Gauge(
+    'audio_job_queue_depth',
+    'TTS jobs in the durable queue by status',
+    ['status'],  # status: queued|running|failed
+    multiprocess_mode='mostrecent'
+)
+
+# ============================================================================
+# SCHEDULED JOB METRICS
+# ============================================================================
+
+scheduled_job_chunk_duration_seconds = Histogram(
+    'scheduled_job_chunk_duration_seconds',
+    'Time to process one chunk of a scheduled batch job',
+    ['job'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+scheduled_job_items_total = Counter(
+    'scheduled_job_items_total',
+    'Items handled by scheduled batch jobs',
+    ['job', 'kind']  # kind: users|words|errors
+)
+
+scheduled_job_progress_ratio = Gauge(
+    'scheduled_job_progress_ratio',
+    'Fraction of the current run completed (1 when idle)',
+    ['job'],
+    multiprocess_mode='mostrecent'
+)
+
 # ============================================================================
 # BUSINESS METRICS
 # ============================================================================
@@ -191,5 +424,9 @@ def estimate_cost(provider, model, usage):
 
 
 def metrics_endpoint():
-    """Expose metrics in Prometheus format."""
+    """Expose metrics in Prometheus format, merged across gunicorn workers when multiprocess."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
     return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
@@ -0,0 +1,196 @@
+"""
+Audio Job Service
+
+Durable, deduplicated TTS queue in the audio_jobs table. Workers claim jobs
+with FOR UPDATE SKIP LOCKED and failed attempts are retried with backoff.
+"""
+
+import os
+import time
+import logging
+from typing import Dict, Iterable, List, Optional
+from utils.database import db_cursor, db_fetch_all
+from middleware.metrics import (
+    audio_jobs_enqueued_total,
+    audio_jobs_processed_total,
+    audio_job_lag_seconds,
+    audio_job_duration_seconds,
+    audio_job_queue_depth,
+)
+
+logger = logging.getLogger(__name__)
+
+AUDIO_JOB_WORKERS = int(os.getenv('AUDIO_JOB_WORKERS', '2'))  # Threads per web process; 0 leaves it to dedicated workers
+AUDIO_JOB_POLL_INTERVAL = float(os.getenv('AUDIO_JOB_POLL_INTERVAL', '1'))  # Idle seconds between polls
+AUDIO_JOB_MAX_ATTEMPTS = int(os.getenv('AUDIO_JOB_MAX_ATTEMPTS', '5'))  # Attempts before a job is failed
+AUDIO_JOB_BACKOFF_BASE = float(os.getenv('AUDIO_JOB_BACKOFF_BASE', '5'))  # Retry delay, doubled per attempt...
+AUDIO_JOB_BACKOFF_MAX = float(os.getenv('AUDIO_JOB_BACKOFF_MAX', '600'))  # ...up to this
+AUDIO_JOB_STALE_SECONDS = int(os.getenv('AUDIO_JOB_STALE_SECONDS', '300'))  # Running jobs older than this are re-queued
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before retrying a job that has failed `attempts` times."""
+    return min(AUDIO_JOB_BACKOFF_MAX, AUDIO_JOB_BACKOFF_BASE * 2 ** max(attempts - 1, 0))
+
+
+def enqueue_audio_jobs(texts: Iterable[str], language: str) -> int:
+    """
+    Queue TTS generation for texts in one statement.
+
+    Returns:
+        Number of jobs newly queued (duplicates of queued/running jobs are skipped)
+    """
+    texts = list(dict.fromkeys(t for t in texts if t))
+    if not texts:
+        return 0
+    with db_cursor(commit=True) as cur:
+        cur.execute("""
+            INSERT INTO audio_jobs (text_content, language, max_attempts)
+            SELECT t, %s, %s FROM unnest(%s::text[]) AS t
+            ON CONFLICT ON CONSTRAINT audio_jobs_text_language_key DO UPDATE
+            SET status = 'queued', attempts = 0, run_after = NOW(), last_error = NULL,
+                finished_at = NULL, max_attempts = EXCLUDED.max_attempts, updated_at = NOW()
+            WHERE audio_jobs.status IN ('done', 'failed')
+            RETURNING id
+        """, (language, AUDIO_JOB_MAX_ATTEMPTS, texts))
+        queued = len(cur.fetchall())
+    audio_jobs_enqueued_total.labels(result='new').inc(queued)
+    audio_jobs_enqueued_total.labels(result='duplicate').inc(len(texts) - queued)
+    return queued
+
+
+def claim_audio_jobs(worker_id: str, limit: int = 1) -> List[Dict]:
+    """Atomically take up to `limit` runnable jobs, skipping rows other workers hold."""
+    with db_cursor(commit=True) as cur:
+        cur.execute("""
+            UPDATE audio_jobs j
+            SET status = 'running', attempts = j.attempts + 1,
+                locked_by = %s, locked_at = NOW(), updated_at = NOW()
+            FROM (
+                SELECT id FROM audio_jobs
+                WHERE status = 'queued' AND run_after <= NOW()
+                ORDER BY run_after, id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ) next_jobs
+            WHERE j.id = next_jobs.id
+            RETURNING j.id, j.text_content, j.language, j.attempts, j.max_attempts,
+                      EXTRACT(EPOCH FROM NOW() - j.run_after) AS lag_seconds
+        """, (worker_id, limit))
+        jobs = cur.fetchall()
+    for job in jobs:
+        audio_job_lag_seconds.observe(max(float(job['lag_seconds'] or 0), 0.0))
+    return jobs
+
+
+def complete_audio_job(job_id: int):
+    with db_cursor(commit=True) as cur:
+        cur.execute("""
+            UPDATE audio_jobs
+            SET status = 'done', locked_by = NULL, locked_at = NULL, last_error = NULL,
+                finished_at = NOW(), updated_at = NOW()
+            WHERE id = %s AND status = 'running'
+        """, (job_id,))
+
+
+def fail_audio_job(job: Dict, error: str) -> str:
+    """Re-queue a failed attempt with backoff, or give up after max_attempts; returns retry|failed."""
+    result = 'failed' if job['attempts'] >= job['max_attempts'] else 'retry'
+    with db_cursor(commit=True) as cur:
+        cur.execute("""
+            UPDATE audio_jobs
+            SET status = %s, run_after = NOW() + make_interval(secs => %s),
+                last_error = %s, locked_by = NULL, locked_at = NULL, updated_at = NOW(),
+                finished_at = CASE WHEN %s = 'failed' THEN NOW() END
+            WHERE id = %s AND status = 'running'
+        """, ('failed' if result == 'failed' else 'queued', retry_delay(job['attempts']),
+              error[:1000], result, job['id']))
+    return result
+
+
+def requeue_stale_audio_jobs(stale_seconds: int = AUDIO_JOB_STALE_SECONDS) -> int:
+    """Hand jobs whose worker died back to the queue (or fail them if out of attempts)."""
+    with db_cursor(commit=True) as cur:
+        cur.execute("""
+            UPDATE audio_jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                last_error = 'worker ' || COALESCE(locked_by, '?') || ' timed out',
+                run_after = NOW(), locked_by = NULL, locked_at = NULL, updated_at = NOW()
+            WHERE status = 'running' AND locked_at < NOW() - make_interval(secs => %s)
+        """, (stale_seconds,))
+        requeued = cur.rowcount
+    if requeued:
+        logger.warning(f"Re-queued {requeued} stale audio jobs")
+    return requeued
+
+
+def refresh_queue_depth() -> Dict[str, int]:
+    """Update the queue depth gauge from the table; returns counts by status."""
+    rows = db_fetch_all("""
+        SELECT status, COUNT(*) AS count
+        FROM audio_jobs
+        WHERE status <> 'done'
+        GROUP BY status
+    """)
+    counts = {'queued': 0, 'running': 0, 'failed': 0}
+    counts.update({row['status']: row['count'] for row in rows})
+    for status, count in counts.items():
+        audio_job_queue_depth.labels(status=status).set(count)
+    return counts
+
+
+def get_audio_job_statuses(texts: List[str], language: str) -> Dict[str, Dict]:
+    """
+    Status of each text's audio: complete (audio stored), queued, running,
+    failed, or missing (never requested).
+    """
+    rows = db_fetch_all("""
+        SELECT t.text,
+               (a.text_content IS NOT NULL) AS has_audio,
+               j.status, j.attempts, j.last_error, j.run_after
+        FROM unnest(%s::text[]) AS t(text)
+        LEFT JOIN audio a ON a.text_content = t.text AND a.language = %s
+        LEFT JOIN audio_jobs j ON j.text_content = t.text AND j.language = %s
+    """, (list(texts), language, language))
+    statuses = {}
+    for row in rows:
+        if row['has_audio'] or row['status'] == 'done':
+            status = 'complete'
+        else:
+            status = row['status'] or 'missing'
+        statuses[row['text']] = {
+            'status': status,
+            'attempts': row['attempts'] or 0,
+            'last_error': row['last_error'] if status in ('queued', 'failed') else None,
+            'next_attempt_at': row['run_after'].isoformat() if status == 'queued' and row['run_after'] else None,
+        }
+    return statuses
+
+
+def process_audio_job(job: Dict) -> str:
+    """Generate and store audio for one claimed job; returns done|skipped|retry|failed."""
+    from handlers.words import audio_exists, generate_audio_for_text, store_audio
+
+    started = time.monotonic()
+    text, language = job['text_content'], job['language']
+    try:
+        if audio_exists(text, language):
+            result = 'skipped'
+        else:
+            store_audio(text, language, generate_audio_for_text(text))
+            result = 'done'
+        complete_audio_job(job['id'])
+    except Exception as e:
+        result = fail_audio_job(job, str(e))
+        logger.error(f"Audio job {job['id']} for '{text}' ({language}) attempt {job['attempts']} failed: {e}")
+    audio_job_duration_seconds.observe(time.monotonic() - started)
+    audio_jobs_processed_total.labels(result=result).inc()
+    return result
+
+
+def run_next_audio_job(worker_id: str) -> Optional[str]:
+    """Claim and process one job; returns its result, or None when the queue is empty."""
+    jobs = claim_audio_jobs(worker_id, limit=1)
+    if not jobs:
+        return None
+    return process_audio_job(jobs[0])
@@ -0,0 +1,453 @@
+"""
+Batch Generation Service
+
+Backfills definitions and review questions through the LLM batch API
+(utils/llm_batch.py). llm_batch_jobs is the checkpoint: each call applies
+finished batches, then submits what is still missing. Requests that failed
+LLM_BATCH_MAX_ATTEMPTS times (llm_batch_attempts) are not submitted again.
+"""
+
+import os
+import json
+import time
+import logging
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from psycopg2.extras import execute_values
+from utils.database import db_cursor, db_fetch_all, db_fetch_one, db_execute
+from utils.llm import get_provider_for_model
+from utils.llm_batch import batch_request, batch_output, create_batch_backend, get_batch_backend
+from utils.llm_hedge import response_validator
+from middleware.metrics import llm_batch_requests_total, llm_tokens_total, llm_cost_usd_total, estimate_cost
+from config.config import COMPLETION_MODEL_NAME, COMPLETION_MODEL_WORD_SEARCH
+from services.definition_service import (
+    build_definition_messages,
+    DEFINITION_RESPONSE_FORMAT,
+    CURRENT_SCHEMA_VERSION,
+)
+from services.question_generation_service import (
+    build_question_prompt,
+    build_video_mc_prompt,
+    parse_video_mc_response,
+    build_video_mc_question,
+    check_word_has_videos,
+    QUESTION_SYSTEM_PROMPT,
+    VIDEO_MC_SYSTEM_PROMPT,
+)
+
+logger = logging.getLogger(__name__)
+
+LLM_BATCH_MAX_REQUESTS = int(os.getenv('LLM_BATCH_MAX_REQUESTS', '5000'))  # Requests per submitted batch
+LLM_BATCH_POLL_INTERVAL = float(os.getenv('LLM_BATCH_POLL_INTERVAL', '60'))  # Seconds between polls when waiting
+LLM_BATCH_MAX_ATTEMPTS = int(os.getenv('LLM_BATCH_MAX_ATTEMPTS', '3'))  # Failed batch attempts before a request is given up
+
+DEFINITION = 'definition'
+QUESTION = 'question'
+
+# Batch API requests are billed at half the synchronous price
+BATCH_PRICE_FACTOR = 0.5
+
+_QUESTION_FORMAT = {"type": "json_object"}
+
+
+def definition_custom_id(word: str, learning_lang: str, native_lang: str) -> str:
+    return f"{DEFINITION}:{learning_lang}:{native_lang}:{word}"
+
+
+def question_custom_id(word: str, learning_lang: str, native_lang: str, question_type: str) -> str:
+    return f"{QUESTION}:{learning_lang}:{native_lang}:{question_type}:{word}"
+
+
+def run_batch_generation(items: Iterable[Dict[str, Any]], wait: bool = False,
+                         poll_interval: float = None, poll_local: bool = True) -> Dict[str, Any]:
+    """
+    Apply finished batches and submit batches for whatever is still missing.
+
+    Args:
+        items: Dicts with word, learning_language, native_language and
+            question_types (a list, may be empty for definitions only)
+        wait: Keep polling until every item is complete or out of attempts
+        poll_interval: Seconds between polls when waiting (default: LLM_BATCH_POLL_INTERVAL)
+        poll_local: Also poll local batches, which run their completions in
+            this process; callers serving HTTP requests pass False
+
+    Returns:
+        Dict with applied/failed counts by kind, the requests submitted by
+        this call, those still in flight and the number of pending batches
+    """
+    items = _normalize_items(items)
+    poll_interval = LLM_BATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+    stats = {
+        'definitions_applied': 0,
+        'questions_applied': 0,
+        'failed': 0,
+        'submitted': 0,
+        'in_flight': 0,
+        'batches_submitted': [],
+        'pending_batches': 0,
+    }
+
+    while True:
+        running = apply_finished_batches(stats, poll_local)
+        pending = _pending_custom_ids()
+        requests, in_flight = plan_requests(items, pending, _exhausted_custom_ids())
+        stats['in_flight'] = in_flight
+        for kind, model, chunk in _pack(requests):
+            stats['batches_submitted'].append(_submit(kind, model, chunk))
+            stats['submitted'] += len(chunk)
+        stats['pending_batches'] = _count_pending_batches()
+
+        if not wait or stats['pending_batches'] == 0:
+            return stats
+        # Batches submitted just now are polled straight away (local ones run then)
+        if running:
+            time.sleep(poll_interval)
+
+
+def plan_requests(items: List[Dict[str, Any]], pending: Set[str],
+                  exhausted: Set[str] = frozenset()) -> Tuple[List[Tuple[str, str, Dict, Dict]], int]:
+    """
+    Batch requests for the definitions and questions items still lack,
+    except those in a submitted batch (pending) or out of attempts (exhausted).
+
+    Returns:
+        ([(kind, model, batch request line, checkpoint item)], number of
+        missing requests already in a submitted batch)
+    """
+    definitions = _existing_definitions(items)
+    questions = _existing_questions(items)
+    requests = []
+    in_flight = 0
+
+    for item in items:
+        word, learning_lang, native_lang = item['word'], item['learning_language'], item['native_language']
+        key = (word, learning_lang, native_lang)
+        definition = definitions.get(key)
+
+        if definition is None:
+            custom_id = definition_custom_id(word, learning_lang, native_lang)
+            if custom_id in pending:
+                in_flight += 1
+            elif custom_id not in exhausted:
+                requests.append((DEFINITION, COMPLETION_MODEL_WORD_SEARCH, batch_request(
+                    custom_id, COMPLETION_MODEL_WORD_SEARCH,
+                    build_definition_messages(word, learning_lang, native_lang),
+                    DEFINITION_RESPONSE_FORMAT,
+                ), {'word': word, 'learning_language': learning_lang, 'native_language': native_lang}))
+            # Questions wait for the definition they are built from
+            continue
+
+        for question_type in item['question_types']:
+            if (word, learning_lang, native_lang, question_type) in questions:
+                continue
+            custom_id = question_custom_id(word, learning_lang, native_lang, question_type)
+            if custom_id in pending:
+                in_flight += 1
+                continue
+            if custom_id in exhausted:
+                continue
+            request = _question_request(custom_id, word, definition, learning_lang, native_lang, question_type)
+            if request is not None:
+                requests.append(request)
+
+    return requests, in_flight
+
+
+def _question_request(custom_id: str, word: str, definition: Dict, learning_lang: str,
+                      native_lang: str, question_type: str) -> Optional[Tuple[str, str, Dict, Dict]]:
+    item = {'word': word, 'learning_language': learning_lang, 'native_language': native_lang,
+            'question_type': question_type}
+    prompt_type = question_type
+
+    if question_type == 'video_mc':
+        video_info = check_word_has_videos(word, learning_lang)
+        if video_info and video_info.get('audio_transcript'):
+            item['video_id'] = video_info['video_id']
+            item['audio_transcript'] = video_info['audio_transcript']
+            messages = [
+                {"role": "system", "content": VIDEO_MC_SYSTEM_PROMPT},
+                {"role": "user", "content": build_video_mc_prompt(word, video_info['audio_transcript'])},
+            ]
+            return QUESTION, COMPLETION_MODEL_NAME, batch_request(
+                custom_id, COMPLETION_MODEL_NAME, messages, _QUESTION_FORMAT), item
+        # Same fallback as generate_video_mc_question: no usable video, ask for mc_definition
+        prompt_type = 'mc_definition'
+
+    try:
+        prompt = build_question_prompt(word, definition, native_lang, prompt_type)
+    except ValueError as e:
+        logger.warning(f"Skipping '{word}' ({question_type}): {e}")
+        return None
+    item['prompt_type'] = prompt_type
+    messages = [
+        {"role": "system", "content": QUESTION_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    return QUESTION, COMPLETION_MODEL_NAME, batch_request(
+        custom_id, COMPLETION_MODEL_NAME, messages, _QUESTION_FORMAT), item
+
+
+def apply_finished_batches(stats: Dict[str, Any], poll_local: bool = True) -> int:
+    """
+    Poll every submitted batch and store the results of those that have finished.
+
+    Returns:
+        Number of batches still running (or that could not be polled)
+    """
+    jobs = db_fetch_all("""
+        SELECT id, kind, backend, model, batch_id
+        FROM llm_batch_jobs
+        WHERE status = 'submitted'
+        ORDER BY id
+    """)
+    running = 0
+    for job in jobs:
+        if job['backend'] == 'local' and not poll_local:
+            running += 1
+            continue
+        try:
+            lines = _backend(job['backend']).poll(job['batch_id'], job['model'])
+        except FileNotFoundError as e:
+            # Local batch files are gone: nothing left to wait for
+            logger.error(f"Batch {job['batch_id']} (job {job['id']}) lost: {e}")
+            _fail_job(job, str(e))
+            continue
+        except Exception as e:
+            logger.error(f"Polling batch {job['batch_id']} (job {job['id']}) failed: {e}", exc_info=True)
+            db_execute("UPDATE llm_batch_jobs SET last_error = %s WHERE id = %s", (str(e), job['id']), commit=True)
+            running += 1
+            continue
+        if lines is None:
+            running += 1
+            continue
+        applied, failed = _apply_job(job, lines)
+        stats['definitions_applied' if job['kind'] == DEFINITION else 'questions_applied'] += applied
+        stats['failed'] += failed
+    return running
+
+
+def _apply_job(job: Dict[str, Any], lines: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Upsert a finished batch's results and mark the job applied, atomically."""
+    outputs = {line.get('custom_id'): line for line in lines}
+    validate_definition = response_validator(DEFINITION_RESPONSE_FORMAT)
+    definition_rows, question_rows, stored_ids, failures = [], [], [], []
+    usage_by_model: Dict[str, Dict[str, int]] = {}
+
+    with db_cursor(commit=True) as cur:
+        # Lock the job so concurrent callers apply it once
+        cur.execute("""
+            SELECT items FROM llm_batch_jobs
+            WHERE id = %s AND status = 'submitted'
+            FOR UPDATE SKIP LOCKED
+        """, (job['id'],))
+        row = cur.fetchone()
+        if row is None:
+            return 0, 0
+
+        for custom_id, item in row['items'].items():
+            line = outputs.get(custom_id)
+            content, usage = batch_output(line) if line else (None, None)
+            if usage:
+                totals = usage_by_model.setdefault(job['model'], {'prompt_tokens': 0, 'completion_tokens': 0})
+                totals['prompt_tokens'] += usage.get('prompt_tokens') or 0
+                totals['completion_tokens'] += usage.get('completion_tokens') or 0
+            try:
+                if job['kind'] == DEFINITION:
+                    if not validate_definition(content):
+                        raise ValueError("response does not match the definition schema")
+                    definition_rows.append(_definition_row(item, content))
+                else:
+                    question_rows.append(_question_row(item, content))
+                stored_ids.append(custom_id)
+            except Exception as e:
+                error = str(line and line.get('error') or e)
+                failures.append((custom_id, error))
+                logger.warning(f"Batch job {job['id']}: no result for {custom_id}: {error}")
+
+        if definition_rows:
+            execute_values(cur, """
+                INSERT INTO definitions (word, learning_language, native_language, definition_data, schema_version, created_at)
+                VALUES %s
+                ON CONFLICT (word, learning_language, native_language)
+                DO UPDATE SET definition_data = EXCLUDED.definition_data, schema_version = EXCLUDED.schema_version, updated_at = CURRENT_TIMESTAMP
+            """, definition_rows, template="(%s, %s, %s, %s, %s, NOW())")
+        if question_rows:
+            execute_values(cur, """
+                INSERT INTO review_questions (word, learning_language, native_language, question_type, question_data)
+                VALUES %s
+                ON CONFLICT (word, learning_language, native_language, question_type)
+                DO UPDATE SET question_data = EXCLUDED.question_data, created_at = CURRENT_TIMESTAMP
+            """, question_rows)
+
+        _record_attempts(cur, failures, stored_ids)
+        applied, failed = len(stored_ids), len(failures)
+        cur.execute("""
+            UPDATE llm_batch_jobs
+            SET status = 'applied', applied_count = %s, failed_count = %s, finished_at = NOW()
+            WHERE id = %s
+        """, (applied, failed, job['id']))
+
+    llm_batch_requests_total.labels(backend=job['backend'], kind=job['kind'], result='applied').inc(applied)
+    llm_batch_requests_total.labels(backend=job['backend'], kind=job['kind'], result='failed').inc(failed)
+    if job['backend'] == 'provider':
+        # Local batches went through llm_completion, which already counted them
+        _record_usage(usage_by_model)
+    logger.info(f"Applied batch job {job['id']} ({job['kind']}): {applied} stored, {failed} failed")
+    return applied, failed
+
+
+def _fail_job(job: Dict[str, Any], error: str):
+    """Mark a batch whose results are gone as failed; each of its requests used an attempt."""
+    with db_cursor(commit=True) as cur:
+        cur.execute("""
+            UPDATE llm_batch_jobs SET status = 'failed', last_error = %s, finished_at = NOW()
+            WHERE id = %s AND status = 'submitted'
+            RETURNING items
+        """, (error, job['id']))
+        row = cur.fetchone()
+        if row is not None:
+            _record_attempts(cur, [(custom_id, error) for custom_id in row['items']], [])
+
+
+def _record_attempts(cur, failures: List[Tuple[str, str]], stored_ids: List[str]):
+    """Count a failed attempt per failed request and forget the requests that succeeded."""
+    if failures:
+        execute_values(cur, """
+            INSERT INTO llm_batch_attempts (custom_id, attempts, last_error, updated_at)
+            VALUES %s
+            ON CONFLICT (custom_id)
+            DO UPDATE SET attempts = llm_batch_attempts.attempts + 1, last_error = EXCLUDED.last_error, updated_at = NOW()
+        """, failures, template="(%s, 1, %s, NOW())")
+    if stored_ids:
+        cur.execute("DELETE FROM llm_batch_attempts WHERE custom_id = ANY(%s)", (stored_ids,))
+
+
+def _definition_row(item: Dict[str, Any], content: str) -> Tuple:
+    definition_data = json.loads(content)
+    # Ensure the word field matches the input
+    definition_data['word'] = item['word']
+    return (item['word'], item['learning_language'], item['native_language'],
+            json.dumps(definition_data), CURRENT_SCHEMA_VERSION)
+
+
+def _question_row(item: Dict[str, Any], content: Optional[str]) -> Tuple:
+    if not content:
+        raise ValueError("empty response")
+    word = item['word']
+    if 'video_id' in item:
+        correct_meaning, distractors = parse_video_mc_response(content)
+        question_data = build_video_mc_question(
+            word, item['video_id'], item['audio_transcript'], correct_meaning, distractors)
+    else:
+        question_data = json.loads(content)
+        if not isinstance(question_data, dict):
+            raise ValueError("response is not a JSON object")
+        question_data['question_type'] = item['prompt_type']
+        question_data['word'] = word
+    return (word, item['learning_language'], item['native_language'], item['question_type'],
+            json.dumps(question_data))
+
+
+def _record_usage(usage_by_model: Dict[str, Dict[str, int]]):
+    for model, usage in usage_by_model.items():
+        provider = get_provider_for_model(model)
+        if usage['prompt_tokens']:
+            llm_tokens_total.labels(provider=provider, model=model, type='prompt').inc(usage['prompt_tokens'])
+        if usage['completion_tokens']:
+            llm_tokens_total.labels(provider=provider, model=model, type='completion').inc(usage['completion_tokens'])
+        cost = estimate_cost(provider, model, SimpleNamespace(**usage)) * BATCH_PRICE_FACTOR
+        if cost > 0:
+            llm_cost_usd_total.labels(provider=provider, model=model).inc(cost)
+
+
+def _submit(kind: str, model: str, chunk: List[Tuple[Dict, Dict]]) -> str:
+    backend = get_batch_backend()
+    batch_id = backend.submit(model, [request for request, _ in chunk])
+    db_execute("""
+        INSERT INTO llm_batch_jobs (kind, backend, model, batch_id, items)
+        VALUES (%s, %s, %s, %s, %s)
+    """, (kind, backend.name, model, batch_id,
+          json.dumps({request['custom_id']: item for request, item in chunk})), commit=True)
+    llm_batch_requests_total.labels(backend=backend.name, kind=kind, result='submitted').inc(len(chunk))
+    logger.info(f"Submitted {kind} batch {batch_id}: {len(chunk)} requests ({model}, {backend.name})")
+    return batch_id
+
+
+def _pack(requests: List[Tuple[str, str, Dict, Dict]]):
+    """Yield (kind, model, [(request, item)]) chunks of at most LLM_BATCH_MAX_REQUESTS."""
+    groups: Dict[Tuple[str, str], List[Tuple[Dict, Dict]]] = {}
+    for kind, model, request, item in requests:
+        groups.setdefault((kind, model), []).append((request, item))
+    for (kind, model), group in groups.items():
+        for start in range(0, len(group), LLM_BATCH_MAX_REQUESTS):
+            yield kind, model, group[start:start + LLM_BATCH_MAX_REQUESTS]
+
+
+def _backend(name: str):
+    backend = get_batch_backend()
+    # Jobs keep the backend they were submitted to, even if LLM_BATCH_BACKEND changed since
+    return backend if backend.name == name else create_batch_backend(name)
+
+
+def _normalize_items(items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge duplicate words and drop repeated question types."""
+    merged: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for item in items:
+        key = (item['word'], item['learning_language'], item['native_language'])
+        entry = merged.setdefault(key, {'word': key[0], 'learning_language': key[1],
+                                        'native_language': key[2], 'question_types': []})
+        for question_type in item.get('question_types') or []:
+            if question_type not in entry['question_types']:
+                entry['question_types'].append(question_type)
+    return list(merged.values())
+
+
+def _key_arrays(items: List[Dict[str, Any]]) -> Tuple[List[str], List[str], List[str]]:
+    return ([i['word'] for i in items], [i['learning_language'] for i in items],
+            [i['native_language'] for i in items])
+
+
+def _existing_definitions(items: List[Dict[str, Any]]) -> Dict[Tuple[str, str, str], Dict]:
+    if not items:
+        return {}
+    rows = db_fetch_all("""
+        SELECT d.word, d.learning_language, d.native_language, d.definition_data
+        FROM definitions d
+        JOIN unnest(%s::text[], %s::text[], %s::text[]) AS k(word, learning_language, native_language)
+          ON d.word = k.word AND d.learning_language = k.learning_language AND d.native_language = k.native_language
+    """, _key_arrays(items))
+    return {(r['word'], r['learning_language'], r['native_language']): r['definition_data'] for r in rows}
+
+
+def _existing_questions(items: List[Dict[str, Any]]) -> Set[Tuple[str, str, str, str]]:
+    items = [i for i in items if i['question_types']]
+    if not items:
+        return set()
+    rows = db_fetch_all("""
+        SELECT rq.word, rq.learning_language, rq.native_language, rq.question_type
+        FROM review_questions rq
+        JOIN unnest(%s::text[], %s::text[], %s::text[]) AS k(word, learning_language, native_language)
+          ON rq.word = k.word AND rq.learning_language = k.learning_language AND rq.native_language = k.native_language
+    """, _key_arrays(items))
+    return {(r['word'], r['learning_language'], r['native_language'], r['question_type']) for r in rows}
+
+
+def _pending_custom_ids() -> Set[str]:
+    rows = db_fetch_all("""
+        SELECT jsonb_object_keys(items) AS custom_id
+        FROM llm_batch_jobs
+        WHERE status = 'submitted'
+    """)
+    return {r['custom_id'] for r in rows}
+
+
+def _exhausted_custom_ids() -> Set[str]:
+    rows = db_fetch_all("""
+        SELECT custom_id FROM llm_batch_attempts WHERE attempts >= %s
+    """, (LLM_BATCH_MAX_ATTEMPTS,))
+    return {r['custom_id'] for r in rows}
+
+
+def _count_pending_batches() -> int:
+    result = db_fetch_one("SELECT COUNT(*) AS count FROM llm_batch_jobs WHERE status = 'submitted'")
+    return result['count'] if result else 0
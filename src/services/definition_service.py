@@ -3,14 +3,22 @@ Definition Service
 
 Utility functions for generating and caching word definitions using LLM.
 Shared logic for word definition generation used by both handlers and services.
+
+Lookups go through a per-process LRU (DEFINITION_CACHE_SIZE entries, expiring
+after DEFINITION_CACHE_TTL seconds) in front of the definitions table, and
+concurrent misses for the same (word, learning_lang, native_lang) are
+coalesced so only one LLM generation runs per key.
 """
 
+import os
 import json
 import logging
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import datetime
-from utils.database import get_db_connection
+from utils.database import db_fetch_one, db_execute
+from utils.cache import TTLCache, SingleFlight
 from utils.llm import llm_completion
+from middleware.metrics import cache_requests_total
 from config.config import COMPLETION_MODEL_WORD_SEARCH
 
 logger = logging.getLogger(__name__)
@@ -18,6 +26,12 @@ logger = logging.getLogger(__name__)
 # Schema version for definitions
 CURRENT_SCHEMA_VERSION = 4
 
+DEFINITION_CACHE_SIZE = int(os.getenv('DEFINITION_CACHE_SIZE', '2000'))
+DEFINITION_CACHE_TTL = float(os.getenv('DEFINITION_CACHE_TTL', '600'))
+
+_definition_cache = TTLCache(max_size=DEFINITION_CACHE_SIZE, ttl=DEFINITION_CACHE_TTL)
+_definition_flight = SingleFlight()
+
 # V4 Schema with vocabulary learning enhancements
 WORD_DEFINITION_V4_SCHEMA = {
     "type": "object",
@@ -206,65 +220,90 @@ CRITICAL:
 - For source: only include if the etymology is interesting or helpful for remembering the word. Keep it brief and accessible."""
 
 
-def generate_definition_with_llm(word: str, learning_lang: str, native_lang: str, build_prompt_fn=None) -> Optional[Dict]:
+DEFINITION_SYSTEM_PROMPT = "You are a bilingual dictionary expert who validates words and provides comprehensive vocabulary learning content using simple, accessible language."
+
+DEFINITION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "word_definition_v4_with_learning_features",
+        "strict": True,
+        "schema": WORD_DEFINITION_V4_SCHEMA
+    }
+}
+
+
+def build_definition_messages(word: str, learning_lang: str, native_lang: str) -> List[Dict[str, str]]:
+    """Chat messages for a V4 definition; also used by the batch backfill (services/batch_generation_service.py)."""
+    return [
+        {"role": "system", "content": DEFINITION_SYSTEM_PROMPT},
+        {"role": "user", "content": build_v4_definition_prompt(word, learning_lang, native_lang)}
+    ]
+
+
+def generate_definition_with_llm(word: str, learning_lang: str, native_lang: str, build_prompt_fn=None,
+                                 hedge: bool = False) -> Optional[Dict]:
     """
     Generate a word definition using OpenAI V4 schema and cache it in the database.
     Uses the V4 schema with vocabulary learning enhancements.
 
+    Hot definitions are served from an in-process LRU; concurrent callers
+    missing on the same key share a single DB lookup / LLM generation.
+    The returned dict may be shared between callers and must not be mutated.
+
     Args:
         word: The word to define
         learning_lang: Language being learned
         native_lang: User's native language
         build_prompt_fn: Deprecated - kept for backward compatibility but not used
+        hedge: Race a slow generation against the fallback model; only for the
+               interactive word lookup, where latency matters more than cost
 
     Returns:
         Dict containing definition_data or None if generation fails
     """
+    key = (word, learning_lang, native_lang)
+
+    definition_data = _definition_cache.get(key)
+    if definition_data is not None:
+        cache_requests_total.labels(cache='definition', result='hit').inc()
+        return definition_data
+
+    # Hedged lookups run their own flight rather than join an unhedged one
+    definition_data, shared = _definition_flight.do(
+        key + (hedge,), lambda: _fetch_or_generate_definition(word, learning_lang, native_lang, hedge)
+    )
+    cache_requests_total.labels(cache='definition', result='coalesced' if shared else 'miss').inc()
+
+    # Failures are not cached so the next request retries generation
+    if definition_data is not None and not shared:
+        _definition_cache.set(key, definition_data)
+    return definition_data
+
+
+def _fetch_or_generate_definition(word: str, learning_lang: str, native_lang: str, hedge: bool = False) -> Optional[Dict]:
+    """Read the definition from the definitions table, generating it with the LLM on a miss."""
     try:
         # Check if definition already exists in cache
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        cur.execute("""
+        existing = db_fetch_one("""
             SELECT definition_data FROM definitions
             WHERE word = %s AND learning_language = %s AND native_language = %s
         """, (word, learning_lang, native_lang))
 
-        existing = cur.fetchone()
         if existing:
             logger.info(f"Definition cache hit for '{word}'")
-            cur.close()
-            conn.close()
             return existing['definition_data']
 
         # Generate definition using OpenAI with V4 schema
         logger.info(f"Generating V4 definition with LLM for '{word}' ({learning_lang} → {native_lang})")
 
-        # Use V4 prompt
-        prompt = build_v4_definition_prompt(word, learning_lang, native_lang)
-
-        # Call LLM API with V4 schema using utility function
+        # Call LLM API with V4 prompt and schema using utility function
         # Uses Groq (llama-4-scout) for fast word search responses
+        # No DB connection is held while waiting on the LLM
         definition_content = llm_completion(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a bilingual dictionary expert who validates words and provides comprehensive vocabulary learning content using simple, accessible language."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+            messages=build_definition_messages(word, learning_lang, native_lang),
             model_name=COMPLETION_MODEL_WORD_SEARCH,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "word_definition_v4_with_learning_features",
-                    "strict": True,
-                    "schema": WORD_DEFINITION_V4_SCHEMA
-                }
-            }
+            response_format=DEFINITION_RESPONSE_FORMAT,
+            hedge=hedge
         )
 
         # Check if content is None or empty
@@ -279,16 +318,12 @@ def generate_definition_with_llm(word: str, learning_lang: str, native_lang: str
         definition_data['word'] = word
 
         # Cache the definition in database
-        cur.execute("""
+        db_execute("""
             INSERT INTO definitions (word, learning_language, native_language, definition_data, schema_version, created_at)
             VALUES (%s, %s, %s, %s, %s, %s)
             ON CONFLICT (word, learning_language, native_language)
             DO UPDATE SET definition_data = EXCLUDED.definition_data, schema_version = EXCLUDED.schema_version, updated_at = CURRENT_TIMESTAMP
-        """, (word, learning_lang, native_lang, json.dumps(definition_data), CURRENT_SCHEMA_VERSION, datetime.now()))
-
-        conn.commit()
-        cur.close()
-        conn.close()
+        """, (word, learning_lang, native_lang, json.dumps(definition_data), CURRENT_SCHEMA_VERSION, datetime.now()), commit=True)
 
         logger.info(f"Successfully generated and cached V4 definition for '{word}' (score: {definition_data.get('valid_word_score', 'N/A')})")
         return definition_data
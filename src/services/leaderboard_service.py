@@ -0,0 +1,137 @@
+"""
+Leaderboard Service
+
+Ranks users from the trigger-maintained user_scores table by score or by
+review count, serving the top entries from a short-lived per-process snapshot.
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional
+from utils.database import db_fetch_one, db_fetch_all
+from utils.cache import TTLCache, SingleFlight
+from middleware.metrics import cache_requests_total
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_TOP_K = int(os.getenv('LEADERBOARD_TOP_K', '100'))  # Entries held in the cached snapshot
+LEADERBOARD_SNAPSHOT_TTL = float(os.getenv('LEADERBOARD_SNAPSHOT_TTL', '60'))  # Seconds before it is refreshed
+LEADERBOARD_MAX_PAGE_SIZE = 100
+
+# total_reviews counts reviews by the reviewing user. Deleting a saved word
+# cascades to its reviews and fires the trigger, so only reviews of words the
+# user still has saved are counted, as the old saved_words join did.
+#
+# ORDER BY clause and the "ranked ahead of (score, total_reviews, user_id)" predicate per ordering
+ORDERINGS = {
+    'score': (
+        "us.score DESC, us.total_reviews DESC, us.user_id",
+        """(us.score > %(score)s
+            OR (us.score = %(score)s AND us.total_reviews > %(total_reviews)s)
+            OR (us.score = %(score)s AND us.total_reviews = %(total_reviews)s AND us.user_id < %(user_id)s))""",
+    ),
+    'reviews': (
+        "us.total_reviews DESC, us.user_id",
+        """(us.total_reviews > %(total_reviews)s
+            OR (us.total_reviews = %(total_reviews)s AND us.user_id < %(user_id)s))""",
+    ),
+}
+
+_snapshot_cache = TTLCache(max_size=len(ORDERINGS), ttl=LEADERBOARD_SNAPSHOT_TTL)
+_snapshot_flight = SingleFlight()
+
+
+def _fetch_entries(ordering: str, offset: int, limit: int) -> List[Dict]:
+    order_by, _ = ORDERINGS[ordering]
+    rows = db_fetch_all(f"""
+        SELECT us.user_id,
+               COALESCE(up.user_name, 'Anonymous') AS user_name,
+               COALESCE(up.user_motto, '') AS user_motto,
+               us.score,
+               us.total_reviews
+        FROM user_scores us
+        JOIN user_preferences up ON up.user_id = us.user_id
+        ORDER BY {order_by}
+        OFFSET %s
+        LIMIT %s
+    """, (offset, limit))
+    return [
+        {
+            "rank": offset + i + 1,
+            "user_id": row['user_id'],
+            "user_name": row['user_name'],
+            "user_motto": row['user_motto'],
+            "score": row['score'],
+            "total_reviews": row['total_reviews'],
+        }
+        for i, row in enumerate(rows)
+    ]
+
+
+def _load_snapshot(ordering: str) -> Dict:
+    total = db_fetch_one("SELECT COUNT(*) AS count FROM user_scores")['count']
+    return {"entries": _fetch_entries(ordering, 0, LEADERBOARD_TOP_K), "total_users": total}
+
+
+def get_snapshot(ordering: str = 'score') -> Dict:
+    """Cached top-K entries and total user count for an ordering."""
+    snapshot = _snapshot_cache.get(ordering)
+    if snapshot is not None:
+        cache_requests_total.labels(cache='leaderboard', result='hit').inc()
+        return snapshot
+
+    def load():
+        fresh = _load_snapshot(ordering)
+        _snapshot_cache.set(ordering, fresh)
+        return fresh
+
+    snapshot, shared = _snapshot_flight.do(ordering, load)
+    cache_requests_total.labels(cache='leaderboard', result='coalesced' if shared else 'miss').inc()
+    return snapshot
+
+
+def get_leaderboard_page(ordering: str = 'score', offset: int = 0, limit: int = LEADERBOARD_TOP_K) -> Dict:
+    """
+    One page of ranks. Served from the snapshot while it lies within the top K,
+    otherwise read from the ranking index.
+
+    Returns:
+        {"entries": [...], "total_users": int}
+    """
+    snapshot = get_snapshot(ordering)
+    if offset + limit <= LEADERBOARD_TOP_K or offset >= snapshot['total_users']:
+        entries = snapshot['entries'][offset:offset + limit]
+    else:
+        entries = _fetch_entries(ordering, offset, limit)
+    return {"entries": entries, "total_users": snapshot['total_users']}
+
+
+def get_user_rank(user_id: str, ordering: str = 'score') -> Optional[Dict]:
+    """A user's live leaderboard entry, or None if they have no profile."""
+    _, ahead = ORDERINGS[ordering]
+    row = db_fetch_one("""
+        SELECT me.user_id,
+               COALESCE(up.user_name, 'Anonymous') AS user_name,
+               COALESCE(up.user_motto, '') AS user_motto,
+               me.score,
+               me.total_reviews
+        FROM user_scores me
+        JOIN user_preferences up ON up.user_id = me.user_id
+        WHERE me.user_id = %(user_id)s
+    """, {'user_id': user_id})
+    if not row:
+        return None
+
+    ahead_count = db_fetch_one(f"""
+        SELECT COUNT(*) AS count
+        FROM user_scores us
+        WHERE {ahead}
+    """, {'user_id': row['user_id'], 'score': row['score'], 'total_reviews': row['total_reviews']})['count']
+    return {
+        "rank": ahead_count + 1,
+        "user_id": row['user_id'],
+        "user_name": row['user_name'],
+        "user_motto": row['user_motto'],
+        "score": row['score'],
+        "total_reviews": row['total_reviews'],
+    }
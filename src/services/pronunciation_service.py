@@ -2,13 +2,12 @@
 Pronunciation evaluation service using OpenAI Whisper and GPT-4
 """
 
-import openai
 import json
 import logging
 import tempfile
 import os
 from utils.database import get_db_connection
-from utils.llm import llm_completion
+from utils.llm import llm_completion, get_llm_client
 from typing import Dict, Any
 from config.config import COMPLETION_MODEL_NAME, WHISPER_MODEL_NAME
 
@@ -16,7 +15,7 @@ logger = logging.getLogger(__name__)
 
 class PronunciationService:
     def __init__(self):
-        self.client = openai.OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+        self.client = get_llm_client("openai")
 
     def evaluate_pronunciation(self, original_text: str, audio_data: bytes,
                               user_id: str, metadata: Dict[str, Any],
@@ -41,6 +41,28 @@ def get_random_question_type() -> str:
     )[0]
 
 
+def choose_question_type(has_videos: bool, available: Optional[set] = None) -> Optional[str]:
+    """
+    Select a question type for a word.
+
+    video_mc is always used when the word has videos; otherwise a weighted
+    random type is picked, with video_mc's share falling back to
+    mc_definition. When available is given, only those types are considered
+    (None is returned if none of them qualify).
+    """
+    if has_videos and (available is None or 'video_mc' in available):
+        return 'video_mc'
+
+    weights = dict(QUESTION_TYPE_WEIGHTS)
+    weights['mc_definition'] += weights.pop('video_mc')
+    if available is not None:
+        weights = {qtype: weight for qtype, weight in weights.items() if qtype in available}
+        if not weights:
+            return None
+
+    return random.choices(list(weights.keys()), weights=list(weights.values()))[0]
+
+
 def get_cached_question(word: str, learning_lang: str, native_lang: str, question_type: str) -> Optional[Dict]:
     """
     Check if a question for this word/language/type combination is already cached.
@@ -126,6 +148,74 @@ def check_word_has_videos(word: str, learning_lang: str) -> Optional[Dict]:
         return None
 
 
+VIDEO_MC_SYSTEM_PROMPT = "You are a language learning expert. Analyze transcripts to infer word meanings. Return only valid JSON without markdown formatting."
+
+
+def build_video_mc_prompt(word: str, audio_transcript: str) -> str:
+    """Prompt asking for the word's meaning in the transcript plus 3 distractors."""
+    return f"""Given this audio transcript from a video and a target word, determine the word's meaning based on how it's used in the transcript, then generate 3 plausible but incorrect alternatives.
+
+Audio transcript: "{audio_transcript}"
+
+Target word: "{word}"
+
+Task:
+1. Infer the meaning of "{word}" based on how it's used in the transcript
+2. Generate 3 plausible but INCORRECT definitions that could confuse learners
+
+Requirements:
+- The correct meaning should be clear, concise, and pedagogically sound
+- Distractors must be semantically related or describe similar concepts
+- All definitions should use simple, common vocabulary
+- Similar length and complexity across all options
+- Avoid negations or "none of the above"
+
+Return ONLY a JSON object with this structure:
+{{
+  "correct_meaning": "the correct definition inferred from transcript context",
+  "distractors": ["distractor 1 text", "distractor 2 text", "distractor 3 text"]
+}}"""
+
+
+def parse_video_mc_response(content: str):
+    """
+    Extract (correct_meaning, distractors) from a video_mc LLM response.
+
+    Raises:
+        ValueError: If the response is not the expected JSON object
+    """
+    parsed = json.loads(content.strip())
+
+    if not isinstance(parsed, dict) or 'correct_meaning' not in parsed or 'distractors' not in parsed:
+        raise ValueError("LLM response missing required fields")
+
+    distractors = parsed['distractors']
+    if not isinstance(distractors, list) or len(distractors) != 3:
+        raise ValueError("LLM did not return exactly 3 distractors")
+
+    return parsed['correct_meaning'], distractors
+
+
+def build_video_mc_question(word: str, video_id: int, audio_transcript: str,
+                            correct_meaning: str, distractors: List[str]) -> Dict:
+    """Video question data with the correct meaning as option A."""
+    return {
+        'question_type': 'video_mc',
+        'word': word,
+        'video_id': video_id,
+        'audio_transcript': audio_transcript,  # Use audio_transcript field
+        'question_text': f"What does '{word}' mean?",
+        'show_word_before_video': False,  # Hide word initially, reveal after answer
+        'options': [
+            {'id': 'A', 'text': correct_meaning, 'is_correct': True},
+            {'id': 'B', 'text': distractors[0], 'is_correct': False},
+            {'id': 'C', 'text': distractors[1], 'is_correct': False},
+            {'id': 'D', 'text': distractors[2], 'is_correct': False}
+        ],
+        'correct_answer': 'A'
+    }
+
+
 def generate_video_mc_question(word: str, definition: Dict, learning_lang: str, native_lang: str) -> Dict:
     """
     Generate a video multiple-choice question.
@@ -157,58 +247,17 @@ def generate_video_mc_question(word: str, definition: Dict, learning_lang: str,
         logger.warning(f"No audio_transcript available for video {video_id}, falling back to mc_definition")
         return generate_question_with_llm(word, definition, learning_lang, native_lang, 'mc_definition')
 
-    # Generate meaning and distractors using LLM based on transcript context
-    prompt = f"""Given this audio transcript from a video and a target word, determine the word's meaning based on how it's used in the transcript, then generate 3 plausible but incorrect alternatives.
-
-Audio transcript: "{audio_transcript}"
-
-Target word: "{word}"
-
-Task:
-1. Infer the meaning of "{word}" based on how it's used in the transcript
-2. Generate 3 plausible but INCORRECT definitions that could confuse learners
-
-Requirements:
-- The correct meaning should be clear, concise, and pedagogically sound
-- Distractors must be semantically related or describe similar concepts
-- All definitions should use simple, common vocabulary
-- Similar length and complexity across all options
-- Avoid negations or "none of the above"
-
-Return ONLY a JSON object with this structure:
-{{
-  "correct_meaning": "the correct definition inferred from transcript context",
-  "distractors": ["distractor 1 text", "distractor 2 text", "distractor 3 text"]
-}}"""
-
     try:
-        # Generate meaning and distractors with LLM
+        # Generate meaning and distractors with LLM based on transcript context
         response_json = llm_completion(
             messages=[
-                {
-                    "role": "system",
-                    "content": "You are a language learning expert. Analyze transcripts to infer word meanings. Return only valid JSON without markdown formatting."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
+                {"role": "system", "content": VIDEO_MC_SYSTEM_PROMPT},
+                {"role": "user", "content": build_video_mc_prompt(word, audio_transcript)}
             ],
             model_name=COMPLETION_MODEL_NAME,
             response_format={"type": "json_object"}
         )
-
-        # Parse the response
-        parsed = json.loads(response_json.strip())
-
-        if not isinstance(parsed, dict) or 'correct_meaning' not in parsed or 'distractors' not in parsed:
-            raise ValueError("LLM response missing required fields")
-
-        correct_meaning = parsed['correct_meaning']
-        distractors = parsed['distractors']
-
-        if not isinstance(distractors, list) or len(distractors) != 3:
-            raise ValueError("LLM did not return exactly 3 distractors")
+        correct_meaning, distractors = parse_video_mc_response(response_json)
 
     except Exception as e:
         logger.error(f"Error generating video question with LLM: {e}, using fallback")
@@ -225,22 +274,7 @@ Return ONLY a JSON object with this structure:
             "another interpretation (distractor 3)"
         ]
 
-    # Build question data
-    question_data = {
-        'question_type': 'video_mc',
-        'word': word,
-        'video_id': video_id,
-        'audio_transcript': audio_transcript,  # Use audio_transcript field
-        'question_text': f"What does '{word}' mean?",
-        'show_word_before_video': False,  # Hide word initially, reveal after answer
-        'options': [
-            {'id': 'A', 'text': correct_meaning, 'is_correct': True},
-            {'id': 'B', 'text': distractors[0], 'is_correct': False},
-            {'id': 'C', 'text': distractors[1], 'is_correct': False},
-            {'id': 'D', 'text': distractors[2], 'is_correct': False}
-        ],
-        'correct_answer': 'A'
-    }
+    question_data = build_video_mc_question(word, video_id, audio_transcript, correct_meaning, distractors)
 
     logger.info(f"Generated video_mc question for word '{word}' with video_id={video_id}, has_audio_transcript={audio_transcript is not None}")
 
@@ -406,6 +440,25 @@ Return ONLY valid JSON:
 }}"""
 
 
+QUESTION_SYSTEM_PROMPT = "You are a language learning expert creating pedagogically sound review questions. Return only valid JSON without markdown formatting."
+
+# Prompt generators for LLM-based question types (video_mc is built from a transcript)
+QUESTION_PROMPT_BUILDERS = {
+    'mc_definition': generate_mc_definition_prompt,
+    'mc_word': generate_mc_word_prompt,
+    'fill_blank': generate_fill_blank_prompt,
+    'pronounce_sentence': generate_pronounce_sentence_prompt,
+}
+
+
+def build_question_prompt(word: str, definition: Dict, native_lang: str, question_type: str) -> str:
+    """Prompt for an LLM-based question type; raises ValueError for unknown types."""
+    builder = QUESTION_PROMPT_BUILDERS.get(question_type)
+    if builder is None:
+        raise ValueError(f"Unknown question type: {question_type}")
+    return builder(word, definition, native_lang)
+
+
 def shuffle_question_options(question_data: Dict) -> Dict:
     """
     Shuffle the options in a multiple choice question to randomize answer position.
@@ -473,7 +526,7 @@ def call_openai_for_question(prompt: str) -> Dict:
             messages=[
                 {
                     "role": "system",
-                    "content": "You are a language learning expert creating pedagogically sound review questions. Return only valid JSON without markdown formatting."
+                    "content": QUESTION_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -523,17 +576,7 @@ def generate_question_with_llm(
     if question_type == 'video_mc':
         return generate_video_mc_question(word, definition, learning_lang, native_lang)
 
-    # Select appropriate prompt generator for LLM-based questions
-    if question_type == 'mc_definition':
-        prompt = generate_mc_definition_prompt(word, definition, native_lang)
-    elif question_type == 'mc_word':
-        prompt = generate_mc_word_prompt(word, definition, native_lang)
-    elif question_type == 'fill_blank':
-        prompt = generate_fill_blank_prompt(word, definition, native_lang)
-    elif question_type == 'pronounce_sentence':
-        prompt = generate_pronounce_sentence_prompt(word, definition, native_lang)
-    else:
-        raise ValueError(f"Unknown question type: {question_type}")
+    prompt = build_question_prompt(word, definition, native_lang, question_type)
 
     # Generate with LLM
     question_data = call_openai_for_question(prompt)
@@ -569,18 +612,10 @@ def get_or_generate_question(
 
     # Select question type with video prioritization
     if question_type is None:
-        # PRIORITY 1: Always use video_mc if word has videos
-        if check_word_has_videos(word, learning_lang):
-            question_type = 'video_mc'
+        has_videos = check_word_has_videos(word, learning_lang) is not None
+        question_type = choose_question_type(has_videos)
+        if has_videos:
             logger.info(f"Prioritizing video_mc for '{word}' (videos available)")
-        else:
-            # PRIORITY 2: Random selection from all types (including video_mc with fallback)
-            question_type = get_random_question_type()
-
-            # If video_mc was randomly selected but no videos available, fallback to mc_definition
-            if question_type == 'video_mc':
-                logger.info(f"video_mc randomly selected but no videos for '{word}', using mc_definition instead")
-                question_type = 'mc_definition'
 
     # Check cache first
     cached = get_cached_question(word, learning_lang, native_lang, question_type)
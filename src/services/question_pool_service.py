@@ -0,0 +1,340 @@
+"""
+Question Pool Service
+
+Pre-generates review questions and their audio for each active user's
+upcoming words on a priority-ordered pool of worker threads, so the batch
+review endpoint only reads caches.
+"""
+
+import os
+import copy
+import queue
+import logging
+import threading
+import itertools
+from typing import Dict, List, Optional, Tuple
+from utils.database import db_fetch_one, db_fetch_all
+from utils.cache import TTLCache
+from services.question_generation_service import (
+    choose_question_type,
+    check_word_has_videos,
+    generate_question_with_llm,
+    cache_question,
+    shuffle_question_options,
+    QUESTION_TYPE_WEIGHTS,
+)
+from middleware.metrics import (
+    question_pool_lookups_total,
+    question_pool_tasks_total,
+    question_pool_queue_depth,
+    question_pool_generated_total,
+)
+
+logger = logging.getLogger(__name__)
+
+QUESTION_POOL_WORKERS = int(os.getenv('QUESTION_POOL_WORKERS', '4'))  # Threads per process; 0 disables the pool
+QUESTION_POOL_QUEUE_SIZE = int(os.getenv('QUESTION_POOL_QUEUE_SIZE', '2000'))  # Queued tasks; new ones dropped beyond this
+QUESTION_POOL_LOOKAHEAD = int(os.getenv('QUESTION_POOL_LOOKAHEAD', '30'))  # Upcoming words prepared per user
+QUESTION_POOL_REFRESH_SECONDS = float(os.getenv('QUESTION_POOL_REFRESH_SECONDS', '300'))  # Skip a completed task this long
+QUESTION_POOL_SWEEP_INTERVAL = int(os.getenv('QUESTION_POOL_SWEEP_INTERVAL', '300'))  # Seconds between sweeps
+QUESTION_POOL_ACTIVE_WINDOW_HOURS = int(os.getenv('QUESTION_POOL_ACTIVE_WINDOW_HOURS', '24'))  # Users reviewing within this are swept
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SWEEP = 10
+
+
+def pool_question_types(has_videos: bool) -> List[str]:
+    """Question types the pool keeps cached for a word."""
+    return [
+        qtype for qtype in QUESTION_TYPE_WEIGHTS
+        if qtype != 'video_mc' or has_videos
+    ]
+
+
+def ensure_audio(text: str, language: str) -> bool:
+    """Generate and store TTS audio for text unless it already exists; returns True if generated."""
+    from handlers.words import audio_exists, generate_audio_for_text, store_audio
+
+    if audio_exists(text, language):
+        return False
+    store_audio(text, language, generate_audio_for_text(text))
+    return True
+
+
+def prepare_word(word: str, learning_lang: str, native_lang: str) -> int:
+    """
+    Fill the pool for one word: definition, every missing question type and
+    the audio they play.
+
+    Returns:
+        Number of questions generated
+    """
+    from services.definition_service import generate_definition_with_llm
+
+    definition = generate_definition_with_llm(word, learning_lang, native_lang)
+    if not definition:
+        logger.warning(f"Question pool: no definition for '{word}', skipping")
+        return 0
+
+    has_videos = check_word_has_videos(word, learning_lang) is not None
+    rows = db_fetch_all("""
+        SELECT question_type, question_data
+        FROM review_questions
+        WHERE word = %s
+          AND learning_language = %s
+          AND native_language = %s
+    """, (word, learning_lang, native_lang))
+    cached = {row['question_type']: row['question_data'] for row in rows}
+
+    generated = 0
+    for question_type in pool_question_types(has_videos):
+        if question_type in cached:
+            continue
+        try:
+            question = generate_question_with_llm(word, definition, learning_lang, native_lang, question_type)
+        except Exception as e:
+            logger.error(f"Question pool: failed to generate {question_type} for '{word}': {e}")
+            continue
+        cache_question(word, learning_lang, native_lang, question_type, question)
+        question_pool_generated_total.labels(question_type=question_type).inc()
+        cached[question_type] = question
+        generated += 1
+
+    # Word audio backs the definition card; sentence audio backs pronounce_sentence
+    audio_texts = [word]
+    sentence = (cached.get('pronounce_sentence') or {}).get('sentence')
+    if sentence:
+        audio_texts.append(sentence)
+    for text in audio_texts:
+        try:
+            ensure_audio(text, learning_lang)
+        except Exception as e:
+            logger.error(f"Question pool: failed to generate audio for '{text[:50]}': {e}")
+
+    return generated
+
+
+def look_ahead_words(user_id: str, limit: int = QUESTION_POOL_LOOKAHEAD) -> List[Tuple[str, str, str]]:
+    """
+    The user's next words to review, in the order they are likely to be served:
+    today's and the following days' scheduled words, then saved words by due date.
+
+    Returns:
+        List of (word, learning_language, native_language)
+    """
+    from handlers.test_vocabulary import get_active_test_type
+    from services.schedule_service import get_schedule_snapshot, get_today_in_timezone
+
+    prefs = db_fetch_one("""
+        SELECT
+            learning_language, native_language, timezone,
+            toefl_beginner_enabled, toefl_intermediate_enabled, toefl_advanced_enabled,
+            ielts_beginner_enabled, ielts_intermediate_enabled, ielts_advanced_enabled,
+            tianz_enabled, target_end_date, schedule_version
+        FROM user_preferences
+        WHERE user_id = %s
+    """, (user_id,))
+    if not prefs:
+        return []
+
+    learning_lang = prefs['learning_language']
+    native_lang = prefs['native_language']
+    words = []
+    seen = set()
+
+    def add(word, ll, nl):
+        key = (word, ll, nl)
+        if word and key not in seen and len(words) < limit:
+            seen.add(key)
+            words.append(key)
+
+    user_tz = prefs.get('timezone') or 'UTC'
+    today = get_today_in_timezone(user_tz)
+    test_type = get_active_test_type(prefs)
+    target_end_date = prefs.get('target_end_date')
+    if test_type and target_end_date and target_end_date > today:
+        try:
+            schedule_result = get_schedule_snapshot(
+                user_id, test_type, target_end_date, user_tz, today, prefs['schedule_version']
+            )
+            today_key = today.isoformat()
+            for day in sorted(schedule_result['daily_schedules']):
+                if day < today_key:
+                    continue
+                entry = schedule_result['daily_schedules'][day]
+                for word in entry.get('new_words') or []:
+                    add(word, learning_lang, native_lang)
+                for practice in (entry.get('test_practice') or []) + (entry.get('non_test_practice') or []):
+                    add(practice.get('word'), learning_lang, native_lang)
+                if len(words) >= limit:
+                    return words
+        except Exception as e:
+            logger.warning(f"Question pool: could not calculate schedule for user {user_id}: {e}")
+
+    rows = db_fetch_all("""
+        SELECT word, learning_language, native_language
+        FROM saved_words
+        WHERE user_id = %s
+          AND (is_known IS NULL OR is_known = FALSE)
+        ORDER BY COALESCE(next_review_date, created_at + INTERVAL '1 day') ASC, word ASC
+        LIMIT %s
+    """, (user_id, limit))
+    for row in rows:
+        add(row['word'], row['learning_language'], row['native_language'])
+
+    return words
+
+
+def get_pooled_question(word: str, learning_lang: str, native_lang: str) -> Optional[Dict]:
+    """
+    Serve a question for a word from review_questions without generating anything.
+
+    The type is chosen the same way get_or_generate_question() does, restricted
+    to the types already cached (a cached video_mc implies the word has videos).
+
+    Returns:
+        Shuffled copy of a cached question, or None if the word has none yet
+    """
+    rows = db_fetch_all("""
+        SELECT question_type, question_data
+        FROM review_questions
+        WHERE word = %s
+          AND learning_language = %s
+          AND native_language = %s
+    """, (word, learning_lang, native_lang))
+    cached = {row['question_type']: row['question_data'] for row in rows}
+    return select_pooled_question(cached, 'video_mc' in cached)
+
+
+def select_pooled_question(cached: Dict[str, Dict], has_videos: bool) -> Optional[Dict]:
+    """
+    Pick one of a word's cached questions (question_type -> question_data).
+
+    A word with videos only hits on a cached video_mc, matching the type
+    get_or_generate_question() would serve.
+
+    Returns:
+        Shuffled copy of the chosen question, or None on a pool miss
+    """
+    if has_videos and 'video_mc' not in cached:
+        question_type = None
+    else:
+        question_type = choose_question_type(has_videos, set(cached))
+    if question_type is None:
+        question_pool_lookups_total.labels(result='miss').inc()
+        return None
+
+    question_pool_lookups_total.labels(result='hit').inc()
+    return shuffle_question_options(copy.deepcopy(cached[question_type]))
+
+
+class QuestionPool:
+    """
+    Bounded, prioritized pre-generation pipeline.
+
+    Tasks are ('user', user_id) look-aheads, which fan out into
+    ('word', (word, learning_lang, native_lang)) tasks at the same priority.
+    submit_*() never blocks: a task already queued is coalesced, one completed
+    within the refresh window is skipped, and a full queue drops the task.
+    """
+
+    def __init__(
+        self,
+        workers: int = QUESTION_POOL_WORKERS,
+        max_queue_size: int = QUESTION_POOL_QUEUE_SIZE,
+        lookahead: int = QUESTION_POOL_LOOKAHEAD,
+        refresh_seconds: float = QUESTION_POOL_REFRESH_SECONDS
+    ):
+        self.workers = workers
+        self.lookahead = lookahead
+        self.dropped = 0
+
+        self._queue = queue.PriorityQueue(maxsize=max_queue_size)
+        self._seq = itertools.count()
+        self._pending = set()
+        self._recent = TTLCache(max_size=max(max_queue_size, 1) * 5, ttl=refresh_seconds)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+
+    def submit_user(self, user_id: str, priority: int = PRIORITY_SWEEP) -> bool:
+        """Queue a look-ahead over the user's upcoming words."""
+        return self._submit(priority, 'user', str(user_id))
+
+    def submit_word(self, word: str, learning_lang: str, native_lang: str, priority: int = PRIORITY_SWEEP) -> bool:
+        """Queue pre-generation for one word."""
+        return self._submit(priority, 'word', (word, learning_lang, native_lang))
+
+    def join(self):
+        """Block until every queued task has been processed (used by tests and scripts)."""
+        self._queue.join()
+
+    def _submit(self, priority: int, kind: str, payload) -> bool:
+        if self.workers <= 0:
+            return False
+        key = (kind, payload)
+        with self._lock:
+            if key in self._pending or self._recent.get(key):
+                return False
+            try:
+                self._queue.put_nowait((priority, next(self._seq), kind, payload))
+            except queue.Full:
+                self.dropped += 1
+                question_pool_tasks_total.labels(kind=kind, result='dropped').inc()
+                return False
+            self._pending.add(key)
+            question_pool_queue_depth.set(self._queue.qsize())
+        self._ensure_started()
+        return True
+
+    def _ensure_started(self):
+        # Threads do not survive fork(), so a forked worker starts its own pool
+        if self._pid == os.getpid() and self._threads:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._threads:
+                return
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, daemon=True, name=f"QuestionPool-{i}")
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _run(self):
+        while True:
+            priority, _, kind, payload = self._queue.get()
+            key = (kind, payload)
+            question_pool_queue_depth.set(self._queue.qsize())
+            try:
+                if kind == 'user':
+                    for word, learning_lang, native_lang in look_ahead_words(payload, self.lookahead):
+                        self.submit_word(word, learning_lang, native_lang, priority)
+                else:
+                    prepare_word(*payload)
+                self._recent.set(key, True)
+                question_pool_tasks_total.labels(kind=kind, result='done').inc()
+            except Exception as e:
+                question_pool_tasks_total.labels(kind=kind, result='error').inc()
+                logger.error(f"Question pool {kind} task failed for {payload}: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+                self._queue.task_done()
+
+
+question_pool = QuestionPool()
+
+
+def sweep_active_users(window_hours: int = QUESTION_POOL_ACTIVE_WINDOW_HOURS) -> int:
+    """Queue a background look-ahead for every user who reviewed recently; returns users queued."""
+    rows = db_fetch_all("""
+        SELECT DISTINCT user_id
+        FROM reviews
+        WHERE reviewed_at >= NOW() - make_interval(hours => %s)
+    """, (window_hours,))
+    queued = sum(1 for row in rows if question_pool.submit_user(row['user_id'], PRIORITY_SWEEP))
+    logger.info(f"Question pool sweep: {queued}/{len(rows)} active users queued")
+    return queued
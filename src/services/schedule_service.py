@@ -5,6 +5,7 @@ This module provides functions to:
 - Calculate future review schedules
 - Generate study schedules
 - Manage timezone-aware date calculations
+- Memoize computed schedules per user (see get_schedule_snapshot)
 """
 
 from datetime import datetime, timedelta
@@ -15,15 +16,26 @@ import os
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.spaced_repetition_service import get_next_review_date_new
-from utils.database import get_db_connection
+from services.spaced_repetition_service import project_review_dates
+from utils.database import get_db_connection, db_fetch_one, db_execute
+from utils.cache import TTLCache, SingleFlight
+from middleware.metrics import cache_requests_total
 import pytz
+import json
 from datetime import date
-from typing import Dict, Set, Callable, List as ListType
+from typing import Any, Dict, Set, Callable, List as ListType
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Computed schedule snapshots (see get_user_snapshot)
+SCHEDULE_CACHE_SIZE = int(os.getenv('SCHEDULE_CACHE_SIZE', '5000'))
+SCHEDULE_CACHE_TTL = float(os.getenv('SCHEDULE_CACHE_TTL', '3600'))
+SCHEDULE_SNAPSHOT_STORE = os.getenv('SCHEDULE_SNAPSHOT_STORE', 'memory')  # 'memory' or 'postgres'
+
+_snapshot_cache = TTLCache(max_size=SCHEDULE_CACHE_SIZE, ttl=SCHEDULE_CACHE_TTL)
+_snapshot_flight = SingleFlight()
+
 
 def fetch_schedule_data(user_id: str, test_type: str, user_tz: str, today: date) -> Dict:
     """
@@ -71,16 +83,8 @@ def fetch_schedule_data(user_id: str, test_type: str, user_tz: str, today: date)
         """, (user_id,))
         all_saved_words = {row['word'] for row in cur.fetchall()}
 
-        # Build saved_words_with_reviews
-        saved_words_with_reviews = {}
-        for word, info in saved_words_map.items():
-            reviews = get_word_review_history(info['id'], exclude_date=None, timezone=user_tz)
-            saved_words_with_reviews[word] = {
-                'id': info['id'],
-                'created_at': info['created_at'],
-                'reviews': reviews,
-                'is_known': info['is_known']
-            }
+        # Build saved_words_with_reviews (one query for every word's history)
+        saved_words_with_reviews = build_saved_words_with_reviews(saved_words_map)
 
         # Get words saved/reviewed today
         words_saved_today = get_words_saved_on_date(user_id, today, user_tz)
@@ -100,6 +104,147 @@ def fetch_schedule_data(user_id: str, test_type: str, user_tz: str, today: date)
 
 
 
+def calculate_user_schedule(user_id: str, test_type: str, target_end_date: date,
+                            user_tz: str, today: date) -> Dict:
+    """
+    Fetch the user's data and run calc_schedule() on it.
+
+    Returns:
+        calc_schedule() result: {'daily_schedules': {...}, 'metadata': {...}}
+    """
+    schedule_data = fetch_schedule_data(user_id, test_type, user_tz, today)
+    return calc_schedule(
+        today=today,
+        target_end_date=target_end_date,
+        all_test_words=schedule_data['all_test_words'],
+        saved_words_with_reviews=schedule_data['saved_words_with_reviews'],
+        words_saved_today=schedule_data['words_saved_today'],
+        words_reviewed_today=schedule_data['words_reviewed_today'],
+        get_schedule_fn=get_schedule,
+        all_saved_words=schedule_data['all_saved_words']
+    )
+
+
+def get_schedule_snapshot(user_id: str, test_type: str, target_end_date: date,
+                          user_tz: str, today: date, schedule_version: int) -> Dict:
+    """
+    Memoized calculate_user_schedule().
+
+    Keyed by (user_id, test_type, target_end_date, today) at the user's current
+    schedule_version, so back-to-back schedule reads compute it once.
+
+    Args:
+        schedule_version: user_preferences.schedule_version, read by the caller
+            before the snapshot is requested
+
+    Returns:
+        calc_schedule() result; shared between callers and must not be mutated
+    """
+    return get_user_snapshot(
+        user_id,
+        schedule_version,
+        'schedule',
+        (test_type, target_end_date.isoformat(), today.isoformat()),
+        lambda: calculate_user_schedule(user_id, test_type, target_end_date, user_tz, today)
+    )
+
+
+def get_user_snapshot(user_id: str, schedule_version: int, kind: str, params: tuple,
+                      compute: Callable[[], Any]) -> Any:
+    """
+    Return a per-user value derived from schedule inputs, computing it at most
+    once per (user_id, schedule_version, kind, params).
+
+    user_preferences.schedule_version is bumped by database triggers whenever
+    reviews, saved words, test settings, target date or timezone change, so
+    once a caller has read the new version no process serves the old entry.
+    Entries live in a per-process LRU (SCHEDULE_CACHE_SIZE entries, expiring
+    after SCHEDULE_CACHE_TTL seconds); with SCHEDULE_SNAPSHOT_STORE=postgres
+    misses also consult the schedule_snapshots table, so one gunicorn worker's
+    computation is reused by the others. Concurrent misses are coalesced.
+
+    Args:
+        user_id: UUID of the user
+        schedule_version: user_preferences.schedule_version read by the caller
+        kind: Snapshot family, e.g. 'schedule' or 'test_progress'
+        params: Remaining key parts (must be str() stable)
+        compute: Zero-argument function producing a JSON-serializable value
+
+    Returns:
+        The cached or freshly computed value; must not be mutated
+    """
+    key = (user_id, schedule_version, kind) + tuple(params)
+
+    value = _snapshot_cache.get(key)
+    if value is not None:
+        cache_requests_total.labels(cache='schedule', result='hit').inc()
+        return value
+
+    def load():
+        if SCHEDULE_SNAPSHOT_STORE == 'postgres':
+            stored = _load_stored_snapshot(user_id, schedule_version, kind, params)
+            if stored is not None:
+                return stored, True
+        computed = compute()
+        if SCHEDULE_SNAPSHOT_STORE == 'postgres':
+            _store_snapshot(user_id, schedule_version, kind, params, computed)
+        return computed, False
+
+    (value, from_store), shared = _snapshot_flight.do(key, load)
+    if shared:
+        result = 'coalesced'
+    else:
+        result = 'store_hit' if from_store else 'miss'
+        _snapshot_cache.set(key, value)
+    cache_requests_total.labels(cache='schedule', result=result).inc()
+    return value
+
+
+def invalidate_user_snapshots(user_id: str) -> int:
+    """
+    Drop this process's cached snapshots for a user.
+
+    Correctness does not depend on this (the schedule_version bump does that
+    for every process); it releases entries a write has just made stale.
+
+    Returns:
+        Number of entries removed
+    """
+    return _snapshot_cache.delete_where(lambda key: key[0] == user_id)
+
+
+def _snapshot_params(params: tuple) -> str:
+    return '|'.join(str(p) for p in params)
+
+
+def _load_stored_snapshot(user_id: str, schedule_version: int, kind: str, params: tuple):
+    try:
+        row = db_fetch_one("""
+            SELECT payload FROM schedule_snapshots
+            WHERE user_id = %s AND kind = %s AND params = %s AND schedule_version = %s
+        """, (user_id, kind, _snapshot_params(params), schedule_version))
+        return row['payload'] if row else None
+    except Exception as e:
+        logger.warning(f"Could not read stored schedule snapshot for {user_id}: {e}")
+        return None
+
+
+def _store_snapshot(user_id: str, schedule_version: int, kind: str, params: tuple, value):
+    try:
+        db_execute("""
+            INSERT INTO schedule_snapshots (user_id, kind, params, schedule_version, payload, computed_at)
+            VALUES (%s, %s, %s, %s, %s::jsonb, NOW())
+            ON CONFLICT (user_id, kind) DO UPDATE
+            SET params = EXCLUDED.params,
+                schedule_version = EXCLUDED.schedule_version,
+                payload = EXCLUDED.payload,
+                computed_at = EXCLUDED.computed_at
+            WHERE schedule_snapshots.schedule_version <= EXCLUDED.schedule_version
+        """, (user_id, kind, _snapshot_params(params), schedule_version, json.dumps(value)), commit=True)
+    except Exception as e:
+        logger.warning(f"Could not store schedule snapshot for {user_id}: {e}")
+
+
 def calc_schedule_v2(    today: date,
     target_end_date: date,
     all_test_words: Set[str],
@@ -680,11 +825,77 @@ def get_word_review_history(word_id: int, exclude_date: date = None, timezone: s
         conn.close()
 
 
+def get_review_histories(word_ids: ListType[int]) -> Dict[int, List[Dict]]:
+    """
+    Get complete review histories for many words in a single query.
+
+    Bulk counterpart of get_word_review_history(): one round trip regardless
+    of how many words are requested, instead of one connection per word.
+
+    Args:
+        word_ids: IDs from saved_words table
+
+    Returns:
+        Dictionary mapping word_id -> list of review dictionaries with
+        'reviewed_at' and 'response' keys, sorted by review date ascending.
+        Every requested ID is present; words never reviewed map to [].
+
+    Example:
+        >>> histories = get_review_histories([123, 456])
+        >>> histories[123][0]
+        {'reviewed_at': datetime(2025, 1, 2), 'response': True}
+    """
+    histories = {word_id: [] for word_id in word_ids}
+    if not histories:
+        return histories
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT word_id, reviewed_at, response
+            FROM reviews
+            WHERE word_id = ANY(%s)
+            ORDER BY word_id, reviewed_at ASC, id ASC
+        """, (list(histories),))
+        for r in cur.fetchall():
+            histories[r['word_id']].append(
+                {'reviewed_at': r['reviewed_at'], 'response': r['response']}
+            )
+        return histories
+    finally:
+        cur.close()
+        conn.close()
+
+
+def build_saved_words_with_reviews(saved_words_map: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Attach review histories to the output of get_user_saved_words().
+
+    Args:
+        saved_words_map: Dictionary mapping word -> {id, created_at, is_known}
+
+    Returns:
+        Dictionary mapping word -> {id, created_at, reviews, is_known}, the
+        saved_words_with_reviews shape expected by calc_schedule()
+    """
+    histories = get_review_histories([info['id'] for info in saved_words_map.values()])
+    return {
+        word: {
+            'id': info['id'],
+            'created_at': info['created_at'],
+            'reviews': histories[info['id']],
+            'is_known': info['is_known']
+        }
+        for word, info in saved_words_map.items()
+    }
+
+
 def get_schedule(past_schedule: List[Tuple[datetime, bool]], created_at: datetime) -> List[Tuple[datetime, bool]]:
     """
     Calculate 7 future review dates assuming all future reviews are correct.
 
-    This function uses the existing spaced repetition algorithm (get_next_review_date_new)
+    This function uses the existing spaced repetition algorithm (see project_review_dates)
     to predict when a word should be reviewed next. It assumes the user will get all
     future reviews correct, which gives an optimistic schedule for planning purposes.
 
@@ -706,30 +917,14 @@ def get_schedule(past_schedule: List[Tuple[datetime, bool]], created_at: datetim
         >>> future[0][1]  # All marked as True (assumed correct)
         True
     """
-    # Convert past_schedule format to what get_next_review_date_new expects
+    # Convert past_schedule format to the review-history dicts the algorithm expects
     review_history = [
         {'reviewed_at': dt, 'response': result}
         for dt, result in past_schedule
     ]
 
-    future_schedule = []
-
-    # Generate 7 future review dates
-    for i in range(7):
-        # Calculate next review date based on current history
-        next_date = get_next_review_date_new(review_history, created_at)
-
-        # Add to future schedule (marked as True - assumed correct)
-        future_schedule.append((next_date, True))
-
-        # Add this assumed-correct review to history for next iteration
-        # This simulates the user getting it right and calculates the next interval
-        review_history.append({
-            'reviewed_at': next_date,
-            'response': True
-        })
-
-    return future_schedule
+    # Each predicted date is treated as a correct review feeding the next one
+    return [(next_date, True) for next_date in project_review_dates(review_history, created_at, count=7)]
 
 
 def initiate_schedule(user_id: str, test_type: str, target_end_date: date) -> Dict:
@@ -793,21 +988,11 @@ def initiate_schedule(user_id: str, test_type: str, target_end_date: date) -> Di
         """, (user_id,))
         all_saved_words = {row['word'] for row in cur.fetchall()}
 
-        # Build saved_words_with_reviews by fetching review history for each saved word
+        # Build saved_words_with_reviews with the review history of every saved word,
+        # INCLUDING today's reviews: if a review happened at 9am and the schedule is
+        # generated at 10am, that review should count towards the next review date
         # Note: saved_words_map already excludes words with is_known=TRUE
-        saved_words_with_reviews = {}
-        for word, info in saved_words_map.items():
-            # Get review history for this word, INCLUDING today's reviews
-            # If a review happened at 9am and schedule is generated at 10am,
-            # that review should count towards calculating the next review date
-            reviews = get_word_review_history(info['id'], exclude_date=None, timezone=user_tz)
-
-            saved_words_with_reviews[word] = {
-                'id': info['id'],
-                'created_at': info['created_at'],
-                'reviews': reviews,
-                'is_known': info['is_known']  # Should always be False since we filter at DB level
-            }
+        saved_words_with_reviews = build_saved_words_with_reviews(saved_words_map)
 
         # Get words saved/reviewed today - these should be excluded from tomorrow onwards
         words_saved_today = get_words_saved_on_date(user_id, today, user_tz)
@@ -3,15 +3,35 @@ Spaced Repetition Service - Centralized spaced repetition algorithm
 
 This service contains all spaced repetition logic for calculating retention
 and scheduling reviews based on the exponential decay forgetting curve model.
+
+Retention after n days is the running product of daily decay factors
+e^(-rate(offset + d)) for d = 1..n, where offset is the day count between the
+decay reference point (creation or last failure) and the last review.
+Those products are tabulated once per offset (see _DecayTable), so retention
+is a table lookup and the threshold crossing a binary search, while staying
+bit-identical to multiplying the factors one day at a time.
+
+calculate_retention_batch evaluates many target dates (and
+calculate_retention_for_words many words) in one NumPy pass over the same
+tables, for forgetting curves and other per-day series.
 """
 
+import bisect
 import math
+import threading
+from functools import lru_cache
 from datetime import datetime, timedelta
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
 from config.config import (
     DECAY_RATE_WEEK_1, DECAY_RATE_WEEK_2, DECAY_RATE_WEEK_3_4,
     DECAY_RATE_WEEK_5_8, DECAY_RATE_WEEK_9_PLUS, RETENTION_THRESHOLD
 )
 
+# Safety cap for next-review search (2 years)
+MAX_REVIEW_INTERVAL_DAYS = 730
+
 
 def get_decay_rate(days_since_start_or_failure):
     """
@@ -29,13 +49,77 @@ def get_decay_rate(days_since_start_or_failure):
     elif days_since_start_or_failure < 112:
         return DECAY_RATE_WEEK_9_PLUS
     else:
-        # Continue halving for longer periods
-        period = 112
-        rate = DECAY_RATE_WEEK_9_PLUS
-        while days_since_start_or_failure >= period * 2:
-            period *= 2
-            rate /= 2
-        return rate
+        # Rate halves each time the period doubles past 112 days:
+        # 112-223 -> rate, 224-447 -> rate/2, 448-895 -> rate/4, ...
+        # Halving is exact in binary floating point, so ldexp matches repeated division
+        halvings = (days_since_start_or_failure // 112).bit_length() - 1
+        return math.ldexp(DECAY_RATE_WEEK_9_PLUS, -halvings)
+
+
+@lru_cache(maxsize=64)
+def _daily_decay_factor(rate):
+    return math.exp(-rate)
+
+
+class _DecayTable:
+    """
+    Retention curve for one decay offset.
+
+    retention[n] is the retention n days after a review (or creation) when
+    that starting point was `offset` days after the decay reference point.
+    The table grows on demand by continuing the same sequential product.
+    """
+
+    def __init__(self, offset):
+        self.offset = offset
+        self.retention = [1.0]
+        self._array = None
+        self._lock = threading.Lock()
+
+    def _extend_to(self, days):
+        with self._lock:
+            retention = self.retention
+            value = retention[-1]
+            for day in range(len(retention), days + 1):
+                value = value * _daily_decay_factor(get_decay_rate(self.offset + day))
+                retention.append(value)
+
+    def retention_after(self, days):
+        """Retention after `days` full days of decay."""
+        if days <= 0:
+            return 1.0
+        if days >= len(self.retention):
+            self._extend_to(days)
+        return self.retention[days]
+
+    def as_array(self, max_days):
+        """The table as a float64 array covering at least 0..max_days."""
+        if max_days >= len(self.retention):
+            self._extend_to(max_days)
+        array = self._array
+        if array is None or len(array) <= max_days:
+            array = np.array(self.retention, dtype=np.float64)
+            self._array = array
+        return array
+
+    def days_until(self, threshold, max_days):
+        """
+        First day in 1..max_days on which retention <= threshold, or None.
+        Retention never increases, so this is a binary search over the table.
+        """
+        if max_days >= len(self.retention):
+            self._extend_to(max_days)
+        day = bisect.bisect_left(self.retention, -threshold, 1, max_days + 1, key=lambda r: -r)
+        return day if day <= max_days else None
+
+
+@lru_cache(maxsize=4096)
+def _decay_table(offset):
+    return _DecayTable(offset)
+
+
+def _retention_after(days, offset):
+    return _decay_table(offset).retention_after(days)
 
 
 def calculate_retention(review_history, target_date, created_at):
@@ -69,17 +153,8 @@ def calculate_retention(review_history, target_date, created_at):
         if days_since_creation == 0:
             return 1.0  # 100% on creation day
 
-        # Calculate retention by applying decay cumulatively day by day
-        retention = 1.0  # Start at 100% on creation day
-
-        for day in range(1, days_since_creation + 1):
-            current_day_date = created_at + timedelta(days=day)
-            # Calculate days since creation for this day's decay rate
-            days_since_start = (current_day_date - created_at).days
-            daily_decay_rate = get_decay_rate(days_since_start)
-
-            # Apply daily decay: retention = retention * e^(-daily_rate)
-            retention = retention * math.exp(-daily_decay_rate)
+        # Cumulative decay from creation (decay reference point is creation itself)
+        retention = _retention_after(days_since_creation, 0)
 
         return max(0.0, min(1.0, retention))
 
@@ -116,17 +191,10 @@ def calculate_retention(review_history, target_date, created_at):
         if target_date.date() == last_review_date.date():
             return 1.0
 
-        # Calculate retention by applying decay cumulatively day by day
-        retention = 1.0  # Start at 100% after review
-
-        for day in range(1, days_since_review + 1):
-            current_day_date = last_review_date + timedelta(days=day)
-            # Calculate days since last failure for this day's decay rate
-            days_since_failure = (current_day_date - last_failure_date).days
-            daily_decay_rate = get_decay_rate(days_since_failure)
-
-            # Apply daily decay: retention = retention * e^(-daily_rate)
-            retention = retention * math.exp(-daily_decay_rate)
+        # Cumulative decay from the last review; the decay rate on each day
+        # depends on days since last failure = offset + day
+        offset = (last_review_date - last_failure_date).days
+        retention = _retention_after(days_since_review, offset)
 
         return max(0.0, min(1.0, retention))
     else:
@@ -137,17 +205,8 @@ def calculate_retention(review_history, target_date, created_at):
         if target_date.date() == created_at.date():
             return 1.0
 
-        # Calculate retention by applying decay cumulatively day by day
-        retention = 1.0  # Start at 100% on creation day
-
-        for day in range(1, days_since_creation + 1):
-            current_day_date = created_at + timedelta(days=day)
-            # Calculate days since creation for this day's decay rate
-            days_since_start = (current_day_date - created_at).days
-            daily_decay_rate = get_decay_rate(days_since_start)
-
-            # Apply daily decay: retention = retention * e^(-daily_rate)
-            retention = retention * math.exp(-daily_decay_rate)
+        # Cumulative decay from creation (decay reference point is creation itself)
+        retention = _retention_after(days_since_creation, 0)
 
         return max(0.0, min(1.0, retention))
 
@@ -183,24 +242,160 @@ def get_next_review_date_new(review_history, created_at):
         start_date = created_at
         last_failure_date = created_at
 
-    # Simulate retention decay day by day using same logic as calculate_retention
-    current_date = start_date
-    retention = 1.0  # Start at 100% after last review/creation
-    max_days = 730  # Safety cap at 2 years
+    # Binary-search the same decay curve calculate_retention uses for the
+    # first day retention drops to the configured threshold
+    offset = (start_date - last_failure_date).days
+    day = _decay_table(offset).days_until(RETENTION_THRESHOLD, MAX_REVIEW_INTERVAL_DAYS)
+    if day is not None:
+        return start_date + timedelta(days=day)
 
-    for day in range(1, max_days + 1):
-        current_date = start_date + timedelta(days=day)
+    # If retention never drops below 40% in 2 years, return max date
+    return start_date + timedelta(days=MAX_REVIEW_INTERVAL_DAYS)
 
-        # Calculate days since last failure for decay rate determination
-        days_since_failure = (current_date - last_failure_date).days
-        daily_decay_rate = get_decay_rate(days_since_failure)
 
-        # Apply daily decay: retention = retention * e^(-daily_rate)
-        retention = retention * math.exp(-daily_decay_rate)
+def project_review_dates(review_history, created_at, count=7):
+    """
+    Predict the next `count` review dates assuming every future review succeeds.
 
-        # Check if retention dropped below the configured threshold
-        if retention <= RETENTION_THRESHOLD:
-            return current_date
+    Equivalent to calling get_next_review_date_new repeatedly and appending
+    each predicted date as a correct review, without re-sorting the history
+    on every step.
 
-    # If retention never drops below 40% in 2 years, return max date
-    return start_date + timedelta(days=max_days)
+    Returns:
+        List of `count` datetimes in ascending order
+    """
+    if not hasattr(created_at, 'hour'):
+        created_at = datetime.combine(created_at, datetime.min.time())
+
+    start_date = created_at
+    last_failure_date = created_at
+    if review_history:
+        sorted_reviews = sorted(review_history, key=lambda x: x['reviewed_at'])
+        start_date = _as_datetime(sorted_reviews[-1]['reviewed_at'], datetime.min.time())
+        for review in sorted_reviews:
+            if not review['response']:
+                last_failure_date = _as_datetime(review['reviewed_at'], datetime.min.time())
+
+    projected = []
+    for _ in range(count):
+        # Successful reviews never move the failure reference point
+        offset = (start_date - last_failure_date).days
+        day = _decay_table(offset).days_until(RETENTION_THRESHOLD, MAX_REVIEW_INTERVAL_DAYS)
+        start_date = start_date + timedelta(days=day if day is not None else MAX_REVIEW_INTERVAL_DAYS)
+        projected.append(start_date)
+    return projected
+
+
+def _as_datetime(value, default_time):
+    if not hasattr(value, 'hour'):
+        return datetime.combine(value, default_time)
+    return value
+
+
+_ONE_DAY = np.timedelta64(1, 'D')
+_END_OF_DAY = np.timedelta64(1, 'D') - np.timedelta64(1, 'us')
+
+
+def _target_array(target_dates) -> np.ndarray:
+    """Target dates as datetime64[us], with whole days mapped to end of day."""
+    if isinstance(target_dates, np.ndarray) and np.issubdtype(target_dates.dtype, np.datetime64):
+        if np.datetime_data(target_dates.dtype)[0] == 'D':
+            return target_dates.astype('datetime64[us]') + _END_OF_DAY
+        return target_dates.astype('datetime64[us]')
+    return np.array(
+        [_as_datetime(t, datetime.max.time()) for t in target_dates],
+        dtype='datetime64[us]'
+    )
+
+
+def calculate_retention_batch(review_history, target_dates: Sequence, created_at) -> np.ndarray:
+    """
+    Retention of one word at many target dates in a single vectorized pass.
+
+    Element-for-element identical to calling calculate_retention(review_history,
+    target, created_at) for each target, but the history is sorted once and
+    each target is a binary search plus a table lookup.
+
+    Args:
+        review_history: List of {'reviewed_at': datetime|date, 'response': bool}
+        target_dates: Dates or datetimes (dates mean end of that day), or a
+            numpy datetime64 array - datetime64[D] also means end of day and
+            skips per-element conversion (e.g. np.arange over a date range)
+        created_at: When the word was saved
+
+    Returns:
+        float64 array of retentions (0.0-1.0), one per target date
+    """
+    created_at = _as_datetime(created_at, datetime.min.time())
+    targets = _target_array(target_dates)
+    if targets.size == 0:
+        return np.empty(0, dtype=np.float64)
+    created = np.datetime64(created_at, 'us')
+
+    # Per review: timestamp and days between its decay reference point
+    # (most recent failure so far, or creation) and the review itself
+    sorted_reviews = sorted(review_history or [], key=lambda x: x['reviewed_at'])
+    review_times = []
+    review_offsets = []
+    last_failure_date = created_at
+    for review in sorted_reviews:
+        review_date = _as_datetime(review['reviewed_at'], datetime.min.time())
+        if not review['response']:
+            last_failure_date = review_date
+        review_times.append(review_date)
+        review_offsets.append((review_date - last_failure_date).days)
+    reviews = np.array(review_times, dtype='datetime64[us]')
+    offsets_by_review = np.array(review_offsets, dtype=np.int64)
+
+    # Index of the last review at or before each target (-1 = none yet)
+    last = np.searchsorted(reviews, targets, side='right') - 1
+    has_review = last >= 0
+    last_clipped = np.maximum(last, 0)
+
+    if reviews.size:
+        start = np.where(has_review, reviews[last_clipped], created)
+        offsets = np.where(has_review, offsets_by_review[last_clipped], 0)
+    else:
+        start = np.full(targets.shape, created)
+        offsets = np.zeros(targets.shape, dtype=np.int64)
+    days = np.maximum((targets - start) // _ONE_DAY, 0).astype(np.int64)
+
+    # One table gather per distinct decay offset (at most one per review + 1)
+    retention = np.empty(targets.shape, dtype=np.float64)
+    unique_offsets, group = np.unique(offsets, return_inverse=True)
+    for index, offset in enumerate(unique_offsets):
+        mask = group == index
+        group_days = days[mask]
+        table = _decay_table(int(offset)).as_array(int(group_days.max()))
+        retention[mask] = table[group_days]
+    np.clip(retention, 0.0, 1.0, out=retention)
+
+    # Same-day and before-creation rules, in calculate_retention's precedence
+    target_days = targets.astype('datetime64[D]')
+    retention[has_review & (target_days == start.astype('datetime64[D]'))] = 1.0
+    retention[target_days == created.astype('datetime64[D]')] = 1.0
+    retention[targets < created] = 0.0
+    return retention
+
+
+def calculate_retention_for_words(
+    words: Iterable[Tuple[list, datetime]],
+    target_dates: Sequence
+) -> np.ndarray:
+    """
+    Retention of many words at the same target dates.
+
+    Args:
+        words: Iterable of (review_history, created_at) pairs
+        target_dates: Dates or datetimes shared by every word
+
+    Returns:
+        float64 array of shape (len(words), len(target_dates))
+    """
+    rows: List[np.ndarray] = [
+        calculate_retention_batch(review_history, target_dates, created_at)
+        for review_history, created_at in words
+    ]
+    if not rows:
+        return np.empty((0, len(target_dates)), dtype=np.float64)
+    return np.vstack(rows)
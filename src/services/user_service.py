@@ -40,7 +40,8 @@ def generate_user_profile() -> tuple[str, str]:
                     }
                 }
             },
-            max_tokens=150
+            max_tokens=150,
+            use_cache=False  # the same prompt must give every user a different profile
         )
 
         if not content:
@@ -2,6 +2,7 @@ import os
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from config.config import SUPPORTED_LANGUAGES
+from utils.db_pool import get_pool
 from contextlib import contextmanager
 from typing import Optional, List, Dict, Any, Union
 import logging
@@ -14,9 +15,20 @@ def validate_language(lang: str) -> bool:
     """Validate if language code is supported"""
     return lang in SUPPORTED_LANGUAGES
 
-def get_db_connection():
+def _connect():
     return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
 
+def get_db_connection():
+    """Check out a connection from the process-wide pool.
+
+    The returned connection behaves like a psycopg2 connection; calling
+    close() returns it to the pool instead of disconnecting.
+
+    Raises:
+        PoolTimeoutError: If no connection frees up within DB_POOL_TIMEOUT
+    """
+    return get_pool(_connect).getconn()
+
 @contextmanager
 def db_cursor(commit: bool = False):
     """Context manager for database operations with automatic resource cleanup.
@@ -0,0 +1,288 @@
+"""
+PostgreSQL Connection Pool
+
+Process-wide, thread-safe pool behind utils.database.get_db_connection();
+close() on a pooled connection rolls back and returns it to the pool.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Callable, List, Optional
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+from middleware.metrics import (
+    db_pool_connections_in_use,
+    db_pool_connections_idle,
+    db_pool_wait_seconds,
+    db_pool_timeouts_total
+)
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '2'))  # Opened eagerly on first use
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '20'))  # Hard cap on open connections
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))  # Seconds to wait for a free connection
+DB_POOL_HEALTHCHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTHCHECK_INTERVAL', '30'))  # Idle seconds before a SELECT 1 ping on checkout (0 = always)
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class PooledConnection:
+    """
+    Proxy around a raw psycopg2 connection checked out from a ConnectionPool.
+
+    Everything except close() is delegated to the underlying connection.
+    close() (or garbage collection of a leaked proxy) hands the connection
+    back to the pool exactly once.
+    """
+
+    _released = True  # until __init__ completes, so __del__ is a no-op
+
+    def __init__(self, pool: 'ConnectionPool', conn):
+        self._pool = pool
+        self._conn = conn
+        self._released = False
+
+    def __getattr__(self, name):
+        if self._released:
+            raise psycopg2.InterfaceError('connection already returned to pool')
+        return getattr(self._conn, name)
+
+    @property
+    def closed(self) -> int:
+        return 1 if self._released else self._conn.closed
+
+    def close(self):
+        """Return the connection to the pool (idempotent)."""
+        if self._released:
+            return
+        self._released = True
+        self._pool.putconn(self._conn)
+
+    def __enter__(self):
+        # Same semantics as psycopg2: the with-block wraps a transaction,
+        # it does not close the connection
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    def __del__(self):
+        # Handlers that return early on an exception path never call close();
+        # make sure the slot is not lost for the lifetime of the process
+        try:
+            if not self._released:
+                self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Bounded connection pool with blocking checkout.
+
+    Args:
+        connect: Zero-argument factory returning a new DB-API connection
+        min_size: Connections opened when the pool is created
+        max_size: Maximum number of connections open at once
+        timeout: Seconds getconn() waits for a free connection before raising
+        healthcheck_interval: Idle seconds after which a connection is pinged
+            before being handed out
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], object],
+        min_size: int = DB_POOL_MIN_SIZE,
+        max_size: int = DB_POOL_MAX_SIZE,
+        timeout: float = DB_POOL_TIMEOUT,
+        healthcheck_interval: float = DB_POOL_HEALTHCHECK_INTERVAL
+    ):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.timeout = timeout
+        self.healthcheck_interval = healthcheck_interval
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: List[tuple] = []  # (conn, returned_at), most recent last
+        self._in_use = 0
+        self._closed = False
+
+        for _ in range(self.min_size):
+            try:
+                self._idle.append((self._connect(), time.monotonic()))
+            except Exception as e:
+                logger.warning(f"Could not pre-open pool connection: {e}")
+                break
+        self._update_gauges()
+
+    @property
+    def size(self) -> int:
+        """Total connections currently open (idle + checked out)."""
+        return len(self._idle) + self._in_use
+
+    def getconn(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Check out a healthy connection, waiting up to `timeout` seconds.
+
+        Raises:
+            PoolTimeoutError: If the pool stays exhausted for the whole timeout
+            PoolError: If the pool has been closed
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        conn = None
+        idle_since = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError('connection pool is closed')
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    break
+                if self.size < self.max_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    db_pool_timeouts_total.inc()
+                    db_pool_wait_seconds.observe(time.monotonic() - start)
+                    raise PoolTimeoutError(
+                        f'no database connection available after {timeout:.1f}s '
+                        f'(max_size={self.max_size})'
+                    )
+                self._cond.wait(remaining)
+            # Reserve the slot before doing any I/O outside the lock
+            self._in_use += 1
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif not self._is_healthy(conn, idle_since):
+                self._discard(conn)
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            self._update_gauges()
+            raise
+
+        db_pool_wait_seconds.observe(time.monotonic() - start)
+        self._update_gauges()
+        return PooledConnection(self, conn)
+
+    def putconn(self, conn):
+        """Return a raw connection to the pool, resetting any open transaction."""
+        reusable = self._reset(conn)
+        with self._cond:
+            self._in_use -= 1
+            keep = reusable and not self._closed
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if not keep:
+            self._discard(conn)
+        self._update_gauges()
+
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+        self._update_gauges()
+
+    def _is_healthy(self, conn, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.healthcheck_interval:
+            return True
+        try:
+            cur = conn.cursor()
+            try:
+                cur.execute('SELECT 1')
+            finally:
+                cur.close()
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.info(f"Discarding stale pooled connection: {e}")
+            return False
+
+    @staticmethod
+    def _reset(conn) -> bool:
+        """Roll back leftover transaction state; returns False if conn is unusable."""
+        try:
+            if conn.closed:
+                return False
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            if conn.autocommit:
+                conn.autocommit = False
+            return True
+        except Exception as e:
+            logger.info(f"Pooled connection failed reset, discarding: {e}")
+            return False
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _update_gauges(self):
+        db_pool_connections_in_use.set(self._in_use)
+        db_pool_connections_idle.set(len(self._idle))
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(connect: Callable[[], object]) -> ConnectionPool:
+    """
+    Return the process-wide pool, creating it on first use.
+
+    A pool inherited across fork() is abandoned (not closed - the sockets are
+    shared with the parent) and a fresh one is built for the child process.
+    """
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool(connect)
+            logger.info(
+                f"Database pool created (pid={_pool.pid}, min={_pool.min_size}, "
+                f"max={_pool.max_size}, timeout={_pool.timeout}s)"
+            )
+        return _pool
+
+
+def close_pool():
+    """Close the current process's pool; the next get_pool() builds a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None and pool.pid == os.getpid():
+        pool.closeall()
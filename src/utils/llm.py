@@ -3,22 +3,34 @@ LLM Completion Utility
 
 Centralized utility for making LLM completion API calls.
 Supports multiple providers: OpenAI (gpt-5-nano, gpt-4o-mini) and Groq (llama-4-scout).
+
+Provider clients are shared per process with keep-alive connections, and
+every call passes a per provider/model limiter and circuit breaker
+(utils/llm_guard.py); failed Groq calls retry on their OpenAI fallback.
 """
 
 import logging
 import os
+import threading
 import time
+import httpx
 import openai
 from typing import Dict, List, Any, Optional
 from middleware.metrics import (
     llm_calls_total,
     llm_request_duration_seconds,
+    llm_generation_duration_seconds,
+    llm_connect_duration_seconds,
+    llm_http_requests_total,
     llm_tokens_total,
     llm_cost_usd_total,
     llm_errors_total,
     estimate_cost
 )
 from config.config import GROQ_TO_OPENAI_FALLBACK
+from utils.llm_cache import get_response_cache, response_cache_key
+from utils.llm_guard import get_llm_guard, classify_failure, LLMUnavailableError, SUCCESS, ERROR
+from utils.llm_hedge import hedged_call, response_validator
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +42,100 @@ except ImportError:
     GROQ_AVAILABLE = False
     logger.warning("Groq SDK not installed. Install with: pip install groq")
 
+LLM_TIMEOUTS = {  # Seconds to wait for a response, per provider
+    "openai": float(os.getenv('LLM_TIMEOUT_OPENAI', '120')),
+    "groq": float(os.getenv('LLM_TIMEOUT_GROQ', '30')),
+}
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))  # Seconds to open a connection
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', '20'))  # Pooled connections per provider per process
+LLM_KEEPALIVE_EXPIRY = float(os.getenv('LLM_KEEPALIVE_EXPIRY', '60'))  # Seconds an idle connection stays open
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '2'))  # SDK retries on connection errors and 429/5xx
+
+_clients: Dict[str, Any] = {}
+_clients_pid = None
+_clients_lock = threading.Lock()
+
+# Connection setup seconds spent by the current thread's call, and whether it
+# was answered from the response cache (see llm_completion)
+_call_timing = threading.local()
+
+_CONNECT_EVENTS = ('connection.connect_tcp', 'connection.start_tls')
+
+
+class _ConnectionTrace:
+    """httpcore trace callback timing the TCP and TLS setup of one request."""
+
+    def __init__(self):
+        self.opened = False
+        self.seconds = 0.0
+        self._started = {}
+
+    def __call__(self, event: str, info: Dict[str, Any]) -> None:
+        step, _, phase = event.rpartition('.')
+        if step not in _CONNECT_EVENTS:
+            return
+        if phase == 'started':
+            self.opened = True
+            self._started[step] = time.perf_counter()
+        elif step in self._started:
+            self.seconds += time.perf_counter() - self._started.pop(step)
+
+
+def _connection_hooks(provider: str) -> Dict[str, list]:
+    def on_request(request: httpx.Request) -> None:
+        request.extensions['trace'] = _ConnectionTrace()
+
+    def on_response(response: httpx.Response) -> None:
+        trace = response.request.extensions.get('trace')
+        if not isinstance(trace, _ConnectionTrace):
+            return
+        if trace.opened:
+            llm_connect_duration_seconds.labels(provider=provider).observe(trace.seconds)
+            _call_timing.connect_seconds = getattr(_call_timing, 'connect_seconds', 0.0) + trace.seconds
+        llm_http_requests_total.labels(provider=provider, connection='new' if trace.opened else 'reused').inc()
+
+    return {'request': [on_request], 'response': [on_response]}
+
+
+def _create_client(provider: str):
+    timeout = httpx.Timeout(LLM_TIMEOUTS[provider], connect=LLM_CONNECT_TIMEOUT)
+    http_client = httpx.Client(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+        event_hooks=_connection_hooks(provider),
+    )
+    if provider == "groq":
+        return Groq(api_key=os.getenv("GROQ_API_KEY"), http_client=http_client,
+                    timeout=timeout, max_retries=LLM_MAX_RETRIES)
+    return openai.OpenAI(http_client=http_client, timeout=timeout, max_retries=LLM_MAX_RETRIES)
+
+
+def get_llm_client(provider: str = "openai"):
+    """
+    Process-wide client for a provider ('openai' or 'groq'), created on first use.
+
+    Clients are thread-safe and share one keep-alive connection pool each.
+    They are recreated after a fork so processes never share sockets.
+    """
+    global _clients_pid
+    if _clients_pid == os.getpid():
+        client = _clients.get(provider)
+        if client is not None:
+            return client
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+        if provider not in _clients:
+            _clients[provider] = _create_client(provider)
+            logger.info(f"Created {provider} client (timeout={LLM_TIMEOUTS[provider]}s, "
+                        f"max_connections={LLM_MAX_CONNECTIONS})")
+        return _clients[provider]
+
 # Model to provider mapping - easily extensible
 MODEL_PROVIDER_MAP = {
     # Groq models
@@ -64,6 +170,31 @@ def get_fallback_model(groq_model: str) -> Optional[str]:
     return GROQ_TO_OPENAI_FALLBACK.get(groq_model)
 
 
+def _complete_with_fallback(model_name: str, **kwargs) -> Optional[str]:
+    """Retry a failed or rejected Groq call once on its OpenAI fallback model."""
+    fallback_model = get_fallback_model(model_name)
+    if not fallback_model:
+        logger.warning(f"Groq over capacity but no fallback configured for {model_name}")
+        return None
+    logger.warning(f"Groq over capacity, falling back from {model_name} to {fallback_model}")
+    return llm_completion(model_name=fallback_model, _is_fallback_attempt=True, **kwargs)
+
+
+def _cached_response(cache, key: str) -> Optional[str]:
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"LLM response cache ({cache.name}) read failed: {e}")
+        return None
+
+
+def _cache_response(cache, key: str, model_name: str, content: str):
+    try:
+        cache.put(key, model_name, content)
+    except Exception as e:
+        logger.warning(f"LLM response cache ({cache.name}) write failed: {e}")
+
+
 def llm_completion(
     messages: List[Dict[str, str]],
     model_name: str,
@@ -71,6 +202,8 @@ def llm_completion(
     temperature: float = 1.0,
     max_tokens: Optional[int] = None,
     max_completion_tokens: Optional[int] = None,
+    use_cache: bool = True,
+    hedge: bool = False,
     _is_fallback_attempt: bool = False
 ) -> Optional[str]:
     """
@@ -88,6 +221,11 @@ def llm_completion(
         temperature: Sampling temperature (default: 1.0)
         max_tokens: (Deprecated) Maximum tokens in response - use max_completion_tokens instead
         max_completion_tokens: Maximum tokens in completion (preferred for newer models)
+        use_cache: Set to False to bypass the response cache (LLM_RESPONSE_CACHE), e.g.
+            for prompts that are expected to produce a different answer every time
+        hedge: For latency-critical calls to a model with a GROQ_TO_OPENAI_FALLBACK
+            entry: if the model has not answered within the hedge delay, also ask
+            the fallback model and return the first valid (schema-conforming) answer
 
     Returns:
         Response content as string, or None if the call fails
@@ -122,6 +260,35 @@ def llm_completion(
     # Start timing for metrics
     start_time = time.time()
     provider = None
+    _call_timing.connect_seconds = 0.0
+    _call_timing.cached = False
+    fallback_kwargs = dict(messages=messages, response_format=response_format, temperature=temperature,
+                           max_tokens=max_tokens, max_completion_tokens=max_completion_tokens,
+                           use_cache=use_cache)
+
+    if hedge and not _is_fallback_attempt and get_provider_for_model(model_name) == "groq":
+        fallback_model = get_fallback_model(model_name)
+        if fallback_model:
+            return hedged_call(
+                model_name,
+                primary=lambda: llm_completion(model_name=model_name, _is_fallback_attempt=True, **fallback_kwargs),
+                fallback=lambda: llm_completion(model_name=fallback_model, _is_fallback_attempt=True, **fallback_kwargs),
+                is_valid=response_validator(response_format),
+                from_cache=lambda: getattr(_call_timing, 'cached', False),
+            )
+
+    # Identical requests are answered from the response cache when one is configured
+    cache = get_response_cache() if use_cache else None
+    if cache is not None:
+        cache_key = response_cache_key(
+            model_name, messages, response_format, temperature,
+            max_completion_tokens if max_completion_tokens is not None else max_tokens
+        )
+        cached = _cached_response(cache, cache_key)
+        if cached is not None:
+            llm_calls_total.labels(provider=get_provider_for_model(model_name), model=model_name, status='cached').inc()
+            _call_timing.cached = True
+            return cached
 
     try:
         # Auto-detect provider based on model name
@@ -135,10 +302,10 @@ def llm_completion(
                 llm_calls_total.labels(provider='groq', model=model_name, status='error').inc()
                 llm_errors_total.labels(provider='groq', model=model_name, error_type='sdk_unavailable').inc()
                 return None
-            client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+            client = get_llm_client("groq")
             logger.debug(f"Auto-detected Groq provider for model={model_name}")
         else:  # default to openai
-            client = openai.OpenAI()
+            client = get_llm_client("openai")
             logger.debug(f"Auto-detected OpenAI provider for model={model_name}")
 
         # Build API call parameters
@@ -160,14 +327,19 @@ def llm_completion(
 
         # Make the API call
         logger.debug(f"Making LLM completion call with provider={provider}, model={model_name}, response_format={response_format is not None}")
-        response = client.chat.completions.create(**params)
+        guard = get_llm_guard(provider, model_name)
+        guard.acquire()
+        try:
+            response = client.chat.completions.create(**params)
+            content = response.choices[0].message.content
+        except Exception as e:
+            guard.release(classify_failure(e))
+            raise
+        guard.release(SUCCESS if content else ERROR)
 
         # Calculate duration
         duration = time.time() - start_time
 
-        # Extract content
-        content = response.choices[0].message.content
-
         if not content:
             logger.error(f"{provider.upper()} returned empty content. Model: {model_name}, Response: {response}")
             # Track as error - empty response
@@ -179,6 +351,8 @@ def llm_completion(
         # Track successful call metrics
         llm_calls_total.labels(provider=provider, model=model_name, status='success').inc()
         llm_request_duration_seconds.labels(provider=provider, model=model_name).observe(duration)
+        llm_generation_duration_seconds.labels(provider=provider, model=model_name).observe(
+            max(duration - _call_timing.connect_seconds, 0.0))
 
         # Track token usage if available
         if hasattr(response, 'usage') and response.usage:
@@ -196,8 +370,19 @@ def llm_completion(
                 llm_cost_usd_total.labels(provider=provider, model=model_name).inc(cost)
                 logger.debug(f"LLM call cost: ${cost:.6f} (provider={provider}, model={model_name}, prompt={prompt_tokens}, completion={completion_tokens})")
 
-        return content.strip()
-
+        content = content.strip()
+        if cache is not None:
+            _cache_response(cache, cache_key, model_name, content)
+        return content
+
+    except LLMUnavailableError as e:
+        # Shed before reaching the provider (breaker open or no free slot)
+        logger.warning(f"LLM call not sent (provider={provider}, model={model_name}): {e}")
+        llm_calls_total.labels(provider=provider, model=model_name, status='rejected').inc()
+        llm_errors_total.labels(provider=provider, model=model_name, error_type=type(e).__name__).inc()
+        if provider == "groq" and not _is_fallback_attempt:
+            return _complete_with_fallback(model_name, **fallback_kwargs)
+        return None
     except openai.APIError as e:
         duration = time.time() - start_time
         error_type = type(e).__name__
@@ -221,25 +406,8 @@ def llm_completion(
             llm_request_duration_seconds.labels(provider=provider, model=model_name).observe(duration)
             llm_errors_total.labels(provider=provider, model=model_name, error_type=error_type).inc()
 
-        # Attempt fallback to OpenAI if this is a Groq over-capacity error
-        if (provider == "groq" and
-            not _is_fallback_attempt):
-
-            fallback_model = get_fallback_model(model_name)
-            if fallback_model:
-                logger.warning(f"Groq over capacity, falling back from {model_name} to {fallback_model}")
-
-                # Retry with OpenAI fallback model (only once)
-                return llm_completion(
-                    messages=messages,
-                    model_name=fallback_model,
-                    response_format=response_format,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    max_completion_tokens=max_completion_tokens,
-                    _is_fallback_attempt=True
-                )
-            else:
-                logger.warning(f"Groq over capacity but no fallback configured for {model_name}")
+        # Attempt fallback to OpenAI if this is a Groq over-capacity error (only once)
+        if provider == "groq" and not _is_fallback_attempt:
+            return _complete_with_fallback(model_name, **fallback_kwargs)
 
         return None
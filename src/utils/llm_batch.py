@@ -0,0 +1,209 @@
+"""
+LLM Batch Backends
+
+Submit many chat completions as one batch (OpenAI Batch API JSONL format) and
+collect the results later, through the provider's Batch API or a local
+stand-in (LLM_BATCH_BACKEND).
+"""
+
+import os
+import json
+import uuid
+import logging
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from utils.llm import llm_completion, get_llm_client, get_provider_for_model
+
+logger = logging.getLogger(__name__)
+
+LLM_BATCH_BACKEND = os.getenv('LLM_BATCH_BACKEND', 'provider').lower()  # 'provider' or 'local'
+LLM_BATCH_PATH = os.getenv('LLM_BATCH_PATH', '/app/llm-batches')  # Local batch files
+LLM_BATCH_LOCAL_WORKERS = int(os.getenv('LLM_BATCH_LOCAL_WORKERS', '4'))  # Concurrent completions per local poll
+LLM_BATCH_COMPLETION_WINDOW = os.getenv('LLM_BATCH_COMPLETION_WINDOW', '24h')  # Provider completion window
+
+BATCH_ENDPOINT = '/v1/chat/completions'
+
+# Provider batch statuses after which no more results will arrive
+# (expired and cancelled batches may still carry partial output)
+FINISHED_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+def batch_request(custom_id: str, model: str, messages: List[Dict[str, str]],
+                  response_format: Optional[Dict[str, Any]] = None, temperature: float = 1.0) -> Dict[str, Any]:
+    """One input line of a batch file."""
+    body = {'model': model, 'messages': messages, 'temperature': temperature}
+    if response_format is not None:
+        body['response_format'] = response_format
+    return {'custom_id': custom_id, 'method': 'POST', 'url': BATCH_ENDPOINT, 'body': body}
+
+
+def batch_output(line: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """(content, usage) of one output line; content is None for failed requests."""
+    response = line.get('response') or {}
+    if line.get('error') or response.get('status_code') != 200:
+        return None, None
+    body = response.get('body') or {}
+    try:
+        content = body['choices'][0]['message']['content']
+    except (KeyError, IndexError, TypeError):
+        return None, None
+    return (content.strip() if content else None), body.get('usage')
+
+
+def _dump_jsonl(lines: List[Dict[str, Any]]) -> bytes:
+    return ''.join(json.dumps(line, ensure_ascii=False) + '\n' for line in lines).encode('utf-8')
+
+
+def _load_jsonl(text: str) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class BatchBackend(ABC):
+    """Interface every backend implements."""
+
+    name = 'base'
+
+    @abstractmethod
+    def submit(self, model: str, requests: List[Dict[str, Any]]) -> str:
+        """Send a batch of batch_request() lines for one model; returns the batch id."""
+
+    @abstractmethod
+    def poll(self, batch_id: str, model: str) -> Optional[List[Dict[str, Any]]]:
+        """Output lines once the batch has finished, None while it is still running."""
+
+
+class ProviderBatchBackend(BatchBackend):
+    """Files + Batches API of the model's provider."""
+
+    name = 'provider'
+
+    def submit(self, model: str, requests: List[Dict[str, Any]]) -> str:
+        client = get_llm_client(get_provider_for_model(model))
+        upload = client.files.create(file=('batch.jsonl', _dump_jsonl(requests)), purpose='batch')
+        batch = client.batches.create(
+            input_file_id=upload.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=LLM_BATCH_COMPLETION_WINDOW,
+        )
+        logger.info(f"Submitted batch {batch.id} ({len(requests)} requests, model={model})")
+        return batch.id
+
+    def poll(self, batch_id: str, model: str) -> Optional[List[Dict[str, Any]]]:
+        client = get_llm_client(get_provider_for_model(model))
+        batch = client.batches.retrieve(batch_id)
+        if batch.status not in FINISHED_STATUSES:
+            return None
+        if batch.status != 'completed':
+            logger.warning(f"Batch {batch_id} finished with status {batch.status}")
+        lines = []
+        # error_file_id holds the lines of requests that failed
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(_load_jsonl(client.files.content(file_id).read().decode('utf-8')))
+        return lines
+
+
+class LocalBatchBackend(BatchBackend):
+    """Batch files on local disk, processed through llm_completion when polled."""
+
+    name = 'local'
+
+    def __init__(self, root: str, workers: int = LLM_BATCH_LOCAL_WORKERS):
+        self.root = root
+        self.workers = workers
+
+    def path(self, batch_id: str, kind: str) -> str:
+        return os.path.join(self.root, f"{batch_id}.{kind}.jsonl")
+
+    def submit(self, model: str, requests: List[Dict[str, Any]]) -> str:
+        batch_id = f"local_{uuid.uuid4().hex}"
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(batch_id, 'input')
+        with open(path + '.tmp', 'wb') as f:
+            f.write(_dump_jsonl(requests))
+        os.replace(path + '.tmp', path)
+        return batch_id
+
+    def poll(self, batch_id: str, model: str) -> Optional[List[Dict[str, Any]]]:
+        with open(self.path(batch_id, 'input'), encoding='utf-8') as f:
+            requests = _load_jsonl(f.read())
+        output_path = self.path(batch_id, 'output')
+        text = self._read_text(output_path)
+        done = {line['custom_id'] for line in self._parse_output(text)}
+        todo = [r for r in requests if r['custom_id'] not in done]
+        if todo:
+            logger.info(f"Running local batch {batch_id}: {len(todo)} of {len(requests)} requests outstanding")
+            with open(output_path, 'a', encoding='utf-8') as out, \
+                    ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='llm-batch') as pool:
+                if text and not text.endswith('\n'):
+                    out.write('\n')  # terminate a line cut short by a crash
+                for line in pool.map(self._run, todo):
+                    out.write(json.dumps(line, ensure_ascii=False) + '\n')
+                    out.flush()
+        return self._parse_output(self._read_text(output_path))
+
+    @staticmethod
+    def _read_text(path: str) -> str:
+        try:
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return ''
+
+    @staticmethod
+    def _parse_output(text: str) -> List[Dict[str, Any]]:
+        # A line cut short by a crash is dropped and its request run again
+        lines = []
+        for raw in text.splitlines():
+            try:
+                lines.append(json.loads(raw))
+            except ValueError:
+                continue
+        return lines
+
+    @staticmethod
+    def _run(request: Dict[str, Any]) -> Dict[str, Any]:
+        body = request['body']
+        content = llm_completion(
+            messages=body['messages'],
+            model_name=body['model'],
+            response_format=body.get('response_format'),
+            temperature=body.get('temperature', 1.0),
+        )
+        if not content:
+            return {'custom_id': request['custom_id'], 'response': None,
+                    'error': {'code': 'completion_failed', 'message': 'LLM completion returned no content'}}
+        return {
+            'custom_id': request['custom_id'],
+            'response': {'status_code': 200, 'body': {
+                'model': body['model'],
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}],
+            }},
+            'error': None,
+        }
+
+
+def create_batch_backend(kind: str = None) -> BatchBackend:
+    """Build the backend named by kind (default: LLM_BATCH_BACKEND)."""
+    kind = (LLM_BATCH_BACKEND if kind is None else kind).lower()
+    if kind == 'provider':
+        return ProviderBatchBackend()
+    if kind == 'local':
+        return LocalBatchBackend(LLM_BATCH_PATH)
+    raise ValueError(f"Unknown LLM_BATCH_BACKEND: {kind}")
+
+
+_batch_backend = None
+_batch_backend_lock = threading.Lock()
+
+
+def get_batch_backend() -> BatchBackend:
+    """Process-wide batch backend."""
+    global _batch_backend
+    if _batch_backend is None:
+        with _batch_backend_lock:
+            if _batch_backend is None:
+                _batch_backend = create_batch_backend()
+    return _batch_backend
@@ -0,0 +1,211 @@
+"""
+LLM Response Cache
+
+Opt-in persistent cache of successful llm_completion responses, keyed by a
+hash of the request, on disk or in Postgres (LLM_RESPONSE_CACHE).
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from utils.database import db_execute, db_insert_returning
+
+logger = logging.getLogger(__name__)
+
+LLM_RESPONSE_CACHE = os.getenv('LLM_RESPONSE_CACHE', '').lower()  # '' (off), 'disk' or 'postgres'
+LLM_RESPONSE_CACHE_PATH = os.getenv('LLM_RESPONSE_CACHE_PATH', '/app/llm-cache')  # Disk entries, sharded as ab/<key>.json
+LLM_RESPONSE_CACHE_TTL = float(os.getenv('LLM_RESPONSE_CACHE_TTL', str(30 * 24 * 3600)))  # Seconds after a write that an entry expires
+LLM_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('LLM_RESPONSE_CACHE_MAX_ENTRIES', '100000'))  # Least recently used entries are evicted beyond this...
+LLM_RESPONSE_CACHE_PRUNE_EVERY = 500  # ...checked every this many writes
+
+
+def response_cache_key(model: str, messages: List[Dict[str, str]], response_format: Optional[Dict[str, Any]],
+                       temperature: float, max_tokens: Optional[int] = None) -> str:
+    """sha256 hex of the parts of a request that determine its response."""
+    payload = json.dumps({
+        'model': model,
+        'messages': messages,
+        'response_format': response_format,
+        'temperature': temperature,
+        'max_tokens': max_tokens,
+    }, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Interface every backend implements."""
+
+    name = 'base'
+
+    def __init__(self, ttl: float = LLM_RESPONSE_CACHE_TTL, max_entries: int = LLM_RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Cached content, or None if missing or expired."""
+
+    def put(self, key: str, model: str, content: str):
+        """Store content and prune every LLM_RESPONSE_CACHE_PRUNE_EVERY writes."""
+        self._put(key, model, content)
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % LLM_RESPONSE_CACHE_PRUNE_EVERY == 0
+        if due:
+            removed = self.prune()
+            if removed:
+                logger.info(f"LLM response cache ({self.name}): pruned {removed} entries")
+
+    @abstractmethod
+    def _put(self, key: str, model: str, content: str):
+        """Store content without pruning."""
+
+    @abstractmethod
+    def prune(self) -> int:
+        """Remove expired entries, then least recently used ones over max_entries."""
+
+
+class DiskResponseCache(ResponseCache):
+    """One JSON file per entry, written atomically."""
+
+    name = 'disk'
+
+    def __init__(self, root: str, **kwargs):
+        super().__init__(**kwargs)
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        if entry['created_at'] + self.ttl <= now:
+            return None
+        try:
+            os.utime(path, (now, os.stat(path).st_mtime))
+        except FileNotFoundError:
+            pass
+        return entry['content']
+
+    def _put(self, key: str, model: str, content: str):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'model': model, 'created_at': time.time(), 'content': content}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def prune(self) -> int:
+        now = time.time()
+        entries = []
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_mtime + self.ttl <= now:
+                        os.unlink(path)
+                        removed += 1
+                    else:
+                        entries.append((stat.st_atime, path))
+                except FileNotFoundError:
+                    continue
+        if len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_entries]:
+                try:
+                    os.unlink(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+class PostgresResponseCache(ResponseCache):
+    """Rows in llm_response_cache, shared by every process."""
+
+    name = 'postgres'
+
+    def get(self, key: str) -> Optional[str]:
+        row = db_insert_returning("""
+            UPDATE llm_response_cache
+            SET last_hit_at = NOW(), hits = hits + 1
+            WHERE cache_key = %s AND created_at > NOW() - %s * INTERVAL '1 second'
+            RETURNING content
+        """, (key, self.ttl))
+        return row['content'] if row else None
+
+    def _put(self, key: str, model: str, content: str):
+        db_execute("""
+            INSERT INTO llm_response_cache (cache_key, model, content, created_at, last_hit_at)
+            VALUES (%s, %s, %s, NOW(), NOW())
+            ON CONFLICT (cache_key) DO UPDATE
+            SET model = EXCLUDED.model,
+                content = EXCLUDED.content,
+                created_at = EXCLUDED.created_at,
+                last_hit_at = EXCLUDED.last_hit_at
+        """, (key, model, content), commit=True)
+
+    def prune(self) -> int:
+        row = db_insert_returning("""
+            WITH doomed AS (
+                DELETE FROM llm_response_cache
+                WHERE created_at <= NOW() - %s * INTERVAL '1 second'
+                   OR cache_key IN (
+                       SELECT cache_key FROM llm_response_cache
+                       ORDER BY last_hit_at DESC
+                       OFFSET %s
+                   )
+                RETURNING 1
+            )
+            SELECT COUNT(*) AS count FROM doomed
+        """, (self.ttl, self.max_entries))
+        return row['count'] if row else 0
+
+
+def create_response_cache(kind: str = None) -> Optional[ResponseCache]:
+    """Build the backend named by kind (default: LLM_RESPONSE_CACHE); None when disabled."""
+    kind = (LLM_RESPONSE_CACHE if kind is None else kind).lower()
+    if kind in ('', 'off', 'none'):
+        return None
+    if kind == 'disk':
+        return DiskResponseCache(LLM_RESPONSE_CACHE_PATH)
+    if kind == 'postgres':
+        return PostgresResponseCache()
+    raise ValueError(f"Unknown LLM_RESPONSE_CACHE backend: {kind}")
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide response cache, or None when LLM_RESPONSE_CACHE is unset."""
+    global _response_cache
+    if _response_cache is None and LLM_RESPONSE_CACHE not in ('', 'off', 'none'):
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = create_response_cache()
+    return _response_cache
@@ -0,0 +1,244 @@
+"""
+LLM Traffic Control
+
+Per provider/model admission control for llm_completion: an AIMD concurrency
+limit (AdaptiveLimiter) and a circuit breaker over provider outcomes
+(CircuitBreaker), both per process. Queue timeouts and 4xx client errors
+other than 429 leave the breaker untouched.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict, Tuple
+from middleware.metrics import (
+    llm_breaker_state,
+    llm_breaker_transitions_total,
+    llm_concurrency_limit,
+    llm_in_flight,
+    llm_queue_depth,
+)
+
+# Concurrency limit per provider/model: starting value, floor and ceiling
+LLM_CONCURRENCY_INITIAL = float(os.getenv('LLM_CONCURRENCY_INITIAL', '8'))
+LLM_CONCURRENCY_MIN = float(os.getenv('LLM_CONCURRENCY_MIN', '1'))
+LLM_CONCURRENCY_MAX = float(os.getenv('LLM_CONCURRENCY_MAX', '64'))
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '10'))  # Seconds to wait for a slot
+LLM_BREAKER_WINDOW = float(os.getenv('LLM_BREAKER_WINDOW', '30'))  # Seconds of outcomes the breaker looks at
+LLM_BREAKER_MIN_REQUESTS = int(os.getenv('LLM_BREAKER_MIN_REQUESTS', '10'))  # Calls before the error rate counts
+LLM_BREAKER_ERROR_RATE = float(os.getenv('LLM_BREAKER_ERROR_RATE', '0.5'))  # Error rate that opens the breaker
+LLM_BREAKER_RATE_LIMITED = int(os.getenv('LLM_BREAKER_RATE_LIMITED', '5'))  # 429s in the window that open it
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv('LLM_BREAKER_OPEN_SECONDS', '30'))  # Seconds before a half-open probe
+
+# Call outcomes reported to release()
+SUCCESS = 'success'
+ERROR = 'error'
+RATE_LIMITED = 'rate_limited'
+TIMEOUT = 'timeout'
+# The provider rejected the request itself (4xx other than 429): says nothing about its health
+CLIENT_ERROR = 'client_error'
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class LLMUnavailableError(Exception):
+    """A call was not sent because the provider/model is shedding load."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+class QueueTimeoutError(LLMUnavailableError):
+    pass
+
+
+def classify_failure(error: Exception) -> str:
+    """Outcome for a provider exception: RATE_LIMITED, TIMEOUT, CLIENT_ERROR or ERROR."""
+    status_code = getattr(error, 'status_code', None)
+    if status_code == 429 or type(error).__name__ == 'RateLimitError':
+        return RATE_LIMITED
+    if status_code == 408 or type(error).__name__ in (
+            'APITimeoutError', 'TimeoutException', 'ReadTimeout', 'ConnectTimeout'):
+        return TIMEOUT
+    if isinstance(status_code, int) and 400 <= status_code < 500:
+        return CLIENT_ERROR
+    return ERROR
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a bounded wait for a free slot."""
+
+    def __init__(self, initial: float = LLM_CONCURRENCY_INITIAL, minimum: float = LLM_CONCURRENCY_MIN,
+                 maximum: float = LLM_CONCURRENCY_MAX, labels: Dict[str, str] = None):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = min(max(initial, minimum), maximum)
+        self.in_flight = 0
+        self.waiting = 0
+        self.labels = labels or {}
+        self._cond = threading.Condition()
+        self._export()
+
+    def acquire(self, timeout: float = LLM_QUEUE_TIMEOUT):
+        """Take a slot, waiting up to timeout seconds; raises QueueTimeoutError."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self.waiting += 1
+            self._export()
+            try:
+                while self.in_flight >= int(self.limit):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise QueueTimeoutError(
+                            f"No LLM slot within {timeout}s (limit {int(self.limit)}, in flight {self.in_flight})")
+                    self._cond.wait(remaining)
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+                self._export()
+
+    def release(self, outcome: str):
+        """Free a slot and adapt the limit to the call's outcome."""
+        with self._cond:
+            self.in_flight -= 1
+            if outcome in (RATE_LIMITED, TIMEOUT):
+                self.limit = max(self.minimum, self.limit / 2)
+            elif outcome == SUCCESS:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._export()
+            self._cond.notify_all()
+
+    def _export(self):
+        if self.labels:
+            llm_concurrency_limit.labels(**self.labels).set(int(self.limit))
+            llm_in_flight.labels(**self.labels).set(self.in_flight)
+            llm_queue_depth.labels(**self.labels).set(self.waiting)
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a sliding window of outcomes."""
+
+    def __init__(self, window: float = LLM_BREAKER_WINDOW, min_requests: int = LLM_BREAKER_MIN_REQUESTS,
+                 error_rate: float = LLM_BREAKER_ERROR_RATE, rate_limited: int = LLM_BREAKER_RATE_LIMITED,
+                 open_seconds: float = LLM_BREAKER_OPEN_SECONDS, labels: Dict[str, str] = None):
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.rate_limited = rate_limited
+        self.open_seconds = open_seconds
+        self.labels = labels or {}
+        self.state = CLOSED
+        self._clock = time.monotonic
+        self._outcomes = deque()  # (timestamp, outcome)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._export()
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now; claims the probe when half-open."""
+        with self._lock:
+            if self.state == OPEN:
+                if self._clock() - self._opened_at < self.open_seconds:
+                    return False
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def cancel(self):
+        """Give back an allowed call that was never sent (frees the half-open probe)."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def record(self, outcome: str):
+        """Report the outcome of an allowed call."""
+        if outcome == CLIENT_ERROR:
+            self.cancel()
+            return
+        with self._lock:
+            now = self._clock()
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if outcome == SUCCESS:
+                    self._outcomes.clear()
+                    self._transition(CLOSED)
+                else:
+                    self._open(now)
+                return
+            if self.state == OPEN:
+                return
+
+            self._outcomes.append((now, outcome))
+            while self._outcomes and self._outcomes[0][0] <= now - self.window:
+                self._outcomes.popleft()
+            total = len(self._outcomes)
+            failures = sum(1 for _, o in self._outcomes if o != SUCCESS)
+            throttled = sum(1 for _, o in self._outcomes if o == RATE_LIMITED)
+            if throttled >= self.rate_limited or (
+                    total >= self.min_requests and failures / total >= self.error_rate):
+                self._open(now)
+
+    def _open(self, now: float):
+        self._opened_at = now
+        self._outcomes.clear()
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        self.state = state
+        if self.labels:
+            llm_breaker_transitions_total.labels(state=state, **self.labels).inc()
+        self._export()
+
+    def _export(self):
+        if self.labels:
+            llm_breaker_state.labels(**self.labels).set(_STATE_VALUES[self.state])
+
+
+class LLMGuard:
+    """Breaker plus limiter for one provider/model."""
+
+    def __init__(self, provider: str, model: str):
+        labels = {'provider': provider, 'model': model}
+        self.breaker = CircuitBreaker(labels=labels)
+        self.limiter = AdaptiveLimiter(labels=labels)
+
+    def acquire(self):
+        """Admit a call; raises CircuitOpenError or QueueTimeoutError."""
+        if not self.breaker.allow():
+            raise CircuitOpenError("Circuit open")
+        try:
+            self.limiter.acquire()
+        except QueueTimeoutError:
+            # Our own backlog, not the provider's health: keep it out of the breaker
+            self.breaker.cancel()
+            raise
+
+    def release(self, outcome: str):
+        """Report the outcome of an admitted call."""
+        self.limiter.release(outcome)
+        self.breaker.record(outcome)
+
+
+_guards: Dict[Tuple[str, str], LLMGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_llm_guard(provider: str, model: str) -> LLMGuard:
+    """Process-wide guard for a provider/model, created on first use."""
+    key = (provider, model)
+    guard = _guards.get(key)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(key)
+            if guard is None:
+                guard = _guards[key] = LLMGuard(provider, model)
+    return guard
@@ -0,0 +1,186 @@
+"""
+Hedged LLM Requests
+
+llm_completion(..., hedge=True) also sends a slow primary call to the
+fallback model once it exceeds a recent-latency percentile; the first valid
+answer wins.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional
+from middleware.metrics import llm_hedge_total, llm_hedge_wins_total, llm_hedge_delay_seconds
+
+LLM_HEDGE_PERCENTILE = float(os.getenv('LLM_HEDGE_PERCENTILE', '0.95'))  # Latency percentile used as the hedge delay
+LLM_HEDGE_DELAY = float(os.getenv('LLM_HEDGE_DELAY', '2.0'))  # Delay until enough latencies are known
+LLM_HEDGE_MIN_DELAY = float(os.getenv('LLM_HEDGE_MIN_DELAY', '0.2'))  # Bounds of the delay
+LLM_HEDGE_MAX_DELAY = float(os.getenv('LLM_HEDGE_MAX_DELAY', '5.0'))
+LLM_HEDGE_WORKERS = int(os.getenv('LLM_HEDGE_WORKERS', '16'))  # Threads running hedged calls per process
+LLM_HEDGE_SAMPLES = 200  # Recent latencies kept per model
+LLM_HEDGE_MIN_SAMPLES = 20  # Latencies needed before the percentile is used
+
+_JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'boolean': bool,
+    'null': type(None),
+}
+
+
+def conforms_to_schema(value: Any, schema: Dict[str, Any]) -> bool:
+    """
+    Check value against the JSON Schema subset used by strict structured
+    outputs: type, properties, required, additionalProperties, items, enum.
+    """
+    if 'enum' in schema and value not in schema['enum']:
+        return False
+    types = schema.get('type')
+    if types is not None:
+        types = types if isinstance(types, list) else [types]
+        if not any(_is_type(value, t) for t in types):
+            return False
+    if isinstance(value, dict):
+        properties = schema.get('properties', {})
+        if any(name not in value for name in schema.get('required', [])):
+            return False
+        if schema.get('additionalProperties') is False and any(name not in properties for name in value):
+            return False
+        return all(conforms_to_schema(value[name], sub) for name, sub in properties.items() if name in value)
+    if isinstance(value, list) and 'items' in schema:
+        return all(conforms_to_schema(item, schema['items']) for item in value)
+    return True
+
+
+def _is_type(value: Any, json_type: str) -> bool:
+    if json_type == 'integer':
+        return isinstance(value, int) and not isinstance(value, bool)
+    if json_type == 'number':
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    expected = _JSON_TYPES.get(json_type)
+    return expected is None or isinstance(value, expected)
+
+
+def response_validator(response_format: Optional[Dict[str, Any]]) -> Callable[[Optional[str]], bool]:
+    """Validity check for completions requested with response_format."""
+    def validate(content: Optional[str]) -> bool:
+        if not content:
+            return False
+        if not response_format or response_format.get('type') == 'text':
+            return True
+        try:
+            value = json.loads(content)
+        except ValueError:
+            return False
+        if response_format.get('type') == 'json_schema':
+            return conforms_to_schema(value, response_format['json_schema']['schema'])
+        return isinstance(value, dict)
+    return validate
+
+
+class LatencyTracker:
+    """Recent successful latencies of one model and the hedge delay they imply."""
+
+    def __init__(self, samples: int = LLM_HEDGE_SAMPLES):
+        self._latencies = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def delay(self) -> float:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DELAY
+        value = latencies[min(int(len(latencies) * LLM_HEDGE_PERCENTILE), len(latencies) - 1)]
+        return min(max(value, LLM_HEDGE_MIN_DELAY), LLM_HEDGE_MAX_DELAY)
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_latency_tracker(model: str) -> LatencyTracker:
+    with _trackers_lock:
+        tracker = _trackers.get(model)
+        if tracker is None:
+            tracker = _trackers[model] = LatencyTracker()
+        return tracker
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=LLM_HEDGE_WORKERS, thread_name_prefix='llm-hedge')
+    return _executor
+
+
+def hedged_call(model: str, primary: Callable[[], Optional[str]], fallback: Callable[[], Optional[str]],
+                is_valid: Callable[[Optional[str]], bool],
+                from_cache: Optional[Callable[[], bool]] = None) -> Optional[str]:
+    """
+    Run primary, adding fallback after the hedge delay or on an early failure.
+
+    from_cache is asked on primary's thread right after it returns; answers
+    it reports as served from the response cache are not counted as latencies.
+
+    Returns the first answer passing is_valid, or None when neither does.
+    """
+    tracker = get_latency_tracker(model)
+    delay = tracker.delay()
+    llm_hedge_delay_seconds.labels(model=model).set(delay)
+
+    executor = _get_executor()
+    started = time.monotonic()
+
+    def timed_primary():
+        content = primary()
+        if is_valid(content) and not (from_cache and from_cache()):
+            tracker.observe(time.monotonic() - started)
+        return content
+
+    primary_future = executor.submit(timed_primary)
+    done, _ = wait([primary_future], timeout=delay)
+    if done:
+        content = _result(primary_future)
+        if is_valid(content):
+            llm_hedge_total.labels(model=model, action='skipped').inc()
+            return content
+        # Primary failed before the delay: plain failover
+        llm_hedge_total.labels(model=model, action='failover').inc()
+        content = fallback()
+        valid = is_valid(content)
+        llm_hedge_wins_total.labels(model=model, winner='fallback' if valid else 'none').inc()
+        return content if valid else None
+
+    llm_hedge_total.labels(model=model, action='hedged').inc()
+    pending = {primary_future: 'primary', executor.submit(fallback): 'fallback'}
+    while pending:
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            source = pending.pop(future)
+            content = _result(future)
+            if is_valid(content):
+                for loser in pending:
+                    loser.cancel()
+                llm_hedge_wins_total.labels(model=model, winner=source).inc()
+                return content
+    llm_hedge_wins_total.labels(model=model, winner='none').inc()
+    return None
+
+
+def _result(future) -> Optional[str]:
+    try:
+        return future.result()
+    except Exception:
+        return None
@@ -0,0 +1,348 @@
+"""
+Media Store
+
+Pluggable storage for media blobs (videos, TTS audio, illustrations) so they
+can live outside Postgres. Blobs are content-addressed by the sha256 of their
+bytes and rows point at them through a storage_key column.
+
+Backends (MEDIA_STORE):
+- db (default): blobs stay in the BYTEA columns and no store is used
+- local: files under MEDIA_STORE_PATH, sharded as ab/cd/<sha256>. Served with
+  sendfile(), or by nginx when MEDIA_ACCEL_REDIRECT_PREFIX names an internal
+  location aliased to MEDIA_STORE_PATH
+- s3: any S3-compatible service (MEDIA_S3_BUCKET, MEDIA_S3_ENDPOINT_URL,
+  MEDIA_S3_PREFIX); needs boto3
+
+Cutover: with MEDIA_STORE_DUAL_WRITE=true (the default) new blobs are written
+to both the store and the BYTEA column, and reads fall back to the column
+whenever a row has no storage_key or the store does not have the blob.
+scripts/migrate_media_to_store.py moves existing rows and, once verified,
+clears their BYTEA columns.
+"""
+
+import os
+import mmap
+import hashlib
+import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Iterator, Optional, Tuple
+from flask import Response, request, send_file
+from middleware.metrics import media_store_reads_total
+
+logger = logging.getLogger(__name__)
+
+MEDIA_STORE = os.getenv('MEDIA_STORE', 'db').lower()
+MEDIA_STORE_PATH = os.getenv('MEDIA_STORE_PATH', '/app/media')
+MEDIA_STORE_DUAL_WRITE = os.getenv('MEDIA_STORE_DUAL_WRITE', 'true').lower() == 'true'
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+MEDIA_S3_BUCKET = os.getenv('MEDIA_S3_BUCKET', '')
+MEDIA_S3_ENDPOINT_URL = os.getenv('MEDIA_S3_ENDPOINT_URL') or None
+MEDIA_S3_PREFIX = os.getenv('MEDIA_S3_PREFIX', 'media/')
+
+MEDIA_STREAM_CHUNK_SIZE = 512 * 1024
+
+
+def content_key(data: bytes) -> str:
+    """Storage key for a blob: sha256 hex of its bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class MediaStore(ABC):
+    """Interface every backend implements. Keys are content_key() values."""
+
+    name = 'base'
+
+    @abstractmethod
+    def put(self, data: bytes, content_type: Optional[str] = None) -> str:
+        """Store data (idempotent) and return its key."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Whole blob; raises KeyError if missing."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether a blob is stored under key."""
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        """Blob length in bytes; raises KeyError if missing."""
+
+    @abstractmethod
+    def iter_range(self, key: str, start: int, stop: int,
+                   chunk_size: int = MEDIA_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield blob[start:stop] in chunks of at most chunk_size bytes."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove the blob; missing keys are ignored."""
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path of the blob if it can be served straight from disk."""
+        return None
+
+
+class LocalMediaStore(MediaStore):
+    """Content-addressed files under root, written atomically."""
+
+    name = 'local'
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def relative_path(self, key: str) -> str:
+        return f"{key[:2]}/{key[2:4]}/{key}"
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, self.relative_path(key))
+
+    def put(self, data: bytes, content_type: Optional[str] = None) -> str:
+        key = content_key(data)
+        path = self.local_path(key)
+        if os.path.exists(path):
+            return key
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return key
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(self.local_path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    def size(self, key: str) -> int:
+        try:
+            return os.path.getsize(self.local_path(key))
+        except FileNotFoundError:
+            raise KeyError(key)
+
+    def iter_range(self, key: str, start: int, stop: int,
+                   chunk_size: int = MEDIA_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        if stop <= start:
+            return
+        try:
+            f = open(self.local_path(key), 'rb')
+        except FileNotFoundError:
+            raise KeyError(key)
+        # The page cache backs the mapping, so slices never hold the whole file
+        with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for position in range(start, min(stop, len(mapped)), chunk_size):
+                yield mapped[position:min(position + chunk_size, stop)]
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+
+def _is_not_found(error: Exception) -> bool:
+    code = str(getattr(error, 'response', {}).get('Error', {}).get('Code', ''))
+    return code in ('404', 'NoSuchKey', 'NotFound')
+
+
+class S3MediaStore(MediaStore):
+    """
+    Any S3-compatible object store, through a boto3-style client
+    (put_object / get_object / head_object / delete_object).
+    """
+
+    name = 's3'
+
+    def __init__(self, client, bucket: str, prefix: str = MEDIA_S3_PREFIX):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key[:2]}/{key}"
+
+    def put(self, data: bytes, content_type: Optional[str] = None) -> str:
+        key = content_key(data)
+        if self.exists(key):
+            return key
+        extra = {'ContentType': content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=self.object_key(key), Body=data, **extra)
+        return key
+
+    def _head(self, key: str) -> dict:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+        except Exception as e:
+            if _is_not_found(e):
+                raise KeyError(key)
+            raise
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))['Body'].read()
+        except Exception as e:
+            if _is_not_found(e):
+                raise KeyError(key)
+            raise
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._head(key)
+            return True
+        except KeyError:
+            return False
+
+    def size(self, key: str) -> int:
+        return int(self._head(key)['ContentLength'])
+
+    def iter_range(self, key: str, start: int, stop: int,
+                   chunk_size: int = MEDIA_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        if stop <= start:
+            return
+        try:
+            body = self.client.get_object(
+                Bucket=self.bucket, Key=self.object_key(key), Range=f"bytes={start}-{stop - 1}"
+            )['Body']
+        except Exception as e:
+            if _is_not_found(e):
+                raise KeyError(key)
+            raise
+        while True:
+            chunk = body.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+
+def create_media_store(kind: str = None) -> Optional[MediaStore]:
+    """Build the store named by kind (default MEDIA_STORE); None for 'db'."""
+    kind = (kind or MEDIA_STORE).lower()
+    if kind == 'db':
+        return None
+    if kind == 'local':
+        return LocalMediaStore(MEDIA_STORE_PATH)
+    if kind == 's3':
+        import boto3
+        if not MEDIA_S3_BUCKET:
+            raise ValueError("MEDIA_S3_BUCKET is required for MEDIA_STORE=s3")
+        return S3MediaStore(boto3.client('s3', endpoint_url=MEDIA_S3_ENDPOINT_URL), MEDIA_S3_BUCKET)
+    raise ValueError(f"Unknown MEDIA_STORE: {kind}")
+
+
+_media_store = None
+_media_store_lock = threading.Lock()
+
+
+def get_media_store() -> Optional[MediaStore]:
+    """Process-wide configured store, or None when blobs stay in the database."""
+    global _media_store
+    if _media_store is None and MEDIA_STORE != 'db':
+        with _media_store_lock:
+            if _media_store is None:
+                _media_store = create_media_store()
+    return _media_store
+
+
+def save_blob(data: bytes, content_type: Optional[str] = None) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Write a new blob to the configured store.
+
+    Returns:
+        (storage_key, bytes for the BYTEA column). Without a store this is
+        (None, data); with one the column only gets data while dual-writing.
+    """
+    store = get_media_store()
+    if store is None:
+        return None, data
+    key = store.put(data)
+    return key, (data if MEDIA_STORE_DUAL_WRITE else None)
+
+
+def load_blob(storage_key: Optional[str], load_from_db: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+    """
+    Dual-read: the store's copy when the row has a storage_key and the store
+    has it, otherwise whatever load_from_db() returns (the BYTEA column).
+    """
+    store = get_media_store()
+    if storage_key and store is not None:
+        try:
+            data = store.get(storage_key)
+            media_store_reads_total.labels(backend=store.name, result='hit').inc()
+            return data
+        except Exception as e:
+            media_store_reads_total.labels(backend=store.name, result='fallback').inc()
+            logger.warning(f"Media store read failed for {storage_key}, falling back to database: {e}")
+    data = load_from_db()
+    return bytes(data) if data is not None else None
+
+
+def ranged_response(length: int, read_range: Callable[[int, int], Iterator[bytes]],
+                    mimetype: str, headers: dict, etag: str) -> Response:
+    """
+    Streamed response for a blob of known length, honouring a single Range
+    (206/416) and If-Range against etag. read_range(start, stop) yields the bytes.
+    """
+    headers = dict(headers)
+    headers['Accept-Ranges'] = 'bytes'
+    start, stop, status = 0, length, 200
+    byte_range = request.range
+    # A stale If-Range validator means the client must get the whole blob
+    if byte_range is not None and request.if_range.etag not in (None, etag):
+        byte_range = None
+    # Multipart ranges are not supported; serve the whole blob instead
+    if byte_range is not None and len(byte_range.ranges) != 1:
+        byte_range = None
+    if byte_range is not None:
+        bounds = byte_range.range_for_length(length)
+        if bounds is None:
+            headers['Content-Range'] = f'bytes */{length}'
+            return Response(status=416, headers=headers)
+        start, stop = bounds
+        status = 206
+        headers['Content-Range'] = f'bytes {start}-{stop - 1}/{length}'
+
+    headers['Content-Length'] = str(stop - start)
+    return Response(read_range(start, stop), status=status, mimetype=mimetype,
+                    headers=headers, direct_passthrough=True)
+
+
+def send_stored_media(store: MediaStore, key: str, mimetype: str, etag: str, headers: dict) -> Response:
+    """
+    Serve a stored blob without buffering it in Python: nginx X-Accel-Redirect
+    or sendfile() for local files, a ranged stream otherwise.
+    """
+    if isinstance(store, LocalMediaStore) and MEDIA_ACCEL_REDIRECT_PREFIX:
+        response = Response(mimetype=mimetype, headers=headers)
+        response.headers['X-Accel-Redirect'] = f"{MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{store.relative_path(key)}"
+        response.set_etag(etag)
+        return response
+
+    path = store.local_path(key)
+    if path:
+        response = send_file(path, mimetype=mimetype, etag=etag, conditional=True)
+        response.headers.update(headers)
+        return response
+
+    return ranged_response(
+        store.size(key),
+        lambda start, stop: store.iter_range(key, start, stop),
+        mimetype,
+        {**headers, 'ETag': f'"{etag}"'},
+        etag
+    )
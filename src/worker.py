@@ -0,0 +1,46 @@
+"""
+Dogetionary Scheduled Workers - Dedicated Process Entry Point
+
+Runs the once-per-deployment scheduled workers (daily test vocabulary, question
+pool sweep) outside the web worker processes. gunicorn.conf.py launches this
+from its when_ready hook; it can also be run on its own (e.g. a separate container) with
+RUN_SCHEDULED_WORKERS=0 set on the web service:
+
+    python worker.py
+"""
+
+import logging
+import signal
+import sys
+import threading
+
+from app import start_scheduled_workers
+from utils.db_pool import close_pool
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    stop = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info(f"Scheduled worker process received signal {signum}, shutting down")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    start_scheduled_workers()
+    logger.info("✅ Scheduled worker process running")
+
+    stop.wait()
+    close_pool()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,24 +1,92 @@
-import queue
+import os
+import sys
 import time
+import socket
 import logging
-from handlers.words import audio_generation_queue
+import threading
+from services.audio_job_service import (
+    run_next_audio_job,
+    requeue_stale_audio_jobs,
+    refresh_queue_depth,
+    AUDIO_JOB_WORKERS,
+    AUDIO_JOB_POLL_INTERVAL,
+    AUDIO_JOB_STALE_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
-def audio_generation_worker():
-    """Background worker for audio generation"""
-    logger.info("Audio generation worker started")
+# How often one thread per process recovers stale jobs and samples queue depth
+MAINTENANCE_INTERVAL = 30
 
-    while True:
+
+def audio_generation_worker(index: int = 0, stop: threading.Event = None):
+    """
+    Background worker that drains the durable audio job queue.
+
+    Any number of these can run across processes and hosts; each claims one
+    job at a time with FOR UPDATE SKIP LOCKED and sleeps for
+    AUDIO_JOB_POLL_INTERVAL when the queue is empty. Worker 0 of each process
+    also re-queues jobs abandoned by crashed workers and refreshes the queue
+    depth gauge.
+    """
+    stop = stop or threading.Event()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    next_maintenance = 0.0
+    logger.info(f"Audio generation worker {worker_id} started")
+
+    while not stop.is_set():
         try:
-            # Check if queue has items
-            if not audio_generation_queue.empty():
-                task = audio_generation_queue.get()
-                # Process task here (implementation would be in handlers.words)
-                logger.info(f"Processing audio task: {task}")
-                audio_generation_queue.task_done()
-            else:
-                time.sleep(1)
+            if index == 0 and time.monotonic() >= next_maintenance:
+                next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+                requeue_stale_audio_jobs(AUDIO_JOB_STALE_SECONDS)
+                refresh_queue_depth()
+
+            if run_next_audio_job(worker_id) is None:
+                stop.wait(AUDIO_JOB_POLL_INTERVAL)
         except Exception as e:
-            logger.error(f"Audio worker error: {e}")
-            time.sleep(5)
\ No newline at end of file
+            logger.error(f"Audio worker {worker_id} error: {e}")
+            stop.wait(5)
+
+
+def start_audio_workers(count: int = AUDIO_JOB_WORKERS, stop: threading.Event = None) -> list:
+    """Start `count` audio worker threads in this process; returns them."""
+    threads = []
+    for index in range(count):
+        thread = threading.Thread(
+            target=audio_generation_worker,
+            args=(index, stop),
+            daemon=True,
+            name=f"AudioWorker-{index}"
+        )
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+def main():
+    """
+    Run audio workers as a standalone process, to scale TTS independently of
+    the web workers (set AUDIO_JOB_WORKERS=0 on the web service):
+
+        cd src && AUDIO_JOB_WORKERS=8 python -m workers.audio_worker
+    """
+    import signal
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+
+    threads = start_audio_workers(max(AUDIO_JOB_WORKERS, 1), stop)
+    logger.info(f"✅ {len(threads)} audio workers running (pid={os.getpid()})")
+    stop.wait()
+    for thread in threads:
+        thread.join(timeout=60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
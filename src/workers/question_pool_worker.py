@@ -0,0 +1,25 @@
+import schedule
+import time
+import logging
+from services.question_pool_service import sweep_active_users, QUESTION_POOL_SWEEP_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+def question_pool_worker():
+    """
+    Background worker that keeps the question pool warm for active users.
+    Every QUESTION_POOL_SWEEP_INTERVAL seconds, users who reviewed recently get
+    a low-priority look-ahead over their upcoming words.
+    """
+    # Own scheduler: the default one is shared by every worker thread in the process
+    scheduler = schedule.Scheduler()
+    scheduler.every(QUESTION_POOL_SWEEP_INTERVAL).seconds.do(sweep_active_users)
+    logger.info(f"📅 Scheduled question pool sweep every {QUESTION_POOL_SWEEP_INTERVAL}s")
+
+    while True:
+        try:
+            scheduler.run_pending()
+            time.sleep(30)
+        except Exception as e:
+            logger.error(f"Error in question pool scheduler: {e}")
+            time.sleep(300)  # Wait 5 minutes on error before retrying
@@ -1,114 +1,180 @@
+import os
 import schedule
 import time
 import logging
-from utils.database import db_fetch_all, db_cursor
+from utils.database import db_fetch_all, db_fetch_one, db_cursor
+from middleware.metrics import (
+    scheduled_job_chunk_duration_seconds,
+    scheduled_job_items_total,
+    scheduled_job_progress_ratio,
+)
 
 logger = logging.getLogger(__name__)
 
-def add_daily_test_words_for_all_users():
-    """Add daily test vocabulary words for all users who have test mode enabled"""
+JOB_NAME = 'daily_test_words'
+
+# Words added per user per local day
+DAILY_TEST_WORDS = 10
+# Users assigned per INSERT ... SELECT statement
+TEST_WORDS_CHUNK_SIZE = int(os.getenv('TEST_WORDS_CHUNK_SIZE', '500'))
+
+# Users with test mode on whose local date has moved past the last assignment.
+# Unknown timezone names fall back to UTC rather than failing the statement.
+ELIGIBLE_USERS_SQL = """
+    FROM user_preferences up
+    LEFT JOIN pg_timezone_names tz ON tz.name = up.timezone
+    WHERE (up.toefl_enabled = TRUE OR up.ielts_enabled = TRUE OR up.tianz_enabled = TRUE)
+    AND (up.last_test_words_added IS NULL
+         OR up.last_test_words_added < (NOW() AT TIME ZONE COALESCE(tz.name, 'UTC'))::date)
+"""
+
+
+def assign_test_words_chunk(user_ids: list, words_per_user: int = DAILY_TEST_WORDS) -> dict:
+    """
+    Add up to words_per_user unsaved test words for each user in one statement.
+
+    Each user's words are the first ones in an order given by md5(user_id, word):
+    stable for a user across runs, different between users, and picked with a
+    per-user top-N instead of sorting the whole vocabulary by RANDOM().
+    Every user in the chunk is marked as done for their local date, including
+    users who have already saved the whole vocabulary.
+
+    Returns:
+        {'users': users marked, 'words': words inserted}
+    """
+    with db_cursor(commit=True) as cur:
+        cur.execute(f"""
+            WITH chunk AS (
+                SELECT up.user_id, up.learning_language, up.native_language,
+                       up.toefl_enabled, up.ielts_enabled, up.tianz_enabled,
+                       (NOW() AT TIME ZONE COALESCE(tz.name, 'UTC'))::date AS local_date
+                {ELIGIBLE_USERS_SQL}
+                AND up.user_id = ANY(%s::uuid[])
+                FOR UPDATE OF up SKIP LOCKED
+            ),
+            picked AS (
+                SELECT c.user_id, w.word, c.learning_language, c.native_language
+                FROM chunk c
+                CROSS JOIN LATERAL (
+                    SELECT tv.word
+                    FROM test_vocabularies tv
+                    WHERE tv.language = c.learning_language
+                    AND (
+                        (c.toefl_enabled = TRUE AND tv.is_toefl = TRUE) OR
+                        (c.ielts_enabled = TRUE AND tv.is_ielts = TRUE) OR
+                        (c.tianz_enabled = TRUE AND tv.is_tianz = TRUE)
+                    )
+                    AND NOT EXISTS (
+                        SELECT 1 FROM saved_words sw
+                        WHERE sw.user_id = c.user_id
+                        AND sw.learning_language = c.learning_language
+                        AND sw.word_key = tv.word_key
+                    )
+                    ORDER BY md5(c.user_id::text || ':' || tv.word)
+                    LIMIT %s
+                ) w
+            ),
+            inserted AS (
+                INSERT INTO saved_words (user_id, word, learning_language, native_language)
+                SELECT user_id, word, learning_language, native_language FROM picked
+                ON CONFLICT DO NOTHING
+                RETURNING user_id
+            ),
+            marked AS (
+                UPDATE user_preferences up
+                SET last_test_words_added = c.local_date
+                FROM chunk c
+                WHERE up.user_id = c.user_id
+                RETURNING up.user_id
+            )
+            SELECT (SELECT COUNT(*) FROM marked) AS users,
+                   (SELECT COUNT(*) FROM inserted) AS words
+        """, (list(user_ids), words_per_user))
+        row = cur.fetchone()
+    return {'users': row['users'], 'words': row['words']}
+
+
+def add_daily_test_words_for_all_users(chunk_size: int = None) -> dict:
+    """
+    Add daily test vocabulary words for all users who have test mode enabled.
+
+    Runs hourly: each run only picks up users whose local day has started since
+    their last assignment, so the work is spread across timezones instead of
+    landing at server midnight. Users are handled in keyset-paginated chunks of
+    TEST_WORDS_CHUNK_SIZE, one set-based statement per chunk.
+
+    Returns:
+        {'eligible', 'users', 'words', 'chunks', 'failed_chunks', 'seconds'}
+    """
+    chunk_size = chunk_size or TEST_WORDS_CHUNK_SIZE
+    stats = {'eligible': 0, 'users': 0, 'words': 0, 'chunks': 0, 'failed_chunks': 0, 'seconds': 0.0}
+    started = time.monotonic()
     try:
-        logger.info("🚀 Starting daily test vocabulary word addition for all users")
-
-        # Get all users who have test mode enabled and haven't received words today
-        users = db_fetch_all("""
-            SELECT
-                user_id,
-                learning_language,
-                native_language,
-                toefl_enabled,
-                ielts_enabled,
-                tianz_enabled
-            FROM user_preferences
-            WHERE (toefl_enabled = TRUE OR ielts_enabled = TRUE OR tianz_enabled = TRUE)
-            AND (last_test_words_added IS NULL OR last_test_words_added < CURRENT_DATE)
-        """)
-        logger.info(f"Found {len(users)} users needing daily test words")
-
-        total_users = 0
-        total_words = 0
-
-        for user in users:
-            try:
-                user_id = user['user_id']
-                learning_language = user['learning_language']
-                native_language = user['native_language']
-                toefl_enabled = user['toefl_enabled']
-                ielts_enabled = user['ielts_enabled']
-                tianz_enabled = user['tianz_enabled']
-
-                with db_cursor(commit=True) as cur:
-                    # Get random test words not already saved
-                    cur.execute("""
-                        WITH existing_words AS (
-                            SELECT word
-                            FROM saved_words
-                            WHERE user_id = %s
-                            AND learning_language = %s
-                        ),
-                        available_words AS (
-                            SELECT DISTINCT tv.word
-                            FROM test_vocabularies tv
-                            WHERE tv.language = %s
-                            AND (
-                                (%s = TRUE AND tv.is_toefl = TRUE) OR
-                                (%s = TRUE AND tv.is_ielts = TRUE) OR
-                                (%s = TRUE AND tv.is_tianz = TRUE)
-                            )
-                            AND tv.word NOT IN (SELECT ew.word FROM existing_words ew)
-                        )
-                        SELECT word FROM available_words
-                        ORDER BY RANDOM()
-                        LIMIT 10
-                    """, (user_id, learning_language, learning_language, toefl_enabled, ielts_enabled, tianz_enabled))
-
-                    words_to_add = cur.fetchall()
-                    words_added = 0
-
-                    # Add words to saved_words
-                    for word_row in words_to_add:
-                        word = word_row['word']
-                        cur.execute("""
-                            INSERT INTO saved_words (user_id, word, learning_language, native_language)
-                            VALUES (%s, %s, %s, %s)
-                            ON CONFLICT DO NOTHING
-                        """, (user_id, word, learning_language, native_language))
-                        if cur.rowcount > 0:
-                            words_added += 1
-
-                    # Update last_test_words_added date
-                    if words_added > 0:
-                        cur.execute("""
-                            UPDATE user_preferences
-                            SET last_test_words_added = CURRENT_DATE
-                            WHERE user_id = %s
-                        """, (user_id,))
-
-                        total_users += 1
-                        total_words += words_added
-                        logger.info(f"Added {words_added} words for user {user_id}")
+        eligible = db_fetch_one(f"SELECT COUNT(*) AS count {ELIGIBLE_USERS_SQL}")['count']
+        stats['eligible'] = eligible
+        logger.info(f"🚀 Daily test words: {eligible} users due")
+        if not eligible:
+            return stats
 
+        scheduled_job_progress_ratio.labels(job=JOB_NAME).set(0)
+        processed = 0
+        last_user_id = None
+        while True:
+            user_ids = [row['user_id'] for row in db_fetch_all(f"""
+                SELECT up.user_id {ELIGIBLE_USERS_SQL}
+                AND (%s::uuid IS NULL OR up.user_id > %s::uuid)
+                ORDER BY up.user_id
+                LIMIT %s
+            """, (last_user_id, last_user_id, chunk_size))]
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+
+            chunk_started = time.monotonic()
+            try:
+                result = assign_test_words_chunk(user_ids)
+                stats['users'] += result['users']
+                stats['words'] += result['words']
+                scheduled_job_items_total.labels(job=JOB_NAME, kind='users').inc(result['users'])
+                scheduled_job_items_total.labels(job=JOB_NAME, kind='words').inc(result['words'])
             except Exception as e:
-                logger.error(f"Failed to add words for user {user['user_id']}: {e}")
+                stats['failed_chunks'] += 1
+                scheduled_job_items_total.labels(job=JOB_NAME, kind='errors').inc(len(user_ids))
+                logger.error(f"Daily test words: chunk of {len(user_ids)} users after {user_ids[0]} failed: {e}")
+            chunk_seconds = time.monotonic() - chunk_started
+            scheduled_job_chunk_duration_seconds.labels(job=JOB_NAME).observe(chunk_seconds)
 
-        logger.info(f"✅ Daily test words completed: {total_users} users, {total_words} words added")
+            stats['chunks'] += 1
+            processed += len(user_ids)
+            scheduled_job_progress_ratio.labels(job=JOB_NAME).set(min(processed / eligible, 1.0))
+            logger.info(f"Daily test words: chunk {stats['chunks']} ({len(user_ids)} users) in {chunk_seconds:.2f}s, "
+                        f"{processed}/{eligible} users processed, {stats['words']} words added")
+
+        stats['seconds'] = round(time.monotonic() - started, 3)
+        logger.info(f"✅ Daily test words completed: {stats['users']} users, {stats['words']} words added "
+                    f"in {stats['chunks']} chunks ({stats['failed_chunks']} failed), {stats['seconds']}s")
 
     except Exception as e:
         logger.error(f"❌ Error in daily test words job: {e}")
+    finally:
+        scheduled_job_progress_ratio.labels(job=JOB_NAME).set(1)
+    return stats
+
 
 def daily_test_words_worker():
     """
     Background worker that adds daily test vocabulary words for all enabled users.
-    Runs at midnight every day.
+    Runs every hour; each run serves the users whose local midnight has passed.
     """
-    # Schedule daily test vocabulary words at midnight
-    schedule.every().day.at("00:00").do(add_daily_test_words_for_all_users)
-    logger.info("📅 Scheduled daily test vocabulary words at midnight")
+    # Own scheduler: the default one is shared by every worker thread in the process
+    scheduler = schedule.Scheduler()
+    scheduler.every().hour.at(":05").do(add_daily_test_words_for_all_users)
+    logger.info("📅 Scheduled daily test vocabulary words hourly (per user timezone)")
 
     while True:
         try:
-            schedule.run_pending()
+            scheduler.run_pending()
             time.sleep(60)  # Check every minute
         except Exception as e:
             logger.error(f"Error in daily test words scheduler: {e}")
-            time.sleep(300)  # Wait 5 minutes on error before retrying
\ No newline at end of file
+            time.sleep(300)  # Wait 5 minutes on error before retrying
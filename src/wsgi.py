@@ -0,0 +1,14 @@
+"""
+Dogetionary API - WSGI Entry Point
+
+Module-level application object for production WSGI servers:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Background workers are not started here; gunicorn.conf.py starts them from
+its server hooks so each one runs in the right process.
+"""
+
+from app import create_app
+
+app = create_app()
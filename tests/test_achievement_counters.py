@@ -0,0 +1,97 @@
+"""
+Unit tests for score and test-completion checks backed by running counters.
+
+Queries are answered by fakes keyed on the table they read, so these check
+that each check is a handful of single-row reads without PostgreSQL.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import handlers.achievements as achievements
+
+USER = '11111111-1111-1111-1111-111111111111'
+
+
+class FakeCounters:
+    def __init__(self, saved, memberships, enabled):
+        self.saved = saved
+        self.memberships = memberships
+        self.enabled = enabled
+        self.queries = []
+
+    def fetch_one(self, query, params):
+        self.queries.append(query)
+        if 'FROM user_scores' in query:
+            return {'score': 420}
+        if 'FROM user_test_progress' in query:
+            return {'saved_words': self.saved.get(params[2], 0)}
+        if 'BOOL_OR' in query:
+            word = params[0].lower()
+            return {name.lower(): (name in self.memberships.get(word, ())) or None
+                    for name in achievements.TEST_TYPES_MAPPING}
+        if 'FROM test_vocabularies' in query:
+            return {name.lower(): 3 for name in achievements.TEST_TYPES_MAPPING}
+        if 'FROM user_preferences' in query:
+            return {metadata['pref_column']: name in self.enabled
+                    for name, metadata in achievements.TEST_TYPES_MAPPING.items()}
+        raise AssertionError(f'unexpected query: {query}')
+
+    def fetch_all(self, query, params):
+        self.queries.append(query)
+        self.check_no_scan(query)
+        return [{'test_type': name, 'saved_words': count} for name, count in self.saved.items()]
+
+    @staticmethod
+    def check_no_scan(query):
+        assert 'saved_words sw' not in query and 'FROM reviews' not in query
+
+
+class TestAchievementCounters(unittest.TestCase):
+
+    def use(self, **kwargs):
+        achievements._test_totals_cache.clear()
+        self.db = FakeCounters(**kwargs)
+        for patcher in (patch.object(achievements, 'db_fetch_one', side_effect=self.db.fetch_one),
+                        patch.object(achievements, 'db_fetch_all', side_effect=self.db.fetch_all)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_score_is_one_counter_read(self):
+        self.use(saved={}, memberships={}, enabled=set())
+        self.assertEqual(achievements.calculate_user_score(USER), 420)
+        self.assertEqual(len(self.db.queries), 1)
+
+    def test_non_test_word_stops_after_membership_lookup(self):
+        self.use(saved={'TIANZ': 3}, memberships={}, enabled={'TIANZ'})
+        self.assertEqual(achievements.check_test_completion_badges(USER, 'zebra', 'en'), [])
+        self.assertEqual(len(self.db.queries), 1)
+
+    def test_completed_enabled_test_awards_badge(self):
+        self.use(saved={'TIANZ': 3, 'TOEFL_BEGINNER': 3}, enabled={'TIANZ'},
+                 memberships={'apple': ('TIANZ', 'TOEFL_BEGINNER')})
+        badges = achievements.check_test_completion_badges(USER, 'Apple', 'en')
+        self.assertEqual([b['badge_id'] for b in badges], ['TIANZ'])
+
+    def test_incomplete_test_awards_nothing(self):
+        self.use(saved={'TIANZ': 2}, enabled={'TIANZ'}, memberships={'apple': ('TIANZ',)})
+        self.assertEqual(achievements.check_test_completion_badges(USER, 'apple', 'en'), [])
+
+    def test_totals_are_cached(self):
+        self.use(saved={'IELTS_ADVANCED': 1}, memberships={}, enabled=set())
+        first = achievements.get_test_vocabulary_progress(USER)
+        achievements.get_test_vocabulary_progress(USER)
+        self.assertEqual(first['IELTS_ADVANCED'], {'saved_words': 1, 'total_words': 3})
+        self.assertEqual(first['TIANZ'], {'saved_words': 0, 'total_words': 3})
+        self.assertEqual(sum('FROM test_vocabularies' in q for q in self.db.queries), 1)
+        self.assertEqual(
+            achievements.count_test_vocabulary_progress(USER, 'is_tianz')['total_words'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Unit tests for the batched API usage log writer.
+
+The database write is replaced by an in-memory recorder so these run
+without PostgreSQL.
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from middleware.api_usage_tracker import ApiUsageLogWriter, _valid_uuid
+
+
+class RecordingWriter(ApiUsageLogWriter):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+        self.fail = False
+        self.written = threading.Event()
+
+    def _write_rows(self, rows):
+        if self.fail:
+            raise Exception('database unavailable')
+        self.batches.append(list(rows))
+        self.written.set()
+
+
+def row(i):
+    return (None, f'/v3/endpoint/{i}', 'GET', None, 200, 1.0, 'test', 'v3')
+
+
+class TestApiUsageLogWriter(unittest.TestCase):
+
+    def test_flushes_when_batch_size_reached(self):
+        writer = RecordingWriter(max_queue_size=100, batch_size=5, flush_interval=60)
+        for i in range(5):
+            writer.enqueue(row(i))
+        self.assertTrue(writer.written.wait(2))
+        self.assertEqual(len(writer.batches), 1)
+        self.assertEqual(len(writer.batches[0]), 5)
+        writer.shutdown()
+
+    def test_flushes_partial_batch_after_interval(self):
+        writer = RecordingWriter(max_queue_size=100, batch_size=50, flush_interval=0.1)
+        writer.enqueue(row(1))
+        self.assertTrue(writer.written.wait(2))
+        self.assertEqual(writer.batches, [[row(1)]])
+        writer.shutdown()
+
+    def test_drops_oldest_when_queue_full(self):
+        writer = RecordingWriter(max_queue_size=3, batch_size=100, flush_interval=60)
+        for i in range(5):
+            writer.enqueue(row(i))
+        writer.shutdown()
+
+        self.assertEqual(writer.dropped, 2)
+        written = [r for batch in writer.batches for r in batch]
+        self.assertEqual(written, [row(2), row(3), row(4)])
+
+    def test_shutdown_flushes_remaining_rows(self):
+        writer = RecordingWriter(max_queue_size=100, batch_size=3, flush_interval=60)
+        for i in range(7):
+            writer.enqueue(row(i))
+        writer.shutdown()
+
+        written = [r for batch in writer.batches for r in batch]
+        self.assertEqual(written, [row(i) for i in range(7)])
+        self.assertTrue(all(len(batch) <= 3 for batch in writer.batches))
+
+    def test_write_error_counts_rows_as_dropped(self):
+        writer = RecordingWriter(max_queue_size=100, batch_size=10, flush_interval=60)
+        writer.fail = True
+        for i in range(4):
+            writer.enqueue(row(i))
+        writer.shutdown()
+        self.assertEqual(writer.dropped, 4)
+
+    def test_enqueue_does_not_block_on_slow_writes(self):
+        class SlowWriter(RecordingWriter):
+            def _write_rows(self, rows):
+                time.sleep(0.2)
+                super()._write_rows(rows)
+
+        writer = SlowWriter(max_queue_size=100, batch_size=10, flush_interval=60)
+        start = time.monotonic()
+        for i in range(20):
+            writer.enqueue(row(i))
+        self.assertLess(time.monotonic() - start, 0.1)
+        writer.shutdown()
+
+    def test_valid_uuid(self):
+        self.assertEqual(
+            _valid_uuid('5B2B3C4D-1111-2222-3333-444455556666'),
+            '5b2b3c4d-1111-2222-3333-444455556666'
+        )
+        self.assertIsNone(_valid_uuid('not-a-uuid'))
+        self.assertIsNone(_valid_uuid(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
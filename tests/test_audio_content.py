@@ -0,0 +1,95 @@
+"""
+Unit tests for the content-addressed audio endpoint.
+
+The audio table is replaced by a fake lookup so these run without PostgreSQL.
+"""
+
+import unittest
+import hashlib
+import sys
+import os
+from unittest.mock import patch
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import handlers.audio as audio
+
+AUDIO = bytes(range(256)) * 4
+
+
+class TestAudioContent(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.route('/v3/audio-content/<content_hash>')(audio.get_audio_content)
+        self.client = self.app.test_client()
+        self.hash = audio.audio_content_hash('hello world', 'en')
+        self.lookups = []
+
+        def fetch_one(query, params):
+            self.lookups.append(params)
+            if params == (self.hash,):
+                return {'text_content': 'hello world', 'language': 'en', 'storage_key': None,
+                        'audio_data': memoryview(AUDIO), 'content_type': 'audio/mpeg'}
+            return None
+
+        patcher = patch.object(audio, 'db_fetch_one', side_effect=fetch_one)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hash_matches_database_trigger_definition(self):
+        expected = hashlib.sha256('en\nhello world'.encode('utf-8')).hexdigest()
+        self.assertEqual(self.hash, expected)
+        self.assertEqual(audio.audio_content_url('hello world', 'en'), f'/v3/audio-content/{expected}')
+
+    def test_serves_raw_audio_with_immutable_caching(self):
+        response = self.client.get(f'/v3/audio-content/{self.hash}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, AUDIO)
+        self.assertEqual(response.mimetype, 'audio/mpeg')
+        self.assertEqual(response.headers['ETag'], f'"{self.hash}"')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertEqual(response.headers['Accept-Ranges'], 'bytes')
+
+    def test_if_none_match_skips_database(self):
+        response = self.client.get(f'/v3/audio-content/{self.hash}',
+                                   headers={'If-None-Match': f'"{self.hash}"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(self.lookups, [])
+
+    def test_range_request(self):
+        response = self.client.get(f'/v3/audio-content/{self.hash}', headers={'Range': 'bytes=10-19'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, AUDIO[10:20])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 10-19/{len(AUDIO)}')
+
+    def test_unknown_and_malformed_hashes_are_404(self):
+        self.assertEqual(self.client.get(f'/v3/audio-content/{"0" * 64}').status_code, 404)
+        self.assertEqual(self.client.get('/v3/audio-content/not-a-hash').status_code, 404)
+        self.assertEqual(self.lookups, [('0' * 64,)])
+
+    def test_inline_flag(self):
+        with self.app.test_request_context('/?inline_audio=true'):
+            self.assertTrue(audio.wants_inline_audio())
+        with self.app.test_request_context('/'):
+            self.assertEqual(audio.wants_inline_audio(), audio.AUDIO_INLINE_BASE64)
+        with self.app.test_request_context('/?inline_audio=false'):
+            self.assertFalse(audio.wants_inline_audio())
+
+    @unittest.skipIf('AUDIO_INLINE_BASE64' in os.environ, 'AUDIO_INLINE_BASE64 overridden')
+    def test_inline_audio_is_the_default(self):
+        # The iOS client decodes audio_data / data: URIs and breaks on URLs
+        self.assertTrue(audio.AUDIO_INLINE_BASE64)
+
+    def test_url_keeps_proxy_prefix(self):
+        with self.app.test_request_context('/', headers={'X-Forwarded-Prefix': '/api/'}):
+            self.assertEqual(audio.audio_content_url('hello world', 'en'), f'/api/v3/audio-content/{self.hash}')
+        with self.app.test_request_context('/', base_url='http://localhost/app'):
+            self.assertEqual(audio.audio_content_url('hello world', 'en'), f'/app/v3/audio-content/{self.hash}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+Unit tests for the durable audio job queue.
+
+The audio_jobs table is replaced by a fake cursor that records statements,
+so these check the queue protocol (claim, complete, retry with backoff, give
+up) without PostgreSQL.
+"""
+
+import unittest
+import threading
+import sys
+import os
+from contextlib import contextmanager
+from unittest.mock import patch
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import services.audio_job_service as jobs
+import handlers.audio as audio
+import workers.audio_worker as audio_worker
+import handlers.words as words
+
+
+class FakeCursor:
+    def __init__(self, results):
+        self.results = results
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        self.statements.append((' '.join(query.split()), params))
+
+    def fetchall(self):
+        return self.results.pop(0) if self.results else []
+
+
+class QueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.results = []
+        self.cursor = FakeCursor(self.results)
+
+        @contextmanager
+        def fake_db_cursor(commit=False):
+            yield self.cursor
+
+        patcher = patch.object(jobs, 'db_cursor', fake_db_cursor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def statement(self, fragment):
+        matches = [s for s in self.cursor.statements if fragment in s[0]]
+        self.assertTrue(matches, f"no statement containing {fragment!r}")
+        return matches[-1]
+
+
+class TestAudioJobQueue(QueueTestCase):
+
+    def test_backoff_doubles_and_is_capped(self):
+        with patch.object(jobs, 'AUDIO_JOB_BACKOFF_BASE', 5), patch.object(jobs, 'AUDIO_JOB_BACKOFF_MAX', 60):
+            self.assertEqual([jobs.retry_delay(n) for n in range(1, 6)], [5, 10, 20, 40, 60])
+
+    def test_enqueue_is_one_deduplicated_insert(self):
+        self.results.append([{'id': 1}])
+        queued = jobs.enqueue_audio_jobs(['hello', 'hello', '', 'world'], 'en')
+        self.assertEqual(queued, 1)
+        self.assertEqual(len(self.cursor.statements), 1)
+        query, params = self.cursor.statements[0]
+        self.assertIn("ON CONFLICT ON CONSTRAINT audio_jobs_text_language_key", query)
+        self.assertIn("WHERE audio_jobs.status IN ('done', 'failed')", query)
+        self.assertEqual(params[2], ['hello', 'world'])
+
+    def test_enqueue_nothing_skips_database(self):
+        self.assertEqual(jobs.enqueue_audio_jobs([], 'en'), 0)
+        self.assertEqual(self.cursor.statements, [])
+
+    def test_claim_skips_locked_rows(self):
+        self.results.append([{'id': 3, 'text_content': 'hi', 'language': 'en',
+                              'attempts': 1, 'max_attempts': 5, 'lag_seconds': 0.2}])
+        claimed = jobs.claim_audio_jobs('host:1:0', limit=1)
+        self.assertEqual([job['id'] for job in claimed], [3])
+        query, params = self.statement('FOR UPDATE SKIP LOCKED')
+        self.assertEqual(params, ('host:1:0', 1))
+
+    def test_process_generates_and_completes(self):
+        job = {'id': 3, 'text_content': 'hi', 'language': 'en', 'attempts': 1, 'max_attempts': 5}
+        with patch('handlers.words.audio_exists', return_value=False), \
+                patch('handlers.words.generate_audio_for_text', return_value=b'mp3') as generate, \
+                patch('handlers.words.store_audio') as store:
+            self.assertEqual(jobs.process_audio_job(job), 'done')
+        generate.assert_called_once_with('hi')
+        store.assert_called_once_with('hi', 'en', b'mp3')
+        self.assertEqual(self.statement("SET status = 'done'")[1], (3,))
+
+    def test_process_skips_existing_audio(self):
+        job = {'id': 3, 'text_content': 'hi', 'language': 'en', 'attempts': 1, 'max_attempts': 5}
+        with patch('handlers.words.audio_exists', return_value=True), \
+                patch('handlers.words.generate_audio_for_text') as generate:
+            self.assertEqual(jobs.process_audio_job(job), 'skipped')
+        generate.assert_not_called()
+
+    def test_failure_retries_with_backoff_then_gives_up(self):
+        job = {'id': 3, 'text_content': 'hi', 'language': 'en', 'attempts': 2, 'max_attempts': 3}
+        with patch('handlers.words.audio_exists', return_value=False), \
+                patch('handlers.words.generate_audio_for_text', side_effect=RuntimeError('tts down')):
+            self.assertEqual(jobs.process_audio_job(job), 'retry')
+            status, delay, error, _, job_id = self.statement('make_interval')[1]
+            self.assertEqual((status, delay, error, job_id), ('queued', jobs.retry_delay(2), 'tts down', 3))
+
+            self.assertEqual(jobs.process_audio_job({**job, 'attempts': 3}), 'failed')
+            self.assertEqual(self.statement('make_interval')[1][0], 'failed')
+
+
+class TestAudioWorker(unittest.TestCase):
+
+    def test_worker_polls_until_stopped(self):
+        stop = threading.Event()
+        results = iter(['done', 'retry', None])
+
+        def run_next(worker_id):
+            result = next(results, None)
+            if result is None:
+                stop.set()
+            return result
+
+        with patch.object(audio_worker, 'run_next_audio_job', side_effect=run_next) as run, \
+                patch.object(audio_worker, 'requeue_stale_audio_jobs') as requeue, \
+                patch.object(audio_worker, 'refresh_queue_depth'):
+            audio_worker.audio_generation_worker(0, stop)
+        self.assertEqual(run.call_count, 3)
+        requeue.assert_called_once()
+
+
+class TestAudioJobsStatus(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.route('/v3/audio-jobs')(audio.get_audio_jobs_status)
+        self.client = self.app.test_client()
+
+    def status(self, statuses, texts):
+        with patch.object(audio, 'get_audio_job_statuses', return_value=statuses):
+            query = '&'.join(f'text={t}' for t in texts)
+            return self.client.get(f'/v3/audio-jobs?language=en&{query}')
+
+    def test_reports_each_text_and_overall_status(self):
+        done = {'status': 'complete', 'attempts': 1, 'last_error': None, 'next_attempt_at': None}
+        queued = {'status': 'queued', 'attempts': 1, 'last_error': 'timeout', 'next_attempt_at': None}
+        response = self.status({'a': done, 'b': queued}, ['a', 'b'])
+        data = response.get_json()
+        self.assertEqual(data['status'], 'queued')
+        self.assertEqual(data['jobs'][0]['audio_url'], audio.audio_content_url('a', 'en'))
+        self.assertIsNone(data['jobs'][1]['audio_url'])
+
+        self.assertEqual(self.status({'a': done}, ['a']).get_json()['status'], 'complete')
+        self.assertEqual(self.status({}, ['c']).get_json()['status'], 'missing')
+
+    def test_requires_language_and_text(self):
+        self.assertEqual(self.client.get('/v3/audio-jobs?language=en').status_code, 400)
+
+
+
+class TestQueueMissingAudio(unittest.TestCase):
+
+    def queue(self, enqueue):
+        definition = {'definitions': [{'examples': ['An apple a day.']}]}
+        refs = {'example_audio': {}}
+        with patch.object(words, 'audio_exists', return_value=False), \
+                patch.object(words, 'enqueue_audio_jobs', side_effect=enqueue) as enqueue_mock:
+            return words.queue_missing_audio('apple', definition, 'en', refs), enqueue_mock
+
+    def test_missing_audio_is_queued(self):
+        status, enqueue = self.queue(lambda texts, language: len(texts))
+        self.assertEqual(status, 'queued')
+        enqueue.assert_called_once_with(['apple', 'An apple a day.'], 'en')
+
+    def test_enqueue_failure_does_not_fail_the_lookup(self):
+        def broken(texts, language):
+            raise RuntimeError('database unavailable')
+        with self.assertLogs(words.logger, 'ERROR'):
+            status, _ = self.queue(broken)
+        self.assertEqual(status, 'error')
+
+
+if __name__ == '__main__':
+    unittest.main()
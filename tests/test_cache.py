@@ -0,0 +1,191 @@
+"""
+Unit tests for in-process caching primitives and definition lookup coalescing.
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.cache import TTLCache, SingleFlight
+import services.definition_service as definition_service
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = TTLCache(max_size=2, ttl=10)
+        self.clock = FakeClock()
+        self.cache._clock = self.clock
+
+    def test_get_returns_stored_value(self):
+        self.cache.set('a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set('a', 1)
+        self.clock.now += 10
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_evicted(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('c'), 3)
+
+    def test_delete_where(self):
+        cache = TTLCache(max_size=10, ttl=10)
+        cache.set(('u1', 'x'), 1)
+        cache.set(('u1', 'y'), 2)
+        cache.set(('u2', 'x'), 3)
+        self.assertEqual(cache.delete_where(lambda key: key[0] == 'u1'), 2)
+        self.assertEqual(cache.get(('u2', 'x')), 3)
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+        results = []
+
+        def work():
+            calls.append(1)
+            release.wait(2)
+            return 'value'
+
+        def caller():
+            results.append(flight.do('key', work))
+
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True, True, True])
+        self.assertTrue(all(value == 'value' for value, _ in results))
+
+    def test_exception_propagates_to_waiters(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def work():
+            release.wait(2)
+            raise ValueError('boom')
+
+        def caller():
+            try:
+                flight.do('key', work)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(len(errors), 3)
+
+    def test_sequential_calls_run_again(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('key', lambda: 1), (1, False))
+        self.assertEqual(flight.do('key', lambda: 2), (2, False))
+
+
+class TestDefinitionCaching(unittest.TestCase):
+
+    def setUp(self):
+        definition_service._definition_cache.clear()
+
+    def test_concurrent_misses_generate_once_then_hit_lru(self):
+        calls = []
+        release = threading.Event()
+
+        def fake_generate(word, learning_lang, native_lang, hedge=False):
+            calls.append(word)
+            release.wait(2)
+            return {'word': word}
+
+        results = []
+        with patch.object(definition_service, '_fetch_or_generate_definition', side_effect=fake_generate):
+            threads = [
+                threading.Thread(target=lambda: results.append(
+                    definition_service.generate_definition_with_llm('viral', 'en', 'zh')))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.1)
+            release.set()
+            for thread in threads:
+                thread.join(2)
+
+            self.assertEqual(definition_service.generate_definition_with_llm('viral', 'en', 'zh'), {'word': 'viral'})
+
+        self.assertEqual(calls, ['viral'])
+        self.assertEqual(results, [{'word': 'viral'}] * 8)
+
+    def test_failed_generation_not_cached(self):
+        with patch.object(definition_service, '_fetch_or_generate_definition', return_value=None) as generate:
+            self.assertIsNone(definition_service.generate_definition_with_llm('oops', 'en', 'zh'))
+            self.assertIsNone(definition_service.generate_definition_with_llm('oops', 'en', 'zh'))
+        self.assertEqual(generate.call_count, 2)
+
+    def test_only_opted_in_callers_hedge(self):
+        with patch.object(definition_service, 'db_fetch_one', return_value=None), \
+                patch.object(definition_service, 'llm_completion', return_value=None) as completion:
+            definition_service.generate_definition_with_llm('slow', 'en', 'zh')
+            definition_service.generate_definition_with_llm('slow', 'en', 'zh', hedge=True)
+        self.assertEqual([c.kwargs['hedge'] for c in completion.call_args_list], [False, True])
+
+    def test_hedged_lookup_does_not_join_unhedged_flight(self):
+        calls = []
+        release = threading.Event()
+
+        def fake_generate(word, learning_lang, native_lang, hedge=False):
+            calls.append(hedge)
+            if not hedge:
+                release.wait(2)
+            return {'word': word}
+
+        with patch.object(definition_service, '_fetch_or_generate_definition', side_effect=fake_generate):
+            background = threading.Thread(
+                target=definition_service.generate_definition_with_llm, args=('viral', 'en', 'zh'))
+            background.start()
+            time.sleep(0.1)
+            result = definition_service.generate_definition_with_llm('viral', 'en', 'zh', hedge=True)
+            release.set()
+            background.join(2)
+
+        self.assertEqual(result, {'word': 'viral'})
+        self.assertEqual(calls, [False, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for the set-based daily test-word assignment job.
+
+Queries are answered by fakes, so these check chunking, keyset pagination
+and the shape of the per-chunk statement without PostgreSQL.
+"""
+
+import unittest
+import sys
+import os
+from contextlib import contextmanager
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import workers.test_vocabulary_worker as worker
+
+USERS = [f'00000000-0000-0000-0000-{i:012d}' for i in range(7)]
+
+
+class FakeCursor:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def execute(self, query, params):
+        self.owner.statements.append((query, params))
+        self.user_ids = params[0]
+
+    def fetchone(self):
+        if self.owner.fail_chunk == len(self.owner.statements):
+            raise RuntimeError('deadlock detected')
+        return {'users': len(self.user_ids), 'words': 10 * len(self.user_ids)}
+
+
+class TestDailyTestWords(unittest.TestCase):
+
+    def setUp(self):
+        self.statements = []
+        self.pages = []
+        self.fail_chunk = None
+
+        def fetch_all(query, params):
+            last_user_id, _, limit = params
+            self.pages.append(last_user_id)
+            remaining = [u for u in USERS if last_user_id is None or u > last_user_id]
+            return [{'user_id': u} for u in remaining[:limit]]
+
+        @contextmanager
+        def fake_db_cursor(commit=False):
+            yield FakeCursor(self)
+
+        for patcher in (patch.object(worker, 'db_fetch_one', return_value={'count': len(USERS)}),
+                        patch.object(worker, 'db_fetch_all', side_effect=fetch_all),
+                        patch.object(worker, 'db_cursor', fake_db_cursor)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_users_are_processed_in_keyset_chunks(self):
+        stats = worker.add_daily_test_words_for_all_users(chunk_size=3)
+        self.assertEqual([params[0] for _, params in self.statements],
+                         [USERS[0:3], USERS[3:6], USERS[6:7]])
+        self.assertEqual(self.pages, [None, USERS[2], USERS[5], USERS[6]])
+        self.assertEqual((stats['eligible'], stats['users'], stats['words'], stats['chunks']), (7, 7, 70, 3))
+
+    def test_chunk_is_one_set_based_statement(self):
+        worker.add_daily_test_words_for_all_users(chunk_size=10)
+        self.assertEqual(len(self.statements), 1)
+        query, params = self.statements[0]
+        self.assertNotIn('RANDOM()', query)
+        self.assertIn('ORDER BY md5(c.user_id::text', query)
+        self.assertIn('INSERT INTO saved_words', query)
+        self.assertIn('AT TIME ZONE', query)
+        self.assertEqual(params[1], worker.DAILY_TEST_WORDS)
+
+    def test_failed_chunk_does_not_stop_the_run(self):
+        self.fail_chunk = 1
+        stats = worker.add_daily_test_words_for_all_users(chunk_size=3)
+        self.assertEqual(stats['failed_chunks'], 1)
+        self.assertEqual(stats['users'], 4)
+        self.assertEqual(stats['chunks'], 3)
+
+    def test_nothing_due(self):
+        with patch.object(worker, 'db_fetch_one', return_value={'count': 0}):
+            stats = worker.add_daily_test_words_for_all_users()
+        self.assertEqual(stats['chunks'], 0)
+        self.assertEqual(self.statements, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Unit tests for the database connection pool.
+
+Uses fake connection objects so no PostgreSQL server is required.
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from psycopg2 import extensions
+from utils.db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeInfo:
+    def __init__(self):
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        if self.conn.broken:
+            raise Exception('server closed the connection unexpectedly')
+        self.conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.autocommit = False
+        self.rollbacks = 0
+        self.info = FakeInfo()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeConnector:
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        conn = FakeConnection()
+        self.created.append(conn)
+        return conn
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.connect = FakeConnector()
+
+    def make_pool(self, **kwargs):
+        options = dict(min_size=1, max_size=2, timeout=0.2, healthcheck_interval=60)
+        options.update(kwargs)
+        return ConnectionPool(self.connect, **options)
+
+    def test_min_size_opened_eagerly(self):
+        pool = self.make_pool(min_size=2, max_size=3)
+        self.assertEqual(len(self.connect.created), 2)
+        self.assertEqual(pool.size, 2)
+
+    def test_close_returns_connection_for_reuse(self):
+        pool = self.make_pool()
+        conn = pool.getconn()
+        raw = conn._conn
+        conn.close()
+        self.assertTrue(conn.closed)
+        self.assertFalse(raw.closed)
+
+        again = pool.getconn()
+        self.assertIs(again._conn, raw)
+        self.assertEqual(len(self.connect.created), 1)
+
+    def test_close_is_idempotent(self):
+        pool = self.make_pool()
+        conn = pool.getconn()
+        conn.close()
+        conn.close()
+        self.assertEqual(pool.size, 1)
+
+    def test_open_transaction_rolled_back_on_return(self):
+        pool = self.make_pool()
+        conn = pool.getconn()
+        conn.cursor().execute('SELECT 1')
+        raw = conn._conn
+        conn.close()
+        self.assertEqual(raw.rollbacks, 1)
+        self.assertEqual(raw.info.transaction_status, extensions.TRANSACTION_STATUS_IDLE)
+
+    def test_autocommit_reset_on_return(self):
+        pool = self.make_pool()
+        conn = pool.getconn()
+        conn.autocommit = True
+        raw = conn._conn
+        conn.close()
+        self.assertFalse(raw.autocommit)
+
+    def test_exhausted_pool_times_out(self):
+        pool = self.make_pool(max_size=1)
+        held = pool.getconn()
+        start = time.monotonic()
+        with self.assertRaises(PoolTimeoutError):
+            pool.getconn()
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        held.close()
+
+    def test_waiter_receives_released_connection(self):
+        pool = self.make_pool(max_size=1, timeout=2)
+        held = pool.getconn()
+        result = {}
+
+        def waiter():
+            result['conn'] = pool.getconn()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        held.close()
+        thread.join(1)
+        self.assertIn('conn', result)
+        self.assertEqual(len(self.connect.created), 1)
+
+    def test_closed_connection_replaced_on_checkout(self):
+        pool = self.make_pool()
+        conn = pool.getconn()
+        raw = conn._conn
+        conn.close()
+        raw.closed = 1
+
+        fresh = pool.getconn()
+        self.assertIsNot(fresh._conn, raw)
+        self.assertEqual(pool.size, 1)
+
+    def test_health_check_discards_broken_idle_connection(self):
+        pool = self.make_pool(healthcheck_interval=0)
+        conn = pool.getconn()
+        raw = conn._conn
+        conn.close()
+        raw.broken = True
+
+        fresh = pool.getconn()
+        self.assertIsNot(fresh._conn, raw)
+        self.assertTrue(raw.closed)
+
+    def test_leaked_proxy_returns_slot_when_collected(self):
+        pool = self.make_pool(max_size=1)
+        conn = pool.getconn()
+        del conn
+        pool.getconn(timeout=0.05)
+
+    def test_context_manager_does_not_release(self):
+        class TxConnection(FakeConnection):
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self.commit()
+
+        pool = ConnectionPool(TxConnection, min_size=0, max_size=1, timeout=0.05)
+        with pool.getconn() as conn:
+            self.assertFalse(conn.closed)
+        self.assertFalse(conn.closed)
+        conn.close()
+
+    def test_closeall_closes_idle_connections(self):
+        pool = self.make_pool(min_size=2)
+        pool.closeall()
+        self.assertTrue(all(c.closed for c in self.connect.created))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Unit tests for the materialized leaderboard.
+
+user_scores is replaced by an in-memory list, so these check snapshot
+caching, pagination and "my rank" lookups without PostgreSQL.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import services.leaderboard_service as leaderboard
+import handlers.reads as reads
+
+# Already in score order
+SCORES = [
+    {'user_id': f'00000000-0000-0000-0000-{i:012d}', 'user_name': f'User {i}', 'user_motto': '',
+     'score': 1000 - 3 * i, 'total_reviews': 600 - i}
+    for i in range(250)
+]
+
+
+class FakeScores:
+    def __init__(self):
+        self.pages = []
+        self.rank_queries = []
+
+    def fetch_all(self, query, params):
+        offset, limit = params
+        self.pages.append((offset, limit))
+        return SCORES[offset:offset + limit]
+
+    def fetch_one(self, query, params=None):
+        if 'FROM user_scores me' in query:
+            return next((row for row in SCORES if row['user_id'] == params['user_id']), None)
+        if 'WHERE' in query:
+            self.rank_queries.append(params)
+            return {'count': sum(1 for row in SCORES if row['score'] > params['score'])}
+        return {'count': len(SCORES)}
+
+
+class TestLeaderboard(unittest.TestCase):
+
+    def setUp(self):
+        leaderboard._snapshot_cache.clear()
+        self.db = FakeScores()
+        for patcher in (patch.object(leaderboard, 'db_fetch_all', side_effect=self.db.fetch_all),
+                        patch.object(leaderboard, 'db_fetch_one', side_effect=self.db.fetch_one),
+                        patch.object(leaderboard, 'LEADERBOARD_TOP_K', 100)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.app = Flask(__name__)
+        self.app.route('/v3/leaderboard-score')(reads.get_leaderboard_v2)
+        self.client = self.app.test_client()
+
+    def test_top_pages_come_from_one_cached_snapshot(self):
+        first = leaderboard.get_leaderboard_page('score', 0, 10)
+        second = leaderboard.get_leaderboard_page('score', 50, 20)
+        self.assertEqual([e['rank'] for e in first['entries']], list(range(1, 11)))
+        self.assertEqual(second['entries'][0]['user_id'], SCORES[50]['user_id'])
+        self.assertEqual(second['total_users'], 250)
+        self.assertEqual(self.db.pages, [(0, 100)])
+
+    def test_pages_past_the_snapshot_read_the_index(self):
+        page = leaderboard.get_leaderboard_page('score', 200, 25)
+        self.assertEqual(page['entries'][0]['rank'], 201)
+        self.assertEqual(page['entries'][0]['user_id'], SCORES[200]['user_id'])
+        self.assertEqual(self.db.pages, [(0, 100), (200, 25)])
+
+    def test_my_rank_counts_users_ahead(self):
+        mine = leaderboard.get_user_rank(SCORES[137]['user_id'])
+        self.assertEqual(mine['rank'], 138)
+        self.assertEqual(self.db.rank_queries[0]['score'], SCORES[137]['score'])
+        self.assertIsNone(leaderboard.get_user_rank('99999999-0000-0000-0000-000000000000'))
+
+    def test_endpoint_paginates_and_reports_my_rank(self):
+        data = self.client.get(f"/v3/leaderboard-score?offset=5&limit=3&user_id={SCORES[10]['user_id']}").get_json()
+        self.assertEqual([e['rank'] for e in data['leaderboard']], [6, 7, 8])
+        self.assertEqual(data['total_users'], 250)
+        self.assertEqual(data['my_rank']['rank'], 11)
+        self.assertNotIn('my_rank', self.client.get('/v3/leaderboard-score').get_json())
+
+    def test_endpoint_rejects_bad_paging(self):
+        self.assertEqual(self.client.get('/v3/leaderboard-score?limit=abc').status_code, 400)
+
+    def test_endpoint_rejects_malformed_user_id(self):
+        response = self.client.get('/v3/leaderboard-score?user_id=not-a-uuid')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.db.rank_queries, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
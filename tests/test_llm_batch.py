@@ -0,0 +1,308 @@
+"""
+Unit tests for batch generation of definitions and review questions.
+
+Batch backends run against a temporary directory or a fake provider client,
+and the engine's tables are replaced by fakes (a recording cursor and
+patched lookups), so no provider or PostgreSQL is contacted.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+import shutil
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import utils.llm_batch as llm_batch
+import services.batch_generation_service as batch_gen
+import handlers.admin_questions_smart as admin_smart
+
+MODEL = 'gpt-5-nano'
+SIMPLE_FORMAT = {'type': 'json_schema', 'json_schema': {'name': 'definition', 'strict': True, 'schema': {
+    'type': 'object',
+    'properties': {'word': {'type': 'string'}, 'translations': {'type': 'array', 'items': {'type': 'string'}}},
+    'required': ['word', 'translations'],
+    'additionalProperties': False,
+}}}
+
+
+def request(custom_id, text='apple'):
+    return llm_batch.batch_request(custom_id, MODEL, [{'role': 'user', 'content': text}], {'type': 'json_object'})
+
+
+def output(custom_id, content):
+    return {'custom_id': custom_id, 'response': {'status_code': 200, 'body': {
+        'choices': [{'message': {'role': 'assistant', 'content': content}}],
+        'usage': {'prompt_tokens': 10, 'completion_tokens': 5},
+    }}, 'error': None}
+
+
+class TestLocalBatchBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.backend = llm_batch.LocalBatchBackend(self.root, workers=2)
+        self.prompts = []
+
+        def fake_completion(messages, model_name, **kwargs):
+            text = messages[-1]['content']
+            self.prompts.append(text)
+            return None if text == 'broken' else json.dumps({'echo': text})
+
+        patcher = patch.object(llm_batch, 'llm_completion', side_effect=fake_completion)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_round_trip_in_batch_output_format(self):
+        batch_id = self.backend.submit(MODEL, [request('a', 'apple'), request('b', 'broken')])
+        lines = {line['custom_id']: line for line in self.backend.poll(batch_id, MODEL)}
+        self.assertEqual(llm_batch.batch_output(lines['a']), ('{"echo": "apple"}', None))
+        self.assertEqual(llm_batch.batch_output(lines['b']), (None, None))
+        self.assertEqual(lines['b']['error']['code'], 'completion_failed')
+
+        # A finished batch is not run again
+        self.backend.poll(batch_id, MODEL)
+        self.assertEqual(sorted(self.prompts), ['apple', 'broken'])
+
+    def test_interrupted_poll_resumes(self):
+        batch_id = self.backend.submit(MODEL, [request('a', 'apple'), request('b', 'banana')])
+        with open(self.backend.path(batch_id, 'output'), 'w') as f:
+            f.write(json.dumps(output('a', '{"echo": "apple"}')) + '\n')
+            f.write('{"custom_id": "b", "resp')  # cut short by a crash
+
+        lines = self.backend.poll(batch_id, MODEL)
+        self.assertEqual(self.prompts, ['banana'])
+        self.assertEqual(sorted(line['custom_id'] for line in lines), ['a', 'b'])
+
+
+class TestProviderBatchBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.files.create.return_value = SimpleNamespace(id='file-in')
+        self.client.batches.create.return_value = SimpleNamespace(id='batch_1')
+        patcher = patch.object(llm_batch, 'get_llm_client', return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.backend = llm_batch.ProviderBatchBackend()
+
+    def test_submit_uploads_jsonl(self):
+        self.assertEqual(self.backend.submit(MODEL, [request('a'), request('b')]), 'batch_1')
+        _, payload = self.client.files.create.call_args.kwargs['file']
+        self.assertEqual([json.loads(line)['custom_id'] for line in payload.decode().splitlines()], ['a', 'b'])
+        self.assertEqual(self.client.files.create.call_args.kwargs['purpose'], 'batch')
+        self.assertEqual(self.client.batches.create.call_args.kwargs['input_file_id'], 'file-in')
+
+    def test_poll_reads_output_and_error_files(self):
+        self.client.batches.retrieve.return_value = SimpleNamespace(status='in_progress')
+        self.assertIsNone(self.backend.poll('batch_1', MODEL))
+
+        self.client.batches.retrieve.return_value = SimpleNamespace(
+            status='expired', output_file_id='file-out', error_file_id='file-err')
+        files = {
+            'file-out': json.dumps(output('a', '{}')) + '\n',
+            'file-err': json.dumps({'custom_id': 'b', 'response': None, 'error': {'code': 'batch_expired'}}) + '\n',
+        }
+        self.client.files.content.side_effect = lambda file_id: SimpleNamespace(
+            read=lambda: files[file_id].encode())
+        lines = self.backend.poll('batch_1', MODEL)
+        self.assertEqual([line['custom_id'] for line in lines], ['a', 'b'])
+
+
+class TestPlanRequests(unittest.TestCase):
+
+    def setUp(self):
+        self.definitions = {('apple', 'en', 'zh'): {'word': 'apple', 'definitions': []}}
+        self.questions = {('apple', 'en', 'zh', 'mc_word')}
+        for patcher in (
+            patch.object(batch_gen, '_existing_definitions', side_effect=lambda items: self.definitions),
+            patch.object(batch_gen, '_existing_questions', side_effect=lambda items: self.questions),
+            patch.object(batch_gen, 'check_word_has_videos', return_value=None),
+            patch.object(batch_gen, 'build_question_prompt', side_effect=lambda w, d, n, qt: f"{qt} for {w}"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def plan(self, pending=frozenset()):
+        items = batch_gen._normalize_items([
+            {'word': 'apple', 'learning_language': 'en', 'native_language': 'zh',
+             'question_types': ['mc_word', 'fill_blank', 'video_mc', 'fill_blank']},
+            {'word': 'quince', 'learning_language': 'en', 'native_language': 'zh',
+             'question_types': ['mc_word']},
+        ])
+        return batch_gen.plan_requests(items, set(pending))
+
+    def test_definitions_first_then_missing_questions(self):
+        requests, in_flight = self.plan()
+        ids = [request['custom_id'] for _, _, request, _ in requests]
+        self.assertEqual(ids, [
+            'question:en:zh:fill_blank:apple',
+            'question:en:zh:video_mc:apple',
+            'definition:en:zh:quince',
+        ])
+        self.assertEqual(in_flight, 0)
+
+        # No usable video: video_mc is asked as an mc_definition question, like the sync path
+        _, _, video_request, video_item = requests[1]
+        self.assertEqual(video_item['prompt_type'], 'mc_definition')
+        self.assertEqual(video_request['body']['messages'][-1]['content'], 'mc_definition for apple')
+        self.assertEqual(requests[2][1], batch_gen.COMPLETION_MODEL_WORD_SEARCH)
+
+    def test_requests_out_of_attempts_are_not_sent_again(self):
+        requests, _ = batch_gen.plan_requests(batch_gen._normalize_items([
+            {'word': 'quince', 'learning_language': 'en', 'native_language': 'zh'},
+            {'word': 'apple', 'learning_language': 'en', 'native_language': 'zh', 'question_types': ['fill_blank']},
+        ]), set(), {'definition:en:zh:quince'})
+        self.assertEqual([request['custom_id'] for _, _, request, _ in requests], ['question:en:zh:fill_blank:apple'])
+
+    def test_requests_in_a_submitted_batch_are_not_sent_again(self):
+        requests, in_flight = self.plan(pending={'definition:en:zh:quince', 'question:en:zh:fill_blank:apple'})
+        self.assertEqual([request['custom_id'] for _, _, request, _ in requests], ['question:en:zh:video_mc:apple'])
+        self.assertEqual(in_flight, 2)
+
+    def test_batches_are_split_by_model_and_size(self):
+        requests = [('question', MODEL, request(f'q{i}'), {}) for i in range(5)]
+        requests.append(('definition', 'llama', request('d'), {}))
+        with patch.object(batch_gen, 'LLM_BATCH_MAX_REQUESTS', 2):
+            chunks = [(kind, model, len(chunk)) for kind, model, chunk in batch_gen._pack(requests)]
+        self.assertEqual(chunks, [('question', MODEL, 2), ('question', MODEL, 2), ('question', MODEL, 1),
+                                  ('definition', 'llama', 1)])
+
+
+class FakeCursor:
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append((' '.join(query.split()), params))
+
+    def fetchone(self):
+        return self.row
+
+
+class TestApplyJob(unittest.TestCase):
+
+    def setUp(self):
+        self.upserts = []
+        self.cursor = None
+
+        @contextmanager
+        def fake_db_cursor(commit=False):
+            yield self.cursor
+
+        def fake_execute_values(cur, query, rows, template=None):
+            self.upserts.append((' '.join(query.split()), rows))
+
+        for patcher in (
+            patch.object(batch_gen, 'db_cursor', fake_db_cursor),
+            patch.object(batch_gen, 'execute_values', side_effect=fake_execute_values),
+            patch.object(batch_gen, 'DEFINITION_RESPONSE_FORMAT', SIMPLE_FORMAT),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def apply(self, kind, items, lines, backend='local'):
+        self.cursor = FakeCursor({'items': items})
+        job = {'id': 7, 'kind': kind, 'backend': backend, 'model': MODEL, 'batch_id': 'b'}
+        return batch_gen._apply_job(job, lines)
+
+    def test_definitions_are_validated_and_upserted(self):
+        items = {f'definition:en:zh:{w}': {'word': w, 'learning_language': 'en', 'native_language': 'zh'}
+                 for w in ('apple', 'pear', 'plum')}
+        lines = [
+            output('definition:en:zh:apple', json.dumps({'word': 'Apple', 'translations': ['苹果']})),
+            output('definition:en:zh:pear', json.dumps({'word': 'pear'})),  # misses translations
+        ]
+        self.assertEqual(self.apply('definition', items, lines), (1, 2))
+
+        # Failures use up an attempt; the stored definition clears its count
+        query, rows = self.upserts[1]
+        self.assertIn('INSERT INTO llm_batch_attempts', query)
+        self.assertEqual([custom_id for custom_id, _ in rows], ['definition:en:zh:pear', 'definition:en:zh:plum'])
+        self.assertIn('attempts = llm_batch_attempts.attempts + 1', query)
+        cleared = self.cursor.statements[-2]
+        self.assertIn('DELETE FROM llm_batch_attempts', cleared[0])
+        self.assertEqual(cleared[1], (['definition:en:zh:apple'],))
+
+        query, rows = self.upserts[0]
+        self.assertIn('INSERT INTO definitions', query)
+        self.assertIn('ON CONFLICT (word, learning_language, native_language)', query)
+        word, _, _, data, version = rows[0]
+        self.assertEqual((word, json.loads(data)['word'], version), ('apple', 'apple', batch_gen.CURRENT_SCHEMA_VERSION))
+        mark = self.cursor.statements[-1]
+        self.assertIn("SET status = 'applied'", mark[0])
+        self.assertEqual(mark[1], (1, 2, 7))
+
+    def test_questions_keep_their_row_type(self):
+        items = {
+            'question:en:zh:video_mc:apple': {'word': 'apple', 'learning_language': 'en', 'native_language': 'zh',
+                                              'question_type': 'video_mc', 'video_id': 3,
+                                              'audio_transcript': 'an apple a day'},
+            'question:en:zh:mc_word:apple': {'word': 'apple', 'learning_language': 'en', 'native_language': 'zh',
+                                             'question_type': 'mc_word', 'prompt_type': 'mc_word'},
+        }
+        lines = [
+            output('question:en:zh:video_mc:apple', json.dumps(
+                {'correct_meaning': 'a fruit', 'distractors': ['a car', 'a tree', 'a song']})),
+            output('question:en:zh:mc_word:apple', json.dumps({'question_text': 'Which word?', 'options': []})),
+        ]
+        self.assertEqual(self.apply('question', items, lines), (2, 0))
+        query, rows = self.upserts[0]
+        self.assertIn('ON CONFLICT (word, learning_language, native_language, question_type)', query)
+        by_type = {row[3]: json.loads(row[4]) for row in rows}
+        self.assertEqual(by_type['video_mc']['video_id'], 3)
+        self.assertEqual(by_type['video_mc']['options'][0], {'id': 'A', 'text': 'a fruit', 'is_correct': True})
+        self.assertEqual(by_type['mc_word']['question_type'], 'mc_word')
+
+    def test_job_taken_by_another_caller_is_skipped(self):
+        self.cursor = FakeCursor(None)
+        job = {'id': 7, 'kind': 'question', 'backend': 'local', 'model': MODEL, 'batch_id': 'b'}
+        self.assertEqual(batch_gen._apply_job(job, []), (0, 0))
+        self.assertEqual(self.upserts, [])
+
+
+class TestRunBatchGeneration(unittest.TestCase):
+
+    def setUp(self):
+        self.polled = []
+        backend = MagicMock()
+        backend.poll.side_effect = lambda batch_id, model: self.polled.append(batch_id)
+        jobs = [{'id': 1, 'kind': 'question', 'backend': 'local', 'model': MODEL, 'batch_id': 'local_1'}]
+        for patcher in (
+            patch.object(batch_gen, 'db_fetch_all', return_value=jobs),
+            patch.object(batch_gen, '_backend', return_value=backend),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_local_batches_are_left_to_callers_outside_requests(self):
+        self.assertEqual(batch_gen.apply_finished_batches({}, poll_local=False), 1)
+        self.assertEqual(self.polled, [])
+        self.assertEqual(batch_gen.apply_finished_batches({}), 1)
+        self.assertEqual(self.polled, ['local_1'])
+
+
+class TestSmartBatchEndpoint(unittest.TestCase):
+
+    def test_local_backend_is_refused(self):
+        app = Flask(__name__)
+        app.route('/generate', methods=['POST'])(admin_smart.smart_batch_generate_questions)
+        with patch.object(admin_smart, 'get_batch_backend', return_value=llm_batch.LocalBatchBackend('/tmp')), \
+                patch.object(admin_smart, 'run_batch_generation') as run:
+            response = app.test_client().post('/generate', json={
+                'source': 'toefl', 'learning_language': 'en', 'native_language': 'zh', 'mode': 'batch'})
+        self.assertEqual(response.status_code, 409)
+        run.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
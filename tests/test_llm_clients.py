@@ -0,0 +1,94 @@
+"""
+Unit tests for process-wide LLM provider clients.
+
+Connection reuse is checked against a local keep-alive HTTP server, so no
+provider is contacted.
+"""
+
+import unittest
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+import httpx
+from prometheus_client import REGISTRY
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import utils.llm as llm
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+def requests_count(provider, connection):
+    return REGISTRY.get_sample_value(
+        'llm_http_requests_total', {'provider': provider, 'connection': connection}) or 0.0
+
+
+class TestLLMClients(unittest.TestCase):
+
+    def setUp(self):
+        llm._clients.clear()
+        self.addCleanup(llm._clients.clear)
+
+    def test_client_is_created_once_per_process(self):
+        with patch.object(llm, '_create_client', side_effect=lambda provider: object()) as create:
+            first = llm.get_llm_client('openai')
+            self.assertIs(llm.get_llm_client('openai'), first)
+            with patch.object(llm.os, 'getpid', return_value=os.getpid() + 1):
+                self.assertIsNot(llm.get_llm_client('openai'), first)
+        self.assertEqual(create.call_count, 2)
+
+    def test_clients_use_provider_timeouts(self):
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'test', 'GROQ_API_KEY': 'test'}):
+            openai_client = llm._create_client('openai')
+            groq_client = llm._create_client('groq')
+        self.assertEqual(openai_client.timeout.read, llm.LLM_TIMEOUTS['openai'])
+        self.assertEqual(groq_client.timeout.read, llm.LLM_TIMEOUTS['groq'])
+        self.assertEqual(openai_client.timeout.connect, llm.LLM_CONNECT_TIMEOUT)
+        self.assertEqual(openai_client.max_retries, llm.LLM_MAX_RETRIES)
+
+    def test_connections_are_kept_alive(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'http://127.0.0.1:{server.server_port}/'
+
+        new_before = requests_count('test', 'new')
+        reused_before = requests_count('test', 'reused')
+        llm._call_timing.connect_seconds = 0.0
+        with httpx.Client(event_hooks=llm._connection_hooks('test')) as client:
+            for _ in range(3):
+                client.get(url).read()
+        self.assertEqual(requests_count('test', 'new') - new_before, 1)
+        self.assertEqual(requests_count('test', 'reused') - reused_before, 2)
+        self.assertGreater(llm._call_timing.connect_seconds, 0.0)
+
+    def test_completion_reuses_the_provider_client(self):
+        response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=' hi '))], usage=None)
+        client = MagicMock()
+        client.chat.completions.create.return_value = response
+        with patch.object(llm, '_create_client', return_value=client) as create:
+            self.assertEqual(llm.llm_completion([{'role': 'user', 'content': 'x'}], 'gpt-4o-mini'), 'hi')
+            self.assertEqual(llm.llm_completion([{'role': 'user', 'content': 'y'}], 'gpt-4o-mini'), 'hi')
+        create.assert_called_once_with('openai')
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
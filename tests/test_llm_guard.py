@@ -0,0 +1,192 @@
+"""
+Unit tests for the per provider/model LLM limiter and circuit breaker.
+
+Clocks and provider clients are fakes, so these run without any provider.
+"""
+
+import unittest
+import sys
+import os
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from prometheus_client import REGISTRY
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import utils.llm as llm
+import utils.llm_guard as llm_guard
+from utils.llm_guard import AdaptiveLimiter, CircuitBreaker, SUCCESS, ERROR, RATE_LIMITED, TIMEOUT, CLIENT_ERROR
+
+GROQ_MODEL = 'llama-3.3-70b-versatile'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+
+    def test_additive_increase_multiplicative_decrease(self):
+        limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=5)
+        for _ in range(5):
+            limiter.acquire(timeout=0)
+            limiter.release(SUCCESS)
+        self.assertEqual(int(limiter.limit), 5)
+        limiter.acquire(timeout=0)
+        limiter.release(RATE_LIMITED)
+        self.assertAlmostEqual(limiter.limit, 2.5)
+        for _ in range(3):
+            limiter.acquire(timeout=0)
+            limiter.release(TIMEOUT)
+        self.assertEqual(limiter.limit, 1)
+
+    def test_waits_for_a_slot_then_times_out(self):
+        limiter = AdaptiveLimiter(initial=1, minimum=1, maximum=1)
+        limiter.acquire(timeout=0)
+        threading.Timer(0.05, limiter.release, args=(SUCCESS,)).start()
+        limiter.acquire(timeout=2)
+        self.assertEqual(limiter.in_flight, 1)
+        with self.assertRaises(llm_guard.QueueTimeoutError):
+            limiter.acquire(timeout=0.01)
+        self.assertEqual(limiter.waiting, 0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def breaker(self, **kwargs):
+        options = dict(window=30, min_requests=4, error_rate=0.5, rate_limited=3, open_seconds=10)
+        options.update(kwargs)
+        breaker = CircuitBreaker(**options)
+        breaker._clock = self.clock = FakeClock()
+        return breaker
+
+    def test_opens_on_rate_limit_spike_and_recovers_through_probe(self):
+        breaker = self.breaker()
+        for _ in range(3):
+            self.assertTrue(breaker.allow())
+            breaker.record(RATE_LIMITED)
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+
+        self.clock.now += 10
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertFalse(breaker.allow())  # one probe at a time
+        breaker.record(SUCCESS)
+        self.assertEqual(breaker.state, 'closed')
+        self.assertTrue(breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        breaker = self.breaker(rate_limited=1)
+        breaker.record(RATE_LIMITED)
+        self.clock.now += 10
+        self.assertTrue(breaker.allow())
+        breaker.record(ERROR)
+        self.assertEqual(breaker.state, 'open')
+        self.clock.now += 5
+        self.assertFalse(breaker.allow())
+
+    def test_error_rate_needs_enough_requests_in_window(self):
+        breaker = self.breaker()
+        breaker.record(ERROR)
+        breaker.record(ERROR)
+        breaker.record(SUCCESS)
+        self.assertEqual(breaker.state, 'closed')
+        self.clock.now += 31  # those fall out of the window
+        for outcome in (SUCCESS, SUCCESS, ERROR):
+            breaker.record(outcome)
+        self.assertEqual(breaker.state, 'closed')
+        breaker.record(ERROR)
+        self.assertEqual(breaker.state, 'open')
+
+    def test_client_errors_are_neutral(self):
+        self.assertEqual(llm_guard.classify_failure(BadRequestError('bad schema')), CLIENT_ERROR)
+        self.assertEqual(llm_guard.classify_failure(RateLimitError('slow down')), RATE_LIMITED)
+        breaker = self.breaker()
+        for _ in range(10):
+            breaker.record(CLIENT_ERROR)
+        self.assertEqual(breaker.state, 'closed')
+        self.assertEqual(len(breaker._outcomes), 0)
+
+
+class TestLLMGuard(unittest.TestCase):
+
+    def setUp(self):
+        self.guard = llm_guard.LLMGuard('groq', 'burst-model')
+        self.guard.breaker._clock = self.clock = FakeClock()
+        patcher = patch.object(self.guard.limiter, 'acquire',
+                               side_effect=llm_guard.QueueTimeoutError('no slot'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_saturated_limiter_does_not_open_breaker(self):
+        for _ in range(self.guard.breaker.min_requests * 2):
+            with self.assertRaises(llm_guard.QueueTimeoutError):
+                self.guard.acquire()
+        self.assertEqual(self.guard.breaker.state, 'closed')
+
+    def test_queue_timeout_frees_half_open_probe(self):
+        breaker = self.guard.breaker
+        for _ in range(breaker.rate_limited):
+            breaker.record(RATE_LIMITED)
+        self.clock.now += breaker.open_seconds
+        with self.assertRaises(llm_guard.QueueTimeoutError):
+            self.guard.acquire()
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertTrue(breaker.allow())
+
+
+class TestGuardedCompletion(unittest.TestCase):
+
+    def setUp(self):
+        llm_guard._guards.clear()
+        self.addCleanup(llm_guard._guards.clear)
+        self.clients = {'groq': MagicMock(), 'openai': MagicMock()}
+        self.clients['openai'].chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content='from openai'))], usage=None)
+        self.clients['groq'].chat.completions.create.side_effect = RateLimitError('over capacity')
+        for patcher in (patch.object(llm, 'get_llm_client', side_effect=self.clients.__getitem__),
+                        patch.object(llm, 'get_response_cache', return_value=None),
+                        patch.object(llm, 'GROQ_AVAILABLE', True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def complete(self):
+        return llm.llm_completion([{'role': 'user', 'content': 'apple'}], GROQ_MODEL)
+
+    def test_open_breaker_goes_straight_to_fallback(self):
+        guard = llm_guard.get_llm_guard('groq', GROQ_MODEL)
+        for _ in range(guard.breaker.rate_limited):
+            self.assertEqual(self.complete(), 'from openai')
+        groq_calls = self.clients['groq'].chat.completions.create.call_count
+        self.assertEqual(guard.breaker.state, 'open')
+        self.assertEqual(REGISTRY.get_sample_value(
+            'llm_breaker_state', {'provider': 'groq', 'model': GROQ_MODEL}), 2)
+
+        self.assertEqual(self.complete(), 'from openai')
+        self.assertEqual(self.clients['groq'].chat.completions.create.call_count, groq_calls)
+        self.assertEqual(guard.limiter.in_flight, 0)
+
+    def test_rate_limits_shrink_the_concurrency_limit(self):
+        guard = llm_guard.get_llm_guard('groq', GROQ_MODEL)
+        before = guard.limiter.limit
+        self.complete()
+        self.assertEqual(guard.limiter.limit, before / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
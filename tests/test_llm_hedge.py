@@ -0,0 +1,189 @@
+"""
+Unit tests for hedged LLM requests.
+
+Primary and fallback calls are plain functions with controlled delays, so
+these run without any provider.
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+import threading
+from unittest.mock import patch, MagicMock
+from prometheus_client import REGISTRY
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import utils.llm as llm
+import utils.llm_hedge as llm_hedge
+
+MODEL = 'llama-3.3-70b-versatile'
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'word': {'type': 'string'},
+        'valid_word_score': {'type': 'number'},
+        'definitions': {'type': 'array', 'items': {
+            'type': 'object',
+            'properties': {'type': {'type': 'string'}, 'comment': {'type': ['string', 'null']}},
+            'required': ['type', 'comment'],
+            'additionalProperties': False,
+        }},
+    },
+    'required': ['word', 'valid_word_score', 'definitions'],
+    'additionalProperties': False,
+}
+FORMAT = {'type': 'json_schema', 'json_schema': {'name': 'definition', 'strict': True, 'schema': SCHEMA}}
+VALID = json.dumps({'word': 'apple', 'valid_word_score': 0.9, 'definitions': [{'type': 'noun', 'comment': None}]})
+INVALID = json.dumps({'word': 'apple', 'definitions': []})
+
+
+def answer(content, delay=0.0, calls=None, name=None):
+    def call():
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        return content
+    return call
+
+
+def hedge_count(action):
+    return REGISTRY.get_sample_value('llm_hedge_total', {'model': MODEL, 'action': action}) or 0.0
+
+
+def win_count(winner):
+    return REGISTRY.get_sample_value('llm_hedge_wins_total', {'model': MODEL, 'winner': winner}) or 0.0
+
+
+class TestSchemaValidation(unittest.TestCase):
+
+    def test_conforming_and_broken_responses(self):
+        validate = llm_hedge.response_validator(FORMAT)
+        self.assertTrue(validate(VALID))
+        self.assertFalse(validate(INVALID))
+        self.assertFalse(validate('{"word": "apple"'))
+        self.assertFalse(validate(None))
+        self.assertFalse(validate(json.dumps({
+            'word': 'apple', 'valid_word_score': 0.9, 'definitions': [{'type': 'noun', 'comment': None}],
+            'extra': True})))
+        self.assertFalse(validate(json.dumps({
+            'word': 'apple', 'valid_word_score': 'high', 'definitions': []})))
+        self.assertTrue(llm_hedge.response_validator(None)('plain text'))
+        self.assertFalse(llm_hedge.response_validator({'type': 'json_object'})('[1, 2]'))
+
+
+class TestHedgedCall(unittest.TestCase):
+
+    def setUp(self):
+        llm_hedge._trackers.clear()
+        self.addCleanup(llm_hedge._trackers.clear)
+        patcher = patch.object(llm_hedge, 'LLM_HEDGE_DELAY', 0.1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.validate = llm_hedge.response_validator(FORMAT)
+        self.calls = []
+
+    def run_hedge(self, primary, fallback):
+        return llm_hedge.hedged_call(MODEL, primary, fallback, self.validate)
+
+    def test_fast_primary_is_not_hedged(self):
+        before = hedge_count('skipped')
+        result = self.run_hedge(answer(VALID, calls=self.calls, name='primary'),
+                                answer(VALID, calls=self.calls, name='fallback'))
+        self.assertEqual(result, VALID)
+        self.assertEqual(self.calls, ['primary'])
+        self.assertEqual(hedge_count('skipped') - before, 1)
+
+    def test_slow_primary_is_raced_against_fallback(self):
+        hedged, fallback_wins = hedge_count('hedged'), win_count('fallback')
+        fallback = json.dumps({'word': 'apple', 'valid_word_score': 0.5, 'definitions': []})
+        result = self.run_hedge(answer(VALID, delay=1.0), answer(fallback, delay=0.01))
+        self.assertEqual(result, fallback)
+        self.assertEqual(hedge_count('hedged') - hedged, 1)
+        self.assertEqual(win_count('fallback') - fallback_wins, 1)
+
+    def test_invalid_fallback_does_not_beat_slow_valid_primary(self):
+        primary_wins = win_count('primary')
+        result = self.run_hedge(answer(VALID, delay=0.3), answer(INVALID))
+        self.assertEqual(result, VALID)
+        self.assertEqual(win_count('primary') - primary_wins, 1)
+
+    def test_early_primary_failure_fails_over_immediately(self):
+        before = hedge_count('failover')
+        started = time.monotonic()
+        result = self.run_hedge(answer(None), answer(VALID))
+        self.assertEqual(result, VALID)
+        self.assertLess(time.monotonic() - started, 0.1)
+        self.assertEqual(hedge_count('failover') - before, 1)
+
+    def test_nothing_valid(self):
+        self.assertIsNone(self.run_hedge(answer(INVALID, delay=0.2), answer(None)))
+
+    def test_cached_primary_answers_are_not_latencies(self):
+        tracker = llm_hedge.get_latency_tracker(MODEL)
+        for _ in range(llm_hedge.LLM_HEDGE_MIN_SAMPLES):
+            llm_hedge.hedged_call(MODEL, answer(VALID), answer(VALID), self.validate, from_cache=lambda: True)
+        self.assertEqual(len(tracker._latencies), 0)
+        self.run_hedge(answer(VALID), answer(VALID))
+        self.assertEqual(len(tracker._latencies), 1)
+
+    def test_delay_follows_recent_primary_latency(self):
+        tracker = llm_hedge.get_latency_tracker(MODEL)
+        self.assertEqual(tracker.delay(), 0.1)
+        for i in range(100):
+            tracker.observe(0.3 + i / 100)
+        self.assertAlmostEqual(tracker.delay(), 1.25)
+        for _ in range(200):
+            tracker.observe(60)
+        self.assertEqual(tracker.delay(), llm_hedge.LLM_HEDGE_MAX_DELAY)
+
+
+class TestHedgedCompletion(unittest.TestCase):
+
+    def test_hedge_uses_the_configured_fallback_model(self):
+        models = []
+        lock = threading.Lock()
+        original = llm.llm_completion
+
+        def fake_completion(*args, **kwargs):
+            if not kwargs.get('_is_fallback_attempt'):
+                return original(*args, **kwargs)
+            with lock:
+                models.append(kwargs['model_name'])
+            return VALID
+
+        with patch.object(llm, 'llm_completion', side_effect=fake_completion):
+            result = llm.llm_completion([{'role': 'user', 'content': 'apple'}], MODEL,
+                                        response_format=FORMAT, hedge=True)
+        self.assertEqual(result, VALID)
+        self.assertEqual(models, [MODEL])
+
+    def test_response_cache_hits_are_reported_to_the_hedge(self):
+        cache = MagicMock()
+        cache.get.return_value = VALID
+        seen = []
+
+        def fake_hedged_call(model, primary, fallback, is_valid, from_cache):
+            content = primary()
+            seen.append(from_cache())
+            return content
+
+        with patch.object(llm, 'get_response_cache', return_value=cache), \
+                patch.object(llm, 'hedged_call', side_effect=fake_hedged_call):
+            result = llm.llm_completion([{'role': 'user', 'content': 'apple'}], MODEL,
+                                        response_format=FORMAT, hedge=True)
+        self.assertEqual(result, VALID)
+        self.assertEqual(seen, [True])
+
+    def test_openai_models_are_never_hedged(self):
+        with patch.object(llm, 'hedged_call') as hedged_call, \
+                patch.object(llm, 'get_llm_client', side_effect=RuntimeError('offline')):
+            llm.llm_completion([{'role': 'user', 'content': 'apple'}], 'gpt-4o-mini', hedge=True)
+        hedged_call.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Unit tests for the opt-in LLM response cache.
+
+The disk backend runs in a temporary directory and the provider client is a
+fake, so no provider or PostgreSQL is contacted.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from prometheus_client import REGISTRY
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import utils.llm as llm
+import utils.llm_cache as llm_cache
+
+MESSAGES = [{'role': 'system', 'content': 'Define words.'}, {'role': 'user', 'content': 'apple'}]
+JSON_FORMAT = {'type': 'json_object'}
+
+
+def cached_calls(model):
+    return REGISTRY.get_sample_value(
+        'llm_calls_total', {'provider': 'openai', 'model': model, 'status': 'cached'}) or 0.0
+
+
+class TestResponseCacheKey(unittest.TestCase):
+
+    def test_key_covers_the_request(self):
+        key = llm_cache.response_cache_key('gpt-4o-mini', MESSAGES, JSON_FORMAT, 1.0)
+        self.assertEqual(key, llm_cache.response_cache_key('gpt-4o-mini', [dict(m) for m in MESSAGES],
+                                                           {'type': 'json_object'}, 1.0))
+        self.assertEqual(len(key), 64)
+        for other in (
+            llm_cache.response_cache_key('gpt-4o', MESSAGES, JSON_FORMAT, 1.0),
+            llm_cache.response_cache_key('gpt-4o-mini', MESSAGES[:1], JSON_FORMAT, 1.0),
+            llm_cache.response_cache_key('gpt-4o-mini', MESSAGES, None, 1.0),
+            llm_cache.response_cache_key('gpt-4o-mini', MESSAGES, JSON_FORMAT, 0.0),
+            llm_cache.response_cache_key('gpt-4o-mini', MESSAGES, JSON_FORMAT, 1.0, 100),
+        ):
+            self.assertNotEqual(key, other)
+
+
+class TestDiskResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.cache = llm_cache.DiskResponseCache(self.root, ttl=60, max_entries=2)
+
+    def test_round_trip_and_expiry(self):
+        self.cache.put('ab' * 32, 'gpt-4o-mini', '{"definition": "a fruit"}')
+        self.assertEqual(self.cache.get('ab' * 32), '{"definition": "a fruit"}')
+        self.assertIsNone(self.cache.get('cd' * 32))
+        with patch.object(llm_cache.time, 'time', return_value=llm_cache.time.time() + 61):
+            self.assertIsNone(self.cache.get('ab' * 32))
+
+    def test_prune_evicts_least_recently_used(self):
+        keys = ['a1' * 32, 'b2' * 32, 'c3' * 32]
+        for i, key in enumerate(keys):
+            self.cache.put(key, 'gpt-4o-mini', key)
+            path = self.cache.path(key)
+            os.utime(path, (1000 + i, os.stat(path).st_mtime))
+        self.cache.get(keys[0])
+
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertEqual(self.cache.get(keys[0]), keys[0])
+        self.assertEqual(self.cache.get(keys[2]), keys[2])
+
+
+class TestCachedCompletion(unittest.TestCase):
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.cache = llm_cache.DiskResponseCache(root)
+        self.client = MagicMock()
+        self.client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=' {"ok": true} '))], usage=None)
+        for patcher in (patch.object(llm, 'get_response_cache', return_value=self.cache),
+                        patch.object(llm, 'get_llm_client', return_value=self.client)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def complete(self, **kwargs):
+        return llm.llm_completion(MESSAGES, 'gpt-4o-mini', response_format=JSON_FORMAT, **kwargs)
+
+    def test_repeat_request_is_served_from_cache(self):
+        before = cached_calls('gpt-4o-mini')
+        self.assertEqual(self.complete(), '{"ok": true}')
+        self.assertEqual(self.complete(), '{"ok": true}')
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+        self.assertEqual(cached_calls('gpt-4o-mini') - before, 1)
+
+    def test_bypass_flag(self):
+        self.complete(use_cache=False)
+        self.complete(use_cache=False)
+        self.assertEqual(self.client.chat.completions.create.call_count, 2)
+        self.complete()
+        self.assertEqual(self.client.chat.completions.create.call_count, 3)
+
+    def test_empty_responses_are_not_cached(self):
+        self.client.chat.completions.create.return_value.choices[0].message.content = ''
+        self.assertIsNone(self.complete())
+        self.assertIsNone(self.complete())
+        self.assertEqual(self.client.chat.completions.create.call_count, 2)
+
+    def test_broken_cache_falls_through_to_provider(self):
+        with patch.object(self.cache, 'get', side_effect=OSError('disk full')), \
+                patch.object(self.cache, 'put', side_effect=OSError('disk full')):
+            self.assertEqual(self.complete(), '{"ok": true}')
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
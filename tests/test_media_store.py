@@ -0,0 +1,183 @@
+"""
+Unit tests for the pluggable media store.
+
+The local backend runs against a temporary directory and the S3 backend
+against an in-memory client, so these need neither a bucket nor PostgreSQL.
+"""
+
+import io
+import unittest
+import tempfile
+import sys
+import os
+from unittest.mock import patch
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import utils.media_store as media_store
+import handlers.videos as videos
+from utils.media_store import LocalMediaStore, S3MediaStore, content_key
+
+BLOB = bytes(i % 253 for i in range(5000))
+
+
+class NotFound(Exception):
+    def __init__(self):
+        super().__init__('NoSuchKey')
+        self.response = {'Error': {'Code': 'NoSuchKey'}}
+
+
+class FakeS3Client:
+    """Just enough of the boto3 S3 client for S3MediaStore."""
+
+    def __init__(self):
+        self.objects = {}
+        self.ranges = []
+
+    def put_object(self, Bucket, Key, Body, **extra):
+        self.objects[(Bucket, Key)] = bytes(Body)
+
+    def _object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NotFound()
+        return self.objects[(Bucket, Key)]
+
+    def head_object(self, Bucket, Key):
+        return {'ContentLength': len(self._object(Bucket, Key))}
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self._object(Bucket, Key)
+        if Range:
+            self.ranges.append(Range)
+            start, end = Range[len('bytes='):].split('-')
+            data = data[int(start):int(end) + 1]
+        return {'Body': io.BytesIO(data)}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+class TestLocalMediaStore(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = LocalMediaStore(tmp.name)
+
+    def test_put_is_content_addressed_and_idempotent(self):
+        key = self.store.put(BLOB)
+        self.assertEqual(key, content_key(BLOB))
+        self.assertEqual(self.store.put(BLOB), key)
+        self.assertTrue(self.store.local_path(key).endswith(f"{key[:2]}/{key[2:4]}/{key}"))
+        self.assertEqual(self.store.get(key), BLOB)
+        self.assertEqual(self.store.size(key), len(BLOB))
+
+    def test_iter_range_yields_bounded_chunks(self):
+        key = self.store.put(BLOB)
+        chunks = list(self.store.iter_range(key, 100, 2100, chunk_size=512))
+        self.assertEqual(b''.join(chunks), BLOB[100:2100])
+        self.assertTrue(all(len(chunk) <= 512 for chunk in chunks))
+
+    def test_missing_blob(self):
+        self.assertFalse(self.store.exists('0' * 64))
+        with self.assertRaises(KeyError):
+            self.store.get('0' * 64)
+        key = self.store.put(BLOB)
+        self.store.delete(key)
+        self.assertFalse(self.store.exists(key))
+
+
+class TestS3MediaStore(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeS3Client()
+        self.store = S3MediaStore(self.client, 'bucket', prefix='media/')
+
+    def test_round_trip_and_ranged_reads(self):
+        key = self.store.put(BLOB, 'video/mp4')
+        self.assertIn(('bucket', f"media/{key[:2]}/{key}"), self.client.objects)
+        self.assertEqual(self.store.get(key), BLOB)
+        self.assertEqual(self.store.size(key), len(BLOB))
+        self.assertEqual(b''.join(self.store.iter_range(key, 10, 20, chunk_size=4)), BLOB[10:20])
+        self.assertEqual(self.client.ranges, ['bytes=10-19'])
+
+    def test_not_found_maps_to_key_error(self):
+        self.assertFalse(self.store.exists('0' * 64))
+        with self.assertRaises(KeyError):
+            self.store.get('0' * 64)
+        with self.assertRaises(KeyError):
+            self.store.size('0' * 64)
+
+
+class TestDualRead(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = LocalMediaStore(tmp.name)
+
+    def test_load_blob_prefers_store_and_falls_back_to_database(self):
+        key = self.store.put(BLOB)
+        with patch.object(media_store, 'get_media_store', return_value=self.store):
+            self.assertEqual(media_store.load_blob(key, lambda: self.fail('database read')), BLOB)
+            self.assertEqual(media_store.load_blob('f' * 64, lambda: memoryview(b'db')), b'db')
+            self.assertEqual(media_store.load_blob(None, lambda: b'db'), b'db')
+
+    def test_save_blob_dual_writes(self):
+        with patch.object(media_store, 'get_media_store', return_value=self.store), \
+                patch.object(media_store, 'MEDIA_STORE_DUAL_WRITE', False):
+            self.assertEqual(media_store.save_blob(BLOB), (content_key(BLOB), None))
+        with patch.object(media_store, 'get_media_store', return_value=None):
+            self.assertEqual(media_store.save_blob(BLOB), (None, BLOB))
+
+
+class TestVideoFromStore(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.app = Flask(__name__)
+        self.app.route('/v3/videos/<int:video_id>')(videos.get_video)
+        self.client = self.app.test_client()
+        self.local = LocalMediaStore(tmp.name)
+        self.s3 = S3MediaStore(FakeS3Client(), 'bucket')
+        self.key = self.local.put(BLOB)
+        self.s3.put(BLOB)
+
+        def fetch_one(query, params):
+            if 'substring' in query:
+                self.fail('video bytes read from the database')
+            return {'format': 'mp4', 'storage_key': self.key, 'length': None}
+
+        patcher = patch.object(videos, 'db_fetch_one', side_effect=fetch_one)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def serve(self, store, **headers):
+        with patch.object(videos, 'get_media_store', return_value=store):
+            return self.client.get('/v3/videos/7', headers=headers)
+
+    def test_local_store_uses_sendfile_with_ranges(self):
+        response = self.serve(self.local, Range='bytes=0-99')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, BLOB[:100])
+        response.close()
+
+    def test_accel_redirect_hands_file_to_nginx(self):
+        with patch.object(media_store, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/_media/'):
+            response = self.serve(self.local)
+        self.assertEqual(response.headers['X-Accel-Redirect'],
+                         f"/_media/{self.key[:2]}/{self.key[2:4]}/{self.key}")
+        self.assertEqual(response.data, b'')
+
+    def test_s3_store_streams_requested_range(self):
+        response = self.serve(self.s3, Range='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, BLOB[100:200])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 100-199/{len(BLOB)}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Unit tests for /metrics under gunicorn's multiprocess mode.
+
+prometheus_client picks its storage when first imported, so each scenario
+runs in a fresh interpreter with PROMETHEUS_MULTIPROC_DIR set and forks
+"workers" that record samples, like gunicorn does.
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import textwrap
+
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+SCRIPT = textwrap.dedent('''
+    import os, sys
+    sys.path.insert(0, sys.argv[1])
+    from prometheus_client import multiprocess
+    from middleware import metrics
+    from flask import Flask
+
+    pids = []
+    for limit in (4, 6):
+        pid = os.fork()
+        if pid == 0:
+            metrics.db_pool_timeouts_total.inc()
+            metrics.llm_concurrency_limit.labels(provider='groq', model='m').set(limit)
+            os._exit(0)
+        os.waitpid(pid, 0)
+        pids.append(pid)
+    multiprocess.mark_process_dead(pids[0])
+
+    with Flask(__name__).app_context():
+        print(metrics.metrics_endpoint().get_data(as_text=True))
+''')
+
+
+class TestMultiprocessMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def scrape(self):
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=self.dir)
+        result = subprocess.run([sys.executable, '-c', SCRIPT, SRC], env=env,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs fork')
+    def test_counters_sum_across_workers_and_dead_workers_leave_live_gauges(self):
+        output = self.scrape()
+        self.assertIn('db_pool_timeouts_total 2.0', output)
+        self.assertIn('llm_concurrency_limit{model="m",provider="groq"} 6.0', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Unit tests for the precomputed review question pool.
+
+Database reads and generation are replaced by fakes so these run without
+PostgreSQL or an LLM.
+"""
+
+import unittest
+import threading
+import sys
+import os
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import services.question_pool_service as pool_service
+from services.question_pool_service import QuestionPool, PRIORITY_INTERACTIVE, PRIORITY_SWEEP
+
+
+def mc_question(word, qtype):
+    return {
+        'question_type': qtype,
+        'word': word,
+        'options': [{'id': 'A', 'text': 'right'}, {'id': 'B', 'text': 'wrong'}],
+        'correct_answer': 'A'
+    }
+
+
+class TestPrepareWord(unittest.TestCase):
+
+    def run_prepare(self, cached_types, has_videos):
+        generated = []
+        stored = []
+        rows = [{'question_type': t, 'question_data': mc_question('apple', t)} for t in cached_types]
+
+        def generate(word, definition, ll, nl, qtype):
+            generated.append(qtype)
+            question = mc_question(word, qtype)
+            if qtype == 'pronounce_sentence':
+                question['sentence'] = 'I ate an apple.'
+            return question
+
+        with patch('services.definition_service.generate_definition_with_llm', return_value={'word': 'apple'}), \
+                patch.object(pool_service, 'check_word_has_videos',
+                             return_value={'video_id': 1} if has_videos else None), \
+                patch.object(pool_service, 'db_fetch_all', return_value=rows), \
+                patch.object(pool_service, 'generate_question_with_llm', side_effect=generate), \
+                patch.object(pool_service, 'cache_question',
+                             side_effect=lambda w, ll, nl, qtype, q: stored.append(qtype)), \
+                patch.object(pool_service, 'ensure_audio', side_effect=lambda text, lang: stored.append(text)):
+            count = pool_service.prepare_word('apple', 'en', 'zh')
+        return count, generated, stored
+
+    def test_generates_only_missing_types(self):
+        count, generated, stored = self.run_prepare(['mc_definition', 'fill_blank'], has_videos=False)
+        self.assertEqual(generated, ['mc_word', 'pronounce_sentence'])
+        self.assertEqual(count, 2)
+        # Questions cached, then word and sentence audio ensured
+        self.assertEqual(stored, ['mc_word', 'pronounce_sentence', 'apple', 'I ate an apple.'])
+
+    def test_video_mc_only_when_word_has_videos(self):
+        _, without_videos, _ = self.run_prepare([], has_videos=False)
+        _, with_videos, _ = self.run_prepare([], has_videos=True)
+        self.assertNotIn('video_mc', without_videos)
+        self.assertIn('video_mc', with_videos)
+
+
+class TestPooledQuestion(unittest.TestCase):
+
+    def lookup(self, cached_types):
+        rows = [{'question_type': t, 'question_data': mc_question('apple', t)} for t in cached_types]
+        with patch.object(pool_service, 'db_fetch_all', return_value=rows):
+            return pool_service.get_pooled_question('apple', 'en', 'zh')
+
+    def test_miss_when_nothing_cached(self):
+        self.assertIsNone(self.lookup([]))
+
+    def test_prefers_video_mc(self):
+        question = self.lookup(['mc_definition', 'video_mc'])
+        self.assertEqual(question['question_type'], 'video_mc')
+
+    def test_picks_among_cached_types_without_mutating_cache(self):
+        rows = [{'question_type': 'fill_blank', 'question_data': mc_question('apple', 'fill_blank')}]
+        with patch.object(pool_service, 'db_fetch_all', return_value=rows):
+            for _ in range(20):
+                question = pool_service.get_pooled_question('apple', 'en', 'zh')
+                self.assertEqual(question['question_type'], 'fill_blank')
+        self.assertEqual(rows[0]['question_data'], mc_question('apple', 'fill_blank'))
+
+
+class TestQuestionPool(unittest.TestCase):
+
+    def test_interactive_tasks_run_before_sweep(self):
+        pool = QuestionPool(workers=1, max_queue_size=10, refresh_seconds=60)
+        order = []
+        gate = threading.Event()
+
+        def prepare(word, ll, nl):
+            gate.wait(2)
+            order.append(word)
+
+        with patch.object(pool_service, 'prepare_word', side_effect=prepare):
+            pool.submit_word('blocker', 'en', 'zh', PRIORITY_SWEEP)
+            pool.submit_word('later', 'en', 'zh', PRIORITY_SWEEP)
+            pool.submit_word('urgent', 'en', 'zh', PRIORITY_INTERACTIVE)
+            gate.set()
+            pool.join()
+
+        self.assertEqual(order[1:], ['urgent', 'later'])
+
+    def test_duplicates_and_recent_tasks_are_skipped(self):
+        pool = QuestionPool(workers=1, max_queue_size=10, refresh_seconds=60)
+        calls = []
+        gate = threading.Event()
+
+        def prepare(word, ll, nl):
+            gate.wait(2)
+            calls.append(word)
+
+        with patch.object(pool_service, 'prepare_word', side_effect=prepare):
+            pool.submit_word('blocker', 'en', 'zh')
+            self.assertTrue(pool.submit_word('apple', 'en', 'zh'))
+            self.assertFalse(pool.submit_word('apple', 'en', 'zh'))
+            gate.set()
+            pool.join()
+            # Completed within the refresh window
+            self.assertFalse(pool.submit_word('apple', 'en', 'zh'))
+
+        self.assertEqual(calls, ['blocker', 'apple'])
+
+    def test_full_queue_drops_task(self):
+        pool = QuestionPool(workers=1, max_queue_size=1, refresh_seconds=60)
+        gate = threading.Event()
+        with patch.object(pool_service, 'prepare_word', side_effect=lambda *args: gate.wait(2)):
+            pool.submit_word('running', 'en', 'zh')
+            # Wait for the worker to take the first task off the queue
+            for _ in range(100):
+                if pool._queue.qsize() == 0:
+                    break
+                threading.Event().wait(0.01)
+            self.assertTrue(pool.submit_word('queued', 'en', 'zh'))
+            self.assertFalse(pool.submit_word('dropped', 'en', 'zh'))
+            gate.set()
+            pool.join()
+        self.assertEqual(pool.dropped, 1)
+
+    def test_user_task_fans_out_to_words(self):
+        pool = QuestionPool(workers=2, max_queue_size=10, refresh_seconds=60)
+        prepared = []
+        with patch.object(pool_service, 'look_ahead_words',
+                          return_value=[('apple', 'en', 'zh'), ('pear', 'en', 'zh')]), \
+                patch.object(pool_service, 'prepare_word', side_effect=lambda *args: prepared.append(args)):
+            pool.submit_user('11111111-1111-1111-1111-111111111111', PRIORITY_INTERACTIVE)
+            pool.join()
+        self.assertEqual(sorted(prepared), [('apple', 'en', 'zh'), ('pear', 'en', 'zh')])
+
+    def test_disabled_pool_accepts_nothing(self):
+        pool = QuestionPool(workers=0)
+        self.assertFalse(pool.submit_word('apple', 'en', 'zh'))
+
+
+if __name__ == '__main__':
+    unittest.main()
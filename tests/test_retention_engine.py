@@ -0,0 +1,393 @@
+"""
+Bit-compatibility tests for the tabulated retention engine.
+
+The legacy_* functions below are the original day-by-day implementations;
+the tabulated engine in spaced_repetition_service must return exactly the
+same floats and dates for every history.
+"""
+
+import unittest
+import math
+import random
+import copy
+import numpy as np
+from datetime import date, datetime, timedelta
+import sys
+import os
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.config import (
+    DECAY_RATE_WEEK_1, DECAY_RATE_WEEK_2, DECAY_RATE_WEEK_3_4,
+    DECAY_RATE_WEEK_5_8, DECAY_RATE_WEEK_9_PLUS, RETENTION_THRESHOLD
+)
+from services.spaced_repetition_service import (
+    get_decay_rate, calculate_retention, get_next_review_date_new,
+    calculate_retention_batch, calculate_retention_for_words, project_review_dates
+)
+
+
+# ----------------------------------------------------------------------------
+# Legacy reference implementation (day-by-day decay)
+# ----------------------------------------------------------------------------
+
+def legacy_get_decay_rate(days_since_start_or_failure):
+    """
+    Calculate daily decay rate based on time elapsed since start or last failure.
+    Uses configurable constants for easy tuning.
+    """
+    if days_since_start_or_failure < 7:
+        return DECAY_RATE_WEEK_1
+    elif days_since_start_or_failure < 14:
+        return DECAY_RATE_WEEK_2
+    elif days_since_start_or_failure < 28:
+        return DECAY_RATE_WEEK_3_4
+    elif days_since_start_or_failure < 56:
+        return DECAY_RATE_WEEK_5_8
+    elif days_since_start_or_failure < 112:
+        return DECAY_RATE_WEEK_9_PLUS
+    else:
+        # Continue halving for longer periods
+        period = 112
+        rate = DECAY_RATE_WEEK_9_PLUS
+        while days_since_start_or_failure >= period * 2:
+            period *= 2
+            rate /= 2
+        return rate
+
+
+def legacy_calculate_retention(review_history, target_date, created_at):
+    """
+    Calculate memory retention at a specific date using the new decay algorithm.
+
+    Rules:
+    - Every review sets retention to 100% regardless of success/failure
+    - Failure resets decay rate to 12.5% per day (restart from week 1)
+    - Success continues current decay schedule
+    - Retention follows exponential decay: retention = e^(-rate * days)
+    """
+    # Ensure we have datetime objects - convert if needed
+    if not hasattr(target_date, 'hour'):
+        target_date = datetime.combine(target_date, datetime.max.time())
+    if not hasattr(created_at, 'hour'):
+        created_at = datetime.combine(created_at, datetime.min.time())
+
+    # If target date is before word creation, no retention
+    if target_date < created_at:
+        return 0.0
+
+    # If target date is on the same day as creation, start at 100%
+    if target_date.date() == created_at.date():
+        return 1.0
+
+    # If no reviews yet, start at 100% and decay from creation date
+    if not review_history:
+        days_since_creation = (target_date - created_at).days
+
+        if days_since_creation == 0:
+            return 1.0  # 100% on creation day
+
+        # Calculate retention by applying decay cumulatively day by day
+        retention = 1.0  # Start at 100% on creation day
+
+        for day in range(1, days_since_creation + 1):
+            current_day_date = created_at + timedelta(days=day)
+            # Calculate days since creation for this day's decay rate
+            days_since_start = (current_day_date - created_at).days
+            daily_decay_rate = legacy_get_decay_rate(days_since_start)
+
+            # Apply daily decay: retention = retention * e^(-daily_rate)
+            retention = retention * math.exp(-daily_decay_rate)
+
+        return max(0.0, min(1.0, retention))
+
+    # Sort reviews by date
+    sorted_reviews = sorted(review_history, key=lambda x: x['reviewed_at'])
+
+    # Find the most recent review before or at target_date
+    last_review = None
+    last_failure_date = created_at  # Track when decay rate should reset
+
+    for review in sorted_reviews:
+        review_date = review['reviewed_at']
+
+        # Ensure review_date is datetime for comparison
+        if not hasattr(review_date, 'hour'):
+            review_date = datetime.combine(review_date, datetime.min.time())
+
+        if review_date <= target_date:
+            last_review = review
+            last_review['reviewed_at'] = review_date  # Update with datetime
+            # If this review was a failure, reset the decay rate reference point
+            if not review['response']:
+                last_failure_date = review_date
+        else:
+            break
+
+    # Calculate retention from the most recent review or creation
+    if last_review:
+        # Start from last review (always 100% immediately after any review)
+        last_review_date = last_review['reviewed_at']
+        days_since_review = (target_date - last_review_date).days
+
+        # If same day as review, return 100%
+        if target_date.date() == last_review_date.date():
+            return 1.0
+
+        # Calculate retention by applying decay cumulatively day by day
+        retention = 1.0  # Start at 100% after review
+
+        for day in range(1, days_since_review + 1):
+            current_day_date = last_review_date + timedelta(days=day)
+            # Calculate days since last failure for this day's decay rate
+            days_since_failure = (current_day_date - last_failure_date).days
+            daily_decay_rate = legacy_get_decay_rate(days_since_failure)
+
+            # Apply daily decay: retention = retention * e^(-daily_rate)
+            retention = retention * math.exp(-daily_decay_rate)
+
+        return max(0.0, min(1.0, retention))
+    else:
+        # No reviews before target date, decay from creation
+        days_since_creation = (target_date - created_at).days
+
+        # If same day as creation, start at 100%
+        if target_date.date() == created_at.date():
+            return 1.0
+
+        # Calculate retention by applying decay cumulatively day by day
+        retention = 1.0  # Start at 100% on creation day
+
+        for day in range(1, days_since_creation + 1):
+            current_day_date = created_at + timedelta(days=day)
+            # Calculate days since creation for this day's decay rate
+            days_since_start = (current_day_date - created_at).days
+            daily_decay_rate = legacy_get_decay_rate(days_since_start)
+
+            # Apply daily decay: retention = retention * e^(-daily_rate)
+            retention = retention * math.exp(-daily_decay_rate)
+
+        return max(0.0, min(1.0, retention))
+
+
+def legacy_get_next_review_date_new(review_history, created_at):
+    """
+    Calculate when retention drops below 40% threshold using cumulative decay algorithm
+    that matches calculate_retention function.
+    """
+    # Ensure created_at is datetime
+    if not hasattr(created_at, 'hour'):
+        created_at = datetime.combine(created_at, datetime.min.time())
+
+    # Start from last review or creation date
+    if review_history:
+        sorted_reviews = sorted(review_history, key=lambda x: x['reviewed_at'])
+        last_review = sorted_reviews[-1]
+        start_date = last_review['reviewed_at']
+
+        # Ensure start_date is datetime
+        if not hasattr(start_date, 'hour'):
+            start_date = datetime.combine(start_date, datetime.min.time())
+
+        # Find last failure for decay rate reference point
+        last_failure_date = created_at
+        for review in sorted_reviews:
+            review_date = review['reviewed_at']
+            if not hasattr(review_date, 'hour'):
+                review_date = datetime.combine(review_date, datetime.min.time())
+            if not review['response']:
+                last_failure_date = review_date
+    else:
+        start_date = created_at
+        last_failure_date = created_at
+
+    # Simulate retention decay day by day using same logic as calculate_retention
+    current_date = start_date
+    retention = 1.0  # Start at 100% after last review/creation
+    max_days = 730  # Safety cap at 2 years
+
+    for day in range(1, max_days + 1):
+        current_date = start_date + timedelta(days=day)
+
+        # Calculate days since last failure for decay rate determination
+        days_since_failure = (current_date - last_failure_date).days
+        daily_decay_rate = legacy_get_decay_rate(days_since_failure)
+
+        # Apply daily decay: retention = retention * e^(-daily_rate)
+        retention = retention * math.exp(-daily_decay_rate)
+
+        # Check if retention dropped below the configured threshold
+        if retention <= RETENTION_THRESHOLD:
+            return current_date
+
+    # If retention never drops below 40% in 2 years, return max date
+    return start_date + timedelta(days=max_days)
+
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+
+def random_history(rng, created_at):
+    reviews = []
+    current = created_at
+    for _ in range(rng.randint(0, 12)):
+        current = current + timedelta(days=rng.randint(0, 60), hours=rng.randint(0, 23), minutes=rng.randint(0, 59))
+        reviews.append({'reviewed_at': current, 'response': rng.random() < 0.75})
+    rng.shuffle(reviews)
+    return reviews
+
+
+class TestDecayRate(unittest.TestCase):
+
+    def test_matches_legacy_for_all_days(self):
+        for days in list(range(-5, 5000)) + [10 ** 6, 10 ** 9]:
+            self.assertEqual(get_decay_rate(days), legacy_get_decay_rate(days), days)
+
+
+class TestRetentionBitCompatibility(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(20240101)
+        self.created_at = datetime(2024, 1, 1, 9, 30, 0)
+
+    def test_no_reviews(self):
+        for days in range(0, 1200, 7):
+            target = self.created_at + timedelta(days=days, hours=5)
+            self.assertEqual(
+                calculate_retention([], target, self.created_at),
+                legacy_calculate_retention([], target, self.created_at)
+            )
+        self.assertEqual(
+            get_next_review_date_new([], self.created_at),
+            legacy_get_next_review_date_new([], self.created_at)
+        )
+
+    def test_random_histories(self):
+        for _ in range(300):
+            history = random_history(self.rng, self.created_at)
+            for _ in range(5):
+                target = self.created_at + timedelta(days=self.rng.randint(-3, 900), hours=self.rng.randint(0, 23))
+                self.assertEqual(
+                    calculate_retention(copy.deepcopy(history), target, self.created_at),
+                    legacy_calculate_retention(copy.deepcopy(history), target, self.created_at)
+                )
+            self.assertEqual(
+                get_next_review_date_new(copy.deepcopy(history), self.created_at),
+                legacy_get_next_review_date_new(copy.deepcopy(history), self.created_at)
+            )
+
+    def test_date_inputs(self):
+        history = [
+            {'reviewed_at': date(2024, 1, 3), 'response': True},
+            {'reviewed_at': date(2024, 1, 10), 'response': False},
+            {'reviewed_at': date(2024, 2, 1), 'response': True},
+        ]
+        for days in range(0, 400, 3):
+            target = date(2024, 1, 1) + timedelta(days=days)
+            self.assertEqual(
+                calculate_retention(copy.deepcopy(history), target, date(2024, 1, 1)),
+                legacy_calculate_retention(copy.deepcopy(history), target, date(2024, 1, 1))
+            )
+        self.assertEqual(
+            get_next_review_date_new(copy.deepcopy(history), date(2024, 1, 1)),
+            legacy_get_next_review_date_new(copy.deepcopy(history), date(2024, 1, 1))
+        )
+
+    def test_long_streak_hits_safety_cap(self):
+        # Years without a failure: rate keeps halving; the search must still
+        # agree with the legacy loop, including the 730-day cap
+        created_at = datetime(2018, 1, 1)
+        history = [{'reviewed_at': datetime(2024, 1, 1), 'response': True}]
+        self.assertEqual(
+            get_next_review_date_new(copy.deepcopy(history), created_at),
+            legacy_get_next_review_date_new(copy.deepcopy(history), created_at)
+        )
+
+
+class TestRetentionBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(7)
+        self.created_at = datetime(2024, 3, 5, 14, 0, 0)
+
+    def daily_targets(self, days, start=None):
+        start = start or self.created_at.date() - timedelta(days=2)
+        return [start + timedelta(days=i) for i in range(days)]
+
+    def test_matches_scalar_for_random_histories(self):
+        targets = self.daily_targets(400)
+        mixed_targets = targets[:50] + [
+            self.created_at + timedelta(days=d, hours=h)
+            for d in range(-2, 200, 3) for h in (-15, 0, 9)
+        ]
+        for _ in range(80):
+            history = random_history(self.rng, self.created_at)
+            for target_list in (targets, mixed_targets):
+                batch = calculate_retention_batch(copy.deepcopy(history), target_list, self.created_at)
+                expected = [
+                    calculate_retention(copy.deepcopy(history), t, self.created_at)
+                    for t in target_list
+                ]
+                self.assertEqual(batch.tolist(), expected)
+
+    def test_date_created_at_and_reviews(self):
+        history = [
+            {'reviewed_at': date(2024, 3, 6), 'response': False},
+            {'reviewed_at': date(2024, 3, 20), 'response': True},
+        ]
+        targets = self.daily_targets(120, start=date(2024, 3, 1))
+        batch = calculate_retention_batch(copy.deepcopy(history), targets, date(2024, 3, 5))
+        expected = [calculate_retention(copy.deepcopy(history), t, date(2024, 3, 5)) for t in targets]
+        self.assertEqual(batch.tolist(), expected)
+
+    def test_day_range_array_means_end_of_day(self):
+        history = random_history(self.rng, self.created_at)
+        targets = self.daily_targets(300)
+        day_range = np.arange(np.datetime64(targets[0], 'D'), np.datetime64(targets[-1], 'D') + 1)
+        self.assertEqual(
+            calculate_retention_batch(history, day_range, self.created_at).tolist(),
+            calculate_retention_batch(history, targets, self.created_at).tolist()
+        )
+
+    def test_empty_targets(self):
+        self.assertEqual(calculate_retention_batch([], [], self.created_at).shape, (0,))
+
+    def test_many_words(self):
+        words = [(random_history(self.rng, self.created_at), self.created_at) for _ in range(10)]
+        targets = self.daily_targets(60)
+        grid = calculate_retention_for_words(words, targets)
+        self.assertEqual(grid.shape, (10, 60))
+        for row, (history, created_at) in zip(grid, words):
+            self.assertEqual(row.tolist(), calculate_retention_batch(history, targets, created_at).tolist())
+
+
+class TestProjectReviewDates(unittest.TestCase):
+
+    def legacy_projection(self, history, created_at, count):
+        history = copy.deepcopy(history)
+        projected = []
+        for _ in range(count):
+            next_date = legacy_get_next_review_date_new(history, created_at)
+            projected.append(next_date)
+            history.append({'reviewed_at': next_date, 'response': True})
+        return projected
+
+    def test_matches_repeated_next_review(self):
+        rng = random.Random(11)
+        created_at = datetime(2024, 1, 1, 8, 0, 0)
+        for _ in range(200):
+            history = random_history(rng, created_at)
+            self.assertEqual(
+                project_review_dates(copy.deepcopy(history), created_at, count=7),
+                self.legacy_projection(history, created_at, 7)
+            )
+        self.assertEqual(
+            project_review_dates([], created_at, count=7),
+            self.legacy_projection([], created_at, 7)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""
+Unit tests for set-based assembly of the review batch endpoint.
+
+The database is replaced by a fake that answers each query by its table, so
+these count round trips without PostgreSQL.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import handlers.review_batch as review_batch
+
+USER = '11111111-1111-1111-1111-111111111111'
+
+
+def definition(word):
+    return {
+        'word': word,
+        'valid_word_score': 0.9,
+        'definitions': [{'examples': [f'{word} one.', f'{word} two.']}]
+    }
+
+
+def question(word, qtype):
+    return {
+        'question_type': qtype,
+        'word': word,
+        'options': [{'id': 'A', 'text': 'right'}, {'id': 'B', 'text': 'wrong'}],
+        'correct_answer': 'A'
+    }
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def execute(self, query, params=None):
+        self.db.queries.append(query)
+        if 'FROM definitions' in query:
+            self.rows = [
+                {'word': w, 'learning_language': ll, 'native_language': nl, 'definition_data': definition(w)}
+                for w, ll, nl in params[0] if w in self.db.defined
+            ]
+        elif 'FROM review_questions' in query:
+            self.rows = [
+                {'word': w, 'learning_language': ll, 'native_language': nl,
+                 'question_type': 'mc_definition', 'question_data': question(w, 'mc_definition')}
+                for w, ll, nl in params[0] if w in self.db.questioned
+            ]
+        elif 'FROM word_to_video' in query:
+            self.rows = []
+        elif 'FROM audio' in query:
+            self.rows = [
+                {'text_content': text, 'language': lang}
+                for text, lang in params[0] if text in self.db.audio
+            ]
+        elif 'COUNT(*)' in query:
+            self.rows = [{'cnt': 0}]
+        elif 'FROM saved_words sw' in query and 'LIMIT' in query:
+            self.rows = [
+                {'saved_word_id': i, 'word': w, 'learning_language': 'en', 'native_language': 'zh'}
+                for i, w in enumerate(self.db.words)
+            ]
+        else:
+            # Words reviewed today / schedule preferences: none
+            self.rows = []
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self, words, defined, questioned, audio):
+        self.words = words
+        self.defined = set(defined)
+        self.questioned = set(questioned)
+        self.audio = set(audio)
+        self.queries = []
+
+    def __call__(self):
+        return self
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+class TestReviewBatchPrefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def fetch(self, db, **patches):
+        with patch.object(review_batch, 'get_db_connection', db), \
+                patch.object(review_batch, 'get_user_preferences', return_value=('en', 'zh', '', '')), \
+                patch.object(review_batch, 'get_user_timezone', return_value='UTC'), \
+                patch.object(review_batch.question_pool, 'submit_user'), \
+                patch.object(review_batch.question_pool, 'submit_word') as submit_word, \
+                self.app.test_request_context(f'/v3/next-review-words-batch?user_id={USER}&count=20'):
+            for name, value in patches.items():
+                patcher = patch.object(review_batch, name, value)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+            response, status = review_batch.get_review_words_batch()
+        self.assertEqual(status, 200)
+        return response.get_json(), submit_word
+
+    def test_warm_batch_costs_a_fixed_number_of_queries(self):
+        words = [f'word{i:02d}' for i in range(20)]
+        db = FakeDatabase(words, defined=words, questioned=words, audio=words[:5] + ['word00 one.'])
+        body, _ = self.fetch(db)
+
+        self.assertEqual([q['word'] for q in body['questions']], words)
+        # reviewed today, preferences, words, count, then one each for
+        # definitions, questions, videos and audio - independent of batch size
+        self.assertEqual(len(db.queries), 8)
+
+        first = body['questions'][0]['definition']['audio_references']
+        self.assertEqual(first, {'example_audio': {'word00 one.': True}, 'word_audio': True})
+        self.assertIsNone(body['questions'][10]['definition']['audio_references']['word_audio'])
+
+    def test_misses_are_generated_and_queued(self):
+        words = ['apple', 'pear', 'plum']
+        db = FakeDatabase(words, defined=['apple', 'pear'], questioned=['apple'], audio=[])
+        generated = []
+
+        def generate(word, definition_data, ll, nl, qtype):
+            generated.append(word)
+            return question(word, qtype)
+
+        body, submit_word = self.fetch(
+            db,
+            fetch_and_cache_definition=lambda word, ll, nl: None if word == 'plum' else definition(word),
+            generate_question_with_llm=generate,
+            cache_question=lambda *args: None,
+        )
+
+        # plum has no definition and is skipped; pear's question is generated
+        self.assertEqual([q['word'] for q in body['questions']], ['apple', 'pear'])
+        self.assertEqual(generated, ['pear'])
+        submit_word.assert_called_once_with('pear', 'en', 'zh', review_batch.PRIORITY_INTERACTIVE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Unit tests for bulk review-history loading used by schedule calculation.
+
+The database connection is replaced by a recording fake so these run
+without PostgreSQL.
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import services.schedule_service as schedule_service
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+
+    def execute(self, query, params=None):
+        self.db.queries.append((query, params))
+
+    def fetchall(self):
+        return self.db.rows
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.connections = 0
+
+    def __call__(self):
+        self.connections += 1
+        return self
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+class TestReviewHistoryLoading(unittest.TestCase):
+
+    def test_one_query_grouped_by_word(self):
+        rows = [
+            {'word_id': 1, 'reviewed_at': datetime(2025, 1, 2), 'response': True},
+            {'word_id': 1, 'reviewed_at': datetime(2025, 1, 5), 'response': False},
+            {'word_id': 3, 'reviewed_at': datetime(2025, 1, 3), 'response': True},
+        ]
+        db = FakeDatabase(rows)
+        with patch.object(schedule_service, 'get_db_connection', db):
+            histories = schedule_service.get_review_histories([1, 2, 3])
+
+        self.assertEqual(db.connections, 1)
+        self.assertEqual(len(db.queries), 1)
+        self.assertEqual(db.queries[0][1], ([1, 2, 3],))
+        self.assertEqual(histories, {
+            1: [
+                {'reviewed_at': datetime(2025, 1, 2), 'response': True},
+                {'reviewed_at': datetime(2025, 1, 5), 'response': False},
+            ],
+            2: [],
+            3: [{'reviewed_at': datetime(2025, 1, 3), 'response': True}],
+        })
+
+    def test_no_words_skips_database(self):
+        db = FakeDatabase([])
+        with patch.object(schedule_service, 'get_db_connection', db):
+            self.assertEqual(schedule_service.get_review_histories([]), {})
+        self.assertEqual(db.connections, 0)
+
+    def test_build_saved_words_with_reviews(self):
+        created = datetime(2025, 1, 1)
+        saved_words_map = {
+            'apple': {'id': 1, 'created_at': created, 'is_known': False},
+            'banana': {'id': 2, 'created_at': created, 'is_known': False},
+        }
+        rows = [{'word_id': 2, 'reviewed_at': datetime(2025, 1, 2), 'response': True}]
+        db = FakeDatabase(rows)
+        with patch.object(schedule_service, 'get_db_connection', db):
+            result = schedule_service.build_saved_words_with_reviews(saved_words_map)
+
+        self.assertEqual(len(db.queries), 1)
+        self.assertEqual(result, {
+            'apple': {'id': 1, 'created_at': created, 'reviews': [], 'is_known': False},
+            'banana': {
+                'id': 2,
+                'created_at': created,
+                'reviews': [{'reviewed_at': datetime(2025, 1, 2), 'response': True}],
+                'is_known': False
+            },
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Regression tests for the review state denormalized onto saved_words
+(db/migrations/008_add_saved_words_review_state.sql).
+
+The first group captures the queries of handlers that read the denormalized
+columns with fakes, so it runs without PostgreSQL. The trigger group writes
+reviews into a migrated database when TEST_DATABASE_URL is set, inside a
+transaction that is rolled back, and checks saved_words against the
+aggregates over reviews after every change and after the backfill.
+"""
+
+import unittest
+import sys
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import handlers.actions as actions
+import handlers.reads as reads
+
+USER = '11111111-1111-1111-1111-111111111111'
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+MIGRATION = os.path.join(os.path.dirname(__file__), '..', 'db', 'migrations',
+                         '008_add_saved_words_review_state.sql')
+
+STATE_COLUMNS = ('last_reviewed_at', 'next_review_date', 'review_count', 'correct_count', 'last_failure_at')
+
+AGGREGATE_SQL = """
+    SELECT
+        MAX(reviewed_at) AS last_reviewed_at,
+        (ARRAY_AGG(next_review_date ORDER BY reviewed_at DESC))[1] AS next_review_date,
+        COUNT(*) AS review_count,
+        COUNT(*) FILTER (WHERE response = TRUE) AS correct_count,
+        MAX(reviewed_at) FILTER (WHERE response = FALSE) AS last_failure_at
+    FROM reviews
+    WHERE word_id = %s
+"""
+
+
+def compact(query):
+    return ' '.join(query.split())
+
+
+class TestReviewStateQueries(unittest.TestCase):
+
+    def test_next_review_word_reads_saved_words_only(self):
+        app = Flask(__name__)
+        with patch.object(actions, 'db_fetch_one', return_value=None) as fetch_one, \
+                app.test_request_context(f'/v3/next-review-word?user_id={USER}'):
+            actions.get_next_review_word()
+        query, params = fetch_one.call_args[0]
+        query = compact(query)
+        self.assertNotIn('reviews', query)
+        self.assertNotIn('ROW_NUMBER', query)
+        self.assertIn('sw.review_count', query)
+        self.assertIn('ORDER BY COALESCE(sw.next_review_date', query)
+        self.assertEqual(params, (USER,))
+
+    def test_due_count_reads_saved_words_only(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = {'total_count': 3, 'due_count': 1}
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        self.assertEqual(reads.get_due_words_count(USER, conn), {'total_count': 3, 'due_count': 1})
+        query, params = cursor.execute.call_args[0]
+        query = compact(query)
+        self.assertNotIn('reviews', query)
+        self.assertIn('COALESCE(sw.next_review_date', query)
+        self.assertEqual(params, (USER,))
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, 'TEST_DATABASE_URL not set')
+class TestReviewStateTrigger(unittest.TestCase):
+
+    def setUp(self):
+        import psycopg2
+        self.conn = psycopg2.connect(TEST_DATABASE_URL)
+        self.addCleanup(self.conn.close)
+        self.addCleanup(self.conn.rollback)
+        self.cur = self.conn.cursor()
+        self.user = str(uuid.uuid4())
+        self.cur.execute("""
+            INSERT INTO saved_words (user_id, word, learning_language, native_language)
+            VALUES (%s, 'apple', 'en', 'zh') RETURNING id
+        """, (self.user,))
+        self.word_id = self.cur.fetchone()[0]
+        self.start = datetime(2026, 1, 1, 12, 0, 0)
+
+    def add_review(self, days, response):
+        reviewed_at = self.start + timedelta(days=days)
+        self.cur.execute("""
+            INSERT INTO reviews (user_id, word_id, response, reviewed_at, next_review_date)
+            VALUES (%s, %s, %s, %s, %s) RETURNING id
+        """, (self.user, self.word_id, response, reviewed_at, reviewed_at + timedelta(days=days + 1)))
+        return self.cur.fetchone()[0]
+
+    def assertStateMatchesReviews(self):
+        self.cur.execute(f"SELECT {', '.join(STATE_COLUMNS)} FROM saved_words WHERE id = %s", (self.word_id,))
+        state = self.cur.fetchone()
+        self.cur.execute(AGGREGATE_SQL, (self.word_id,))
+        self.assertEqual(state, self.cur.fetchone())
+
+    def test_insert_update_delete(self):
+        self.assertStateMatchesReviews()
+        first = self.add_review(0, True)
+        self.assertStateMatchesReviews()
+        latest = self.add_review(5, False)
+        self.assertStateMatchesReviews()
+        # A review recorded out of order must not replace the latest next_review_date
+        self.add_review(2, True)
+        self.assertStateMatchesReviews()
+
+        self.cur.execute("UPDATE reviews SET response = TRUE WHERE id = %s", (latest,))
+        self.assertStateMatchesReviews()
+        self.cur.execute("UPDATE reviews SET reviewed_at = %s WHERE id = %s",
+                         (self.start + timedelta(days=9), first))
+        self.assertStateMatchesReviews()
+
+        self.cur.execute("DELETE FROM reviews WHERE id = %s", (first,))
+        self.assertStateMatchesReviews()
+        self.cur.execute("DELETE FROM reviews WHERE word_id = %s", (self.word_id,))
+        self.assertStateMatchesReviews()
+
+    def test_backfill(self):
+        for days, response in ((0, True), (3, False), (1, True)):
+            self.add_review(days, response)
+        self.cur.execute("""
+            UPDATE saved_words
+            SET last_reviewed_at = NULL, next_review_date = NULL,
+                review_count = 0, correct_count = 0, last_failure_at = NULL
+            WHERE id = %s
+        """, (self.word_id,))
+
+        with open(MIGRATION) as f:
+            backfill = re.search(r'-- One-shot backfill of existing reviews\n(.*?;)', f.read(), re.S).group(1)
+        self.cur.execute(backfill)
+        self.assertStateMatchesReviews()
+
+
+if __name__ == '__main__':
+    unittest.main()
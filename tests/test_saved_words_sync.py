@@ -0,0 +1,130 @@
+"""
+Unit tests for delta sync of saved words.
+
+The database connection is replaced by a recording fake so these check
+cursor handling and the shape of the delta queries without PostgreSQL.
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import handlers.words as words
+
+USER = '11111111-1111-1111-1111-111111111111'
+NOW = datetime(2026, 10, 16, 12, 0, 0)
+
+ROW = {
+    'id': 7, 'word': 'apple', 'learning_language': 'en', 'native_language': 'zh',
+    'metadata': {}, 'created_at': datetime(2026, 10, 1), 'is_known': False,
+    'next_review_date': datetime(2026, 10, 20), 'review_count': 3,
+    'correct_reviews': 2, 'incorrect_reviews': 1,
+    'last_reviewed_at': datetime(2026, 10, 15, 9, 30), 'is_toefl': True,
+    'is_ielts': None, 'word_progress_level': 1,
+}
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    def execute(self, query, params=None):
+        self.db.queries.append((query, params))
+        if 'NOW()::timestamp' in query:
+            self.result = [{'now': NOW}]
+        elif 'FROM saved_word_deletions' in query:
+            self.result = [{'word_id': 3}, {'word_id': 5}]
+        else:
+            self.result = [ROW]
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self):
+        return self
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+class TestSavedWordsSync(unittest.TestCase):
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        patcher = patch.object(words, 'get_db_connection', self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        app = Flask(__name__)
+        app.route('/v3/saved_words')(words.get_saved_words)
+        self.client = app.test_client()
+
+    def get(self, **params):
+        query = '&'.join(f'{k}={v}' for k, v in {'user_id': USER, **params}.items())
+        return self.client.get(f'/v3/saved_words?{query}')
+
+    def words_query(self):
+        return next((q, p) for q, p in self.db.queries if 'FROM saved_words sw' in q)
+
+    def test_full_list_issues_cursor(self):
+        data = self.get().get_json()
+        self.assertTrue(data['full'])
+        self.assertEqual(data['deleted_ids'], [])
+        self.assertEqual(data['saved_words'][0]['word'], 'apple')
+        self.assertEqual(data['cursor'], (NOW - words.SAVED_WORDS_SYNC_OVERLAP).isoformat())
+        query, params = self.words_query()
+        self.assertNotIn('updated_at', query)
+        self.assertFalse(any('saved_word_deletions' in q for q, _ in self.db.queries))
+
+    def test_review_aggregates_are_scoped_to_the_user(self):
+        self.get()
+        query, params = self.words_query()
+        cte = query.split('GROUP BY word_id')[0]
+        self.assertIn('WHERE user_id = %(user_id)s', cte)
+        self.assertEqual(params['user_id'], USER)
+
+    def test_delta_returns_changes_and_deletions(self):
+        since = NOW - timedelta(hours=1)
+        data = self.get(since=since.isoformat()).get_json()
+        self.assertFalse(data['full'])
+        self.assertEqual(data['deleted_ids'], [3, 5])
+        self.assertEqual([w['id'] for w in data['saved_words']], [7])
+        query, params = self.words_query()
+        self.assertIn('sw.updated_at > %(since)s', query)
+        self.assertEqual(params['since'], since)
+        self.assertEqual(params['windows'], words.PROGRESS_LEVEL_WINDOWS)
+
+    def test_expired_cursor_gets_full_list(self):
+        since = NOW - timedelta(days=words.SAVED_WORDS_SYNC_RETENTION_DAYS + 1)
+        data = self.get(since=since.isoformat()).get_json()
+        self.assertTrue(data['full'])
+        self.assertNotIn('updated_at', self.words_query()[0])
+
+    def test_bad_cursors_are_rejected(self):
+        self.assertEqual(self.get(since='yesterday').status_code, 400)
+        self.assertEqual(self.get(since='2026-10-16T10:00:00%2B02:00').status_code, 400)
+        self.assertEqual(self.get(since=NOW.isoformat(), due_only='true').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Unit tests for memoized per-user schedule snapshots.
+
+The computation and the optional Postgres store are replaced by fakes so
+these run without PostgreSQL.
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+from datetime import date
+from unittest.mock import patch
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import services.schedule_service as schedule_service
+
+USER = '11111111-1111-1111-1111-111111111111'
+OTHER_USER = '22222222-2222-2222-2222-222222222222'
+
+
+class TestUserSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        schedule_service._snapshot_cache.clear()
+        self.calls = []
+
+    def compute(self, value='schedule'):
+        def fn():
+            self.calls.append(value)
+            return {'value': value}
+        return fn
+
+    def test_repeat_reads_compute_once(self):
+        first = schedule_service.get_user_snapshot(USER, 3, 'schedule', ('TOEFL',), self.compute())
+        second = schedule_service.get_user_snapshot(USER, 3, 'schedule', ('TOEFL',), self.compute())
+        self.assertIs(first, second)
+        self.assertEqual(self.calls, ['schedule'])
+
+    def test_version_bump_recomputes(self):
+        schedule_service.get_user_snapshot(USER, 3, 'schedule', ('TOEFL',), self.compute('old'))
+        value = schedule_service.get_user_snapshot(USER, 4, 'schedule', ('TOEFL',), self.compute('new'))
+        self.assertEqual(value, {'value': 'new'})
+        self.assertEqual(self.calls, ['old', 'new'])
+
+    def test_params_are_part_of_key(self):
+        schedule_service.get_user_snapshot(USER, 1, 'schedule', ('TOEFL', '2026-10-16'), self.compute('a'))
+        schedule_service.get_user_snapshot(USER, 1, 'schedule', ('TOEFL', '2026-10-17'), self.compute('b'))
+        schedule_service.get_user_snapshot(USER, 1, 'test_progress', ('TOEFL', '2026-10-16'), self.compute('c'))
+        self.assertEqual(self.calls, ['a', 'b', 'c'])
+
+    def test_invalidate_drops_only_that_user(self):
+        schedule_service.get_user_snapshot(USER, 1, 'schedule', (), self.compute('a'))
+        schedule_service.get_user_snapshot(OTHER_USER, 1, 'schedule', (), self.compute('b'))
+        self.assertEqual(schedule_service.invalidate_user_snapshots(USER), 1)
+
+        schedule_service.get_user_snapshot(USER, 1, 'schedule', (), self.compute('a'))
+        schedule_service.get_user_snapshot(OTHER_USER, 1, 'schedule', (), self.compute('b'))
+        self.assertEqual(self.calls, ['a', 'b', 'a'])
+
+    def test_concurrent_misses_coalesce(self):
+        release = threading.Event()
+
+        def slow():
+            self.calls.append('slow')
+            release.wait(2)
+            return {'value': 'slow'}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                schedule_service.get_user_snapshot(USER, 1, 'schedule', (), slow)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(2)
+
+        self.assertEqual(self.calls, ['slow'])
+        self.assertEqual(results, [{'value': 'slow'}] * 4)
+
+    def test_postgres_store_shared_between_processes(self):
+        store = {}
+
+        def load(user_id, version, kind, params):
+            return store.get((user_id, version, kind, params))
+
+        def save(user_id, version, kind, params, value):
+            store[(user_id, version, kind, params)] = value
+
+        with patch.object(schedule_service, 'SCHEDULE_SNAPSHOT_STORE', 'postgres'), \
+                patch.object(schedule_service, '_load_stored_snapshot', side_effect=load), \
+                patch.object(schedule_service, '_store_snapshot', side_effect=save):
+            schedule_service.get_user_snapshot(USER, 1, 'schedule', ('TOEFL',), self.compute())
+            # Another worker process starts with an empty local cache
+            schedule_service._snapshot_cache.clear()
+            value = schedule_service.get_user_snapshot(USER, 1, 'schedule', ('TOEFL',), self.compute())
+
+        self.assertEqual(value, {'value': 'schedule'})
+        self.assertEqual(self.calls, ['schedule'])
+
+    def test_get_schedule_snapshot_keys_by_local_date(self):
+        with patch.object(schedule_service, 'calculate_user_schedule',
+                          side_effect=lambda *args: {'daily_schedules': {}, 'args': args}) as calc:
+            args = (USER, 'TOEFL', date(2026, 12, 1), 'UTC')
+            schedule_service.get_schedule_snapshot(*args, date(2026, 10, 16), 7)
+            schedule_service.get_schedule_snapshot(*args, date(2026, 10, 16), 7)
+            schedule_service.get_schedule_snapshot(*args, date(2026, 10, 17), 7)
+        self.assertEqual(calc.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for ranged, streamed video responses.
+
+The videos table is replaced by a fake that answers metadata and substring()
+queries from memory, so these run without PostgreSQL.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import handlers.videos as videos
+
+VIDEO = bytes(i % 251 for i in range(10000))
+
+
+class FakeVideos:
+    def __init__(self):
+        self.slices = []
+
+    def __call__(self, query, params):
+        if 'substring' in query:
+            start, length, video_id = params
+            self.slices.append(length)
+            return {'chunk': memoryview(VIDEO[start - 1:start - 1 + length])} if video_id == 7 else None
+        video_id = params[0]
+        return {'format': 'mp4', 'storage_key': None, 'length': len(VIDEO)} if video_id == 7 else None
+
+
+class TestVideoStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.route('/v3/videos/<int:video_id>')(videos.get_video)
+        self.client = self.app.test_client()
+        self.db = FakeVideos()
+        for patcher in (patch.object(videos, 'db_fetch_one', side_effect=self.db),
+                        patch.object(videos, 'VIDEO_STREAM_CHUNK_SIZE', 1000)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get(self, **headers):
+        return self.client.get('/v3/videos/7', headers=headers)
+
+    def test_full_video_streams_in_bounded_chunks(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, VIDEO)
+        self.assertEqual(response.headers['Content-Length'], str(len(VIDEO)))
+        self.assertEqual(response.mimetype, 'video/mp4')
+        self.assertEqual(max(self.db.slices), 1000)
+        self.assertEqual(len(self.db.slices), 10)
+
+    def test_range_reads_only_requested_bytes(self):
+        response = self.get(Range='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, VIDEO[100:200])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 100-199/{len(VIDEO)}')
+        self.assertEqual(response.headers['Content-Length'], '100')
+        self.assertEqual(self.db.slices, [100])
+
+    def test_suffix_range(self):
+        response = self.get(Range='bytes=-10')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, VIDEO[-10:])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range=f'bytes={len(VIDEO)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response.headers['Content-Range'], f'bytes */{len(VIDEO)}')
+
+    def test_stale_if_range_gets_full_body(self):
+        response = self.get(Range='bytes=0-9', **{'If-Range': '"8"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), len(VIDEO))
+
+    def test_if_none_match_returns_304_without_reading(self):
+        response = self.get(**{'If-None-Match': '"7"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.db.slices, [])
+
+    def test_missing_video(self):
+        self.assertEqual(self.client.get('/v3/videos/8').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Regression tests for case-normalized word keys (db/migrations/015_add_word_keys.sql).
+
+The lookup queries are captured from the handlers with fakes, so the first
+group runs without PostgreSQL. The EXPLAIN group runs the same queries
+against a migrated database when TEST_DATABASE_URL is set and asserts the
+planner can answer them from an index.
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+from flask import Flask
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import handlers.achievements as achievements
+import handlers.words as words
+import workers.test_vocabulary_worker as test_vocabulary_worker
+
+USER = '11111111-1111-1111-1111-111111111111'
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+# Statements the schedule handler and the saved_words trigger run, which are
+# not reachable through a single handler call
+SCHEDULE_PROGRESS_SQL = """
+    SELECT COUNT(DISTINCT sw.word_key) as saved
+    FROM saved_words sw
+    INNER JOIN test_vocabularies tv ON sw.word_key = tv.word_key AND sw.learning_language = tv.language
+    WHERE sw.user_id = %s
+        AND tv.is_tianz = TRUE
+"""
+TRIGGER_DUPLICATE_SQL = """
+    SELECT 1 FROM saved_words
+    WHERE user_id = %s AND learning_language = %s
+      AND word_key = LOWER(%s) AND id <> %s
+"""
+
+
+def capture_membership_query():
+    with patch.object(achievements, 'db_fetch_one', return_value={}) as fetch_one:
+        achievements.check_test_completion_badges(USER, 'Apple', 'en')
+    return fetch_one.call_args[0]
+
+
+def capture_is_saved_queries():
+    app = Flask(__name__)
+    app.route('/v3/is-word-saved')(words.is_word_saved)
+    cursor = MagicMock()
+    cursor.fetchone.return_value = None
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+    with patch.object(words, 'get_db_connection', return_value=conn):
+        client = app.test_client()
+        client.get(f'/v3/is-word-saved?user_id={USER}&word=Apple')
+        client.get(f'/v3/is-word-saved?user_id={USER}&word=Apple&learning_lang=en&native_lang=zh')
+    return [c[0] for c in cursor.execute.call_args_list]
+
+
+class TestWordKeyQueries(unittest.TestCase):
+
+    def test_membership_lookup_uses_word_key(self):
+        query, params = capture_membership_query()
+        self.assertIn('word_key = LOWER(%s)', query)
+        self.assertNotIn('LOWER(word)', query)
+        self.assertEqual(params, ('Apple', 'en'))
+
+    def test_is_word_saved_uses_word_key(self):
+        captured = capture_is_saved_queries()
+        self.assertEqual(len(captured), 2)
+        for query, params in captured:
+            self.assertIn('word_key = %s', query)
+            self.assertEqual(params[1], 'apple')
+
+    def test_daily_words_skip_saved_words_by_key(self):
+        with patch.object(test_vocabulary_worker, 'db_cursor') as db_cursor:
+            cur = db_cursor.return_value.__enter__.return_value
+            cur.fetchone.return_value = {'users': 0, 'words': 0}
+            test_vocabulary_worker.assign_test_words_chunk([USER])
+        self.assertIn('sw.word_key = tv.word_key', cur.execute.call_args[0][0])
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, 'TEST_DATABASE_URL not set')
+class TestWordKeyIndexPlans(unittest.TestCase):
+
+    def setUp(self):
+        import psycopg2
+        self.conn = psycopg2.connect(TEST_DATABASE_URL)
+        self.addCleanup(self.conn.close)
+        self.addCleanup(self.conn.rollback)
+        self.cur = self.conn.cursor()
+        # Small test databases make sequential scans cheapest; with them
+        # penalized, a Seq Scan in the plan means no index can serve the query.
+        self.cur.execute("SET LOCAL enable_seqscan = off")
+
+    def plan_nodes(self, query, params):
+        self.cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        stack = [self.cur.fetchone()[0][0]['Plan']]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.get('Plans', []))
+
+    def assertIndexed(self, query, params, *tables):
+        nodes = list(self.plan_nodes(query, params))
+        for table in tables:
+            scans = [n['Node Type'] for n in nodes if n.get('Relation Name') == table]
+            self.assertTrue(scans, f'{table} not in plan')
+            self.assertNotIn('Seq Scan', scans, f'{table} is scanned sequentially')
+
+    def test_membership_lookup(self):
+        self.assertIndexed(*capture_membership_query(), 'test_vocabularies')
+
+    def test_is_word_saved(self):
+        for query, params in capture_is_saved_queries():
+            self.assertIndexed(query, params, 'saved_words')
+
+    def test_schedule_progress_join(self):
+        self.assertIndexed(SCHEDULE_PROGRESS_SQL, (USER,), 'saved_words', 'test_vocabularies')
+
+    def test_trigger_duplicate_check(self):
+        self.assertIndexed(TRIGGER_DUPLICATE_SQL, (USER, 'en', 'Apple', 0), 'saved_words')
+
+
+if __name__ == '__main__':
+    unittest.main()